@@ -18,6 +18,10 @@ class Settings(BaseSettings):
     secret_key: str = Field(..., env="SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     access_token_expire_minutes: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    internal_api_key: str = Field(default="a-super-secret-internal-key", env="INTERNAL_API_KEY")
+
+    # Token revocation list (synced from user-service)
+    token_revocation_sync_seconds: float = Field(default=2.0, gt=0, env="TOKEN_REVOCATION_SYNC_SECONDS")
 
     # CORS
     cors_origins: List[str] = Field(
@@ -8,6 +8,8 @@ from loguru import logger
 import sys
 
 from src.core.config import settings
+from src.middleware import RevocationMiddleware
+from src.utils.revocation import TokenRevocationList
 
 # Configure logger
 logger.remove()
@@ -32,6 +34,10 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Tokens revocados (logout, usuario desactivado): lista en memoria sincronizada con
+# user-service. Se registra antes que CORS para que el 401 lleve los headers CORS
+app.add_middleware(RevocationMiddleware)
+
 # CORS middleware - DEBE ir ANTES de los routers
 app.add_middleware(
     CORSMiddleware,
@@ -70,6 +76,7 @@ async def startup_event():
     """Initialize on startup"""
     logger.info(f"Starting {settings.service_name} on port {settings.port}")
     logger.info(f"Environment: {settings.environment}")
+    await TokenRevocationList.start()
     logger.info("API Gateway ready - routing to microservices")
 
 
@@ -77,6 +84,7 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info(f"Shutting down {settings.service_name}")
+    await TokenRevocationList.stop()
 
 
 @app.get("/")
@@ -106,13 +114,14 @@ async def health_check():
 
 
 # Import and include routers (proxy routes to microservices)
-from src.routers import auth, users, roles, profile, patients, orders, billing, config, reconciliation
+from src.routers import auth, users, roles, profile, audit, patients, orders, billing, config, reconciliation
 
 # User service routers
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(roles.router)
 app.include_router(profile.router)
+app.include_router(audit.router)
 
 # Patient service router
 app.include_router(patients.router)
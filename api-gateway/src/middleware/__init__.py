@@ -1,4 +1,5 @@
 """Middleware package"""
 from src.middleware.auth import AuthMiddleware, is_public_endpoint
+from src.middleware.revocation import RevocationMiddleware
 
-__all__ = ["AuthMiddleware", "is_public_endpoint"]
+__all__ = ["AuthMiddleware", "is_public_endpoint", "RevocationMiddleware"]
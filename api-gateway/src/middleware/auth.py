@@ -6,7 +6,6 @@ For now, we'll keep it simple and let individual services handle authentication.
 """
 from fastapi import Request, HTTPException, status
 from typing import Optional
-import jwt
 from loguru import logger
 
 
@@ -33,6 +32,8 @@ class AuthMiddleware:
             "/openapi.json",
             "/api/v1/auth/login",
             "/api/v1/auth/register",
+            "/api/v1/auth/refresh",
+            "/api/v1/auth/logout",
         ]
 
         if request.url.path in public_paths:
@@ -100,6 +101,6 @@ def is_public_endpoint(path: str) -> bool:
     if path in PUBLIC_ENDPOINTS:
         return True
     # Auth endpoints are public
-    if path.startswith("/api/v1/auth/login") or path.startswith("/api/v1/auth/register"):
+    if path.startswith(("/api/v1/auth/login", "/api/v1/auth/register", "/api/v1/auth/refresh", "/api/v1/auth/logout")):
         return True
     return False
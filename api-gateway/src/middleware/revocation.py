@@ -0,0 +1,34 @@
+"""
+Token Revocation Middleware for API Gateway
+
+Rejects requests whose Bearer token is in the revocation list synced from
+user-service. Signature and expiry are still validated by the backend
+services; here only the claims are read, so the check costs no crypto and
+no network call.
+"""
+from fastapi import status
+from fastapi.responses import JSONResponse
+from jose import jwt, JWTError
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.middleware.auth import is_public_endpoint
+from src.utils.revocation import TokenRevocationList
+
+
+class RevocationMiddleware(BaseHTTPMiddleware):
+    """401 for revoked access tokens; every other request passes through unchanged"""
+
+    async def dispatch(self, request, call_next):
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header[:7].lower() == "bearer " and not is_public_endpoint(request.url.path):
+            try:
+                claims = jwt.get_unverified_claims(auth_header[7:].strip())
+            except JWTError:
+                claims = None
+            if isinstance(claims, dict) and TokenRevocationList.is_revoked(claims):
+                return JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"detail": "Token revocado"},
+                    headers={"WWW-Authenticate": "Bearer"}
+                )
+        return await call_next(request)
@@ -0,0 +1,15 @@
+"""
+Audit Logs Router - Proxy to user-service
+"""
+from fastapi import APIRouter, Request, Response
+from src.core.config import settings
+from src.utils.proxy import proxy_request
+
+router = APIRouter(prefix="/api/v1/audit-logs", tags=["Audit Logs"])
+
+
+@router.get("")
+async def search_audit_logs(request: Request) -> Response:
+    """Search audit logs of a date range (date_from and date_to are required)"""
+    target_url = f"{settings.user_service_url}/api/v1/audit-logs"
+    return await proxy_request(request, target_url)
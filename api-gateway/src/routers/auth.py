@@ -25,6 +25,20 @@ async def login(request: Request) -> Response:
     return await proxy_request(request, target_url)
 
 
+@router.post("/refresh")
+async def refresh(request: Request) -> Response:
+    """Refresh - Exchange a refresh token for a new access token (the refresh token is rotated)"""
+    target_url = f"{settings.user_service_url}/api/v1/auth/refresh"
+    return await proxy_request(request, target_url)
+
+
+@router.post("/logout")
+async def logout(request: Request) -> Response:
+    """Logout - Revoke the session of a refresh token"""
+    target_url = f"{settings.user_service_url}/api/v1/auth/logout"
+    return await proxy_request(request, target_url)
+
+
 @router.post("/register")
 async def register(request: Request) -> Response:
     """Register new user"""
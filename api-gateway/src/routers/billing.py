@@ -15,6 +15,13 @@ async def list_invoices(request: Request) -> Response:
     return await proxy_request(request, target_url)
 
 
+@router.post("/bulk")
+async def create_invoices_bulk(request: Request) -> Response:
+    """Invoice every paid, uninvoiced order of a location and date range"""
+    target_url = f"{settings.billing_service_url}/api/v1/invoices/bulk"
+    return await proxy_request(request, target_url)
+
+
 @router.get("/statistics")
 async def get_billing_statistics(request: Request) -> Response:
     """Get billing statistics"""
@@ -22,6 +29,20 @@ async def get_billing_statistics(request: Request) -> Response:
     return await proxy_request(request, target_url)
 
 
+@router.get("/series")
+async def list_invoice_series(request: Request) -> Response:
+    """List invoice series (B001, F001, ...) with their next correlative"""
+    target_url = f"{settings.billing_service_url}/api/v1/invoices/series"
+    return await proxy_request(request, target_url)
+
+
+@router.post("/series")
+async def create_invoice_series(request: Request) -> Response:
+    """Register a new invoice series for a type and optional location"""
+    target_url = f"{settings.billing_service_url}/api/v1/invoices/series"
+    return await proxy_request(request, target_url)
+
+
 @router.get("/{invoice_id}")
 async def get_invoice(request: Request, invoice_id: int) -> Response:
     """Get invoice by ID"""
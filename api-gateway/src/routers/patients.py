@@ -15,6 +15,41 @@ async def list_patients(request: Request) -> Response:
     return await proxy_request(request, target_url)
 
 
+@router.get("/suggest")
+async def suggest_patients(request: Request) -> Response:
+    """Typeahead suggestions (top matches, minimal projection)"""
+    target_url = f"{settings.patient_service_url}/api/v1/patients/suggest"
+    return await proxy_request(request, target_url)
+
+
+@router.get("/duplicates")
+async def get_duplicate_suggestions(request: Request) -> Response:
+    """Possible duplicate patients found by the dedup job"""
+    target_url = f"{settings.patient_service_url}/api/v1/patients/duplicates"
+    return await proxy_request(request, target_url)
+
+
+@router.put("/duplicates/{suggestion_id}")
+async def review_duplicate_suggestion(request: Request, suggestion_id: int) -> Response:
+    """Mark a duplicate suggestion as MERGED or REJECTED"""
+    target_url = f"{settings.patient_service_url}/api/v1/patients/duplicates/{suggestion_id}"
+    return await proxy_request(request, target_url)
+
+
+@router.post("/batch")
+async def get_patients_batch(request: Request) -> Response:
+    """Get several patients by ID and/or document number in one call"""
+    target_url = f"{settings.patient_service_url}/api/v1/patients/batch"
+    return await proxy_request(request, target_url)
+
+
+@router.post("/import")
+async def import_patients(request: Request) -> Response:
+    """Bulk import patients from a CSV/XLSX file (multipart)"""
+    target_url = f"{settings.patient_service_url}/api/v1/patients/import"
+    return await proxy_request(request, target_url, timeout=120.0)
+
+
 @router.get("/{patient_id}")
 async def get_patient(request: Request, patient_id: int) -> Response:
     """Get patient by ID"""
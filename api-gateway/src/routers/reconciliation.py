@@ -19,6 +19,13 @@ async def list_closures(request: Request) -> Response:
     return await proxy_request(request, target_url)
 
 
+@router.post("/closures/batch")
+async def create_batch_closure(request: Request) -> Response:
+    """Run the daily closure for every active location"""
+    target_url = f"{settings.billing_service_url}/api/v1/reconciliation/closures/batch"
+    return await proxy_request(request, target_url)
+
+
 @router.get("/closures/statistics")
 async def get_closure_statistics(request: Request) -> Response:
     """Get closure statistics"""
@@ -65,6 +72,13 @@ async def add_discrepancy(request: Request, closure_id: int) -> Response:
     return await proxy_request(request, target_url)
 
 
+@router.post("/closures/{closure_id}/statements")
+async def import_statement(request: Request, closure_id: int) -> Response:
+    """Import a bank/wallet statement and reconcile it against the day's payments"""
+    target_url = f"{settings.billing_service_url}/api/v1/reconciliation/closures/{closure_id}/statements"
+    return await proxy_request(request, target_url, timeout=120.0)
+
+
 @router.put("/discrepancies/{discrepancy_id}/resolve")
 async def resolve_discrepancy(request: Request, discrepancy_id: int) -> Response:
     """Mark discrepancy as resolved"""
@@ -0,0 +1,133 @@
+"""
+In-memory list of revoked access tokens, synced from user-service
+
+user-service records revocations (logout, deactivated users, password
+resets) until the tokens expire and serves them as an incremental feed
+(/api/v1/internal/token-revocations?after_id=N). The gateway polls it every
+TOKEN_REVOCATION_SYNC_SECONDS, so checking a request is two dict lookups
+with no network call, and a revocation reaches the gateway within one cycle.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from src.core.config import settings
+
+
+class TokenRevocationList:
+    """
+    Revoked jtis and per-user watermarks (tokens issued before issued_before)
+
+    If user-service is unreachable the last synced list is kept.
+    """
+
+    _jtis: Dict[str, float] = {}
+    _users: Dict[int, Tuple[float, float]] = {}
+    _cursor = 0
+    _client: Optional[httpx.AsyncClient] = None
+    _task: Optional[asyncio.Task] = None
+    _synced_at = 0.0
+    _syncs = 0
+    _failed_syncs = 0
+
+    @classmethod
+    def is_revoked(cls, claims: Dict[str, Any]) -> bool:
+        """True if the token's jti is revoked or it predates its user's revocation"""
+        jti = claims.get("jti")
+        if jti is not None and jti in cls._jtis:
+            return True
+        user = cls._users.get(claims.get("user_id"))
+        if user is None:
+            return False
+        issued_at = claims.get("iat")
+        return issued_at is None or issued_at < user[0]
+
+    @classmethod
+    async def sync(cls) -> int:
+        """
+        Fetch the revocations after the cursor
+
+        Returns:
+            Number of entries received
+        """
+        if cls._client is None:
+            cls._client = httpx.AsyncClient(timeout=5.0)
+        response = await cls._client.get(
+            f"{settings.user_service_url.rstrip('/')}/api/v1/internal/token-revocations",
+            params={"after_id": cls._cursor},
+            headers={"X-Internal-API-Key": settings.internal_api_key}
+        )
+        response.raise_for_status()
+        feed = response.json()
+        if feed["last_id"] < cls._cursor:
+            # The table was recreated: reload the whole list
+            cls._jtis, cls._users, cls._cursor = {}, {}, 0
+            return await cls.sync()
+
+        for entry in feed["revocations"]:
+            if entry["jti"]:
+                cls._jtis[entry["jti"]] = entry["expires_at"]
+            if entry["user_id"] is not None and entry["issued_before"] is not None:
+                current = cls._users.get(entry["user_id"])
+                if current is None or entry["issued_before"] >= current[0]:
+                    cls._users[entry["user_id"]] = (entry["issued_before"], entry["expires_at"])
+
+        now = time.time()
+        cls._jtis = {jti: expires_at for jti, expires_at in cls._jtis.items() if expires_at > now}
+        cls._users = {user_id: user for user_id, user in cls._users.items() if user[1] > now}
+        cls._cursor = feed["last_id"]
+        cls._synced_at = now
+        cls._syncs += 1
+        return len(feed["revocations"])
+
+    @classmethod
+    async def start(cls) -> None:
+        """Initial load and periodic sync (startup)"""
+        try:
+            await cls.sync()
+            logger.info(f"Token revocation list loaded ({len(cls._jtis)} tokens, {len(cls._users)} users)")
+        except Exception as e:
+            cls._failed_syncs += 1
+            logger.warning(f"Could not load the token revocation list yet: {e}")
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stop the sync task and close the client (shutdown)"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            await asyncio.sleep(settings.token_revocation_sync_seconds)
+            try:
+                await cls.sync()
+            except Exception as e:
+                cls._failed_syncs += 1
+                logger.error(f"Token revocation sync failed (keeping the last list): {e}")
+
+    @classmethod
+    def metrics(cls) -> Dict[str, Any]:
+        """Size and sync state of the list"""
+        return {
+            "revoked_tokens": len(cls._jtis),
+            "revoked_users": len(cls._users),
+            "cursor": cls._cursor,
+            "syncs": cls._syncs,
+            "failed_syncs": cls._failed_syncs,
+            "seconds_since_sync": round(time.time() - cls._synced_at, 3) if cls._synced_at else None,
+            "sync_seconds": settings.token_revocation_sync_seconds,
+        }
@@ -13,7 +13,7 @@ from src.core.config import settings
 from src.core.database import Base
 
 # Import all models from modules
-from src.modules.billing.models import Invoice, InvoiceItem
+from src.modules.billing.models import Invoice, InvoiceItem, InvoiceSeries
 from src.modules.reconciliation.models import DailyClosure, Discrepancy
 
 # this is the Alembic Config object
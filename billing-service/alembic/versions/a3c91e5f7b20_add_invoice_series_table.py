@@ -0,0 +1,54 @@
+"""add_invoice_series_table
+
+Revision ID: a3c91e5f7b20
+Revises: d60a67c5c1c9
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91e5f7b20'
+down_revision: Union[str, None] = 'd60a67c5c1c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'invoice_series',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('invoice_type', sa.Enum('BOLETA', 'FACTURA', name='invoicetype', native_enum=False), nullable=False),
+        sa.Column('serie', sa.String(length=4), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=True),
+        sa.Column('next_value', sa.Integer(), nullable=False),
+        sa.Column('is_default', sa.Boolean(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('invoice_type', 'serie', name='uq_invoice_series_type_serie')
+    )
+    op.create_index(op.f('ix_invoice_series_id'), 'invoice_series', ['id'], unique=False)
+    op.create_index('ix_invoice_series_type_location', 'invoice_series', ['invoice_type', 'location_id'], unique=False)
+
+    # Series globales por defecto, continuando después del último número emitido
+    op.execute("""
+        INSERT INTO invoice_series (invoice_type, serie, location_id, next_value, is_default, is_active)
+        SELECT s.invoice_type, s.serie, NULL,
+               COALESCE(MAX(CAST(split_part(i.invoice_number, '-', 2) AS INTEGER)), 0) + 1,
+               true, true
+        FROM (VALUES ('BOLETA', 'B001'), ('FACTURA', 'F001')) AS s(invoice_type, serie)
+        LEFT JOIN invoices i ON split_part(i.invoice_number, '-', 1) = s.serie
+        GROUP BY s.invoice_type, s.serie
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invoice_series_type_location', table_name='invoice_series')
+    op.drop_index(op.f('ix_invoice_series_id'), table_name='invoice_series')
+    op.drop_table('invoice_series')
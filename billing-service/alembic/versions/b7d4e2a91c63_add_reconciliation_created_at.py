@@ -0,0 +1,28 @@
+"""add_reconciliation_created_at
+
+Revision ID: b7d4e2a91c63
+Revises: a3c91e5f7b20
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d4e2a91c63'
+down_revision: Union[str, None] = 'a3c91e5f7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('daily_closures', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('discrepancies', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('discrepancies', 'created_at')
+    op.drop_column('daily_closures', 'created_at')
@@ -0,0 +1,30 @@
+"""nullable_closure_registered_total
+
+Revision ID: c4f1a8e2d7b5
+Revises: b7d4e2a91c63
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f1a8e2d7b5'
+down_revision: Union[str, None] = 'b7d4e2a91c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Batch closures of locations without declared totals stay PENDING with no registered total
+    op.alter_column('daily_closures', 'registered_total', existing_type=sa.Numeric(precision=10, scale=2), nullable=True)
+    op.alter_column('daily_closures', 'difference', existing_type=sa.Numeric(precision=10, scale=2), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("UPDATE daily_closures SET registered_total = 0, difference = -expected_total WHERE registered_total IS NULL")
+    op.alter_column('daily_closures', 'difference', existing_type=sa.Numeric(precision=10, scale=2), nullable=False)
+    op.alter_column('daily_closures', 'registered_total', existing_type=sa.Numeric(precision=10, scale=2), nullable=False)
@@ -0,0 +1,32 @@
+"""add_discrepancy_source_key
+
+Revision ID: d9e3b7c1a4f6
+Revises: c4f1a8e2d7b5
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e3b7c1a4f6'
+down_revision: Union[str, None] = 'c4f1a8e2d7b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Statement line / payment that produced the discrepancy (re-imports do not duplicate it)
+    op.add_column('discrepancies', sa.Column('source_key', sa.Text(), nullable=True))
+    op.create_index(
+        'uq_discrepancies_closure_source_key', 'discrepancies', ['closure_id', 'source_key'],
+        unique=True, postgresql_where=sa.text('source_key IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_discrepancies_closure_source_key', table_name='discrepancies')
+    op.drop_column('discrepancies', 'source_key')
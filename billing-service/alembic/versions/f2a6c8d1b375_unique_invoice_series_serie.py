@@ -0,0 +1,28 @@
+"""unique_invoice_series_serie
+
+Revision ID: f2a6c8d1b375
+Revises: d9e3b7c1a4f6
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6c8d1b375'
+down_revision: Union[str, None] = 'd9e3b7c1a4f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # invoice_number is serie-correlative, so the serie alone must identify the sequence
+    op.drop_constraint('uq_invoice_series_type_serie', 'invoice_series', type_='unique')
+    op.create_unique_constraint('uq_invoice_series_serie', 'invoice_series', ['serie'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_invoice_series_serie', 'invoice_series', type_='unique')
+    op.create_unique_constraint('uq_invoice_series_type_serie', 'invoice_series', ['invoice_type', 'serie'])
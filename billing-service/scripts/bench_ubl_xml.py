@@ -0,0 +1,109 @@
+"""
+Benchmark and equivalence check for the UBL 2.1 XML generators.
+
+Compares UBLXMLGenerator (lxml element by element) against
+UBLTemplateXMLGenerator (precompiled templates) at 1, 50 and 500 lines,
+asserting byte-identical output before timing. Also times the pre-flight
+validation (XSD + SUNAT rules) of the generated tree. The equivalence
+itself is covered by tests/test_ubl_xml.py.
+
+Usage:
+    python scripts/bench_ubl_xml.py [iterations]
+"""
+import sys
+import timeit
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from loguru import logger
+
+from src.modules.sunat_integration.xml_generator import UBLXMLGenerator
+from src.modules.sunat_integration.xml_template import UBLTemplateXMLGenerator
+from src.modules.sunat_integration.ubl_validator import UBLValidator
+
+LINE_COUNTS = (1, 50, 500)
+
+
+def build_sample(lines: int):
+    """Build a representative boleta with `lines` items (includes characters that need escaping)"""
+    company_data = {
+        "ruc": "20000000001",
+        "razon_social": "LABORATORIO CLÍNICO & ASOCIADOS SAC",
+        "nombre_comercial": "LAB <CLÍNICO>",
+        "direccion": "Av. Principal 123",
+        "ciudad": "LIMA",
+        "departamento": "LIMA",
+        "distrito": "LIMA",
+    }
+    client_data = {
+        "tipo_documento": "1",
+        "numero_documento": "12345678",
+        "razon_social": None,
+        "nombres_completos": "José Pérez \"Pepe\"",
+    }
+    items = [
+        {
+            "codigo": f"SERV{i:04d}",
+            "descripcion": f"Hemograma completo #{i} (sangre & orina)",
+            "cantidad": float(1 + i % 3),
+            "unidad_medida": "NIU",
+            "valor_unitario": 84.7457627118644,
+            "precio_unitario": 100.0,
+            "subtotal": 84.7457627118644 * (1 + i % 3),
+            "igv": 15.254237288135593 * (1 + i % 3),
+            "total": 100.0 * (1 + i % 3),
+        }
+        for i in range(lines)
+    ]
+    invoice_data = {
+        "tipo_comprobante": "03",
+        "serie": "B001",
+        "numero": 123,
+        "fecha_emision": datetime(2024, 1, 15, 10, 30, 0),
+        "moneda": "PEN",
+        "subtotal": Decimal(str(sum(item["subtotal"] for item in items))),
+        "igv": Decimal(str(sum(item["igv"] for item in items))),
+        "total": Decimal(str(sum(item["total"] for item in items))),
+    }
+    return invoice_data, company_data, client_data, items
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    logger.remove()
+
+    lxml_generator = UBLXMLGenerator()
+    template_generator = UBLTemplateXMLGenerator()
+
+    UBLValidator.load()
+
+    print(f"{'lines':>6} | {'lxml (ms)':>10} | {'template (ms)':>13} | {'speedup':>7} | {'validate (ms)':>13}")
+    for lines in LINE_COUNTS:
+        sample = build_sample(lines)
+
+        expected = lxml_generator.generate_invoice(*sample)
+        rendered = template_generator.generate_invoice(*sample)
+        if expected != rendered:
+            raise SystemExit(f"❌ Salida distinta con {lines} líneas")
+
+        runs = max(1, iterations // lines) if lines > 1 else iterations
+        lxml_ms = timeit.timeit(lambda: lxml_generator.generate_invoice(*sample), number=runs) / runs * 1000
+        template_ms = timeit.timeit(lambda: template_generator.generate_invoice(*sample), number=runs) / runs * 1000
+
+        tree = template_generator.generate_invoice_tree(*sample)
+        errors = UBLValidator.validate(tree)
+        if errors:
+            raise SystemExit(f"❌ XML inválido con {lines} líneas: {errors[0]}")
+        validate_ms = timeit.timeit(lambda: UBLValidator.validate(tree), number=runs) / runs * 1000
+
+        print(f"{lines:>6} | {lxml_ms:>10.3f} | {template_ms:>13.3f} | {lxml_ms / template_ms:>6.1f}x | {validate_ms:>13.3f}")
+
+    print("✅ Salidas idénticas byte a byte")
+
+
+if __name__ == "__main__":
+    main()
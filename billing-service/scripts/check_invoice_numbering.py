@@ -0,0 +1,86 @@
+"""
+Parallel invoice numbering check.
+
+Creates invoices concurrently on separate sessions/connections against the
+configured DATABASE_URL and verifies that the allocated numbers of each series
+are unique and gapless, even when some transactions roll back.
+
+Usage (use a disposable database, it inserts rows):
+    python scripts/check_invoice_numbering.py [invoices] [concurrency]
+"""
+import asyncio
+import sys
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from src.core.database import AsyncSessionLocal, create_tables
+from src.modules.billing.models import Invoice, InvoiceItem, InvoiceType, InvoiceStatus
+from src.modules.billing.repository import InvoiceRepository
+
+ORDER_ID_BASE = 900_000_000
+
+
+async def create_one(index: int, semaphore: asyncio.Semaphore) -> str:
+    """Allocate a number and insert an invoice; every 7th transaction rolls back"""
+    invoice_type = InvoiceType.BOLETA if index % 2 else InvoiceType.FACTURA
+    async with semaphore, AsyncSessionLocal() as db:
+        number = await InvoiceRepository.generate_invoice_number(db, invoice_type, location_id=1)
+        if index % 7 == 0:
+            await db.rollback()
+            return ""
+
+        invoice = Invoice(
+            invoice_number=number,
+            order_id=ORDER_ID_BASE + index,
+            patient_id=1,
+            location_id=1,
+            invoice_type=invoice_type,
+            invoice_status=InvoiceStatus.PENDING,
+            customer_document_type="RUC" if invoice_type == InvoiceType.FACTURA else "DNI",
+            customer_document_number="20000000001" if invoice_type == InvoiceType.FACTURA else "12345678",
+            customer_name="CLIENTE PRUEBA",
+            subtotal=Decimal("10.00"),
+            tax=Decimal("1.80"),
+            total=Decimal("11.80")
+        )
+        items = [InvoiceItem(service_name="Prueba", quantity=1, unit_price=Decimal("11.80"), subtotal=Decimal("11.80"))]
+        await InvoiceRepository.create_with_items(db, invoice, items)
+        return number
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    await create_tables()
+    semaphore = asyncio.Semaphore(concurrency)
+    created = [n for n in await asyncio.gather(*(create_one(i, semaphore) for i in range(total))) if n]
+
+    if len(created) != len(set(created)):
+        raise SystemExit("❌ Números duplicados")
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Invoice.invoice_number).where(Invoice.order_id >= ORDER_ID_BASE))
+        numbers = [row[0] for row in result.all()]
+
+    by_serie = defaultdict(list)
+    for number in numbers:
+        serie, value = number.split("-")
+        by_serie[serie].append(int(value))
+
+    for serie, values in sorted(by_serie.items()):
+        values.sort()
+        expected = list(range(values[0], values[0] + len(values)))
+        if values != expected:
+            raise SystemExit(f"❌ Huecos en la serie {serie}: {sorted(set(expected) - set(values))[:10]}")
+        print(f"✅ {serie}: {len(values)} comprobantes, {values[0]}..{values[-1]} sin huecos")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
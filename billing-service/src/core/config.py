@@ -20,6 +20,8 @@ class Settings(BaseSettings):
     # ----------------------
     database_url: str = Field(..., env="DATABASE_URL")
     db_echo: bool = Field(default=False, env="DB_ECHO")
+    # auto | alembic | create_all | off (ver prepare_schema en src/core/database.py)
+    schema_startup_mode: str = Field(default="auto", env="SCHEMA_STARTUP_MODE")
 
     # ----------------------
     # Security / JWT
@@ -43,6 +45,24 @@ class Settings(BaseSettings):
     patient_service_url: str = Field(default="http://patient-service:8002", env="PATIENT_SERVICE_URL")
     order_service_url: str = Field(default="http://order-service:8003", env="ORDER_SERVICE_URL")
     configuration_service_url: str = Field(default="http://configuration-service:8005", env="CONFIGURATION_SERVICE_URL")
+    upstream_timeout_seconds: float = Field(default=10.0, env="UPSTREAM_TIMEOUT_SECONDS")
+    internal_api_key: str = Field(default="a-super-secret-internal-key", env="INTERNAL_API_KEY")
+
+    # Configuración de configuration-service en memoria (long-poll, reintento y última copia conocida)
+    config_long_poll_seconds: float = Field(default=25.0, ge=0, env="CONFIG_LONG_POLL_SECONDS")
+    config_retry_seconds: float = Field(default=5.0, gt=0, env="CONFIG_RETRY_SECONDS")
+    config_snapshot_file: str = Field(default="data/config_snapshot.json", env="CONFIG_SNAPSHOT_FILE")
+
+    # Caché de identidad de facturación del paciente (0 = desactivada)
+    patient_cache_ttl_seconds: int = Field(default=300, env="PATIENT_CACHE_TTL_SECONDS")
+    patient_cache_max_entries: int = Field(default=10000, env="PATIENT_CACHE_MAX_ENTRIES")
+
+    # Cierre diario masivo: sedes conciliadas en paralelo
+    closure_batch_concurrency: int = Field(default=8, env="CLOSURE_BATCH_CONCURRENCY")
+
+    # Importación de extractos: ventana de emparejamiento por hora y zona horaria de las horas del archivo
+    statement_match_window_minutes: int = Field(default=30, env="STATEMENT_MATCH_WINDOW_MINUTES")
+    statement_utc_offset_hours: int = Field(default=-5, env="STATEMENT_UTC_OFFSET_HOURS")
 
     # ----------------------
     # Fiscal / SUNAT
@@ -54,8 +74,10 @@ class Settings(BaseSettings):
     sunat_sol_password: str = Field(default="", env="SUNAT_SOL_PASSWORD")
     sunat_cert_path: str = Field(default="", env="SUNAT_CERT_PATH")  # Ruta a certificado .pfx/.pem
     sunat_cert_pass: str = Field(default="", env="SUNAT_CERT_PASS")  # Contraseña del certificado
+    ubl_xml_engine: str = Field(default="template", env="UBL_XML_ENGINE")  # template | lxml
+    ubl_preflight_validation: bool = Field(default=True, env="UBL_PREFLIGHT_VALIDATION")  # XSD + reglas antes de firmar
 
-    # Company data (for invoices)
+    # Company data (for invoices; configuration-service tiene prioridad, ver ConfigClient)
     company_name: str = Field(default="MI EMPRESA SAC", env="COMPANY_NAME")
     company_trade_name: str = Field(default="MI EMPRESA", env="COMPANY_TRADE_NAME")
     company_address: str = Field(default="Av. Principal 123", env="COMPANY_ADDRESS")
@@ -69,6 +91,8 @@ class Settings(BaseSettings):
     smtp_password: str = Field(default="", env="SMTP_PASSWORD")
     smtp_tls: bool = Field(default=False, env="SMTP_TLS")
     smtp_from: str = Field(default="no-reply@labclinico.local", env="SMTP_FROM")
+    # service: encolar en configuration-service (SMTP directo solo si no responde) | smtp: siempre SMTP directo
+    notification_delivery: str = Field(default="service", env="NOTIFICATION_DELIVERY")
 
     # ----------------------
     # Logging
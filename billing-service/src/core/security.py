@@ -0,0 +1,17 @@
+"""
+Security utilities for service-to-service communication
+"""
+from fastapi import Header, HTTPException, status
+
+from src.core.config import settings
+
+
+def verify_internal_api_key(x_internal_api_key: str = Header(...)):
+    """
+    Dependency to verify the internal API key for service-to-service communication.
+    """
+    if x_internal_api_key != settings.internal_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal API key"
+        )
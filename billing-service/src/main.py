@@ -2,13 +2,17 @@
 Billing Service Main Application
 FastAPI application for billing and reconciliation
 """
+from shared.startup import StartupTimer  # primero: mide la importación de la aplicación
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 import sys
 
 from src.core.config import settings
-from src.core.database import create_tables
+from src.core.database import prepare_schema
+from src.utils.config_client import ConfigClient
+from src.utils.service_clients import close_clients
 
 # Configure logger
 logger.remove()
@@ -49,15 +53,23 @@ async def startup_event():
     logger.info(f"Starting {settings.service_name} on port {settings.port}")
     logger.info(f"Environment: {settings.environment}")
 
-    # Create tables
-    await create_tables()
-    logger.info("Database tables created successfully")
+    # Esquema: una consulta al head de Alembic (create_all solo si hace falta)
+    with StartupTimer.phase("schema"):
+        schema = await prepare_schema()
+    logger.info(f"Database schema: {schema}")
+
+    # Configuración de empresa e IGV desde configuration-service
+    with StartupTimer.phase("config"):
+        await ConfigClient.start()
+    logger.info(StartupTimer.finish())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info(f"Shutting down {settings.service_name}")
+    await ConfigClient.stop()
+    await close_clients()
 
 
 @app.get("/")
@@ -67,6 +79,7 @@ async def root():
         "service": "billing-service",
         "version": "1.0.0",
         "status": "running",
+        "startup": StartupTimer.report(),
         "modules": ["billing", "reconciliation"]
     }
 
@@ -82,7 +95,11 @@ async def health_check():
 
 # Import and include routers
 from src.modules.billing.router import router as invoice_router
+from src.modules.billing.internal_router import router as internal_router
 from src.modules.reconciliation.router import router as reconciliation_router
 
 app.include_router(invoice_router)
+app.include_router(internal_router)
 app.include_router(reconciliation_router)
+
+StartupTimer.mark("import")
@@ -1,3 +1,3 @@
-from .models import Invoice, InvoiceItem, InvoiceType, InvoiceStatus
+from .models import Invoice, InvoiceItem, InvoiceSeries, InvoiceType, InvoiceStatus
 
-__all__ = ["Invoice", "InvoiceItem", "InvoiceType", "InvoiceStatus"]
+__all__ = ["Invoice", "InvoiceItem", "InvoiceSeries", "InvoiceType", "InvoiceStatus"]
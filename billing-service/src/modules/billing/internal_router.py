@@ -0,0 +1,32 @@
+"""
+Internal Router for service-to-service communication
+"""
+from fastapi import APIRouter, Depends, Path
+
+from src.core.security import verify_internal_api_key
+from src.utils.config_client import ConfigClient
+from src.utils.service_clients import PatientIdentityCache
+
+router = APIRouter(
+    prefix="/api/v1/internal",
+    tags=["Internal"],
+    dependencies=[Depends(verify_internal_api_key)]
+)
+
+
+@router.delete(
+    "/patient-cache/{patient_id}",
+    summary="Invalidar la identidad de facturación de un paciente"
+)
+async def invalidate_patient_cache(patient_id: int = Path(..., gt=0)):
+    """
+    Elimina al paciente de la caché de identidad de facturación.
+    Lo invoca patient-service al actualizar o desactivar un paciente.
+    """
+    return {"patient_id": patient_id, "invalidated": PatientIdentityCache.invalidate(patient_id)}
+
+
+@router.get("/config/metrics", summary="Estado de la configuración en memoria")
+async def config_metrics():
+    """Versión de configuration-service en uso, su origen (service, file o env) y el estado del long-poll"""
+    return ConfigClient.metrics()
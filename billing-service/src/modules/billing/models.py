@@ -1,7 +1,7 @@
 """
 Billing Models
 """
-from sqlalchemy import String, Boolean, Integer, DateTime, Numeric, Text, Enum as SQLEnum, Index, ForeignKey
+from sqlalchemy import String, Boolean, Integer, DateTime, Numeric, Text, Enum as SQLEnum, Index, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -69,3 +69,25 @@ class InvoiceItem(Base):
     unit_price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     subtotal: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     invoice: Mapped["Invoice"] = relationship("Invoice", back_populates="items")
+
+class InvoiceSeries(Base):
+    """Serie de comprobantes SUNAT con su correlativo (una fila por serie)"""
+    __tablename__ = "invoice_series"
+    __table_args__ = (
+        # invoice_number = serie-correlativo: la serie sola es la clave de numeración (única por RUC)
+        UniqueConstraint('serie', name='uq_invoice_series_serie'),
+        Index('ix_invoice_series_type_location', 'invoice_type', 'location_id'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    invoice_type: Mapped[InvoiceType] = mapped_column(SQLEnum(InvoiceType, native_enum=False), nullable=False)
+    serie: Mapped[str] = mapped_column(String(4), nullable=False)  # B001, F001, ...
+    location_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # NULL = serie válida para cualquier sede
+
+    # Próximo correlativo a emitir; se asigna con UPDATE ... RETURNING (bloqueo de fila)
+    next_value: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    is_default: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
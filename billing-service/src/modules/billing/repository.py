@@ -1,14 +1,15 @@
 """
 Billing Repository (Database operations)
 """
-from sqlalchemy import select, func, or_, and_
+from sqlalchemy import select, insert, update, func, or_, and_, cast, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Any, Set
 from datetime import datetime, date
 from decimal import Decimal
 
-from src.modules.billing.models import Invoice, InvoiceItem, InvoiceType, InvoiceStatus
+from src.modules.billing.models import Invoice, InvoiceItem, InvoiceSeries, InvoiceType, InvoiceStatus
 
 
 class InvoiceRepository:
@@ -128,24 +129,69 @@ class InvoiceRepository:
         return invoice
 
     @staticmethod
-    async def generate_invoice_number(
-        db: AsyncSession,
-        invoice_type: InvoiceType
-    ) -> str:
-        """Generate unique invoice number"""
-        # Format: B001-00000001 (Boleta) or F001-00000001 (Factura)
-        prefix = "B" if invoice_type == InvoiceType.BOLETA else "F"
-        serie = "001"
-
-        # Get count of invoices of this type
-        query = select(func.count()).select_from(Invoice).where(
-            Invoice.invoice_type == invoice_type
+    async def create_with_items(db: AsyncSession, invoice: Invoice, items: List[InvoiceItem]) -> Invoice:
+        """
+        Create invoice and its items in a single transaction.
+        The commit also releases the row lock taken on the invoice series.
+        """
+        invoice.items = items
+        db.add(invoice)
+        await db.commit()
+        return invoice
+
+    @staticmethod
+    async def get_active_order_ids(db: AsyncSession, order_ids: List[int]) -> Set[int]:
+        """Order IDs (of the given ones) that already have a non-cancelled invoice"""
+        if not order_ids:
+            return set()
+        query = select(Invoice.order_id).where(
+            Invoice.order_id.in_(order_ids),
+            Invoice.invoice_status != InvoiceStatus.CANCELLED
         )
         result = await db.execute(query)
-        count = result.scalar() or 0
+        return set(result.scalars().all())
 
-        sequence = str(count + 1).zfill(8)
-        return f"{prefix}{serie}-{sequence}"
+    @staticmethod
+    async def bulk_create_with_items(
+        db: AsyncSession,
+        invoices: List[Dict[str, Any]],
+        items_by_order: Dict[int, List[Dict[str, Any]]]
+    ) -> Dict[int, int]:
+        """
+        Insert invoices and their items with multi-row INSERTs (no ORM
+        objects) and commit once. Returns {order_id: invoice_id}.
+        """
+        if not invoices:
+            return {}
+        result = await db.execute(
+            insert(Invoice).returning(Invoice.id, Invoice.order_id),
+            invoices
+        )
+        invoice_ids = {order_id: invoice_id for invoice_id, order_id in result.all()}
+
+        item_rows = [
+            {**item, "invoice_id": invoice_ids[order_id]}
+            for order_id, items in items_by_order.items()
+            for item in items
+        ]
+        if item_rows:
+            await db.execute(insert(InvoiceItem), item_rows)
+
+        await db.commit()
+        return invoice_ids
+
+    @staticmethod
+    async def generate_invoice_number(
+        db: AsyncSession,
+        invoice_type: InvoiceType,
+        location_id: Optional[int] = None,
+        serie: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Allocate the next gapless invoice number (e.g. B001-00000001).
+        Must run inside the transaction that inserts the invoice.
+        """
+        return await InvoiceSeriesRepository.allocate_number(db, invoice_type, location_id, serie)
 
     @staticmethod
     async def get_statistics(
@@ -209,3 +255,154 @@ class InvoiceItemRepository:
         db.add_all(items)
         await db.flush()
         return items
+
+
+class InvoiceSeriesRepository:
+    """Repository for InvoiceSeries (SUNAT series and correlatives)"""
+
+    @staticmethod
+    async def get_all(
+        db: AsyncSession,
+        invoice_type: Optional[InvoiceType] = None,
+        location_id: Optional[int] = None
+    ) -> List[InvoiceSeries]:
+        """Get series, optionally filtered by type and location"""
+        query = select(InvoiceSeries)
+        if invoice_type is not None:
+            query = query.where(InvoiceSeries.invoice_type == invoice_type)
+        if location_id is not None:
+            query = query.where(InvoiceSeries.location_id == location_id)
+        query = query.order_by(InvoiceSeries.invoice_type, InvoiceSeries.serie)
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_serie(db: AsyncSession, invoice_type: InvoiceType, serie: str) -> Optional[InvoiceSeries]:
+        """Get series by type and serie code"""
+        query = select(InvoiceSeries).where(
+            InvoiceSeries.invoice_type == invoice_type,
+            InvoiceSeries.serie == serie
+        )
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def create(db: AsyncSession, series: InvoiceSeries) -> InvoiceSeries:
+        """Create a new series"""
+        db.add(series)
+        await db.commit()
+        await db.refresh(series)
+        return series
+
+    @staticmethod
+    async def allocate_number(
+        db: AsyncSession,
+        invoice_type: InvoiceType,
+        location_id: Optional[int] = None,
+        serie: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Allocate the next correlative with UPDATE ... RETURNING.
+
+        The UPDATE takes a row lock on the series that is held until the
+        caller commits or rolls back, so concurrent invoices wait for each
+        other and a rolled back invoice returns its number (gapless).
+
+        Series resolution: explicit `serie`, else the location's default
+        series, else a global one (location_id NULL). Returns None when no
+        active series matches.
+        """
+        numbers = await InvoiceSeriesRepository.allocate_numbers(db, invoice_type, 1, location_id, serie)
+        return numbers[0] if numbers else None
+
+    @staticmethod
+    async def allocate_numbers(
+        db: AsyncSession,
+        invoice_type: InvoiceType,
+        count: int,
+        location_id: Optional[int] = None,
+        serie: Optional[str] = None
+    ) -> List[str]:
+        """
+        Allocate a block of `count` consecutive numbers in one statement.
+        Same locking and series resolution as allocate_number; returns an
+        empty list when no active series matches.
+        """
+        block = await InvoiceSeriesRepository._allocate(db, invoice_type, location_id, serie, count)
+        if block is None and serie is None:
+            # Primera emisión del tipo: crear serie global por defecto y reintentar
+            await InvoiceSeriesRepository._ensure_default_series(db, invoice_type)
+            block = await InvoiceSeriesRepository._allocate(db, invoice_type, location_id, serie, count)
+        if block is None:
+            return []
+        allocated_serie, first_value = block
+        return [f"{allocated_serie}-{str(value).zfill(8)}" for value in range(first_value, first_value + count)]
+
+    @staticmethod
+    async def _allocate(
+        db: AsyncSession,
+        invoice_type: InvoiceType,
+        location_id: Optional[int],
+        serie: Optional[str],
+        count: int = 1
+    ) -> Optional[Tuple[str, int]]:
+        """Single-statement allocation on the resolved series row; returns (serie, first value)"""
+        filters = [
+            InvoiceSeries.invoice_type == invoice_type,
+            InvoiceSeries.is_active.is_(True),
+        ]
+        if location_id is not None:
+            filters.append(or_(InvoiceSeries.location_id == location_id, InvoiceSeries.location_id.is_(None)))
+        else:
+            filters.append(InvoiceSeries.location_id.is_(None))
+        if serie is not None:
+            filters.append(InvoiceSeries.serie == serie)
+
+        series_id = (
+            select(InvoiceSeries.id)
+            .where(and_(*filters))
+            .order_by(
+                InvoiceSeries.location_id.is_(None),  # primero la serie propia de la sede
+                InvoiceSeries.is_default.desc(),
+                InvoiceSeries.id
+            )
+            .limit(1)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(InvoiceSeries)
+            .where(InvoiceSeries.id == series_id)
+            .values(next_value=InvoiceSeries.next_value + count)
+            .returning(InvoiceSeries.serie, InvoiceSeries.next_value - count)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await db.execute(stmt)).first()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    @staticmethod
+    async def _ensure_default_series(db: AsyncSession, invoice_type: InvoiceType) -> None:
+        """
+        Create the global default series (B001/F001) if missing, continuing
+        after the highest number already issued with that serie.
+        """
+        serie = ("B" if invoice_type == InvoiceType.BOLETA else "F") + "001"
+        last_value = (
+            select(func.coalesce(func.max(cast(func.split_part(Invoice.invoice_number, "-", 2), Integer)), 0))
+            .where(Invoice.invoice_number.like(f"{serie}-%"))
+            .scalar_subquery()
+        )
+        stmt = (
+            pg_insert(InvoiceSeries)
+            .values(
+                invoice_type=invoice_type,
+                serie=serie,
+                location_id=None,
+                next_value=last_value + 1,
+                is_default=True,
+                is_active=True
+            )
+            .on_conflict_do_nothing(constraint="uq_invoice_series_serie")
+        )
+        await db.execute(stmt)
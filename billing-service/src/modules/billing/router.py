@@ -13,7 +13,9 @@ from src.modules.billing.service import InvoiceService
 from src.modules.billing.schemas import (
     InvoiceCreate, InvoiceUpdateStatus,
     InvoiceResponse, InvoiceDetailResponse, InvoiceListResponse, InvoiceStats,
-    SalesByPeriodStats, InvoiceTypeStats
+    SalesByPeriodStats, InvoiceTypeStats,
+    InvoiceSeriesCreate, InvoiceSeriesResponse,
+    InvoiceBulkCreate, InvoiceBulkResponse
 )
 from src.modules.billing.models import InvoiceType, InvoiceStatus
 
@@ -83,6 +85,39 @@ async def get_statistics(
     return await InvoiceService.get_statistics(db, date_from, date_to)
 
 
+@router.get(
+    "/series",
+    response_model=List[InvoiceSeriesResponse],
+    summary="Listar series de comprobantes",
+    description="Series SUNAT configuradas con su próximo correlativo"
+)
+async def get_invoice_series(
+    invoice_type: Optional[InvoiceType] = Query(None, description="Filtrar por tipo (BOLETA/FACTURA)"),
+    location_id: Optional[int] = Query(None, description="Filtrar por ID de sede"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Lista las series por tipo y sede."""
+    return await InvoiceService.get_series(db, invoice_type, location_id)
+
+
+@router.post(
+    "/series",
+    response_model=InvoiceSeriesResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Registrar serie de comprobantes",
+    description="Crea una serie (ej. B002) para un tipo de comprobante y, opcionalmente, una sede"
+)
+async def create_invoice_series(
+    data: InvoiceSeriesCreate = Body(..., description="Datos de la serie"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Una sede puede tener varias series por tipo; la marcada como
+    predeterminada se usa cuando el comprobante no indica serie.
+    """
+    return await InvoiceService.create_series(db, data)
+
+
 @router.get(
     "/order/{order_id}",
     response_model=InvoiceDetailResponse,
@@ -130,13 +165,35 @@ async def create_invoice_from_order(
     3. Consulta datos del paciente (patient-service)
     4. Valida tipo de documento según tipo de comprobante
     5. Calcula montos (subtotal, IGV, total)
-    6. Genera número correlativo
-    7. Persiste comprobante e items
+    6. Genera número correlativo de la serie (sin huecos, bloqueo de fila)
+    7. Persiste comprobante e items en la misma transacción
     8. Opcionalmente envía a SUNAT si send_now=True
     """
     return await InvoiceService.create_invoice_from_order(db, data, send_now)
 
 
+@router.post(
+    "/bulk",
+    response_model=InvoiceBulkResponse,
+    summary="Facturación masiva por sede y fechas",
+    description="Genera comprobantes para todas las órdenes pagadas y sin facturar de una sede"
+)
+async def create_invoices_bulk(
+    data: InvoiceBulkCreate = Body(..., description="Sede, rango de fechas y tipo opcional"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Factura en una sola transacción todas las órdenes pagadas (no anuladas)
+    de la sede en el rango de fechas que no tengan comprobante activo.
+
+    - Tipo por defecto: FACTURA para clientes con RUC, BOLETA para el resto
+    - Correlativos reservados en bloque por serie (sin huecos)
+    - Retorna el resultado por orden: CREATED, SKIPPED (ya facturada) o ERROR
+    - Los comprobantes quedan PENDING; el envío a SUNAT se hace por separado
+    """
+    return await InvoiceService.create_invoices_bulk(db, data)
+
+
 @router.patch(
     "/{invoice_id}/status",
     response_model=InvoiceResponse,
@@ -176,29 +233,35 @@ async def cancel_invoice(
 @router.get(
     "/{invoice_id}/ubl",
     summary="Obtener XML UBL generado",
-    description="Retorna el XML UBL 2.1 del comprobante (sin firmar)"
+    description="Retorna el XML UBL 2.1 del comprobante (sin firmar) y sus errores de validación"
 )
 async def get_invoice_ubl(
     invoice_id: int = Path(..., gt=0, description="ID del comprobante"),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Genera y retorna el XML UBL del comprobante.
+    Genera y retorna el XML UBL del comprobante junto con el resultado
+    de la validación previa (XSD + reglas SUNAT).
     Útil para inspección o debugging antes del envío a SUNAT.
     """
-    from src.modules.billing.service import build_ubl_invoice_xml
+    from src.modules.billing.service import build_ubl_invoice_tree, serialize_ubl_tree
     from src.modules.billing.repository import InvoiceRepository
+    from src.modules.sunat_integration.ubl_validator import UBLValidator
     
     invoice = await InvoiceRepository.get_by_id_with_items(db, invoice_id)
     if not invoice:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=f"Comprobante {invoice_id} no encontrado")
     
-    xml = build_ubl_invoice_xml(invoice)
+    tree = build_ubl_invoice_tree(invoice)
+    validation_errors = UBLValidator.validate(tree)
+    xml = serialize_ubl_tree(tree)
     return {
         "invoice_id": invoice_id,
         "invoice_number": invoice.invoice_number,
-        "xml": xml
+        "xml": xml,
+        "is_valid": not validation_errors,
+        "validation_errors": validation_errors
     }
 
 
@@ -278,7 +341,7 @@ async def send_invoice_to_sunat(
     """
     Flujo completo de envío a SUNAT:
     1. Carga comprobante con items
-    2. Genera XML UBL 2.1
+    2. Genera XML UBL 2.1 y lo valida (XSD + reglas SUNAT); si falla retorna 422 con los errores
     3. Firma digitalmente el XML (XAdES-BES)
     4. Empaqueta en ZIP
     5. Envía a SUNAT vía web service
@@ -30,6 +30,14 @@ class InvoiceCreate(BaseModel):
     """Schema for creating an invoice from an order"""
     order_id: int = Field(..., gt=0, description="ID de la orden")
     invoice_type: InvoiceType = Field(..., description="Tipo de comprobante (BOLETA o FACTURA)")
+    serie: Optional[str] = Field(
+        None, pattern=r"^[BF][A-Z0-9]{3}$",
+        description="Serie a usar (ej. B002). Por defecto, la serie predeterminada de la sede"
+    )
+    patient_id: Optional[int] = Field(
+        None, gt=0,
+        description="ID del paciente de la orden (opcional). Si se envía, la orden y el paciente se consultan en paralelo"
+    )
 
     @validator('invoice_type')
     def validate_invoice_type(cls, v, values):
@@ -80,6 +88,79 @@ class InvoiceListResponse(BaseModel):
     invoices: List[InvoiceResponse] = Field(..., description="Lista de comprobantes")
 
 
+# ==================== Invoice Series Schemas ====================
+
+class InvoiceSeriesCreate(BaseModel):
+    """Schema for registering an invoice series"""
+    invoice_type: InvoiceType = Field(..., description="Tipo de comprobante (BOLETA o FACTURA)")
+    serie: str = Field(..., pattern=r"^[BF][A-Z0-9]{3}$", description="Serie SUNAT (ej. B002, F002)")
+    location_id: Optional[int] = Field(None, gt=0, description="Sede; vacío = serie válida para cualquier sede")
+    next_value: int = Field(1, ge=1, le=99999999, description="Primer correlativo a emitir")
+    is_default: bool = Field(True, description="Serie predeterminada para el tipo/sede")
+
+
+class InvoiceSeriesResponse(BaseModel):
+    """Schema for invoice series response"""
+    id: int
+    invoice_type: InvoiceType
+    serie: str
+    location_id: Optional[int]
+    next_value: int
+    is_default: bool
+    is_active: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# ==================== Bulk Invoicing Schemas ====================
+
+class InvoiceBulkCreate(BaseModel):
+    """Schema for invoicing every paid, uninvoiced order of a location and date range"""
+    location_id: int = Field(..., gt=0, description="ID de la sede")
+    date_from: date = Field(..., description="Fecha desde (YYYY-MM-DD)")
+    date_to: Optional[date] = Field(None, description="Fecha hasta (YYYY-MM-DD); por defecto igual a date_from")
+    invoice_type: Optional[InvoiceType] = Field(
+        None, description="Forzar tipo de comprobante; por defecto FACTURA para RUC y BOLETA para el resto"
+    )
+
+    @validator('date_to', always=True)
+    def validate_date_range(cls, v, values):
+        """Default date_to to date_from and validate the range"""
+        date_from = values.get('date_from')
+        if v is None:
+            return date_from
+        if date_from and v < date_from:
+            raise ValueError('date_to no puede ser anterior a date_from')
+        return v
+
+
+class InvoiceBulkResult(BaseModel):
+    """Result of bulk invoicing for a single order"""
+    order_id: int
+    order_number: Optional[str] = None
+    status: str = Field(..., description="CREATED, SKIPPED o ERROR")
+    invoice_id: Optional[int] = None
+    invoice_number: Optional[str] = None
+    invoice_type: Optional[InvoiceType] = None
+    total: Optional[Decimal] = None
+    message: Optional[str] = None
+
+
+class InvoiceBulkResponse(BaseModel):
+    """Summary of a bulk invoicing run"""
+    location_id: int
+    date_from: date
+    date_to: date
+    total_orders: int = Field(..., description="Órdenes pagadas encontradas")
+    created: int = Field(..., description="Comprobantes creados")
+    skipped: int = Field(..., description="Órdenes ya facturadas")
+    failed: int = Field(..., description="Órdenes con error")
+    total_billed: Decimal = Field(..., description="Total de los comprobantes creados")
+    results: List[InvoiceBulkResult] = Field(default_factory=list)
+
+
 # ==================== Invoice Statistics ====================
 
 class InvoiceStats(BaseModel):
@@ -11,12 +11,13 @@ Funcionalidades completas:
 """
 
 import io
+import base64
 import zipfile
 import logging
 import asyncio
 from decimal import Decimal
 from datetime import date, datetime
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List, Union
 
 import httpx
 from email.message import EmailMessage
@@ -25,25 +26,40 @@ import smtplib
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
-from src.modules.billing.models import Invoice, InvoiceItem, InvoiceType, InvoiceStatus
-from src.modules.billing.repository import InvoiceRepository, InvoiceItemRepository
+from src.modules.billing.models import Invoice, InvoiceItem, InvoiceSeries, InvoiceType, InvoiceStatus
+from src.modules.billing.repository import InvoiceRepository, InvoiceSeriesRepository
 from src.modules.billing.schemas import (
     InvoiceCreate, InvoiceUpdateStatus,
     InvoiceResponse, InvoiceDetailResponse, InvoiceListResponse,
     InvoiceItemResponse, InvoiceStats,
-    SalesByPeriodStats, InvoiceTypeStats
+    SalesByPeriodStats, InvoiceTypeStats,
+    InvoiceSeriesCreate, InvoiceSeriesResponse,
+    InvoiceBulkCreate, InvoiceBulkResult, InvoiceBulkResponse
 )
 
 from src.core.config import settings
+from src.utils.config_client import ConfigClient
 from src.utils.sunat_client import SunatClient
-from src.modules.sunat_integration.xml_generator import UBLXMLGenerator
+from src.utils.service_clients import (
+    fetch_order, fetch_patient_identity, fetch_patient_identities,
+    fetch_billable_orders, get_patient_email, enqueue_notification
+)
+from src.modules.sunat_integration.xml_generator import UBLXMLGenerator, _etree
+from src.modules.sunat_integration.xml_template import UBLTemplateXMLGenerator
+from src.modules.sunat_integration.ubl_validator import UBLValidator
 from src.modules.sunat_integration.sunat_client import SUNATClient
 
+if TYPE_CHECKING:
+    from lxml import etree
+
 logger = logging.getLogger(__name__)
 sunat_client = SunatClient()
 
 # Nuevos clientes SUNAT
-xml_generator = UBLXMLGenerator()
+# "template" renderiza desde plantillas precompiladas (misma salida que "lxml")
+xml_generator = (
+    UBLXMLGenerator() if settings.ubl_xml_engine == "lxml" else UBLTemplateXMLGenerator()
+)
 # Por defecto usamos ambiente Beta (pruebas)
 sunat_ws_client = SUNATClient.create_beta_client()
 
@@ -52,9 +68,9 @@ sunat_ws_client = SUNATClient.create_beta_client()
 # HELPERS: XML / SIGNING / ZIP
 # ========================================
 
-def build_ubl_invoice_xml(invoice: Invoice) -> str:
+def _build_ubl_payload(invoice: Invoice) -> dict:
     """
-    Construye XML UBL 2.1 completo usando el nuevo generador.
+    Prepara los datos (comprobante, emisor, cliente, items) para el generador UBL.
     """
     # Mapeo de tipo de comprobante a código SUNAT
     tipo_comprobante_map = {
@@ -74,12 +90,13 @@ def build_ubl_invoice_xml(invoice: Invoice) -> str:
         "total": invoice.total,
     }
 
-    # Datos de la empresa emisora
+    # Datos de la empresa emisora (el RUC va con las credenciales SOL y el certificado)
+    config = ConfigClient.snapshot()
     company_data = {
         "ruc": settings.sunat_company_ruc,
-        "razon_social": getattr(settings, "company_name", "MI EMPRESA SAC"),
-        "nombre_comercial": getattr(settings, "company_trade_name", "MI EMPRESA"),
-        "direccion": getattr(settings, "company_address", "Av. Principal 123"),
+        "razon_social": config.company_name,
+        "nombre_comercial": config.company_trade_name,
+        "direccion": config.company_address,
         "ciudad": "LIMA",
         "departamento": "LIMA",
         "distrito": "LIMA",
@@ -135,23 +152,42 @@ def build_ubl_invoice_xml(invoice: Invoice) -> str:
     invoice_data["igv"] = total_igv
     # total permanece igual (es el total con IGV de la BD)
 
-    # Generar XML usando el nuevo generador
-    xml_content = xml_generator.generate_invoice(
-        invoice_data=invoice_data,
-        company_data=company_data,
-        client_data=client_data,
-        items=items
-    )
+    return {
+        "invoice_data": invoice_data,
+        "company_data": company_data,
+        "client_data": client_data,
+        "items": items,
+    }
+
+
+def build_ubl_invoice_xml(invoice: Invoice) -> str:
+    """
+    Construye XML UBL 2.1 completo usando el nuevo generador.
+    """
+    return xml_generator.generate_invoice(**_build_ubl_payload(invoice))
 
-    return xml_content
+
+def build_ubl_invoice_tree(invoice: Invoice):
+    """
+    Construye el XML UBL 2.1 como árbol lxml listo para firmar.
+    """
+    return xml_generator.generate_invoice_tree(**_build_ubl_payload(invoice))
 
 
-def sign_xml_placeholder(xml_str: str) -> bytes:
+def serialize_ubl_tree(tree: "etree._Element") -> str:
+    """
+    Serializa el árbol UBL (sin firmar) igual que generate_invoice.
+    """
+    return xml_generator.serialize(tree)
+
+
+def sign_xml_placeholder(xml: Union[str, "etree._Element"]) -> bytes:
     """
     Firma XML usando certificado autofirmado para pruebas en SUNAT Beta.
     Para producción: usar certificado .pfx/.pem real de SUNAT.
+
+    Acepta el XML como string o como árbol lxml (evita volver a parsearlo).
     """
-    from lxml import etree
     from signxml import XMLSigner
     from cryptography.hazmat.primitives import hashes, serialization
     from cryptography.hazmat.primitives.asymmetric import rsa
@@ -159,6 +195,7 @@ def sign_xml_placeholder(xml_str: str) -> bytes:
     from cryptography.x509.oid import NameOID
     import datetime
 
+    etree = _etree()
     try:
         # Generar clave privada RSA temporal para pruebas
         private_key = rsa.generate_private_key(
@@ -197,8 +234,11 @@ def sign_xml_placeholder(xml_str: str) -> bytes:
             encryption_algorithm=serialization.NoEncryption()
         )
 
-        # Parsear XML
-        root = etree.fromstring(xml_str.encode('utf-8'))
+        # Parsear XML (solo si no se recibió el árbol)
+        if isinstance(xml, str):
+            root = etree.fromstring(xml.encode('utf-8'))
+        else:
+            root = xml
 
         # Buscar UBLExtensions donde va la firma
         ns = {'ext': 'urn:oasis:names:specification:ubl:schema:xsd:CommonExtensionComponents-2'}
@@ -206,7 +246,7 @@ def sign_xml_placeholder(xml_str: str) -> bytes:
 
         if ext_content is None:
             logger.error("No se encontró ExtensionContent para insertar la firma")
-            return xml_str.encode("utf-8")
+            return _unsigned_xml_bytes(xml)
 
         # Firmar usando signxml
         # signxml agregará la firma al elemento raíz, pero necesitamos moverla a ExtensionContent
@@ -248,7 +288,14 @@ def sign_xml_placeholder(xml_str: str) -> bytes:
     except Exception as e:
         logger.error(f"Error al firmar XML: {e}")
         logger.warning("⚠️  Enviando XML SIN FIRMA DIGITAL")
-        return xml_str.encode("utf-8")
+        return _unsigned_xml_bytes(xml)
+
+
+def _unsigned_xml_bytes(xml) -> bytes:
+    """Serializa el XML sin firma (fallback cuando la firma falla)."""
+    if isinstance(xml, str):
+        return xml.encode("utf-8")
+    return _etree().tostring(xml, encoding='utf-8', xml_declaration=True)
 
 
 def create_zip_from_xml(xml_bytes: bytes, filename_without_ext: str) -> bytes:
@@ -313,6 +360,51 @@ async def send_email_with_attachments_async(
     return await asyncio.to_thread(_send_sync)
 
 
+async def send_invoice_email(
+    invoice: Invoice,
+    to_email: str,
+    subject: str,
+    body: str,
+    attachments: List[dict]
+):
+    """
+    Envía el comprobante por correo.
+
+    Con NOTIFICATION_DELIVERY=service se encola en configuration-service
+    (plantilla INVOICE_RECEIPT si está configurada; si no, subject y body),
+    que lo envía en lotes reutilizando la conexión SMTP. Si el servicio no
+    responde, o con NOTIFICATION_DELIVERY=smtp, se envía por SMTP directo.
+    """
+    if settings.notification_delivery == "service":
+        try:
+            notification = await enqueue_notification({
+                "notification_type": "EMAIL",
+                "recipient": to_email,
+                "template_type": "INVOICE_RECEIPT",
+                "context": {
+                    "invoice_number": invoice.invoice_number,
+                    "customer_name": invoice.customer_name,
+                    "issue_date": invoice.issue_date.isoformat() if invoice.issue_date else None,
+                    "total": str(invoice.total),
+                },
+                "subject": subject,
+                "message": body,
+                "attachments": [
+                    {
+                        "filename": att["filename"],
+                        "content_type": f"{att.get('maintype', 'application')}/{att.get('subtype', 'octet-stream')}",
+                        "content": base64.b64encode(att["content"]).decode("ascii"),
+                    }
+                    for att in attachments
+                ],
+            })
+            return {"status": "queued", "notification_id": notification["id"]}
+        except httpx.HTTPError as e:
+            logger.warning(f"No se pudo encolar el correo de {invoice.invoice_number}, se envía por SMTP: {e}")
+
+    return await send_email_with_attachments_async(to_email, subject, body, attachments)
+
+
 # ========================================
 # SUNAT HELPERS
 # ========================================
@@ -344,6 +436,40 @@ async def save_cdr_files_and_update_invoice(
     await InvoiceRepository.update(db, invoice)
 
 
+# ========================================
+# HELPERS: DATOS DEL COMPROBANTE
+# ========================================
+
+def customer_name_from_patient(patient_data: dict) -> str:
+    """Razón social para RUC, nombres completos para el resto"""
+    if patient_data["document_type"] == "RUC":
+        return patient_data["business_name"]
+    return f"{patient_data.get('first_name') or ''} {patient_data.get('last_name') or ''}".strip()
+
+
+def calculate_invoice_amounts(order_data: dict) -> tuple:
+    """(subtotal, igv, total) del comprobante a partir del total de la orden"""
+    subtotal = Decimal(str(order_data.get("total", "0.00")))
+    igv_rate = ConfigClient.snapshot().igv_rate
+    tax = (subtotal * igv_rate).quantize(Decimal("0.01")) if igv_rate else Decimal("0.00")
+    total = (subtotal + tax).quantize(Decimal("0.01"))
+    return subtotal, tax, total
+
+
+def invoice_item_values(order_data: dict) -> List[dict]:
+    """Columnas de InvoiceItem para cada item de la orden"""
+    return [
+        {
+            "service_code": order_item.get("service_code"),  # Código del servicio
+            "service_name": order_item.get("service_name", ""),
+            "quantity": order_item.get("quantity", 1),
+            "unit_price": Decimal(str(order_item.get("unit_price", "0.00"))),
+            "subtotal": Decimal(str(order_item.get("subtotal", "0.00"))),
+        }
+        for order_item in order_data.get("items", [])
+    ]
+
+
 # ========================================
 # MAIN SERVICE CLASS
 # ========================================
@@ -431,52 +557,69 @@ class InvoiceService:
     ) -> InvoiceDetailResponse:
         """
         Crea un comprobante desde una orden.
-        - Comunicación corregida con order-service y patient-service usando settings
+        - Orden y paciente se consultan en paralelo con clientes HTTP compartidos
+        - La identidad del paciente se toma de la caché con TTL cuando está vigente
         """
-        # 1) Validar que no exista comprobante para la orden
-        existing_invoices = await InvoiceRepository.get_all_by_order_id(db, data.order_id)
-        if existing_invoices:
-            # Permitir crear uno nuevo solo si TODOS los anteriores están anulados
-            if not all(inv.invoice_status == InvoiceStatus.CANCELLED for inv in existing_invoices):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Ya existe un comprobante activo o pendiente para la orden {data.order_id}. Anule el comprobante existente antes de crear uno nuevo."
-                )
-
-        # 2) Consultar order-service (corrección aplicada)
+        # 1-3) order-service, patient-service y comprobantes existentes en paralelo.
+        # Sin patient_id en la petición, el paciente se consulta al llegar la orden
+        # (normalmente desde la caché de identidad de facturación).
+        order_task = asyncio.create_task(fetch_order(data.order_id))
+        patient_task = (
+            asyncio.create_task(fetch_patient_identity(data.patient_id)) if data.patient_id else None
+        )
         try:
-            async with httpx.AsyncClient(base_url=settings.order_service_url) as client:
-                order_resp = await client.get(f"/api/v1/orders/{data.order_id}", timeout=10.0)
-                if order_resp.status_code == 404:
+            existing_invoices = await InvoiceRepository.get_all_by_order_id(db, data.order_id)
+            # 1) Validar que no exista comprobante para la orden
+            if existing_invoices:
+                # Permitir crear uno nuevo solo si TODOS los anteriores están anulados
+                if not all(inv.invoice_status == InvoiceStatus.CANCELLED for inv in existing_invoices):
                     raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Orden {data.order_id} no encontrada"
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Ya existe un comprobante activo o pendiente para la orden {data.order_id}. Anule el comprobante existente antes de crear uno nuevo."
                     )
-                order_resp.raise_for_status()
-                order_data = order_resp.json()
-        except httpx.HTTPError as e:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Error al comunicarse con order-service: {str(e)}"
-            )
 
-        # 3) Consultar patient-service (corrección aplicada)
-        patient_id = order_data["patient_id"]
-        try:
-            async with httpx.AsyncClient(base_url=settings.patient_service_url) as client:
-                patient_resp = await client.get(f"/api/v1/patients/{patient_id}", timeout=10.0)
-                if patient_resp.status_code == 404:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Paciente {patient_id} no encontrado"
-                    )
-                patient_resp.raise_for_status()
-                patient_data = patient_resp.json()
-        except httpx.HTTPError as e:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Error al comunicarse con patient-service: {str(e)}"
-            )
+            # 2) Consultar order-service
+            try:
+                order_data = await order_task
+            except httpx.HTTPError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Error al comunicarse con order-service: {str(e)}"
+                )
+            if order_data is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Orden {data.order_id} no encontrada"
+                )
+
+            patient_id = order_data["patient_id"]
+            if data.patient_id and data.patient_id != patient_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"La orden {data.order_id} no pertenece al paciente {data.patient_id}"
+                )
+
+            # 3) Consultar patient-service
+            try:
+                patient_data = await (patient_task or fetch_patient_identity(patient_id))
+            except httpx.HTTPError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Error al comunicarse con patient-service: {str(e)}"
+                )
+            if patient_data is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Paciente {patient_id} no encontrado"
+                )
+        finally:
+            for task in (order_task, patient_task):
+                if task is None:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # marcar como leída si no se llegó a esperar
 
         # 4) Validación: FACTURA requiere RUC
         if data.invoice_type == InvoiceType.FACTURA and patient_data["document_type"] != "RUC":
@@ -486,27 +629,30 @@ class InvoiceService:
             )
 
         # 5) Preparar datos del cliente
-        customer_name = (
-            patient_data["business_name"] 
-            if patient_data["document_type"] == "RUC" 
-            else f"{patient_data.get('first_name','')} {patient_data.get('last_name','')}".strip()
-        )
+        customer_name = customer_name_from_patient(patient_data)
 
         # 6) Calcular montos
-        subtotal = Decimal(str(order_data.get("total", "0.00")))
-        igv_rate = Decimal(str(getattr(settings, "igv_rate", "0.00")))
-        tax = (subtotal * igv_rate).quantize(Decimal("0.01")) if igv_rate else Decimal("0.00")
-        total = (subtotal + tax).quantize(Decimal("0.01"))
+        subtotal, tax, total = calculate_invoice_amounts(order_data)
 
-        # 7) Generar número correlativo
-        invoice_number = await InvoiceRepository.generate_invoice_number(db, data.invoice_type)
+        # 7) Generar número correlativo (bloquea la fila de la serie hasta el commit)
+        location_id = order_data.get("location_id", 0)
+        invoice_number = await InvoiceRepository.generate_invoice_number(
+            db, data.invoice_type, location_id, data.serie
+        )
+        if invoice_number is None:
+            await db.rollback()
+            serie_label = f"{data.serie} " if data.serie else ""
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No hay una serie activa {serie_label}para {data.invoice_type.value} en la sede {location_id}"
+            )
 
         # 8) Crear entidad Invoice
         invoice = Invoice(
             invoice_number=invoice_number,
             order_id=data.order_id,
             patient_id=patient_id,
-            location_id=order_data.get("location_id", 0),
+            location_id=location_id,
             invoice_type=data.invoice_type,
             invoice_status=InvoiceStatus.PENDING,
             customer_document_type=patient_data.get("document_type", ""),
@@ -517,22 +663,12 @@ class InvoiceService:
             tax=tax,
             total=total
         )
-        invoice = await InvoiceRepository.create(db, invoice)
 
         # 9) Crear items
-        invoice_items = []
-        for order_item in order_data.get("items", []):
-            item = InvoiceItem(
-                invoice_id=invoice.id,
-                service_code=order_item.get("service_code"),  # Código del servicio
-                service_name=order_item.get("service_name", ""),
-                quantity=order_item.get("quantity", 1),
-                unit_price=Decimal(str(order_item.get("unit_price", "0.00"))),
-                subtotal=Decimal(str(order_item.get("subtotal", "0.00")))
-            )
-            invoice_items.append(item)
+        invoice_items = [InvoiceItem(**values) for values in invoice_item_values(order_data)]
 
-        await InvoiceItemRepository.create_many(db, invoice_items)
+        # Comprobante + items + correlativo en una sola transacción (numeración sin huecos)
+        invoice = await InvoiceRepository.create_with_items(db, invoice, invoice_items)
 
         # 10) Envío opcional a SUNAT
         if send_now:
@@ -544,6 +680,130 @@ class InvoiceService:
         # 11) Retornar detalle
         return await InvoiceService.get_invoice_by_id(db, invoice.id)
 
+    @staticmethod
+    async def create_invoices_bulk(db: AsyncSession, data: InvoiceBulkCreate) -> InvoiceBulkResponse:
+        """
+        Factura todas las órdenes pagadas y sin comprobante de una sede y rango de fechas.
+
+        - Órdenes en lotes desde order-service (cursor por ID)
+        - Comprobantes existentes descartados con una sola consulta por lote
+        - Pacientes distintos consultados en paralelo (caché de identidad)
+        - Correlativos reservados en bloque por tipo de comprobante
+        - Comprobantes e items con INSERT multi-fila en una sola transacción
+        """
+        results: dict = {}
+        invoices_by_type: dict = {}
+
+        try:
+            async for orders in fetch_billable_orders(data.location_id, data.date_from, data.date_to):
+                active_order_ids = await InvoiceRepository.get_active_order_ids(
+                    db, [order["id"] for order in orders]
+                )
+                pending_orders = []
+                for order in orders:
+                    if order["id"] in active_order_ids:
+                        results[order["id"]] = InvoiceBulkResult(
+                            order_id=order["id"], order_number=order.get("order_number"),
+                            status="SKIPPED", message="La orden ya tiene un comprobante activo"
+                        )
+                    else:
+                        pending_orders.append(order)
+
+                patients = await fetch_patient_identities(order["patient_id"] for order in pending_orders)
+
+                for order in pending_orders:
+                    result = InvoiceBulkResult(order_id=order["id"], order_number=order.get("order_number"), status="ERROR")
+                    results[order["id"]] = result
+
+                    patient_data = patients.get(order["patient_id"])
+                    if isinstance(patient_data, Exception):
+                        result.message = f"Error al comunicarse con patient-service: {patient_data}"
+                        continue
+                    if patient_data is None:
+                        result.message = f"Paciente {order['patient_id']} no encontrado"
+                        continue
+
+                    invoice_type = data.invoice_type or (
+                        InvoiceType.FACTURA if patient_data["document_type"] == "RUC" else InvoiceType.BOLETA
+                    )
+                    if invoice_type == InvoiceType.FACTURA and patient_data["document_type"] != "RUC":
+                        result.message = "Las facturas solo pueden emitirse para clientes con RUC"
+                        continue
+
+                    subtotal, tax, total = calculate_invoice_amounts(order)
+                    result.invoice_type = invoice_type
+                    result.total = total
+                    invoices_by_type.setdefault(invoice_type, []).append((
+                        {
+                            "order_id": order["id"],
+                            "patient_id": order["patient_id"],
+                            "location_id": order.get("location_id", data.location_id),
+                            "invoice_type": invoice_type,
+                            "invoice_status": InvoiceStatus.PENDING,
+                            "customer_document_type": patient_data.get("document_type", ""),
+                            "customer_document_number": patient_data.get("document_number", ""),
+                            "customer_name": customer_name_from_patient(patient_data),
+                            "customer_address": patient_data.get("address"),
+                            "subtotal": subtotal,
+                            "tax": tax,
+                            "total": total,
+                        },
+                        invoice_item_values(order)
+                    ))
+        except httpx.HTTPError as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Error al comunicarse con order-service: {str(e)}"
+            )
+
+        # Correlativos en bloque: un UPDATE por tipo (bloquea la serie hasta el commit)
+        invoice_rows = []
+        items_by_order = {}
+        for invoice_type, pending in invoices_by_type.items():
+            numbers = await InvoiceSeriesRepository.allocate_numbers(
+                db, invoice_type, len(pending), data.location_id
+            )
+            if not numbers:
+                for invoice_values, _ in pending:
+                    results[invoice_values["order_id"]].message = (
+                        f"No hay una serie activa para {invoice_type.value} en la sede {data.location_id}"
+                    )
+                continue
+            for invoice_number, (invoice_values, items) in zip(numbers, pending):
+                invoice_values["invoice_number"] = invoice_number
+                invoice_rows.append(invoice_values)
+                items_by_order[invoice_values["order_id"]] = items
+
+        invoice_ids = await InvoiceRepository.bulk_create_with_items(db, invoice_rows, items_by_order)
+        if not invoice_rows:
+            await db.rollback()
+
+        total_billed = Decimal("0.00")
+        for invoice_values in invoice_rows:
+            result = results[invoice_values["order_id"]]
+            result.status = "CREATED"
+            result.invoice_id = invoice_ids[invoice_values["order_id"]]
+            result.invoice_number = invoice_values["invoice_number"]
+            total_billed += invoice_values["total"]
+
+        summary = list(results.values())
+        logger.info(
+            f"Facturación masiva sede {data.location_id} ({data.date_from} a {data.date_to}): "
+            f"{len(invoice_rows)} creados de {len(summary)} órdenes"
+        )
+        return InvoiceBulkResponse(
+            location_id=data.location_id,
+            date_from=data.date_from,
+            date_to=data.date_to,
+            total_orders=len(summary),
+            created=len(invoice_rows),
+            skipped=sum(1 for result in summary if result.status == "SKIPPED"),
+            failed=sum(1 for result in summary if result.status == "ERROR"),
+            total_billed=total_billed,
+            results=summary
+        )
+
     @staticmethod
     async def update_invoice_status(
         db: AsyncSession,
@@ -598,6 +858,43 @@ class InvoiceService:
         stats = await InvoiceRepository.get_statistics(db, date_from, date_to)
         return InvoiceStats(**stats)
 
+    @staticmethod
+    async def get_series(
+        db: AsyncSession,
+        invoice_type: Optional[InvoiceType] = None,
+        location_id: Optional[int] = None
+    ) -> List[InvoiceSeriesResponse]:
+        """Lista las series configuradas."""
+        series = await InvoiceSeriesRepository.get_all(db, invoice_type, location_id)
+        return [InvoiceSeriesResponse.model_validate(s) for s in series]
+
+    @staticmethod
+    async def create_series(db: AsyncSession, data: InvoiceSeriesCreate) -> InvoiceSeriesResponse:
+        """Registra una nueva serie para un tipo de comprobante (y opcionalmente una sede)."""
+        expected_prefix = "B" if data.invoice_type == InvoiceType.BOLETA else "F"
+        if not data.serie.startswith(expected_prefix):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Las series de {data.invoice_type.value} deben empezar con {expected_prefix}"
+            )
+
+        if await InvoiceSeriesRepository.get_by_serie(db, data.invoice_type, data.serie):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"La serie {data.serie} ya existe para {data.invoice_type.value}"
+            )
+
+        series = InvoiceSeries(
+            invoice_type=data.invoice_type,
+            serie=data.serie,
+            location_id=data.location_id,
+            next_value=data.next_value,
+            is_default=data.is_default,
+            is_active=True
+        )
+        series = await InvoiceSeriesRepository.create(db, series)
+        return InvoiceSeriesResponse.model_validate(series)
+
     @staticmethod
     async def generate_and_send_to_sunat(
         db: AsyncSession,
@@ -606,7 +903,7 @@ class InvoiceService:
         """
         Flujo completo de envío a SUNAT:
          1. Cargar comprobante con ítems
-         2. Generar XML UBL
+         2. Generar XML UBL y validarlo (XSD + reglas SUNAT)
          3. Firmar XML (placeholder)
          4. Crear ZIP
          5. Enviar a SUNAT via SunatClient
@@ -621,11 +918,27 @@ class InvoiceService:
                 detail=f"Comprobante {invoice_id} no encontrado"
             )
 
-        # 2) Generar XML UBL
-        xml = build_ubl_invoice_xml(invoice)
+        # 2) Generar XML UBL (árbol listo para firmar)
+        xml_tree = build_ubl_invoice_tree(invoice)
+
+        # 2.1) Validación previa (XSD + reglas SUNAT): evita un viaje SOAP que SUNAT rechazaría
+        if settings.ubl_preflight_validation:
+            validation_errors = UBLValidator.validate(xml_tree)
+            if validation_errors:
+                logger.warning(
+                    f"Comprobante {invoice.invoice_number} no pasó la validación UBL: "
+                    f"{len(validation_errors)} error(es)"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={
+                        "message": f"El XML UBL del comprobante {invoice.invoice_number} no es válido",
+                        "errors": validation_errors
+                    }
+                )
 
         # 3) Firmar XML
-        signed_xml_bytes = sign_xml_placeholder(xml)
+        signed_xml_bytes = sign_xml_placeholder(xml_tree)
 
         # Convertir bytes a string para el cliente SUNAT
         signed_xml_str = signed_xml_bytes.decode('utf-8')
@@ -653,24 +966,14 @@ class InvoiceService:
         # 6) Guardar CDR y actualizar estado
         await save_cdr_files_and_update_invoice(db, invoice, send_result)
 
-        # 7) Envío de correo si SMTP configurado
-        if getattr(settings, "smtp_host", None):
-            # Obtener email del paciente
-            try:
-                async with httpx.AsyncClient() as client:
-                    patient_resp = await client.get(
-                        f"{settings.patient_service_url}/api/v1/patients/{invoice.patient_id}",
-                        timeout=10.0
-                    )
-                    if patient_resp.status_code == 200:
-                        patient_data = patient_resp.json()
-                        patient_email = patient_data.get("email")
-                    else:
-                        patient_email = None
-            except Exception:
-                patient_email = None
+        # 7) Envío de correo (cola de configuration-service o SMTP directo)
+        if settings.notification_delivery == "service" or getattr(settings, "smtp_host", None):
+            # Obtener email del paciente (caché de identidad de facturación)
+            patient_email = await get_patient_email(invoice.patient_id)
 
             if patient_email:
+                filename_base = xml_filename
+                zip_bytes = create_zip_from_xml(signed_xml_bytes, filename_base)
                 attachments = [
                     {
                         "filename": f"{filename_base}.xml",
@@ -698,7 +1001,7 @@ class InvoiceService:
                 # Enviar email
                 subject = f"Comprobante {invoice.invoice_number}"
                 body = f"Adjunto el comprobante electrónico {invoice.invoice_number} y su CDR."
-                await send_email_with_attachments_async(patient_email, subject, body, attachments)
+                await send_invoice_email(invoice, patient_email, subject, body, attachments)
 
         return await InvoiceService.get_invoice_by_id(db, invoice.id)
 
@@ -3,7 +3,7 @@ Reconciliation Models
 """
 from sqlalchemy import String, Boolean, Integer, DateTime, Numeric, Text, Date, Enum as SQLEnum, Index, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from datetime import datetime, date
 from decimal import Decimal
 from typing import Optional, List
@@ -15,6 +15,7 @@ class ClosureStatus(str, enum.Enum):
     OPEN = "OPEN"
     CLOSED = "CLOSED"
     REOPENED = "REOPENED"
+    PENDING = "PENDING"  # cierre por lote sin total registrado de la sede
 
 class DailyClosure(Base):
     __tablename__ = "daily_closures"
@@ -23,14 +24,24 @@ class DailyClosure(Base):
     closure_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
     status: Mapped[ClosureStatus] = mapped_column(SQLEnum(ClosureStatus, native_enum=False), default=ClosureStatus.OPEN, index=True)
     expected_total: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=Decimal("0.00"))
-    registered_total: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=Decimal("0.00"))
-    difference: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=Decimal("0.00"))
+    registered_total: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2), nullable=True)
+    difference: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     discrepancies: Mapped[List["Discrepancy"]] = relationship("Discrepancy", back_populates="closure", cascade="all, delete-orphan")
 
 class Discrepancy(Base):
     __tablename__ = "discrepancies"
+    __table_args__ = (
+        # Una discrepancia por línea o pago de extracto: reimportar el mismo archivo no la duplica
+        Index(
+            "uq_discrepancies_closure_source_key", "closure_id", "source_key",
+            unique=True, postgresql_where=text("source_key IS NOT NULL")
+        ),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     closure_id: Mapped[int] = mapped_column(ForeignKey('daily_closures.id'), nullable=False, index=True)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     is_resolved: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
+    source_key: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     closure: Mapped["DailyClosure"] = relationship("DailyClosure", back_populates="discrepancies")
@@ -2,12 +2,18 @@
 Reconciliation Repository (Data access layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import Optional, List, Tuple
+from sqlalchemy import select, insert, func, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload
+from typing import Optional, List, Tuple, Dict, Any, Set
 from datetime import date
 
 from src.modules.reconciliation.models import DailyClosure, Discrepancy, ClosureStatus
 
+# Rows per INSERT in create_many_keyed: 4 bind parameters per row stays well
+# below asyncpg's 32767 parameters per statement
+KEYED_INSERT_CHUNK = 5000
+
 
 class DailyClosureRepository:
     """Repository for DailyClosure operations"""
@@ -58,17 +64,14 @@ class DailyClosureRepository:
     @staticmethod
     async def get_by_id_with_discrepancies(db: AsyncSession, closure_id: int) -> Optional[DailyClosure]:
         """Get closure by ID with discrepancies loaded"""
-        query = select(DailyClosure).where(DailyClosure.id == closure_id)
+        query = (
+            select(DailyClosure)
+            .options(selectinload(DailyClosure.discrepancies))
+            .where(DailyClosure.id == closure_id)
+            .execution_options(populate_existing=True)
+        )
         result = await db.execute(query)
-        closure = result.scalar_one_or_none()
-
-        if closure:
-            # Load discrepancies
-            disc_query = select(Discrepancy).where(Discrepancy.closure_id == closure_id)
-            disc_result = await db.execute(disc_query)
-            closure.discrepancies = list(disc_result.scalars().all())
-
-        return closure
+        return result.scalar_one_or_none()
 
     @staticmethod
     async def get_by_location_and_date(
@@ -86,6 +89,51 @@ class DailyClosureRepository:
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_closed_location_ids(
+        db: AsyncSession,
+        location_ids: List[int],
+        closure_date: date
+    ) -> Set[int]:
+        """Location IDs (of the given ones) that already have a closure for the date"""
+        if not location_ids:
+            return set()
+        query = select(DailyClosure.location_id).where(
+            DailyClosure.location_id.in_(location_ids),
+            DailyClosure.closure_date == closure_date
+        )
+        result = await db.execute(query)
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def bulk_create_with_discrepancies(
+        db: AsyncSession,
+        closures: List[Dict[str, Any]],
+        descriptions_by_location: Dict[int, List[str]]
+    ) -> Dict[int, int]:
+        """
+        Insert closures and their discrepancies with multi-row INSERTs and
+        commit once. Returns {location_id: closure_id}.
+        """
+        if not closures:
+            return {}
+        result = await db.execute(
+            insert(DailyClosure).returning(DailyClosure.id, DailyClosure.location_id),
+            closures
+        )
+        closure_ids = {location_id: closure_id for closure_id, location_id in result.all()}
+
+        discrepancy_rows = [
+            {"closure_id": closure_ids[location_id], "description": description, "is_resolved": False}
+            for location_id, descriptions in descriptions_by_location.items()
+            for description in descriptions
+        ]
+        if discrepancy_rows:
+            await db.execute(insert(Discrepancy), discrepancy_rows)
+
+        await db.commit()
+        return closure_ids
+
     @staticmethod
     async def create(db: AsyncSession, closure: DailyClosure) -> DailyClosure:
         """Create a new closure"""
@@ -159,13 +207,45 @@ class DiscrepancyRepository:
         return discrepancy
 
     @staticmethod
-    async def create_many(db: AsyncSession, discrepancies: List[Discrepancy]) -> List[Discrepancy]:
-        """Create multiple discrepancies"""
-        db.add_all(discrepancies)
+    async def create_many(db: AsyncSession, closure_id: int, descriptions: List[str]) -> int:
+        """Create multiple discrepancies for a closure with one multi-row INSERT"""
+        if not descriptions:
+            return 0
+        await db.execute(
+            insert(Discrepancy),
+            [{"closure_id": closure_id, "description": description, "is_resolved": False} for description in descriptions]
+        )
+        await db.commit()
+        return len(descriptions)
+
+    @staticmethod
+    async def create_many_keyed(db: AsyncSession, closure_id: int, descriptions: Dict[str, str]) -> int:
+        """
+        Create discrepancies keyed by source ({source_key: description}) with
+        INSERT ... ON CONFLICT DO NOTHING in chunks of KEYED_INSERT_CHUNK rows,
+        committed together; returns how many were new
+        """
+        if not descriptions:
+            return 0
+        rows = [
+            {"closure_id": closure_id, "description": description, "is_resolved": False, "source_key": key}
+            for key, description in descriptions.items()
+        ]
+        created = 0
+        for start in range(0, len(rows), KEYED_INSERT_CHUNK):
+            stmt = (
+                pg_insert(Discrepancy)
+                .values(rows[start:start + KEYED_INSERT_CHUNK])
+                .on_conflict_do_nothing(
+                    index_elements=[Discrepancy.closure_id, Discrepancy.source_key],
+                    index_where=Discrepancy.source_key.isnot(None)
+                )
+                .returning(Discrepancy.id)
+            )
+            result = await db.execute(stmt)
+            created += len(result.all())
         await db.commit()
-        for d in discrepancies:
-            await db.refresh(d)
-        return discrepancies
+        return created
 
     @staticmethod
     async def get_by_id(db: AsyncSession, discrepancy_id: int) -> Optional[Discrepancy]:
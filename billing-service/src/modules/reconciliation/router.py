@@ -1,7 +1,7 @@
 """
 Reconciliation Router (API endpoints for daily closures and reconciliation)
 """
-from fastapi import APIRouter, Depends, status, Query, Path, Body
+from fastapi import APIRouter, Depends, status, Query, Path, Body, File, Form, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import date
@@ -12,7 +12,9 @@ from src.modules.reconciliation.schemas import (
     DailyClosureCreate, DailyClosureResponse, DailyClosureDetailResponse,
     DailyClosureListResponse, DailyClosureReopen,
     DiscrepancyResponse, DiscrepancyCreate, DiscrepancyResolve,
-    ClosureStats, ReconciliationReport
+    ClosureStats, ReconciliationReport,
+    DailyClosureBatchCreate, DailyClosureBatchResponse,
+    StatementSource, StatementImportResponse
 )
 from src.modules.reconciliation.models import ClosureStatus
 
@@ -111,6 +113,30 @@ async def create_daily_closure(
     return await ReconciliationService.create_daily_closure(db, data)
 
 
+@router.post(
+    "/closures/batch",
+    response_model=DailyClosureBatchResponse,
+    summary="Cierre diario de todas las sedes activas"
+)
+async def create_batch_closure(
+    data: DailyClosureBatchCreate = Body(..., description="Fecha y totales registrados por sede"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ejecuta el cierre diario de todas las sedes activas en una sola llamada
+
+    **Proceso:**
+    1. Obtiene las sedes activas desde configuration-service
+    2. Omite las sedes que ya tienen cierre para la fecha
+    3. Consulta los totales de cada sede en paralelo (concurrencia acotada)
+    4. Registra cierres y discrepancias en una sola transacción
+
+    Las sedes sin total registrado se cierran con el total esperado
+    (`registered_declared = false` en el reporte).
+    """
+    return await ReconciliationService.create_batch_closure(db, data)
+
+
 @router.put(
     "/closures/{closure_id}/close",
     response_model=DailyClosureResponse,
@@ -177,6 +203,41 @@ async def add_discrepancy(
     return await ReconciliationService.add_discrepancy(db, closure_id, data)
 
 
+@router.post(
+    "/closures/{closure_id}/statements",
+    response_model=StatementImportResponse,
+    summary="Importar extracto bancario o de billetera"
+)
+async def import_statement(
+    closure_id: int = Path(..., gt=0, description="ID del cierre"),
+    source: StatementSource = Form(..., description="Origen del extracto (TARJETA, TRANSFERENCIA, YAPE_PLIN)"),
+    file: UploadFile = File(..., description="Extracto en CSV (',', ';' o tabulador)"),
+    match_window_minutes: Optional[int] = Form(None, ge=1, le=1440, description="Ventana de emparejamiento por hora"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Conciliar un extracto de procesador de tarjetas, banco o Yape/Plin con los
+    pagos del día registrados en el sistema para la sede del cierre
+
+    **Columnas reconocidas** (encabezado, sin distinguir tildes ni mayúsculas):
+    - Fecha y hora: `fecha_hora`, o `fecha` + `hora`
+    - Monto: `monto`, `importe`, `amount`
+    - Referencia (opcional): `referencia`, `numero_operacion`, `nro_operacion`...
+
+    **Emparejamiento:** por referencia de operación; si no coincide, por monto
+    exacto y hora dentro de la ventana (por defecto STATEMENT_MATCH_WINDOW_MINUTES).
+
+    Las líneas sin pago y los pagos sin línea se registran como discrepancias del cierre.
+    """
+    async def chunks():
+        while chunk := await file.read(64 * 1024):
+            yield chunk
+
+    return await ReconciliationService.import_statement(
+        db, closure_id, source, chunks(), match_window_minutes
+    )
+
+
 @router.put(
     "/discrepancies/{discrepancy_id}/resolve",
     response_model=DiscrepancyResponse,
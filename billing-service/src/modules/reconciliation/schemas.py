@@ -1,12 +1,23 @@
 """
 Reconciliation Schemas (Pydantic models for request/response validation)
 """
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List, Dict
 from datetime import date, datetime
 from decimal import Decimal
+import enum
 from src.modules.reconciliation.models import ClosureStatus
 
+# Métodos de pago de order-service (PaymentMethod)
+PAYMENT_METHODS = ("EFECTIVO", "TARJETA", "TRANSFERENCIA", "YAPE_PLIN")
+
+
+class StatementSource(str, enum.Enum):
+    """Origen del extracto (coincide con el método de pago conciliado)"""
+    TARJETA = "TARJETA"
+    TRANSFERENCIA = "TRANSFERENCIA"
+    YAPE_PLIN = "YAPE_PLIN"
+
 
 # ==================== Discrepancy Schemas ====================
 
@@ -34,11 +45,32 @@ class DiscrepancyResolve(BaseModel):
 
 # ==================== Daily Closure Schemas ====================
 
+def validate_registered_by_method(v: Optional[Dict[str, Decimal]]) -> Optional[Dict[str, Decimal]]:
+    """Validate payment method names and amounts"""
+    if v is None:
+        return v
+    invalid = set(v) - set(PAYMENT_METHODS)
+    if invalid:
+        raise ValueError(f"Métodos de pago inválidos: {', '.join(sorted(invalid))}")
+    if any(amount < 0 for amount in v.values()):
+        raise ValueError("Los montos por método de pago no pueden ser negativos")
+    return v
+
+
 class DailyClosureCreate(BaseModel):
     """Schema for creating a daily closure"""
     location_id: int = Field(..., gt=0, description="ID de la sede")
     closure_date: date = Field(..., description="Fecha de cierre")
     registered_total: Decimal = Field(..., ge=0, description="Total registrado")
+    registered_by_method: Optional[Dict[str, Decimal]] = Field(
+        None,
+        description="Total registrado por método de pago (EFECTIVO, TARJETA, TRANSFERENCIA, YAPE_PLIN)"
+    )
+
+    @validator('registered_by_method')
+    def validate_payment_methods(cls, v):
+        """Validate payment method names and amounts"""
+        return validate_registered_by_method(v)
 
 
 class DailyClosureResponse(BaseModel):
@@ -48,8 +80,8 @@ class DailyClosureResponse(BaseModel):
     closure_date: date
     status: ClosureStatus
     expected_total: Decimal
-    registered_total: Decimal
-    difference: Decimal
+    registered_total: Optional[Decimal] = None
+    difference: Optional[Decimal] = None
     created_at: datetime
 
     class Config:
@@ -69,6 +101,87 @@ class DailyClosureListResponse(BaseModel):
     closures: List[DailyClosureResponse] = Field(..., description="Lista de cierres")
 
 
+class DailyClosureRegistered(BaseModel):
+    """Cashier-declared totals of one location for the batch closure"""
+    location_id: int = Field(..., gt=0, description="ID de la sede")
+    registered_total: Decimal = Field(..., ge=0, description="Total registrado")
+    registered_by_method: Optional[Dict[str, Decimal]] = Field(None, description="Total registrado por método de pago")
+
+    @validator('registered_by_method')
+    def validate_payment_methods(cls, v):
+        """Validate payment method names and amounts"""
+        return validate_registered_by_method(v)
+
+
+class DailyClosureBatchCreate(BaseModel):
+    """Schema for closing the day of every active location"""
+    closure_date: date = Field(..., description="Fecha de cierre")
+    registered: List[DailyClosureRegistered] = Field(
+        default_factory=list,
+        description="Totales registrados por sede; las sedes no incluidas quedan PENDING sin total registrado"
+    )
+
+    @validator('registered')
+    def validate_unique_locations(cls, v):
+        """Validate one entry per location"""
+        location_ids = [entry.location_id for entry in v]
+        if len(location_ids) != len(set(location_ids)):
+            raise ValueError('Cada sede puede registrarse una sola vez')
+        return v
+
+
+class DailyClosureBatchResult(BaseModel):
+    """Batch closure result for a single location"""
+    location_id: int
+    location_name: Optional[str] = None
+    status: str = Field(..., description="CREATED, SKIPPED o ERROR")
+    closure_id: Optional[int] = None
+    expected_total: Optional[Decimal] = None
+    registered_total: Optional[Decimal] = None
+    difference: Optional[Decimal] = None
+    registered_declared: bool = Field(False, description="Indica si la sede envió su total registrado")
+    discrepancies: List[str] = Field(default_factory=list)
+    message: Optional[str] = None
+
+
+class DailyClosureBatchResponse(BaseModel):
+    """Consolidated report of a batch closure"""
+    closure_date: date
+    total_locations: int = Field(..., description="Sedes activas")
+    created: int = Field(..., description="Cierres creados")
+    skipped: int = Field(..., description="Sedes con cierre existente")
+    failed: int = Field(..., description="Sedes con error")
+    pending: int = Field(..., description="Cierres creados sin total registrado (PENDING)")
+    expected_total: Decimal = Field(..., description="Total esperado de los cierres creados")
+    registered_total: Decimal = Field(..., description="Total registrado de los cierres con total declarado")
+    difference: Decimal = Field(..., description="Diferencia total de los cierres con total declarado")
+    total_discrepancies: int = Field(..., description="Discrepancias generadas")
+    results: List[DailyClosureBatchResult] = Field(default_factory=list)
+
+
+class StatementLineError(BaseModel):
+    """Invalid statement line"""
+    line_number: int
+    message: str
+
+
+class StatementImportResponse(BaseModel):
+    """Result of importing a bank/wallet statement into a closure"""
+    closure_id: int
+    source: StatementSource
+    total_lines: int = Field(..., description="Líneas de datos leídas")
+    matched: int = Field(..., description="Líneas emparejadas con un pago")
+    unmatched_lines: int = Field(..., description="Líneas sin pago en el sistema")
+    unmatched_payments: int = Field(..., description="Pagos del sistema sin línea en el extracto")
+    ignored_lines: int = Field(..., description="Líneas de otra fecha o con monto no positivo (devoluciones, comisiones)")
+    invalid_lines: int = Field(..., description="Líneas con fecha o monto inválido")
+    statement_total: Decimal = Field(..., description="Suma de las líneas válidas del día")
+    matched_total: Decimal = Field(..., description="Suma de las líneas emparejadas")
+    system_total: Decimal = Field(..., description="Suma de los pagos del sistema")
+    discrepancies_created: int = Field(..., description="Discrepancias registradas")
+    errors: List[StatementLineError] = Field(default_factory=list, description="Primeras líneas inválidas")
+
+
 class DailyClosureReopen(BaseModel):
     """Schema for reopening a closure"""
     reason: str = Field(..., min_length=10, description="Justificación para reabrir (mínimo 10 caracteres)")
@@ -1,11 +1,12 @@
 """
 Reconciliation Service (Business logic for daily closures and reconciliation)
 """
+import asyncio
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import Optional, List
-from datetime import date
+from typing import Optional, List, Dict, AsyncIterator
+from datetime import date, timedelta, timezone
 from decimal import Decimal
 
 from src.modules.reconciliation.models import DailyClosure, Discrepancy, ClosureStatus
@@ -14,9 +15,18 @@ from src.modules.reconciliation.schemas import (
     DailyClosureCreate, DailyClosureResponse, DailyClosureDetailResponse,
     DailyClosureListResponse, DailyClosureReopen,
     DiscrepancyResponse, DiscrepancyCreate, DiscrepancyResolve,
-    ClosureStats, ReconciliationReport, PaymentMethodSummary
+    ClosureStats, ReconciliationReport, PaymentMethodSummary, PAYMENT_METHODS,
+    DailyClosureBatchCreate, DailyClosureBatchResult, DailyClosureBatchResponse,
+    StatementSource, StatementImportResponse, StatementLineError
+)
+from src.modules.reconciliation.statement import (
+    StatementLine, StatementParser, StatementFormatError, PaymentMatcher, iter_csv_rows, statement_line_key
 )
 from src.core.config import settings
+from src.utils.service_clients import fetch_active_locations, fetch_daily_order_totals, fetch_location_payments
+
+# Líneas inválidas detalladas en la respuesta de la importación de extractos
+MAX_STATEMENT_ERRORS = 100
 
 
 class ReconciliationService:
@@ -63,67 +73,175 @@ class ReconciliationService:
         db: AsyncSession,
         data: DailyClosureCreate
     ) -> DailyClosureDetailResponse:
-        """Create a new daily closure and perform reconciliation - RF-056, RF-057, RF-058"""
+        """
+        Create a new daily closure and perform reconciliation - RF-056, RF-057, RF-058
+
+        A PENDING closure (batch closure without declared totals) for the same
+        location and date is completed with the declared totals.
+        """
         # Check if closure already exists for this location and date
         existing = await DailyClosureRepository.get_by_location_and_date(
             db, data.location_id, data.closure_date
         )
-        if existing:
+        if existing and existing.status != ClosureStatus.PENDING:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Ya existe un cierre para la sede {data.location_id} en la fecha {data.closure_date}"
             )
 
-        # Calculate expected total from orders and invoices
-        expected_total = await ReconciliationService._calculate_expected_total(
-            db, data.location_id, data.closure_date
-        )
+        # Order totals of the day (one call, reused for every check below)
+        daily_totals = await ReconciliationService._get_daily_totals(data.location_id, data.closure_date)
+
+        # Calculate expected total from orders
+        expected_total = ReconciliationService._calculate_expected_total(daily_totals)
 
         # Calculate difference
         difference = data.registered_total - expected_total
 
-        # Create closure
-        closure = DailyClosure(
-            location_id=data.location_id,
-            closure_date=data.closure_date,
-            status=ClosureStatus.OPEN,
-            expected_total=expected_total,
-            registered_total=data.registered_total,
-            difference=difference
-        )
-        closure = await DailyClosureRepository.create(db, closure)
-
-        # Detect discrepancies (RF-058)
-        discrepancies = []
-        if abs(difference) > Decimal("0.01"):  # Tolerance of 0.01
-            desc = f"Diferencia de S/ {difference:.2f} entre el total esperado (S/ {expected_total:.2f}) y el total registrado (S/ {data.registered_total:.2f})"
-            discrepancy = Discrepancy(
-                closure_id=closure.id,
-                description=desc,
-                is_resolved=False
+        if existing:
+            existing.status = ClosureStatus.OPEN
+            existing.expected_total = expected_total
+            existing.registered_total = data.registered_total
+            existing.difference = difference
+            closure = await DailyClosureRepository.update(db, existing)
+        else:
+            closure = DailyClosure(
+                location_id=data.location_id,
+                closure_date=data.closure_date,
+                status=ClosureStatus.OPEN,
+                expected_total=expected_total,
+                registered_total=data.registered_total,
+                difference=difference
             )
-            discrepancies.append(discrepancy)
+            closure = await DailyClosureRepository.create(db, closure)
 
-        # Check payment methods reconciliation
-        payment_discrepancies = await ReconciliationService._check_payment_methods(
-            db, data.location_id, data.closure_date
+        # Detect discrepancies (RF-058) and check payment methods reconciliation
+        discrepancies = ReconciliationService._detect_discrepancies(
+            daily_totals, data.registered_total, data.registered_by_method
         )
-        for desc in payment_discrepancies:
-            discrepancy = Discrepancy(
-                closure_id=closure.id,
-                description=desc,
-                is_resolved=False
-            )
-            discrepancies.append(discrepancy)
 
         if discrepancies:
-            await DiscrepancyRepository.create_many(db, discrepancies)
+            await DiscrepancyRepository.create_many(db, closure.id, discrepancies)
             # TODO: Send alerts to supervisor and admin (RF-061)
             # This requires notification service integration
 
         # Reload closure with discrepancies
         return await ReconciliationService.get_closure_by_id(db, closure.id)
 
+    @staticmethod
+    async def create_batch_closure(
+        db: AsyncSession,
+        data: DailyClosureBatchCreate
+    ) -> DailyClosureBatchResponse:
+        """
+        Run the daily closure for every active location (configuration-service)
+
+        - Order totals fetched concurrently, at most CLOSURE_BATCH_CONCURRENCY at a time
+        - Locations that already have a closure for the date are skipped
+        - Locations without declared totals are stored as PENDING, with no
+          registered total or difference, until they are declared
+        - Closures and discrepancies written with multi-row INSERTs in one transaction
+        """
+        try:
+            locations = await fetch_active_locations()
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Error al obtener las sedes de configuration-service: {str(e)}"
+            )
+
+        registered = {entry.location_id: entry for entry in data.registered}
+        results = {
+            location["id"]: DailyClosureBatchResult(
+                location_id=location["id"], location_name=location.get("name"), status="ERROR"
+            )
+            for location in locations
+        }
+        unknown = set(registered) - set(results)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Sedes inexistentes o inactivas: {', '.join(str(i) for i in sorted(unknown))}"
+            )
+
+        closed = await DailyClosureRepository.get_closed_location_ids(db, list(results), data.closure_date)
+        for location_id in closed:
+            results[location_id].status = "SKIPPED"
+            results[location_id].message = f"Ya existe un cierre para la fecha {data.closure_date}"
+
+        pending = [location_id for location_id in results if location_id not in closed]
+        semaphore = asyncio.Semaphore(settings.closure_batch_concurrency)
+
+        async def load_totals(location_id: int):
+            async with semaphore:
+                try:
+                    return await fetch_daily_order_totals(location_id, data.closure_date)
+                except httpx.HTTPError as e:
+                    return e
+
+        totals = await asyncio.gather(*(load_totals(location_id) for location_id in pending))
+
+        closure_rows = []
+        descriptions_by_location = {}
+        for location_id, daily_totals in zip(pending, totals):
+            result = results[location_id]
+            if isinstance(daily_totals, Exception):
+                result.message = f"Error al obtener los totales de order-service: {daily_totals}"
+                continue
+
+            expected_total = ReconciliationService._calculate_expected_total(daily_totals)
+            entry = registered.get(location_id)
+            if entry is None:
+                # Sin total declarado no se puede conciliar: no se asume que cuadra
+                registered_total = difference = None
+                discrepancies = []
+                result.message = "Sin total registrado: el cierre queda PENDING hasta que la sede lo declare"
+            else:
+                registered_total = entry.registered_total
+                difference = registered_total - expected_total
+                discrepancies = ReconciliationService._detect_discrepancies(
+                    daily_totals, registered_total, entry.registered_by_method
+                )
+            closure_rows.append({
+                "location_id": location_id,
+                "closure_date": data.closure_date,
+                "status": ClosureStatus.OPEN if entry else ClosureStatus.PENDING,
+                "expected_total": expected_total,
+                "registered_total": registered_total,
+                "difference": difference
+            })
+            descriptions_by_location[location_id] = discrepancies
+
+            result.expected_total = expected_total
+            result.registered_total = registered_total
+            result.difference = difference
+            result.registered_declared = entry is not None
+            result.discrepancies = discrepancies
+
+        closure_ids = await DailyClosureRepository.bulk_create_with_discrepancies(
+            db, closure_rows, descriptions_by_location
+        )
+        for location_id, closure_id in closure_ids.items():
+            results[location_id].status = "CREATED"
+            results[location_id].closure_id = closure_id
+
+        created = [results[row["location_id"]] for row in closure_rows]
+        declared = [result for result in created if result.registered_declared]
+        summary = list(results.values())
+        return DailyClosureBatchResponse(
+            closure_date=data.closure_date,
+            total_locations=len(summary),
+            created=len(created),
+            skipped=len(closed),
+            failed=sum(1 for result in summary if result.status == "ERROR"),
+            pending=len(created) - len(declared),
+            expected_total=sum((r.expected_total for r in created), Decimal("0.00")),
+            registered_total=sum((r.registered_total for r in declared), Decimal("0.00")),
+            difference=sum((r.difference for r in declared), Decimal("0.00")),
+            total_discrepancies=sum(len(r.discrepancies) for r in created),
+            results=summary
+        )
+
     @staticmethod
     async def close_daily_closure(
         db: AsyncSession,
@@ -142,6 +260,11 @@ class ReconciliationService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El cierre ya está cerrado"
             )
+        if closure.status == ClosureStatus.PENDING:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El cierre no tiene total registrado; regístrelo antes de cerrarlo"
+            )
 
         closure.status = ClosureStatus.CLOSED
         closure = await DailyClosureRepository.update(db, closure)
@@ -167,6 +290,11 @@ class ReconciliationService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El cierre ya está abierto"
             )
+        if closure.status == ClosureStatus.PENDING:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El cierre no tiene total registrado; regístrelo en lugar de reabrirlo"
+            )
 
         # Log reason (could be saved to a separate audit table)
         # For now, we just reopen it
@@ -201,6 +329,128 @@ class ReconciliationService:
 
         return DiscrepancyResponse.model_validate(discrepancy)
 
+    @staticmethod
+    async def import_statement(
+        db: AsyncSession,
+        closure_id: int,
+        source: StatementSource,
+        chunks: AsyncIterator[bytes],
+        match_window_minutes: Optional[int] = None
+    ) -> StatementImportResponse:
+        """
+        Conciliar un extracto (tarjeta, transferencias, Yape/Plin) contra los pagos del día
+
+        - Los pagos de la sede y día se obtienen en una sola llamada a order-service
+        - El archivo se lee en streaming; cada línea se empareja por referencia y
+          las restantes por monto dentro de la ventana de tiempo (índices hash, sin bucles anidados)
+        - Las líneas sin pago y los pagos sin línea se registran como discrepancias
+          en un único INSERT, con una clave por línea (referencia, o fecha, hora y
+          monto) y por pago: reimportar el mismo extracto no las duplica
+        """
+        closure = await DailyClosureRepository.get_by_id(db, closure_id)
+        if not closure:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Cierre con ID {closure_id} no encontrado"
+            )
+
+        if closure.status == ClosureStatus.CLOSED:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No se puede importar un extracto en un cierre cerrado"
+            )
+
+        try:
+            payments = await fetch_location_payments(closure.location_id, closure.closure_date, [source.value])
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Error al obtener los pagos de order-service: {e}"
+            )
+
+        window = timedelta(minutes=match_window_minutes or settings.statement_match_window_minutes)
+        matcher = PaymentMatcher(payments, window)
+        tz = timezone(timedelta(hours=settings.statement_utc_offset_hours))
+
+        parser: Optional[StatementParser] = None
+        total_lines = matched = ignored = invalid = 0
+        statement_total = matched_total = Decimal("0.00")
+        errors: List[StatementLineError] = []
+        pending: List[StatementLine] = []
+        descriptions: Dict[str, str] = {}
+        line_keys: Dict[str, int] = {}
+
+        async for line_number, row in iter_csv_rows(chunks):
+            if parser is None:
+                try:
+                    parser = StatementParser(row, tz)
+                except StatementFormatError as e:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+                continue
+
+            total_lines += 1
+            try:
+                line = parser.parse(line_number, row)
+            except ValueError as e:
+                invalid += 1
+                if len(errors) < MAX_STATEMENT_ERRORS:
+                    errors.append(StatementLineError(line_number=line_number, message=str(e)))
+                continue
+
+            if line.amount <= 0 or line.timestamp.astimezone(tz).date() != closure.closure_date:
+                ignored += 1
+                continue
+
+            statement_total += line.amount
+            if matcher.match_reference(line) is not None:
+                matched += 1
+                matched_total += line.amount
+            else:
+                pending.append(line)
+
+        if parser is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El extracto está vacío")
+
+        for line, payment in matcher.match_amounts(pending):
+            if payment is not None:
+                matched += 1
+                matched_total += line.amount
+                continue
+
+            reference = f" (ref. {line.reference})" if line.reference else ""
+            key = statement_line_key(source.value, line)
+            line_keys[key] = line_keys.get(key, 0) + 1
+            descriptions[f"{key}:{line_keys[key]}"] = (
+                f"Extracto {source.value} línea {line.line_number}: S/ {line.amount:.2f} "
+                f"del {line.timestamp.astimezone(tz):%d/%m/%Y %H:%M}{reference} sin pago registrado en el sistema"
+            )
+
+        unmatched_payments = matcher.unmatched_payments()
+        for payment in unmatched_payments:
+            reference = f" (ref. {payment['reference']})" if payment.get("reference") else ""
+            descriptions[f"{source.value}:payment:{payment['id']}"] = (
+                f"Pago {source.value} de S/ {Decimal(str(payment['amount'])):.2f} de la orden "
+                f"{payment['order_number']}{reference} no figura en el extracto"
+            )
+
+        created = await DiscrepancyRepository.create_many_keyed(db, closure_id, descriptions)
+
+        return StatementImportResponse(
+            closure_id=closure_id,
+            source=source,
+            total_lines=total_lines,
+            matched=matched,
+            unmatched_lines=len(descriptions) - len(unmatched_payments),
+            unmatched_payments=len(unmatched_payments),
+            ignored_lines=ignored,
+            invalid_lines=invalid,
+            statement_total=statement_total,
+            matched_total=matched_total,
+            system_total=sum((Decimal(str(p["amount"])) for p in payments), Decimal("0.00")),
+            discrepancies_created=created,
+            errors=errors
+        )
+
     @staticmethod
     async def resolve_discrepancy(
         db: AsyncSession,
@@ -237,29 +487,9 @@ class ReconciliationService:
         closure_date: date
     ) -> ReconciliationReport:
         """Generate complete reconciliation report - RF-057, RF-059"""
-        # Get orders from order-service
-        async with httpx.AsyncClient() as client:
-            try:
-                orders_resp = await client.get(
-                    f"{settings.order_service_url}/api/v1/orders",
-                    params={
-                        "location_id": location_id,
-                        "date_from": closure_date,
-                        "date_to": closure_date,
-                        "page_size": 1000
-                    },
-                    timeout=10.0
-                )
-                if orders_resp.status_code == 200:
-                    orders_data = orders_resp.json()
-                    total_orders = orders_data.get("total", 0)
-                    orders = orders_data.get("orders", [])
-                else:
-                    total_orders = 0
-                    orders = []
-            except Exception:
-                total_orders = 0
-                orders = []
+        # Order totals of the day from order-service (single aggregate query)
+        daily_totals = await ReconciliationService._get_daily_totals(location_id, closure_date)
+        total_orders = daily_totals["total_orders"]
 
         # Get invoices from local database
         from src.modules.billing.repository import InvoiceRepository
@@ -275,13 +505,8 @@ class ReconciliationService:
         )
         total_invoices = (await db.execute(invoice_query)).scalar() or 0
 
-        # Calculate total payments from orders
-        total_payments = Decimal("0.00")
-        for order in orders:
-            # Sum all payments for each order
-            payments = order.get("payments", [])
-            for payment in payments:
-                total_payments += Decimal(str(payment.get("amount", 0)))
+        # Total payments registered in orders
+        total_payments = Decimal(str(daily_totals["total_paid"]))
 
         # Calculate total billed from invoices
         from src.modules.billing.models import Invoice
@@ -295,9 +520,7 @@ class ReconciliationService:
         total_billed = (await db.execute(billed_query)).scalar() or Decimal("0.00")
 
         # Get payment method summary (RF-059, RF-060)
-        payment_methods = await ReconciliationService._get_payment_method_summary(
-            db, location_id, closure_date
-        )
+        payment_methods = ReconciliationService._get_payment_method_summary(daily_totals)
 
         # Get discrepancies if closure exists
         closure = await DailyClosureRepository.get_by_location_and_date(
@@ -326,47 +549,54 @@ class ReconciliationService:
     # ==================== HELPER METHODS ====================
 
     @staticmethod
-    async def _calculate_expected_total(
-        db: AsyncSession,
-        location_id: int,
-        closure_date: date
-    ) -> Decimal:
-        """Calculate expected total from system (orders + payments)"""
-        # Query orders from order-service
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.get(
-                    f"{settings.order_service_url}/api/v1/orders",
-                    params={
-                        "location_id": location_id,
-                        "date_from": closure_date,
-                        "date_to": closure_date,
-                        "page_size": 1000
-                    },
-                    timeout=10.0
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    orders = data.get("orders", [])
-                    total = sum(Decimal(str(order.get("total", 0))) for order in orders)
-                    return total
-                else:
-                    return Decimal("0.00")
-            except Exception:
-                return Decimal("0.00")
+    async def _get_daily_totals(location_id: int, closure_date: date) -> dict:
+        """Get order count, expected total and paid totals by payment method from order-service"""
+        try:
+            return await fetch_daily_order_totals(location_id, closure_date)
+        except httpx.HTTPError as e:
+            # Sin los totales del sistema el cierre no se puede conciliar
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Error al obtener los totales de order-service: {str(e)}"
+            )
 
     @staticmethod
-    async def _check_payment_methods(
-        db: AsyncSession,
-        location_id: int,
-        closure_date: date
+    def _calculate_expected_total(daily_totals: dict) -> Decimal:
+        """Calculate expected total from system (non-cancelled orders of the day)"""
+        return Decimal(str(daily_totals["expected_total"]))
+
+    @staticmethod
+    def _detect_discrepancies(
+        daily_totals: dict,
+        registered_total: Decimal,
+        registered_by_method: Optional[dict] = None
+    ) -> List[str]:
+        """Discrepancy descriptions for a closure: total difference and per payment method"""
+        discrepancies = []
+
+        expected_total = ReconciliationService._calculate_expected_total(daily_totals)
+        difference = registered_total - expected_total
+        if abs(difference) > Decimal("0.01"):  # Tolerance of 0.01
+            discrepancies.append(
+                f"Diferencia de S/ {difference:.2f} entre el total esperado (S/ {expected_total:.2f}) y el total registrado (S/ {registered_total:.2f})"
+            )
+
+        discrepancies.extend(
+            ReconciliationService._check_payment_methods(daily_totals, registered_by_method)
+        )
+        return discrepancies
+
+    @staticmethod
+    def _check_payment_methods(
+        daily_totals: dict,
+        registered_by_method: Optional[dict] = None
     ) -> List[str]:
         """Check for discrepancies in payment methods"""
         discrepancies = []
 
         # Get payment method summary
-        payment_methods = await ReconciliationService._get_payment_method_summary(
-            db, location_id, closure_date
+        payment_methods = ReconciliationService._get_payment_method_summary(
+            daily_totals, registered_by_method
         )
 
         # Check each payment method for significant differences
@@ -378,42 +608,34 @@ class ReconciliationService:
         return discrepancies
 
     @staticmethod
-    async def _get_payment_method_summary(
-        db: AsyncSession,
-        location_id: int,
-        closure_date: date
+    def _get_payment_method_summary(
+        daily_totals: dict,
+        registered_by_method: Optional[dict] = None
     ) -> List[PaymentMethodSummary]:
-        """Get payment method summary for reconciliation - RF-059"""
-        # This is a simplified version
-        # In a real system, you'd query actual payment records
-        # For now, we return a placeholder
-
-        # TODO: Implement actual payment method reconciliation
-        # This requires querying order-service for payment details
-
-        return [
-            PaymentMethodSummary(
-                payment_method="EFECTIVO",
-                expected_total=Decimal("0.00"),
-                registered_total=Decimal("0.00"),
-                difference=Decimal("0.00")
-            ),
-            PaymentMethodSummary(
-                payment_method="TARJETA",
-                expected_total=Decimal("0.00"),
-                registered_total=Decimal("0.00"),
-                difference=Decimal("0.00")
-            ),
-            PaymentMethodSummary(
-                payment_method="TRANSFERENCIA",
-                expected_total=Decimal("0.00"),
-                registered_total=Decimal("0.00"),
-                difference=Decimal("0.00")
-            ),
-            PaymentMethodSummary(
-                payment_method="YAPE_PLIN",
-                expected_total=Decimal("0.00"),
-                registered_total=Decimal("0.00"),
-                difference=Decimal("0.00")
-            )
-        ]
+        """
+        Get payment method summary for reconciliation - RF-059
+
+        The expected total of each method is what order-service recorded as
+        paid. When the cashier did not declare amounts per method, the
+        registered total equals the expected one (no difference); when they
+        did, a missing method counts as S/ 0.00 registered.
+        """
+        paid_by_method = {
+            pm["payment_method"]: Decimal(str(pm["total_amount"]))
+            for pm in daily_totals.get("payment_methods", [])
+        }
+
+        summary = []
+        for method in PAYMENT_METHODS:
+            expected = paid_by_method.get(method, Decimal("0.00"))
+            if registered_by_method is None:
+                registered = expected
+            else:
+                registered = Decimal(str(registered_by_method.get(method, Decimal("0.00"))))
+            summary.append(PaymentMethodSummary(
+                payment_method=method,
+                expected_total=expected,
+                registered_total=registered,
+                difference=registered - expected
+            ))
+        return summary
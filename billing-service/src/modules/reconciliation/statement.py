@@ -0,0 +1,349 @@
+"""
+Statement Import (extractos de tarjeta, transferencias y Yape/Plin)
+
+- Lectura del CSV en streaming, por bloques (no se carga el archivo completo)
+- Emparejamiento contra los pagos de order-service con índices hash:
+  referencia de operación exacta, y monto en céntimos + ventana de tiempo
+"""
+import codecs
+import csv
+import re
+import unicodedata
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+# Encabezados aceptados (normalizados: minúsculas, sin tildes, "_" como separador)
+COLUMN_ALIASES = {
+    "datetime": ("fecha_hora", "fecha_y_hora", "datetime", "timestamp", "fecha_hora_operacion"),
+    "date": ("fecha", "date", "fecha_operacion", "fecha_transaccion", "fecha_de_operacion"),
+    "time": ("hora", "time", "hora_operacion", "hora_transaccion", "hora_de_operacion"),
+    "amount": ("monto", "importe", "amount", "total", "monto_operacion", "importe_operacion", "monto_pen"),
+    "reference": (
+        "referencia", "reference", "numero_operacion", "nro_operacion", "n_operacion", "no_operacion",
+        "num_operacion", "codigo_operacion", "operacion", "id_transaccion", "transaction_id", "codigo_autorizacion",
+    ),
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y")
+TIME_FORMATS = ("%H:%M:%S", "%H:%M", "%I:%M:%S %p", "%I:%M %p")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_REFERENCE_CHARS = re.compile(r"[^A-Z0-9]")
+
+
+class StatementFormatError(ValueError):
+    """El archivo no tiene las columnas mínimas (fecha y monto)"""
+
+
+class StatementLine(NamedTuple):
+    """Línea válida del extracto"""
+    line_number: int
+    timestamp: datetime
+    amount: Decimal
+    reference: Optional[str]
+
+
+def normalize_header(value: str) -> str:
+    """'Nº Operación' -> 'n_operacion'"""
+    folded = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub("_", folded.lower()).strip("_")
+
+
+def normalize_reference(value: Optional[str]) -> Optional[str]:
+    """Referencia comparable: mayúsculas, solo alfanuméricos, sin ceros a la izquierda"""
+    if not value:
+        return None
+    reference = _REFERENCE_CHARS.sub("", value.upper()).lstrip("0")
+    return reference or None
+
+
+def amount_to_cents(amount: Decimal) -> int:
+    """Clave hash del monto"""
+    return int((amount * 100).to_integral_value())
+
+
+def parse_amount(value: str) -> Decimal:
+    """
+    Monto en formato local o internacional: '1,234.50', '1.234,50', 'S/ 25.00', '(12.00)'
+
+    Raises:
+        ValueError: si el valor no es un monto
+    """
+    text = value.strip()
+    negative = text.startswith("(") and text.endswith(")")
+    text = re.sub(r"[^0-9,.\-]", "", text)
+    if text.startswith("-"):
+        negative, text = True, text[1:]
+
+    if "," in text and "." in text:
+        # El último separador es el decimal
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        integer, _, decimals = text.rpartition(",")
+        text = f"{integer.replace(',', '')}.{decimals}" if len(decimals) <= 2 else text.replace(",", "")
+
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"Monto inválido: '{value}'")
+    return -amount if negative else amount
+
+
+def _parse_date(value: str) -> date:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha inválida: '{value}'")
+
+
+def _parse_time(value: str) -> time:
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(value.upper(), fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Hora inválida: '{value}'")
+
+
+def parse_timestamp(value: str, tz: timezone) -> datetime:
+    """
+    Fecha y hora del extracto ('2024-01-15 10:30', '15/01/2024 10:30:00', ISO 8601)
+
+    Las horas sin zona horaria se interpretan en `tz`.
+    """
+    text = value.strip()
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        date_part, _, time_part = text.partition(" ")
+        parsed = datetime.combine(
+            _parse_date(date_part),
+            _parse_time(time_part.strip()) if time_part.strip() else time.min
+        )
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=tz)
+
+
+class StatementParser:
+    """Convierte las filas del CSV en StatementLine según el encabezado"""
+
+    def __init__(self, header: List[str], tz: timezone):
+        normalized = [normalize_header(column) for column in header]
+        self.tz = tz
+        self.columns: Dict[str, int] = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            index = self._find(normalized, aliases)
+            if index is not None:
+                self.columns[field] = index
+
+        if "amount" not in self.columns or not ({"datetime", "date"} & set(self.columns)):
+            raise StatementFormatError(
+                "El extracto debe tener columnas de fecha y monto "
+                f"(encabezado recibido: {', '.join(header)})"
+            )
+
+    @staticmethod
+    def _find(normalized: List[str], aliases: Tuple[str, ...]) -> Optional[int]:
+        """Columna exacta, o con sufijo ('monto_s' de 'Monto (S/)')"""
+        for alias in aliases:
+            if alias in normalized:
+                return normalized.index(alias)
+        for alias in aliases:
+            for index, column in enumerate(normalized):
+                if column.startswith(f"{alias}_"):
+                    return index
+        return None
+
+    def _value(self, row: List[str], field: str) -> Optional[str]:
+        index = self.columns.get(field)
+        if index is None or index >= len(row):
+            return None
+        return row[index].strip() or None
+
+    def parse(self, line_number: int, row: List[str]) -> StatementLine:
+        """
+        Raises:
+            ValueError: si la fila no tiene fecha o monto válidos
+        """
+        raw_amount = self._value(row, "amount")
+        if raw_amount is None:
+            raise ValueError("Monto vacío")
+
+        raw_datetime = self._value(row, "datetime")
+        if raw_datetime is None:
+            raw_date = self._value(row, "date")
+            if raw_date is None:
+                raise ValueError("Fecha vacía")
+            raw_time = self._value(row, "time")
+            raw_datetime = f"{raw_date} {raw_time}" if raw_time else raw_date
+
+        return StatementLine(
+            line_number=line_number,
+            timestamp=parse_timestamp(raw_datetime, self.tz),
+            amount=parse_amount(raw_amount),
+            reference=self._value(row, "reference"),
+        )
+
+
+async def iter_csv_rows(
+    chunks: AsyncIterator[bytes],
+    encoding: str = "utf-8-sig"
+) -> AsyncIterator[Tuple[int, List[str]]]:
+    """
+    Filas del CSV (número de línea, campos) leyendo el archivo por bloques
+
+    El delimitador (',', ';' o tabulador) se detecta en la primera línea.
+    No admite saltos de línea dentro de campos entre comillas.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    delimiter: Optional[str] = None
+    line_number = 0
+
+    def rows(lines: List[str]):
+        nonlocal delimiter, line_number
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            if delimiter is None:
+                delimiter = max((";", ",", "\t"), key=line.count)
+            yield line_number, next(csv.reader([line], delimiter=delimiter))
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for row in rows([line.rstrip("\r") for line in lines]):
+            yield row
+
+    pending += decoder.decode(b"", final=True)
+    for row in rows([line.rstrip("\r") for line in pending.split("\n")]):
+        yield row
+
+
+def statement_line_key(source: str, line: StatementLine) -> str:
+    """Clave estable de una línea (no depende de su posición en el archivo)"""
+    reference = normalize_reference(line.reference)
+    if reference:
+        return f"{source}:ref:{reference}"
+    return f"{source}:line:{line.timestamp.isoformat()}:{amount_to_cents(line.amount)}"
+
+
+class PaymentMatcher:
+    """
+    Emparejamiento de líneas del extracto con pagos del sistema (hash join)
+
+    Índices construidos una sola vez:
+    - referencia normalizada -> pagos
+    - monto en céntimos -> pagos ordenados por hora (búsqueda binaria en la ventana)
+
+    Primero se empareja por referencia mientras se lee el archivo; las líneas
+    restantes se emparejan al final por monto y hora, en orden cronológico,
+    con el pago libre más cercano en hora dentro de la ventana. Así una línea
+    sin referencia no toma el pago que corresponde a otra línea con referencia.
+    Cada pago se empareja como máximo con una línea.
+    """
+
+    def __init__(self, payments: List[Dict[str, Any]], window: timedelta):
+        self.payments = payments
+        self.window = window.total_seconds()
+        self.used = [False] * len(payments)
+        self.cents = [amount_to_cents(Decimal(str(payment["amount"]))) for payment in payments]
+        self.by_reference: Dict[str, List[int]] = {}
+        by_amount: Dict[int, List[Tuple[float, int]]] = {}
+
+        for index, payment in enumerate(payments):
+            timestamp = datetime.fromisoformat(payment["created_at"].replace("Z", "+00:00")).timestamp()
+            reference = normalize_reference(payment.get("reference"))
+            if reference:
+                self.by_reference.setdefault(reference, []).append(index)
+            by_amount.setdefault(self.cents[index], []).append((timestamp, index))
+
+        # Por monto: horas ordenadas, índices de pago y punteros de salto sobre los
+        # pagos ya usados (siguiente a la derecha / a la izquierda)
+        self.by_amount: Dict[int, Tuple[List[float], List[int], List[int], List[int]]] = {}
+        for cents, entries in by_amount.items():
+            entries.sort()
+            self.by_amount[cents] = (
+                [t for t, _ in entries],
+                [i for _, i in entries],
+                list(range(1, len(entries) + 1)),
+                list(range(-1, len(entries) - 1)),
+            )
+
+    def match_reference(self, line: StatementLine) -> Optional[Dict[str, Any]]:
+        """Pago libre con la misma referencia y monto (lo marca como usado), o None"""
+        reference = normalize_reference(line.reference)
+        if not reference:
+            return None
+        cents = amount_to_cents(line.amount)
+        for index in self.by_reference.get(reference, ()):
+            if not self.used[index] and self.cents[index] == cents:
+                return self._take(index)
+        return None
+
+    def match_amounts(self, lines: List[StatementLine]) -> List[Tuple[StatementLine, Optional[Dict[str, Any]]]]:
+        """Emparejar por monto y ventana de tiempo (en orden cronológico)"""
+        results = []
+        for line in sorted(lines, key=lambda line: line.timestamp):
+            match = None
+            bucket = self.by_amount.get(amount_to_cents(line.amount))
+            if bucket is not None:
+                index = self._nearest_free(*bucket, line.timestamp.timestamp())
+                if index is not None:
+                    match = self._take(index)
+            results.append((line, match))
+        return results
+
+    def _nearest_free(
+        self,
+        timestamps: List[float],
+        indexes: List[int],
+        right_skip: List[int],
+        left_skip: List[int],
+        target: float,
+    ) -> Optional[int]:
+        """
+        Índice del pago libre con menor |Δt| respecto de target dentro de la ventana, o None
+
+        La búsqueda no sale de la ventana y salta los pagos ya usados con punteros
+        que se comprimen al recorrerlos, así un mismo pago usado no se vuelve a
+        recorrer línea tras línea (montos frecuentes).
+        """
+        start = bisect_left(timestamps, target)
+        right = self._skip_used(timestamps, indexes, right_skip, start, target)
+        left = self._skip_used(timestamps, indexes, left_skip, start - 1, target)
+
+        best = None
+        if 0 <= left and target - timestamps[left] <= self.window:
+            best = left
+        if right < len(timestamps) and timestamps[right] - target <= self.window:
+            if best is None or timestamps[right] - target < target - timestamps[left]:
+                best = right
+        return None if best is None else indexes[best]
+
+    def _skip_used(
+        self, timestamps: List[float], indexes: List[int], skip: List[int], position: int, target: float
+    ) -> int:
+        """Primera posición libre desde position en la dirección de skip (o la primera fuera de la ventana)"""
+        end = position
+        while 0 <= end < len(indexes) and abs(timestamps[end] - target) <= self.window and self.used[indexes[end]]:
+            end = skip[end]
+        while position != end:
+            skip[position], position = end, skip[position]
+        return end
+
+    def _take(self, index: int) -> Dict[str, Any]:
+        self.used[index] = True
+        return self.payments[index]
+
+    def unmatched_payments(self) -> List[Dict[str, Any]]:
+        """Pagos del sistema sin línea en el extracto"""
+        return [payment for payment, used in zip(self.payments, self.used) if not used]
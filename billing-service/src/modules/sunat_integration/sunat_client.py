@@ -6,10 +6,11 @@ import base64
 import httpx
 from typing import Dict, Optional, Tuple
 from loguru import logger
-from lxml import etree
 import zipfile
 import io
 
+from src.modules.sunat_integration.xml_generator import _etree
+
 
 class SUNATClient:
     """Cliente para envío de comprobantes a SUNAT via SOAP"""
@@ -165,6 +166,7 @@ class SUNATClient:
 
     def _parse_response(self, response_xml: str) -> Dict:
         """Parsear respuesta SOAP de SUNAT"""
+        etree = _etree()
         try:
             # Parsear XML de respuesta
             root = etree.fromstring(response_xml.encode('utf-8'))
@@ -256,6 +258,7 @@ class SUNATClient:
 
     def _parse_cdr(self, cdr_xml: str) -> Dict:
         """Parsear CDR (Constancia de Recepción)"""
+        etree = _etree()
         try:
             root = etree.fromstring(cdr_xml.encode('utf-8'))
 
@@ -0,0 +1,170 @@
+"""
+UBL 2.1 Pre-flight Validator for SUNAT
+Validación previa del XML UBL (XSD + reglas Schematron) antes de firmar y enviar
+
+Los esquemas se cargan desde schemas/ y se compilan una sola vez por proceso.
+"""
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+from loguru import logger
+
+from src.modules.sunat_integration.xml_generator import _etree
+
+if TYPE_CHECKING:
+    from lxml import etree
+
+SCHEMA_DIR = Path(__file__).parent / "schemas"
+INVOICE_XSD = SCHEMA_DIR / "UBL-Invoice-2.1.xsd"
+INVOICE_RULES = SCHEMA_DIR / "sunat-invoice-rules.sch"
+
+SCH = "{http://purl.oclc.org/dsdl/schematron}"
+
+
+class UBLValidationError(Exception):
+    """El XML UBL no cumple el esquema o las reglas SUNAT"""
+
+    def __init__(self, errors: List[Dict]):
+        self.errors = errors
+        super().__init__(f"XML UBL inválido: {len(errors)} error(es)")
+
+
+class SchematronRules:
+    """
+    Subconjunto de ISO Schematron (ns, pattern, rule, let, assert) compilado a XPath.
+
+    Evita la transformación XSLT completa de isoschematron: cada contexto,
+    variable y test se compila una sola vez con etree.XPath.
+
+    Un pattern de una sola regla sin variables (p. ej. las reglas por línea) se
+    compila a un XPath por assert, "(contexto)[not(test)]", que devuelve solo
+    los nodos que fallan: una evaluación por documento en lugar de una por nodo.
+    """
+
+    def __init__(self, path: Path):
+        etree = _etree()
+        doc = etree.parse(str(path))
+        namespaces = {ns.get("prefix"): ns.get("uri") for ns in doc.iterfind(f"{SCH}ns")}
+
+        # (reglas por nodo, asserts filtrados): uno de los dos por pattern
+        self.patterns = []
+        for pattern in doc.iterfind(f"{SCH}pattern"):
+            rules = list(pattern.iterfind(f"{SCH}rule"))
+            if len(rules) == 1 and rules[0].find(f"{SCH}let") is None:
+                context = rules[0].get("context")
+                failing = [
+                    (
+                        check.get("id"),
+                        etree.XPath(f"({context})[not({check.get('test')})]", namespaces=namespaces),
+                        " ".join((check.text or "").split()),
+                    )
+                    for check in rules[0].iterfind(f"{SCH}assert")
+                ]
+                self.patterns.append((None, failing))
+                continue
+
+            compiled = []
+            for rule in rules:
+                lets = [
+                    (let.get("name"), etree.XPath(let.get("value"), namespaces=namespaces))
+                    for let in rule.iterfind(f"{SCH}let")
+                ]
+                asserts = [
+                    (
+                        check.get("id"),
+                        etree.XPath(f"boolean({check.get('test')})", namespaces=namespaces),
+                        " ".join((check.text or "").split()),
+                    )
+                    for check in rule.iterfind(f"{SCH}assert")
+                ]
+                compiled.append((etree.XPath(rule.get("context"), namespaces=namespaces), lets, asserts))
+            self.patterns.append((compiled, None))
+
+    def validate(self, root: "etree._Element") -> List[Dict]:
+        """Evaluar las reglas; retorna los asserts fallidos"""
+        tree = root.getroottree()
+        errors: List[Dict] = []
+
+        def fail(rule_id: str, node, message: str) -> None:
+            errors.append({
+                "source": "schematron",
+                "rule": rule_id,
+                "path": tree.getpath(node),
+                "message": message,
+            })
+
+        for rules, failing in self.patterns:
+            if failing is not None:
+                for rule_id, find_failing, message in failing:
+                    for node in find_failing(root):
+                        fail(rule_id, node, message)
+                continue
+
+            # En un pattern, cada nodo lo procesa solo la primera regla que lo selecciona
+            fired = set()
+            for context, lets, asserts in rules:
+                for node in context(root):
+                    if node in fired:
+                        continue
+                    fired.add(node)
+
+                    variables = {}
+                    for name, expr in lets:
+                        variables[name] = expr(node, **variables)
+
+                    for rule_id, test, message in asserts:
+                        if not test(node, **variables):
+                            fail(rule_id, node, message)
+
+        return errors
+
+
+class UBLValidator:
+    """Validador UBL 2.1 con XSD y Schematron precompilados"""
+
+    _schema: Optional["etree.XMLSchema"] = None
+    _rules: Optional[SchematronRules] = None
+
+    @classmethod
+    def load(cls) -> None:
+        """Compilar XSD y Schematron (solo la primera vez)"""
+        if cls._schema is None:
+            etree = _etree()
+            cls._schema = etree.XMLSchema(etree.parse(str(INVOICE_XSD)))
+            logger.info(f"Esquema UBL compilado desde {INVOICE_XSD.name}")
+        if cls._rules is None:
+            cls._rules = SchematronRules(INVOICE_RULES)
+            logger.info(f"Reglas SUNAT compiladas desde {INVOICE_RULES.name}")
+
+    @classmethod
+    def validate(cls, root: "etree._Element") -> List[Dict]:
+        """
+        Validar un comprobante UBL
+
+        Args:
+            root: Elemento raíz <Invoice> (sin firmar)
+
+        Returns:
+            Lista de errores (vacía si el comprobante es válido)
+        """
+        cls.load()
+
+        if not cls._schema.validate(root):
+            # Las reglas de negocio asumen una estructura válida
+            return [
+                {
+                    "source": "xsd",
+                    "line": entry.line,
+                    "path": entry.path,
+                    "message": entry.message,
+                }
+                for entry in cls._schema.error_log
+            ]
+
+        return cls._rules.validate(root)
+
+    @classmethod
+    def assert_valid(cls, root: "etree._Element") -> None:
+        """Validar y lanzar UBLValidationError si hay errores"""
+        errors = cls.validate(root)
+        if errors:
+            raise UBLValidationError(errors)
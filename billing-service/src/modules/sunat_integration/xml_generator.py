@@ -4,10 +4,23 @@ Generador de XML según estándar UBL 2.1 de SUNAT
 """
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional
-from lxml import etree
+from typing import TYPE_CHECKING, Dict, List, Optional
 from loguru import logger
 
+if TYPE_CHECKING:
+    from lxml import etree
+
+_lxml_etree = None
+
+
+def _etree():
+    """lxml.etree, importado una sola vez en el primer uso (el motor de plantillas arranca sin lxml)"""
+    global _lxml_etree
+    if _lxml_etree is None:
+        from lxml import etree
+        _lxml_etree = etree
+    return _lxml_etree
+
 
 class UBLXMLGenerator:
     """Generador de XML UBL 2.1 para comprobantes electrónicos"""
@@ -75,11 +88,50 @@ class UBLXMLGenerator:
         Returns:
             XML como string
         """
+        root = self._build_invoice_root(invoice_data, company_data, client_data, items)
+        xml_string = self.serialize(root)
+
+        logger.info(f"XML generado exitosamente: {len(xml_string)} bytes")
+        return xml_string
+
+    def serialize(self, root: "etree._Element") -> str:
+        """Convertir el árbol a string XML (pretty_print, con declaración)"""
+        return _etree().tostring(
+            root,
+            pretty_print=True,
+            xml_declaration=True,
+            encoding="UTF-8",
+        ).decode("utf-8")
+
+    def generate_invoice_tree(
+        self,
+        invoice_data: Dict,
+        company_data: Dict,
+        client_data: Dict,
+        items: List[Dict],
+    ) -> "etree._Element":
+        """
+        Generar el comprobante como árbol lxml listo para firmar
+
+        El árbol se construye directamente (sin serializar y volver a parsear);
+        la firma y el envío a SUNAT usan la serialización de este mismo árbol.
+        """
+        return self._build_invoice_root(invoice_data, company_data, client_data, items)
+
+    def _build_invoice_root(
+        self,
+        invoice_data: Dict,
+        company_data: Dict,
+        client_data: Dict,
+        items: List[Dict],
+    ) -> "etree._Element":
+        """Construir el elemento raíz <Invoice> con todo el contenido del comprobante"""
+        etree = _etree()
         logger.info(f"Generando XML UBL 2.1 para {invoice_data.get('serie')}-{invoice_data.get('numero')}")
 
         # Crear elemento raíz <Invoice>
         root = etree.Element(
-            "Invoice",
+            f"{{{self.NAMESPACES[None]}}}Invoice",
             nsmap=self.NAMESPACES,
         )
         root.set("{http://www.w3.org/2001/XMLSchema-instance}schemaLocation",
@@ -136,19 +188,11 @@ class UBLXMLGenerator:
         for idx, item in enumerate(items, start=1):
             self._add_invoice_line(root, idx, item, moneda)
 
-        # Convertir a string XML
-        xml_string = etree.tostring(
-            root,
-            pretty_print=True,
-            xml_declaration=True,
-            encoding="UTF-8",
-        ).decode("utf-8")
-
-        logger.info(f"XML generado exitosamente: {len(xml_string)} bytes")
-        return xml_string
+        return root
 
     def _add_ubl_extensions(self, parent):
         """Añadir UBLExtensions (para firma digital)"""
+        etree = _etree()
         ext = etree.SubElement(parent, "{urn:oasis:names:specification:ubl:schema:xsd:CommonExtensionComponents-2}UBLExtensions")
         ext_elem = etree.SubElement(ext, "{urn:oasis:names:specification:ubl:schema:xsd:CommonExtensionComponents-2}UBLExtension")
         ext_content = etree.SubElement(ext_elem, "{urn:oasis:names:specification:ubl:schema:xsd:CommonExtensionComponents-2}ExtensionContent")
@@ -157,6 +201,7 @@ class UBLXMLGenerator:
 
     def _add_signature_placeholder(self, parent, company_data: Dict):
         """Añadir placeholder para firma digital"""
+        etree = _etree()
         nsmap_cac = {"cac": "urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2"}
         nsmap_cbc = {"cbc": "urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2"}
 
@@ -188,6 +233,7 @@ class UBLXMLGenerator:
 
     def _add_supplier_party(self, parent, company_data: Dict):
         """Añadir datos del emisor (empresa)"""
+        etree = _etree()
         supplier = etree.SubElement(parent, self._qname("cac", "AccountingSupplierParty"))
         party = etree.SubElement(supplier, self._qname("cac", "Party"))
 
@@ -340,6 +386,7 @@ class UBLXMLGenerator:
 
     def _create_element(self, parent, tag: str):
         """Crear elemento hijo con namespace"""
+        etree = _etree()
         if ":" in tag:
             prefix, localname = tag.split(":", 1)
             full_tag = self._qname(prefix, localname)
@@ -349,6 +396,7 @@ class UBLXMLGenerator:
 
     def _add_element(self, parent, tag: str, text: str, **attribs):
         """Crear elemento con texto y atributos"""
+        etree = _etree()
         if ":" in tag:
             prefix, localname = tag.split(":", 1)
             full_tag = self._qname(prefix, localname)
@@ -0,0 +1,307 @@
+"""
+XML UBL 2.1 Template Generator for SUNAT
+Generador de XML UBL 2.1 a partir de plantillas precompiladas.
+
+Produce exactamente los mismos bytes que UBLXMLGenerator (pretty_print de lxml)
+sin construir el árbol elemento por elemento.
+"""
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+from loguru import logger
+
+from src.modules.sunat_integration.xml_generator import UBLXMLGenerator
+
+
+# Caracteres que XML 1.0 no admite (lxml los rechaza con ValueError)
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+
+def _check_xml_chars(value: str) -> None:
+    """Rechazar caracteres de control no permitidos en XML, igual que lxml"""
+    if _XML_ILLEGAL.search(value):
+        raise ValueError(
+            "All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters"
+        )
+
+
+def _text(value: str) -> str:
+    """Escapar texto de elemento igual que lxml"""
+    _check_xml_chars(value)
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace("\r", "&#13;")
+    )
+
+
+def _attr(value: str) -> str:
+    """Escapar valor de atributo igual que lxml"""
+    _check_xml_chars(value)
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("\n", "&#10;")
+        .replace("\r", "&#13;")
+        .replace("\t", "&#9;")
+    )
+
+
+def _leaf(indent: str, tag: str, value: Optional[str], **attribs) -> str:
+    """Renderizar elemento hoja (equivale a UBLXMLGenerator._add_element)"""
+    attrs = "".join(f' {key}="{_attr(val)}"' for key, val in attribs.items())
+    if value is None:
+        return f"{indent}<{tag}{attrs}/>\n"
+    return f"{indent}<{tag}{attrs}>{_text(value)}</{tag}>\n"
+
+
+# Cabecera raíz: declaración XML + <Invoice> con todos los namespaces
+_ROOT_OPEN = (
+    "<?xml version='1.0' encoding='UTF-8'?>\n<Invoice"
+    + "".join(
+        f' xmlns="{uri}"' if prefix is None else f' xmlns:{prefix}="{uri}"'
+        for prefix, uri in UBLXMLGenerator.NAMESPACES.items()
+    )
+    + ' xsi:schemaLocation="urn:oasis:names:specification:ubl:schema:xsd:Invoice-2">\n'
+    "  <ext:UBLExtensions>\n"
+    "    <ext:UBLExtension>\n"
+    "      <ext:ExtensionContent/>\n"
+    "    </ext:UBLExtension>\n"
+    "  </ext:UBLExtensions>\n"
+    "  <cbc:UBLVersionID>2.1</cbc:UBLVersionID>\n"
+    "  <cbc:CustomizationID>2.0</cbc:CustomizationID>\n"
+)
+
+_ROOT_CLOSE = "</Invoice>\n"
+
+# Bloques estáticos del TaxScheme (IGV)
+_TAX_SCHEME_HEADER = (
+    "        <cac:TaxScheme>\n"
+    "          <cbc:ID>1000</cbc:ID>\n"
+    "          <cbc:Name>IGV</cbc:Name>\n"
+    "          <cbc:TaxTypeCode>VAT</cbc:TaxTypeCode>\n"
+    "        </cac:TaxScheme>\n"
+)
+
+_TAX_SCHEME_LINE = (
+    "          <cac:TaxScheme>\n"
+    "            <cbc:ID>1000</cbc:ID>\n"
+    "            <cbc:Name>IGV</cbc:Name>\n"
+    "            <cbc:TaxTypeCode>VAT</cbc:TaxTypeCode>\n"
+    "          </cac:TaxScheme>\n"
+)
+
+# Plantilla de <cac:InvoiceLine>; los valores se insertan ya escapados
+_INVOICE_LINE = (
+    "  <cac:InvoiceLine>\n"
+    "    <cbc:ID>{line_id}</cbc:ID>\n"
+    '    <cbc:InvoicedQuantity unitCode="{unit_code}">{cantidad}</cbc:InvoicedQuantity>\n'
+    '    <cbc:LineExtensionAmount currencyID="{moneda}">{valor_venta}</cbc:LineExtensionAmount>\n'
+    "    <cac:PricingReference>\n"
+    "      <cac:AlternativeConditionPrice>\n"
+    '        <cbc:PriceAmount currencyID="{moneda}">{precio_unitario}</cbc:PriceAmount>\n'
+    "        <cbc:PriceTypeCode>01</cbc:PriceTypeCode>\n"
+    "      </cac:AlternativeConditionPrice>\n"
+    "    </cac:PricingReference>\n"
+    "    <cac:TaxTotal>\n"
+    '      <cbc:TaxAmount currencyID="{moneda}">{igv_linea}</cbc:TaxAmount>\n'
+    "      <cac:TaxSubtotal>\n"
+    '        <cbc:TaxableAmount currencyID="{moneda}">{valor_venta}</cbc:TaxableAmount>\n'
+    '        <cbc:TaxAmount currencyID="{moneda}">{igv_linea}</cbc:TaxAmount>\n'
+    "        <cac:TaxCategory>\n"
+    "          <cbc:Percent>18.00</cbc:Percent>\n"
+    "          <cbc:TaxExemptionReasonCode>10</cbc:TaxExemptionReasonCode>\n"
+    + _TAX_SCHEME_LINE
+    + "        </cac:TaxCategory>\n"
+    "      </cac:TaxSubtotal>\n"
+    "    </cac:TaxTotal>\n"
+    "    <cac:Item>\n"
+    "{descripcion}"
+    "      <cac:SellersItemIdentification>\n"
+    "{codigo}"
+    "      </cac:SellersItemIdentification>\n"
+    "    </cac:Item>\n"
+    "    <cac:Price>\n"
+    '      <cbc:PriceAmount currencyID="{moneda}">{valor_unitario}</cbc:PriceAmount>\n'
+    "    </cac:Price>\n"
+    "  </cac:InvoiceLine>\n"
+)
+
+
+class UBLTemplateXMLGenerator(UBLXMLGenerator):
+    """
+    Generador de XML UBL 2.1 basado en plantillas.
+
+    Misma interfaz y salida byte a byte que UBLXMLGenerator, pero concatena
+    fragmentos precompilados en lugar de crear un elemento lxml por nodo.
+    """
+
+    def generate_invoice(
+        self,
+        invoice_data: Dict,
+        company_data: Dict,
+        client_data: Dict,
+        items: List[Dict],
+    ) -> str:
+        """
+        Generar XML de Factura o Boleta (UBL 2.1) desde plantillas
+
+        Returns:
+            XML como string (idéntico al de UBLXMLGenerator)
+        """
+        logger.info(f"Generando XML UBL 2.1 (plantilla) para {invoice_data.get('serie')}-{invoice_data.get('numero')}")
+
+        parts = [_ROOT_OPEN]
+
+        serie = invoice_data.get("serie", "F001")
+        numero = str(invoice_data.get("numero", 1)).zfill(8)
+        parts.append(_leaf("  ", "cbc:ID", f"{serie}-{numero}"))
+
+        fecha_emision = invoice_data.get("fecha_emision", datetime.now())
+        if isinstance(fecha_emision, str):
+            fecha_emision = datetime.fromisoformat(fecha_emision.replace("Z", "+00:00"))
+        parts.append(_leaf("  ", "cbc:IssueDate", fecha_emision.strftime("%Y-%m-%d")))
+        parts.append(_leaf("  ", "cbc:IssueTime", fecha_emision.strftime("%H:%M:%S")))
+
+        tipo_comprobante = invoice_data.get("tipo_comprobante", "01")
+        parts.append(_leaf("  ", "cbc:InvoiceTypeCode", tipo_comprobante, listID="0101"))
+
+        moneda = invoice_data.get("moneda", "PEN")
+        parts.append(_leaf("  ", "cbc:DocumentCurrencyCode", moneda))
+
+        self._render_signature(parts, company_data)
+        self._render_supplier_party(parts, company_data)
+        self._render_customer_party(parts, client_data)
+        self._render_tax_total(parts, invoice_data)
+        self._render_legal_monetary_total(parts, invoice_data)
+
+        moneda_attr = _attr(moneda)
+        for idx, item in enumerate(items, start=1):
+            parts.append(self._render_invoice_line(idx, item, moneda_attr))
+
+        parts.append(_ROOT_CLOSE)
+        xml_string = "".join(parts)
+
+        logger.info(f"XML generado exitosamente: {len(xml_string)} bytes")
+        return xml_string
+
+    def _render_signature(self, parts: List[str], company_data: Dict):
+        """Renderizar placeholder de firma digital"""
+        ruc = company_data.get("ruc", "")
+        parts.append("  <cac:Signature>\n")
+        parts.append(_leaf("    ", "cbc:ID", ruc))
+        parts.append("    <cac:SignatoryParty>\n      <cac:PartyIdentification>\n")
+        parts.append(_leaf("        ", "cbc:ID", ruc))
+        parts.append("      </cac:PartyIdentification>\n      <cac:PartyName>\n")
+        parts.append(_leaf("        ", "cbc:Name", company_data.get("razon_social", "")))
+        parts.append(
+            "      </cac:PartyName>\n"
+            "    </cac:SignatoryParty>\n"
+            "    <cac:DigitalSignatureAttachment>\n"
+            "      <cac:ExternalReference>\n"
+        )
+        parts.append(_leaf("        ", "cbc:URI", f"#{ruc}"))
+        parts.append(
+            "      </cac:ExternalReference>\n"
+            "    </cac:DigitalSignatureAttachment>\n"
+            "  </cac:Signature>\n"
+        )
+
+    def _render_supplier_party(self, parts: List[str], company_data: Dict):
+        """Renderizar datos del emisor (empresa)"""
+        parts.append(
+            "  <cac:AccountingSupplierParty>\n"
+            "    <cac:Party>\n"
+            "      <cac:PartyIdentification>\n"
+        )
+        parts.append(_leaf("        ", "cbc:ID", company_data.get("ruc", ""), schemeID="6"))
+        parts.append("      </cac:PartyIdentification>\n      <cac:PartyName>\n")
+        parts.append(_leaf("        ", "cbc:Name", company_data.get("nombre_comercial", "")))
+        parts.append("      </cac:PartyName>\n      <cac:PostalAddress>\n")
+        parts.append(_leaf("        ", "cbc:StreetName", company_data.get("direccion", "")))
+        parts.append(_leaf("        ", "cbc:CityName", company_data.get("ciudad", "LIMA")))
+        parts.append(_leaf("        ", "cbc:CountrySubentity", company_data.get("departamento", "LIMA")))
+        parts.append(_leaf("        ", "cbc:District", company_data.get("distrito", "LIMA")))
+        parts.append(
+            "        <cac:Country>\n"
+            "          <cbc:IdentificationCode>PE</cbc:IdentificationCode>\n"
+            "        </cac:Country>\n"
+            "      </cac:PostalAddress>\n"
+            "      <cac:PartyLegalEntity>\n"
+        )
+        parts.append(_leaf("        ", "cbc:RegistrationName", company_data.get("razon_social", "")))
+        parts.append(
+            "      </cac:PartyLegalEntity>\n"
+            "    </cac:Party>\n"
+            "  </cac:AccountingSupplierParty>\n"
+        )
+
+    def _render_customer_party(self, parts: List[str], client_data: Dict):
+        """Renderizar datos del cliente"""
+        tipo_doc = client_data.get("tipo_documento", "6")
+        nombre_cliente = client_data.get("razon_social") or client_data.get("nombres_completos", "")
+        parts.append(
+            "  <cac:AccountingCustomerParty>\n"
+            "    <cac:Party>\n"
+            "      <cac:PartyIdentification>\n"
+        )
+        parts.append(_leaf("        ", "cbc:ID", client_data.get("numero_documento", ""), schemeID=tipo_doc))
+        parts.append("      </cac:PartyIdentification>\n      <cac:PartyLegalEntity>\n")
+        parts.append(_leaf("        ", "cbc:RegistrationName", nombre_cliente))
+        parts.append(
+            "      </cac:PartyLegalEntity>\n"
+            "    </cac:Party>\n"
+            "  </cac:AccountingCustomerParty>\n"
+        )
+
+    def _render_tax_total(self, parts: List[str], invoice_data: Dict):
+        """Renderizar totales de impuestos (IGV)"""
+        moneda = invoice_data.get("moneda", "PEN")
+        igv_total = invoice_data.get("igv", Decimal("0.00"))
+        base_imponible = invoice_data.get("subtotal", Decimal("0.00"))
+        parts.append("  <cac:TaxTotal>\n")
+        parts.append(_leaf("    ", "cbc:TaxAmount", f"{igv_total:.2f}", currencyID=moneda))
+        parts.append("    <cac:TaxSubtotal>\n")
+        parts.append(_leaf("      ", "cbc:TaxableAmount", f"{base_imponible:.2f}", currencyID=moneda))
+        parts.append(_leaf("      ", "cbc:TaxAmount", f"{igv_total:.2f}", currencyID=moneda))
+        parts.append(
+            "      <cac:TaxCategory>\n"
+            "        <cbc:ID>S</cbc:ID>\n"
+            + _TAX_SCHEME_HEADER
+            + "      </cac:TaxCategory>\n"
+            "    </cac:TaxSubtotal>\n"
+            "  </cac:TaxTotal>\n"
+        )
+
+    def _render_legal_monetary_total(self, parts: List[str], invoice_data: Dict):
+        """Renderizar totales monetarios"""
+        moneda = invoice_data.get("moneda", "PEN")
+        subtotal = invoice_data.get("subtotal", Decimal("0.00"))
+        total = invoice_data.get("total", Decimal("0.00"))
+        parts.append("  <cac:LegalMonetaryTotal>\n")
+        parts.append(_leaf("    ", "cbc:LineExtensionAmount", f"{subtotal:.2f}", currencyID=moneda))
+        parts.append(_leaf("    ", "cbc:TaxInclusiveAmount", f"{total:.2f}", currencyID=moneda))
+        parts.append(_leaf("    ", "cbc:PayableAmount", f"{total:.2f}", currencyID=moneda))
+        parts.append("  </cac:LegalMonetaryTotal>\n")
+
+    def _render_invoice_line(self, line_id: int, item: Dict, moneda_attr: str) -> str:
+        """Renderizar línea de item/servicio (moneda ya escapada)"""
+        cantidad = item.get("cantidad", 1)
+        valor_unitario = float(item.get("valor_unitario", 0))
+        valor_venta = valor_unitario * cantidad
+        return _INVOICE_LINE.format(
+            line_id=line_id,
+            unit_code=_attr(item.get("unidad_medida", "NIU")),
+            cantidad=_text(str(cantidad)),
+            moneda=moneda_attr,
+            valor_venta=f"{valor_venta:.2f}",
+            precio_unitario=f"{float(item.get('precio_unitario', 0)):.2f}",
+            igv_linea=f"{float(item.get('igv', 0)):.2f}",
+            descripcion=_leaf("      ", "cbc:Description", item.get("descripcion", "")),
+            codigo=_leaf("        ", "cbc:ID", item.get("codigo", "")),
+            valor_unitario=f"{item.get('valor_unitario', 0):.2f}",
+        )
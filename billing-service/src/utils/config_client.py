@@ -0,0 +1,228 @@
+"""
+Configuración de configuration-service en memoria del proceso
+
+- ConfigClient.snapshot() entrega la última configuración conocida sin E/S
+  (empresa emisora, tasa de IGV, parámetros y sedes)
+- Una tarea en segundo plano la mantiene al día con long-poll sobre
+  GET /api/v1/configuration/snapshot (ETag "<versión>" + If-None-Match): la
+  petición queda abierta hasta que la configuración cambia o vence
+  CONFIG_LONG_POLL_SECONDS, y sin cambios responde 304 sin cuerpo
+- La última configuración recibida se guarda en CONFIG_SNAPSHOT_FILE; si
+  configuration-service no responde se sigue usando esa (o, sin ninguna, los
+  valores de las variables de entorno)
+"""
+import asyncio
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+import httpx
+from loguru import logger
+
+from src.core.config import settings
+from src.utils.service_clients import get_client
+
+
+class ConfigSnapshot(NamedTuple):
+    """Configuración inmutable con los valores que usa la facturación ya convertidos"""
+    version: Optional[int]
+    company_name: str
+    company_trade_name: str
+    company_address: str
+    igv_rate: Decimal
+    settings: Dict[str, str]
+    locations: Dict[int, Dict[str, Any]]
+    source: str  # env | file | service
+
+
+def _decimal_setting(values: Dict[str, str], key: str, default: Any) -> Decimal:
+    try:
+        return Decimal(str(values.get(key, default)))
+    except InvalidOperation:
+        logger.warning(f"Valor inválido para '{key}' en configuration-service: {values.get(key)!r}")
+        return Decimal(str(default))
+
+
+def _igv_rate(values: Dict[str, str]) -> Decimal:
+    """Tasa de IGV como fracción (0.18); un porcentaje (18) u otro valor fuera de (0, 1) se descarta"""
+    rate = _decimal_setting(values, "igv_rate", settings.igv_rate)
+    if not (rate.is_finite() and Decimal(0) < rate < Decimal(1)):
+        logger.warning(
+            f"igv_rate fuera de rango en configuration-service: {values.get('igv_rate')!r} "
+            f"(se espera una fracción, ej. 0.18); se usa IGV_RATE={settings.igv_rate}"
+        )
+        return Decimal(str(settings.igv_rate))
+    return rate
+
+
+def build_snapshot(payload: Optional[Dict[str, Any]], source: str) -> ConfigSnapshot:
+    """
+    ConfigSnapshot a partir de la respuesta de /configuration/snapshot
+
+    Lo que configuration-service no define se toma de las variables de entorno
+    (COMPANY_NAME, COMPANY_TRADE_NAME, COMPANY_ADDRESS, IGV_RATE).
+    """
+    payload = payload or {}
+    company = payload.get("company") or {}
+    values = payload.get("settings") or {}
+    return ConfigSnapshot(
+        version=payload.get("version"),
+        company_name=company.get("business_name") or settings.company_name,
+        company_trade_name=values.get("company_trade_name") or settings.company_trade_name,
+        company_address=company.get("address") or settings.company_address,
+        igv_rate=_igv_rate(values),
+        settings=dict(values),
+        locations={location["id"]: location for location in payload.get("locations") or []},
+        source=source,
+    )
+
+
+class ConfigClient:
+    """
+    Snapshot de configuración compartido por el proceso
+
+    snapshot() solo lee un atributo de clase; el reemplazo lo hace la tarea de
+    refresco con una asignación, así que nunca se observa un estado a medias.
+    """
+
+    _snapshot: ConfigSnapshot = build_snapshot(None, "env")
+    _task: Optional[asyncio.Task] = None
+    _refreshed_at = 0.0
+    _refreshes = 0
+    _not_modified = 0
+    _failures = 0
+
+    @classmethod
+    def snapshot(cls) -> ConfigSnapshot:
+        """Última configuración conocida (sin E/S)"""
+        return cls._snapshot
+
+    @classmethod
+    async def refresh(cls, wait: float = 0) -> bool:
+        """
+        Pedir la configuración si cambió respecto de la versión actual
+
+        Args:
+            wait: segundos que configuration-service puede esperar un cambio (long-poll)
+
+        Returns:
+            True si se recibió una versión nueva
+
+        Raises:
+            httpx.HTTPError: si configuration-service no responde correctamente
+        """
+        headers = {}
+        if cls._snapshot.version is not None:
+            headers["If-None-Match"] = f'"{cls._snapshot.version}"'
+        response = await get_client(settings.configuration_service_url).get(
+            "/api/v1/configuration/snapshot",
+            params={"wait": wait} if wait and headers else None,
+            headers=headers,
+            timeout=wait + settings.upstream_timeout_seconds,
+        )
+        cls._refreshed_at = time.time()
+        if response.status_code == 304:
+            cls._not_modified += 1
+            if cls._snapshot.source != "service":
+                # La copia del archivo coincide con la versión vigente
+                cls._snapshot = cls._snapshot._replace(source="service")
+            return False
+        response.raise_for_status()
+
+        payload = response.json()
+        cls._snapshot = build_snapshot(payload, "service")
+        cls._refreshes += 1
+        await asyncio.to_thread(cls._save, payload)
+        logger.info(f"Configuración actualizada a la versión {cls._snapshot.version}")
+        return True
+
+    @classmethod
+    async def start(cls) -> None:
+        """
+        Cargar la última configuración guardada e iniciar el long-poll (startup)
+
+        Con una versión guardada el arranque no espera a configuration-service:
+        el primer long-poll envía esa versión y recibe la actual de inmediato si
+        cambió. Sin archivo se pide la configuración antes de terminar el arranque.
+        """
+        payload = await asyncio.to_thread(cls._load)
+        if payload is not None:
+            cls._snapshot = build_snapshot(payload, "file")
+        if cls._snapshot.version is None:
+            try:
+                await cls.refresh()
+            except httpx.HTTPError as e:
+                cls._failures += 1
+                logger.warning(
+                    f"configuration-service no responde, se usa la configuración '{cls._snapshot.source}' "
+                    f"(versión {cls._snapshot.version}): {e}"
+                )
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Detener el long-poll (shutdown)"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            try:
+                if cls._snapshot.version is None:
+                    # Sin versión no hay long-poll posible: pedirla de nuevo tras la espera
+                    await asyncio.sleep(settings.config_retry_seconds)
+                await cls.refresh(wait=settings.config_long_poll_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                cls._failures += 1
+                logger.error(f"No se pudo refrescar la configuración (se mantiene la versión {cls._snapshot.version}): {e}")
+                await asyncio.sleep(settings.config_retry_seconds)
+
+    @classmethod
+    def _load(cls) -> Optional[Dict[str, Any]]:
+        path = Path(settings.config_snapshot_file) if settings.config_snapshot_file else None
+        if path is None or not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo leer {path}: {e}")
+            return None
+
+    @classmethod
+    def _save(cls, payload: Dict[str, Any]) -> None:
+        """Guardar la configuración recibida (escritura atómica: archivo temporal + os.replace)"""
+        if not settings.config_snapshot_file:
+            return
+        path = Path(settings.config_snapshot_file)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar la configuración en {path}: {e}")
+
+    @classmethod
+    def metrics(cls) -> Dict[str, Any]:
+        """Versión, origen y estado del refresco"""
+        return {
+            "version": cls._snapshot.version,
+            "source": cls._snapshot.source,
+            "refreshes": cls._refreshes,
+            "not_modified": cls._not_modified,
+            "failures": cls._failures,
+            "seconds_since_refresh": round(time.time() - cls._refreshed_at, 3) if cls._refreshed_at else None,
+            "long_poll_seconds": settings.config_long_poll_seconds,
+        }
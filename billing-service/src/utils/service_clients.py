@@ -0,0 +1,351 @@
+"""
+Clientes HTTP hacia otros microservicios (order-service, patient-service, configuration-service)
+
+- Un httpx.AsyncClient compartido por servicio (reutiliza conexiones keep-alive)
+- Caché en memoria con TTL de la identidad de facturación del paciente
+"""
+import asyncio
+import time
+from datetime import date
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
+from loguru import logger
+
+from src.core.config import settings
+
+# Campos del paciente que usa la facturación (comprobante y correo)
+PATIENT_IDENTITY_FIELDS = (
+    "id", "document_type", "document_number",
+    "first_name", "last_name", "business_name",
+    "address", "email",
+)
+
+# Máximo de IDs por llamada a POST /api/v1/patients/batch
+PATIENT_BATCH_SIZE = 500
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def get_client(base_url: str) -> httpx.AsyncClient:
+    """Cliente compartido para un servicio (se crea en el primer uso)"""
+    client = _clients.get(base_url)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=settings.upstream_timeout_seconds,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+        _clients[base_url] = client
+    return client
+
+
+async def close_clients() -> None:
+    """Cerrar los clientes compartidos (shutdown)"""
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+
+
+class PatientIdentityCache:
+    """
+    Caché TTL de la identidad de facturación por patient_id.
+
+    Las consultas concurrentes del mismo paciente comparten una sola petición
+    a patient-service. patient-service invalida la entrada al actualizar o
+    desactivar un paciente; el TTL acota cualquier invalidación perdida.
+    """
+
+    _entries: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+    _inflight: Dict[int, asyncio.Task] = {}
+    _versions: Dict[int, int] = {}
+
+    @classmethod
+    def get_cached(cls, patient_id: int) -> Optional[Dict[str, Any]]:
+        """Retorna la identidad si está en caché y vigente"""
+        entry = cls._entries.get(patient_id)
+        if entry is None:
+            return None
+        expires_at, identity = entry
+        if expires_at < time.monotonic():
+            cls._entries.pop(patient_id, None)
+            return None
+        return identity
+
+    @classmethod
+    def put(cls, patient_id: int, patient_data: Dict[str, Any], version: Optional[int] = None) -> Dict[str, Any]:
+        """Guardar la proyección de facturación (no se guarda si hubo invalidación desde `version`)"""
+        identity = {field: patient_data.get(field) for field in PATIENT_IDENTITY_FIELDS}
+        stale = version is not None and version != cls._versions.get(patient_id, 0)
+        if settings.patient_cache_ttl_seconds > 0 and not stale:
+            if len(cls._entries) >= settings.patient_cache_max_entries:
+                cls._evict()
+            cls._entries[patient_id] = (time.monotonic() + settings.patient_cache_ttl_seconds, identity)
+        return identity
+
+    @classmethod
+    def invalidate(cls, patient_id: int) -> bool:
+        """Eliminar un paciente de la caché; retorna True si estaba"""
+        # Una consulta en curso ya no puede guardar datos anteriores a la invalidación
+        cls._versions[patient_id] = cls._versions.get(patient_id, 0) + 1
+        cls._inflight.pop(patient_id, None)
+        return cls._entries.pop(patient_id, None) is not None
+
+    @classmethod
+    def clear(cls) -> None:
+        """Vaciar la caché completa"""
+        for patient_id in list(cls._entries) + list(cls._inflight):
+            cls.invalidate(patient_id)
+
+    @classmethod
+    def _evict(cls) -> None:
+        """Quitar vencidos; si aún está lleno, el 10% más antiguo"""
+        now = time.monotonic()
+        for patient_id in [pid for pid, (expires_at, _) in cls._entries.items() if expires_at < now]:
+            del cls._entries[patient_id]
+        overflow = len(cls._entries) - settings.patient_cache_max_entries + 1
+        if overflow > 0:
+            oldest = sorted(cls._entries, key=lambda pid: cls._entries[pid][0])
+            for patient_id in oldest[:max(overflow, settings.patient_cache_max_entries // 10)]:
+                del cls._entries[patient_id]
+
+    @classmethod
+    async def get(cls, patient_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Identidad de facturación del paciente (caché o patient-service)
+
+        Returns:
+            Diccionario con PATIENT_IDENTITY_FIELDS, o None si el paciente no existe
+
+        Raises:
+            httpx.HTTPError: si patient-service no responde correctamente
+        """
+        identity = cls.get_cached(patient_id)
+        if identity is not None:
+            return identity
+
+        task = cls._inflight.get(patient_id)
+        if task is None:
+            task = asyncio.create_task(cls._load(patient_id))
+            cls._inflight[patient_id] = task
+            task.add_done_callback(lambda done: cls._finish(patient_id, done))
+        # shield: cancelar a un solicitante no cancela la consulta compartida
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def get_many(cls, patient_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Identidades de varios pacientes: las vigentes en caché y el resto en una
+        sola llamada a POST /api/v1/patients/batch (hasta PATIENT_BATCH_SIZE IDs)
+
+        Returns:
+            {patient_id: identidad | None (no existe)}
+
+        Raises:
+            httpx.HTTPError: si patient-service no responde correctamente
+        """
+        identities: Dict[int, Optional[Dict[str, Any]]] = {}
+        missing = []
+        for patient_id in dict.fromkeys(patient_ids):
+            identity = cls.get_cached(patient_id)
+            if identity is not None:
+                identities[patient_id] = identity
+            else:
+                missing.append(patient_id)
+
+        if not missing:
+            return identities
+
+        versions = {patient_id: cls._versions.get(patient_id, 0) for patient_id in missing}
+        response = await get_client(settings.patient_service_url).post(
+            "/api/v1/patients/batch", json={"ids": missing}
+        )
+        response.raise_for_status()
+        for patient in response.json()["patients"]:
+            identities[patient["id"]] = cls.put(patient["id"], patient, versions.get(patient["id"]))
+        for patient_id in missing:
+            identities.setdefault(patient_id, None)
+        return identities
+
+    @classmethod
+    async def _load(cls, patient_id: int) -> Optional[Dict[str, Any]]:
+        version = cls._versions.get(patient_id, 0)
+        response = await get_client(settings.patient_service_url).get(f"/api/v1/patients/{patient_id}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return cls.put(patient_id, response.json(), version)
+
+    @classmethod
+    def _finish(cls, patient_id: int, task: asyncio.Task) -> None:
+        if cls._inflight.get(patient_id) is task:
+            del cls._inflight[patient_id]
+        if not task.cancelled():
+            task.exception()  # evita el aviso si todos los solicitantes se cancelaron
+
+
+async def fetch_order(order_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Orden completa desde order-service
+
+    Returns:
+        JSON de la orden, o None si no existe
+
+    Raises:
+        httpx.HTTPError: si order-service no responde correctamente
+    """
+    response = await get_client(settings.order_service_url).get(f"/api/v1/orders/{order_id}")
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_active_locations() -> List[Dict[str, Any]]:
+    """
+    Sedes activas desde configuration-service
+
+    Raises:
+        httpx.HTTPError: si configuration-service no responde correctamente
+    """
+    response = await get_client(settings.configuration_service_url).get(
+        "/api/v1/configuration/locations", params={"active_only": "true"}
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def enqueue_notification(notification: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Encolar una notificación en configuration-service (POST /api/v1/notifications)
+
+    Returns:
+        La notificación encolada (id y estado)
+
+    Raises:
+        httpx.HTTPError: si configuration-service no responde correctamente
+    """
+    response = await get_client(settings.configuration_service_url).post(
+        "/api/v1/notifications", json=notification
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_daily_order_totals(location_id: int, day: date) -> Dict[str, Any]:
+    """
+    Totales de órdenes y pagos por método de una sede y día (una consulta en order-service)
+
+    Raises:
+        httpx.HTTPError: si order-service no responde correctamente
+    """
+    response = await get_client(settings.order_service_url).get(
+        "/api/v1/orders/daily-totals",
+        params={"location_id": location_id, "date": day.isoformat()},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_location_payments(
+    location_id: int,
+    day: date,
+    payment_methods: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Pagos de una sede y día desde order-service (una sola consulta), ordenados por hora
+
+    El día es el día local con STATEMENT_UTC_OFFSET_HOURS, el mismo con el que se
+    asignan las líneas del extracto.
+
+    Raises:
+        httpx.HTTPError: si order-service no responde correctamente
+    """
+    params: List[Tuple[str, Any]] = [
+        ("location_id", location_id),
+        ("date", day.isoformat()),
+        ("utc_offset_hours", settings.statement_utc_offset_hours),
+    ]
+    params += [("payment_method", method) for method in payment_methods or ()]
+    response = await get_client(settings.order_service_url).get("/api/v1/orders/payments", params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_billable_orders(
+    location_id: int,
+    date_from: date,
+    date_to: date,
+    batch_size: int = 500
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Órdenes pagadas (con items) de una sede y rango de fechas, en lotes
+
+    Recorre /api/v1/orders/billable por cursor (after_id) hasta agotar el rango.
+
+    Raises:
+        httpx.HTTPError: si order-service no responde correctamente
+    """
+    client = get_client(settings.order_service_url)
+    after_id = 0
+    while True:
+        response = await client.get(
+            "/api/v1/orders/billable",
+            params={
+                "location_id": location_id,
+                "date_from": date_from.isoformat(),
+                "date_to": date_to.isoformat(),
+                "after_id": after_id,
+                "limit": batch_size,
+            },
+        )
+        response.raise_for_status()
+        orders = response.json()
+        if orders:
+            yield orders
+        if len(orders) < batch_size:
+            return
+        after_id = orders[-1]["id"]
+
+
+async def fetch_patient_identity(patient_id: int) -> Optional[Dict[str, Any]]:
+    """Identidad de facturación del paciente (ver PatientIdentityCache.get)"""
+    return await PatientIdentityCache.get(patient_id)
+
+
+async def fetch_patient_identities(
+    patient_ids: Iterable[int],
+    concurrency: int = 4
+) -> Dict[int, Union[Dict[str, Any], None, Exception]]:
+    """
+    Identidades de varios pacientes (caché + una llamada por lote de
+    PATIENT_BATCH_SIZE IDs, con a lo sumo `concurrency` lotes en paralelo)
+
+    Returns:
+        {patient_id: identidad | None (no existe) | excepción de la consulta}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def load(chunk: List[int]) -> Dict[int, Union[Dict[str, Any], None, Exception]]:
+        async with semaphore:
+            try:
+                return await PatientIdentityCache.get_many(chunk)
+            except httpx.HTTPError as e:
+                return {patient_id: PatientIdentityCache.get_cached(patient_id) or e for patient_id in chunk}
+
+    unique_ids = list(dict.fromkeys(patient_ids))
+    chunks = [unique_ids[i:i + PATIENT_BATCH_SIZE] for i in range(0, len(unique_ids), PATIENT_BATCH_SIZE)]
+    results: Dict[int, Union[Dict[str, Any], None, Exception]] = {}
+    for chunk_result in await asyncio.gather(*(load(chunk) for chunk in chunks)):
+        results.update(chunk_result)
+    return results
+
+
+async def get_patient_email(patient_id: int) -> Optional[str]:
+    """Email del paciente para el envío del comprobante; None si no se puede obtener"""
+    try:
+        identity = await PatientIdentityCache.get(patient_id)
+    except httpx.HTTPError as e:
+        logger.warning(f"No se pudo obtener el email del paciente {patient_id}: {e}")
+        return None
+    return identity.get("email") if identity else None
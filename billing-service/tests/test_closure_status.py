@@ -0,0 +1,43 @@
+"""
+Transiciones de estado de cierres diarios (reabrir y cerrar)
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.modules.reconciliation.models import ClosureStatus
+from src.modules.reconciliation.repository import DailyClosureRepository
+from src.modules.reconciliation.schemas import DailyClosureReopen
+from src.modules.reconciliation.service import ReconciliationService
+
+
+@pytest.fixture
+def closure(monkeypatch):
+    """Cierre en memoria; get_by_id y update no tocan la base de datos"""
+    closure = SimpleNamespace(status=ClosureStatus.PENDING)
+
+    async def get_by_id(db, closure_id):
+        return closure
+
+    async def update(db, updated):
+        return updated
+
+    monkeypatch.setattr(DailyClosureRepository, "get_by_id", get_by_id)
+    monkeypatch.setattr(DailyClosureRepository, "update", update)
+    return closure
+
+
+def test_pending_closure_cannot_be_reopened(closure):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(ReconciliationService.reopen_closure(None, 1, DailyClosureReopen(reason="Corrección del total del día")))
+    assert error.value.status_code == 400
+    assert closure.status == ClosureStatus.PENDING
+
+
+def test_pending_closure_cannot_be_closed(closure):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(ReconciliationService.close_daily_closure(None, 1))
+    assert error.value.status_code == 400
+    assert closure.status == ClosureStatus.PENDING
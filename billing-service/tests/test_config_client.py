@@ -0,0 +1,20 @@
+"""
+Snapshot de configuration-service (build_snapshot)
+"""
+from decimal import Decimal
+
+import pytest
+
+from src.core.config import settings
+from src.utils.config_client import build_snapshot
+
+
+def test_igv_rate_fraction_is_used():
+    snapshot = build_snapshot({"settings": {"igv_rate": "0.10"}}, "service")
+    assert snapshot.igv_rate == Decimal("0.10")
+
+
+@pytest.mark.parametrize("value", ["18", "1", "0", "-0.18", "NaN", "dieciocho"])
+def test_igv_rate_out_of_range_falls_back_to_env(value):
+    snapshot = build_snapshot({"settings": {"igv_rate": value}}, "service")
+    assert snapshot.igv_rate == Decimal(str(settings.igv_rate))
@@ -0,0 +1,112 @@
+"""
+Asignación de serie y correlativo (InvoiceSeriesRepository)
+
+Requiere la base de datos de billing-service (DATABASE_URL); se omite sin
+conexión. Cada prueba usa una serie y una sede propias y las elimina al final.
+"""
+import asyncio
+import random
+import string
+
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.core.config import settings
+from src.modules.billing.models import InvoiceSeries, InvoiceType
+from src.modules.billing.repository import InvoiceSeriesRepository
+
+LOCATION_ID = 990_001
+
+
+@pytest.fixture
+def series():
+    """Serie de boletas propia de LOCATION_ID; retorna (session factory, serie)"""
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    serie = "B" + "".join(random.choices(string.ascii_uppercase, k=3))
+
+    async def setup() -> bool:
+        try:
+            async with factory() as db:
+                await db.execute(text("SELECT 1 FROM invoice_series LIMIT 1"))
+                db.add(InvoiceSeries(
+                    invoice_type=InvoiceType.BOLETA, serie=serie, location_id=LOCATION_ID,
+                    next_value=1, is_default=True, is_active=True,
+                ))
+                await db.commit()
+            return True
+        except Exception:
+            return False
+
+    async def teardown():
+        async with factory() as db:
+            await db.execute(delete(InvoiceSeries).where(InvoiceSeries.location_id == LOCATION_ID))
+            await db.commit()
+
+    if not asyncio.run(setup()):
+        pytest.skip("Base de datos de billing-service no disponible")
+    yield factory, serie
+    asyncio.run(teardown())
+
+
+def next_value(factory, serie: str) -> int:
+    async def run():
+        async with factory() as db:
+            return (await db.execute(select(InvoiceSeries.next_value).where(InvoiceSeries.serie == serie))).scalar_one()
+    return asyncio.run(run())
+
+
+def test_parallel_allocations_are_unique_and_gapless(series):
+    factory, serie = series
+
+    async def allocate(index: int):
+        async with factory() as db:
+            number = await InvoiceSeriesRepository.allocate_number(db, InvoiceType.BOLETA, LOCATION_ID)
+            if index % 5 == 0:
+                await db.rollback()
+                return None
+            await db.commit()
+            return number
+
+    async def run():
+        return await asyncio.gather(*(allocate(i) for i in range(30)))
+
+    committed = [number for number in asyncio.run(run()) if number is not None]
+
+    assert sorted(committed) == [f"{serie}-{value:08d}" for value in range(1, 25)]
+    assert next_value(factory, serie) == 25
+
+
+def test_block_allocation_is_contiguous(series):
+    factory, serie = series
+
+    async def run():
+        async with factory() as db:
+            block = await InvoiceSeriesRepository.allocate_numbers(db, InvoiceType.BOLETA, 3, LOCATION_ID)
+            single = await InvoiceSeriesRepository.allocate_number(db, InvoiceType.BOLETA, LOCATION_ID, serie=serie)
+            await db.commit()
+            return block, single
+
+    block, single = asyncio.run(run())
+
+    assert block == [f"{serie}-00000001", f"{serie}-00000002", f"{serie}-00000003"]
+    assert single == f"{serie}-00000004"
+
+
+def test_serie_is_unique_across_invoice_types(series):
+    factory, serie = series
+
+    async def run():
+        async with factory() as db:
+            db.add(InvoiceSeries(
+                invoice_type=InvoiceType.FACTURA, serie=serie, location_id=LOCATION_ID,
+                next_value=1, is_default=False, is_active=True,
+            ))
+            await db.commit()
+
+    # El número es serie-correlativo: dos secuencias con la misma serie chocarían
+    with pytest.raises(IntegrityError):
+        asyncio.run(run())
@@ -0,0 +1,39 @@
+"""
+Emparejamiento de líneas de extracto con pagos (PaymentMatcher.match_amounts)
+"""
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from src.modules.reconciliation.statement import PaymentMatcher, StatementLine
+
+BASE = datetime(2026, 10, 19, 15, 0, tzinfo=timezone.utc)
+
+
+def payment(payment_id: int, seconds: float, amount: str = "50.00") -> dict:
+    return {"id": payment_id, "amount": amount, "reference": None, "created_at": (BASE + timedelta(seconds=seconds)).isoformat()}
+
+
+def line(number: int, seconds: float, amount: str = "50.00") -> StatementLine:
+    return StatementLine(number, BASE + timedelta(seconds=seconds), Decimal(amount), None)
+
+
+def matched_ids(matcher: PaymentMatcher, lines):
+    return [None if match is None else match["id"] for _, match in matcher.match_amounts(lines)]
+
+
+def test_line_takes_nearest_free_payment_within_window():
+    matcher = PaymentMatcher([payment(1, -240), payment(2, 30), payment(3, 400)], timedelta(minutes=5))
+    assert matched_ids(matcher, [line(1, 0), line(2, 10), line(3, 20)]) == [2, 1, None]
+
+
+def test_used_payments_are_skipped_for_frequent_amounts():
+    payments = [payment(i, i) for i in range(3000)]
+    lines = [line(i, 1500) for i in range(3001)]
+    ids = matched_ids(PaymentMatcher(payments, timedelta(hours=1)), lines)
+    assert sorted(ids[:-1]) == list(range(3000))
+    assert ids[-1] is None
+
+
+def test_payments_outside_the_window_are_not_matched():
+    matcher = PaymentMatcher([payment(1, 0), payment(2, 1000)], timedelta(minutes=5))
+    assert matched_ids(matcher, [line(1, 0), line(2, 0), line(3, 690)]) == [1, None, None]
@@ -0,0 +1,70 @@
+"""
+Envío a SUNAT con correo al paciente (generate_and_send_to_sunat, paso 7)
+"""
+import asyncio
+import io
+import zipfile
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.config import settings
+from src.modules.billing import service as billing_service
+from src.modules.billing.models import InvoiceType
+from src.modules.billing.service import InvoiceService
+
+
+@pytest.fixture
+def sunat_send(monkeypatch):
+    """Flujo de envío sin base de datos ni SUNAT; retorna los correos enviados"""
+    invoice = SimpleNamespace(
+        id=7, patient_id=3, invoice_number="B001-00000007", invoice_type=InvoiceType.BOLETA,
+        customer_name="Paciente", total=Decimal("118.00"), issue_date=None,
+    )
+    sent = []
+
+    async def get_invoice(db, invoice_id):
+        return invoice
+
+    async def send_bill(xml_content, filename):
+        return {"status": "ACCEPTED", "cdr_zip": b"cdr"}
+
+    async def save_cdr(db, invoice, send_result):
+        pass
+
+    async def patient_email(patient_id):
+        return "paciente@example.com"
+
+    async def send_email(invoice, to_email, subject, body, attachments):
+        sent.append((to_email, attachments))
+
+    async def invoice_detail(db, invoice_id):
+        return invoice
+
+    monkeypatch.setattr(settings, "notification_delivery", "service")
+    monkeypatch.setattr(settings, "ubl_preflight_validation", False)
+    monkeypatch.setattr(settings, "sunat_company_ruc", "20000000001")
+    monkeypatch.setattr(billing_service.InvoiceRepository, "get_by_id_with_items", get_invoice)
+    monkeypatch.setattr(billing_service, "build_ubl_invoice_tree", lambda invoice: "<Invoice/>")
+    monkeypatch.setattr(billing_service, "sign_xml_placeholder", lambda xml: b"<Invoice/>")
+    monkeypatch.setattr(billing_service.sunat_ws_client, "send_bill", send_bill)
+    monkeypatch.setattr(billing_service, "save_cdr_files_and_update_invoice", save_cdr)
+    monkeypatch.setattr(billing_service, "get_patient_email", patient_email)
+    monkeypatch.setattr(billing_service, "send_invoice_email", send_email)
+    monkeypatch.setattr(InvoiceService, "get_invoice_by_id", invoice_detail)
+    return sent
+
+
+def test_send_to_sunat_emails_xml_zip_and_cdr(sunat_send):
+    asyncio.run(InvoiceService.generate_and_send_to_sunat(None, 7))
+
+    [(to_email, attachments)] = sunat_send
+    assert to_email == "paciente@example.com"
+    assert [att["filename"] for att in attachments] == [
+        "20000000001-03-B001-00000007.xml",
+        "20000000001-03-B001-00000007.zip",
+        "20000000001-03-B001-00000007_cdr.zip",
+    ]
+    with zipfile.ZipFile(io.BytesIO(attachments[1]["content"])) as zf:
+        assert zf.read("20000000001-03-B001-00000007.xml") == b"<Invoice/>"
@@ -0,0 +1,107 @@
+"""
+Equivalencia de los generadores UBL 2.1 (lxml vs plantillas)
+
+UBLTemplateXMLGenerator debe producir exactamente los mismos bytes que
+UBLXMLGenerator; el árbol para firmar se construye sin re-parsear.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from lxml import etree
+
+from src.modules.sunat_integration.ubl_validator import UBLValidator
+from src.modules.sunat_integration.xml_generator import UBLXMLGenerator
+from src.modules.sunat_integration.xml_template import UBLTemplateXMLGenerator
+
+
+def build_sample(lines: int, description: str = "Hemograma completo #{i} (sangre & orina)"):
+    """Boleta representativa con `lines` items (incluye caracteres que requieren escape)"""
+    company_data = {
+        "ruc": "20000000001",
+        "razon_social": "LABORATORIO CLÍNICO & ASOCIADOS SAC",
+        "nombre_comercial": "LAB <CLÍNICO>",
+        "direccion": "Av. Principal 123",
+        "ciudad": "LIMA",
+        "departamento": "LIMA",
+        "distrito": "LIMA",
+    }
+    client_data = {
+        "tipo_documento": "1",
+        "numero_documento": "12345678",
+        "razon_social": None,
+        "nombres_completos": "José Pérez \"Pepe\"",
+    }
+    items = [
+        {
+            "codigo": f"SERV{i:04d}",
+            "descripcion": description.format(i=i),
+            "cantidad": float(1 + i % 3),
+            "unidad_medida": "NIU",
+            "valor_unitario": 84.7457627118644,
+            "precio_unitario": 100.0,
+            "subtotal": 84.7457627118644 * (1 + i % 3),
+            "igv": 15.254237288135593 * (1 + i % 3),
+            "total": 100.0 * (1 + i % 3),
+        }
+        for i in range(lines)
+    ]
+    invoice_data = {
+        "tipo_comprobante": "03",
+        "serie": "B001",
+        "numero": 123,
+        "fecha_emision": datetime(2024, 1, 15, 10, 30, 0),
+        "moneda": "PEN",
+        "subtotal": Decimal(str(sum(item["subtotal"] for item in items))),
+        "igv": Decimal(str(sum(item["igv"] for item in items))),
+        "total": Decimal(str(sum(item["total"] for item in items))),
+    }
+    return invoice_data, company_data, client_data, items
+
+
+def factura_sample():
+    """Factura a empresa (RUC), con retornos de carro y tabulaciones en el texto"""
+    invoice_data, company_data, client_data, items = build_sample(3, "Perfil lipídico\r\n\tlínea {i} > 'ok'")
+    invoice_data.update(tipo_comprobante="01", serie="F001", fecha_emision="2024-01-15T10:30:00Z")
+    client_data.update(tipo_documento="6", numero_documento="20123456789", razon_social="CLÍNICA <SAN JUAN> S.A.C.")
+    return invoice_data, company_data, client_data, items
+
+
+SAMPLES = {
+    "1-linea": build_sample(1),
+    "50-lineas": build_sample(50),
+    "500-lineas": build_sample(500),
+    "factura": factura_sample(),
+}
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_template_output_is_byte_identical_to_lxml(name):
+    sample = SAMPLES[name]
+    assert UBLTemplateXMLGenerator().generate_invoice(*sample) == UBLXMLGenerator().generate_invoice(*sample)
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_tree_is_built_directly_and_serializes_to_the_same_document(name):
+    sample = SAMPLES[name]
+    tree = UBLTemplateXMLGenerator().generate_invoice_tree(*sample)
+    expected = UBLXMLGenerator().generate_invoice(*sample)
+    assert etree.tostring(tree, pretty_print=True, xml_declaration=True, encoding="UTF-8").decode("utf-8") == expected
+
+
+@pytest.mark.parametrize("name", ["50-lineas", "factura"])
+def test_generated_tree_passes_ubl_validation(name):
+    assert UBLValidator.validate(UBLTemplateXMLGenerator().generate_invoice_tree(*SAMPLES[name])) == []
+
+
+@pytest.mark.parametrize("char", ["\x00", "\x08", "\x0b", "\x1f", "￾"])
+@pytest.mark.parametrize("generator", [UBLXMLGenerator, UBLTemplateXMLGenerator])
+def test_xml_illegal_characters_are_rejected(generator, char):
+    invoice_data, company_data, client_data, items = build_sample(1, "Glucosa" + char)
+    with pytest.raises(ValueError):
+        generator().generate_invoice(invoice_data, company_data, client_data, items)
+
+    invoice_data, company_data, client_data, items = build_sample(1)
+    items[0]["unidad_medida"] = "NIU" + char
+    with pytest.raises(ValueError):
+        generator().generate_invoice(invoice_data, company_data, client_data, items)
@@ -13,7 +13,7 @@ from src.core.config import settings
 from src.core.database import Base
 
 # Import all models from modules
-from src.modules.configuration.models import CompanyInfo, Location, SystemSetting
+from src.modules.configuration.models import CompanyInfo, Location, SystemSetting, ConfigVersion
 from src.modules.notifications.models import NotificationLog, NotificationTemplate
 
 # this is the Alembic Config object
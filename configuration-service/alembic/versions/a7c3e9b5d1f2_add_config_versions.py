@@ -0,0 +1,33 @@
+"""add_config_versions
+
+Revision ID: a7c3e9b5d1f2
+Revises: 9ace90eea1d2
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9b5d1f2'
+down_revision: Union[str, None] = '9ace90eea1d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'config_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO config_versions (id, version) VALUES (1, 1)")
+
+
+def downgrade() -> None:
+    op.drop_table('config_versions')
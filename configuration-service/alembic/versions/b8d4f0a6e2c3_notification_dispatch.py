@@ -0,0 +1,46 @@
+"""notification_dispatch
+
+Revision ID: b8d4f0a6e2c3
+Revises: a7c3e9b5d1f2
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f0a6e2c3'
+down_revision: Union[str, None] = 'a7c3e9b5d1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notification_logs', sa.Column('subject', sa.String(length=255), nullable=True))
+    op.add_column('notification_logs', sa.Column('template_type', sa.Enum('ORDER_CONFIRMATION', 'INVOICE_RECEIPT', name='templatetype', native_enum=False), nullable=True))
+    op.add_column('notification_logs', sa.Column('attachments', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('notification_logs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('notification_logs', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('notification_logs', sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('notification_logs', sa.Column('error', sa.Text(), nullable=True))
+    op.create_index(
+        'ix_notification_logs_dispatch', 'notification_logs', ['id'], unique=False,
+        postgresql_where=sa.text("status IN ('PENDING', 'SENDING')")
+    )
+    op.add_column('notification_templates', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('notification_templates', 'version')
+    op.drop_index('ix_notification_logs_dispatch', table_name='notification_logs')
+    op.drop_column('notification_logs', 'error')
+    op.drop_column('notification_logs', 'sent_at')
+    op.drop_column('notification_logs', 'next_attempt_at')
+    op.drop_column('notification_logs', 'attempts')
+    op.drop_column('notification_logs', 'attachments')
+    op.drop_column('notification_logs', 'template_type')
+    op.drop_column('notification_logs', 'subject')
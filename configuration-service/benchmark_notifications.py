@@ -0,0 +1,188 @@
+"""
+Notification dispatch benchmark for configuration-service
+
+Starts a local SMTP sink (aiosmtpd, `pip install aiosmtpd`), enqueues --count
+emails from a template through POST /api/v1/notifications/batch and lets
+NotificationWorker send them. Reports the enqueue time, the time until all of
+them are SENT, the SMTP connections used and the final statuses. For
+comparison it also sends the same number of emails opening one SMTP
+connection per email (the previous approach in billing-service).
+Recipients starting with bad@ are refused (550) and temp@ are deferred (451),
+so the permanent-failure and retry paths run too.
+
+Usage:
+    python benchmark_notifications.py [--count=1000] [--batch-size=100] [--connections=2]
+                                      [--rate=0] [--latency-ms=0] [--cleanup]
+
+    --rate        emails per second (0 = no limit)
+    --latency-ms  delay the sink adds to EHLO, RCPT and DATA (a remote server)
+    --cleanup     delete the benchmark notifications and exit
+"""
+import asyncio
+import sys
+import time
+from email.message import EmailMessage
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import aiosmtplib
+import httpx
+from sqlalchemy import delete, func, select
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, create_tables
+from src.modules.notifications.models import NotificationLog, NotificationStatus
+
+SINK_HOST = "127.0.0.1"
+SINK_PORT = 8026
+RECIPIENT_DOMAIN = "@bench.labclinico.com"
+
+
+def option(name: str, default):
+    """Value of --name=value, or default"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return type(default)(arg.split("=", 1)[1]) if default is not None else arg.split("=", 1)[1]
+    return default
+
+
+class SinkHandler:
+    """Accepts everything except bad@ (550) and temp@ (451); counts sessions and messages"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.sessions = set()
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await asyncio.sleep(self.latency)
+        if address.startswith("bad@"):
+            return "550 5.1.1 Unknown user"
+        if address.startswith("temp@"):
+            return "451 4.3.0 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        self.sessions.add(id(session))
+        self.messages += 1
+        return "250 OK"
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(delete(NotificationLog).where(NotificationLog.recipient.like(f"%{RECIPIENT_DOMAIN}")))
+        await db.commit()
+    print(f"Deleted {result.rowcount} benchmark notifications")
+
+
+async def per_message_connections(count: int) -> float:
+    """Previous approach: connect, send and quit for every email"""
+    started = time.perf_counter()
+    for i in range(count):
+        message = EmailMessage()
+        message["From"] = "no-reply@labclinico.local"
+        message["To"] = f"legacy{i}{RECIPIENT_DOMAIN}"
+        message["Subject"] = f"Comprobante B001-{i:08d}"
+        message.set_content("Adjunto el comprobante electrónico.")
+        await aiosmtplib.send(message, hostname=SINK_HOST, port=SINK_PORT, start_tls=False)
+    return time.perf_counter() - started
+
+
+async def main():
+    if "--cleanup" in sys.argv:
+        await cleanup()
+        return
+
+    from aiosmtpd.controller import Controller
+
+    count = option("count", 1000)
+    settings.smtp_host, settings.smtp_port = SINK_HOST, SINK_PORT
+    settings.smtp_user = settings.smtp_password = None
+    settings.notification_batch_size = option("batch-size", 100)
+    settings.notification_smtp_connections = option("connections", 2)
+    settings.notification_email_rate_per_second = option("rate", 0.0)
+    settings.notification_retry_seconds = 0.5
+    settings.notification_max_attempts = 2
+    settings.notification_poll_seconds = 0.2
+
+    handler = SinkHandler(option("latency-ms", 0.0) / 1000)
+    controller = Controller(handler, hostname=SINK_HOST, port=SINK_PORT)
+    controller.start()
+    await create_tables()
+
+    from src.main import app
+    from src.modules.notifications.worker import NotificationWorker
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            response = await client.put("/api/v1/notifications/templates/INVOICE_RECEIPT", json={
+                "subject_template": "Comprobante {{ invoice_number }}",
+                "body_template": "Estimado(a) {{ customer_name }}, adjuntamos el comprobante {{ invoice_number }} por S/ {{ total }}.",
+            })
+            response.raise_for_status()
+
+            notifications = [
+                {
+                    "recipient": f"patient{i}{RECIPIENT_DOMAIN}",
+                    "template_type": "INVOICE_RECEIPT",
+                    "context": {"invoice_number": f"B001-{i:08d}", "customer_name": f"Paciente {i}", "total": "118.00"},
+                }
+                for i in range(count)
+            ]
+            notifications += [
+                {"recipient": f"bad{RECIPIENT_DOMAIN}", "subject": "x", "message": "x"},
+                {"recipient": f"temp{RECIPIENT_DOMAIN}", "subject": "x", "message": "x"},
+            ]
+            started = time.perf_counter()
+            for first in range(0, len(notifications), 1000):
+                response = await client.post(
+                    "/api/v1/notifications/batch", json={"notifications": notifications[first:first + 1000]}
+                )
+                response.raise_for_status()
+            enqueue_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await NotificationWorker.start()
+            drain_seconds = None
+            while True:
+                async with AsyncSessionLocal() as db:
+                    counts = dict((await db.execute(
+                        select(NotificationLog.status, func.count())
+                        .where(NotificationLog.recipient.like(f"%{RECIPIENT_DOMAIN}"))
+                        .group_by(NotificationLog.status)
+                    )).all())
+                if drain_seconds is None and counts.get(NotificationStatus.SENT, 0) >= count:
+                    drain_seconds = time.perf_counter() - started
+                if not counts.get(NotificationStatus.PENDING) and not counts.get(NotificationStatus.SENDING):
+                    break
+                await asyncio.sleep(0.02)
+            await NotificationWorker.stop()
+
+            statuses = counts
+        worker_sessions = len(handler.sessions)
+
+        legacy_seconds = await per_message_connections(count)
+    finally:
+        controller.stop()
+
+    print(
+        f"{count} emails (+1 refused, +1 deferred), batch size {settings.notification_batch_size}, "
+        f"{settings.notification_smtp_connections} connection(s), rate {settings.notification_email_rate_per_second or 'unlimited'}/s, "
+        f"sink latency {handler.latency * 1000:.0f} ms"
+    )
+    print(f"enqueue:                    {enqueue_seconds * 1000:.0f} ms")
+    print(f"worker, all sent:           {drain_seconds:.2f} s ({count / drain_seconds:.0f} emails/s, {worker_sessions} SMTP connection(s))")
+    print(f"one connection per email:   {legacy_seconds:.2f} s ({count / legacy_seconds:.0f} emails/s, {count} SMTP connections)")
+    print(f"statuses: { {status.value: n for status, n in statuses.items()} }")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -16,6 +16,8 @@ class Settings(BaseSettings):
     # Database
     database_url: str = Field(..., env="DATABASE_URL")
     db_echo: bool = Field(default=False, env="DB_ECHO")
+    # auto | alembic | create_all | off (ver prepare_schema en src/core/database.py)
+    schema_startup_mode: str = Field(default="auto", env="SCHEMA_STARTUP_MODE")
 
     # Security
     secret_key: str = Field(default="default-secret", env="SECRET_KEY")
@@ -28,6 +30,10 @@ class Settings(BaseSettings):
         env="CORS_ORIGINS"
     )
 
+    # Snapshot de configuración para otros servicios (long-poll sobre la versión)
+    config_version_poll_seconds: float = Field(default=1.0, gt=0, env="CONFIG_VERSION_POLL_SECONDS")
+    config_long_poll_max_seconds: float = Field(default=60.0, ge=0, env="CONFIG_LONG_POLL_MAX_SECONDS")
+
     # Service URLs
     user_service_url: str = Field(default="http://localhost:8001", env="USER_SERVICE_URL")
 
@@ -48,6 +54,18 @@ class Settings(BaseSettings):
     whatsapp_api_url: str = Field(default="", env="WHATSAPP_API_URL")
     whatsapp_business_number: str = Field(default="", env="WHATSAPP_BUSINESS_NUMBER")
 
+    # Worker de notificaciones: lotes, reintentos y límite de envíos por canal (0 = sin límite)
+    notification_worker_enabled: bool = Field(default=True, env="NOTIFICATION_WORKER_ENABLED")
+    notification_batch_size: int = Field(default=100, gt=0, env="NOTIFICATION_BATCH_SIZE")
+    notification_poll_seconds: float = Field(default=2.0, gt=0, env="NOTIFICATION_POLL_SECONDS")
+    notification_lease_seconds: float = Field(default=300.0, gt=0, env="NOTIFICATION_LEASE_SECONDS")
+    notification_max_attempts: int = Field(default=5, gt=0, env="NOTIFICATION_MAX_ATTEMPTS")
+    notification_retry_seconds: float = Field(default=30.0, ge=0, env="NOTIFICATION_RETRY_SECONDS")
+    notification_email_rate_per_second: float = Field(default=10.0, ge=0, env="NOTIFICATION_EMAIL_RATE_PER_SECOND")
+    notification_whatsapp_rate_per_second: float = Field(default=5.0, ge=0, env="NOTIFICATION_WHATSAPP_RATE_PER_SECOND")
+    notification_smtp_connections: int = Field(default=2, gt=0, env="NOTIFICATION_SMTP_CONNECTIONS")
+    notification_smtp_idle_seconds: float = Field(default=60.0, ge=0, env="NOTIFICATION_SMTP_IDLE_SECONDS")
+
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
 
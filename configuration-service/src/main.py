@@ -2,13 +2,16 @@
 Configuration Service Main Application
 FastAPI application for system configuration and notifications
 """
+from shared.startup import StartupTimer  # primero: mide la importación de la aplicación
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 import sys
 
 from src.core.config import settings
-from src.core.database import create_tables
+from src.core.database import prepare_schema
+from src.modules.notifications.worker import NotificationWorker
 
 # Configure logger
 logger.remove()
@@ -49,15 +52,22 @@ async def startup_event():
     logger.info(f"Starting {settings.service_name} on port {settings.port}")
     logger.info(f"Environment: {settings.environment}")
 
-    # Create tables
-    await create_tables()
-    logger.info("Database tables created successfully")
+    # Esquema: una consulta al head de Alembic (create_all solo si hace falta)
+    with StartupTimer.phase("schema"):
+        schema = await prepare_schema()
+    logger.info(f"Database schema: {schema}")
+
+    if settings.notification_worker_enabled:
+        with StartupTimer.phase("notification_worker"):
+            await NotificationWorker.start()
+    logger.info(StartupTimer.finish())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info(f"Shutting down {settings.service_name}")
+    await NotificationWorker.stop()
 
 
 @app.get("/")
@@ -67,6 +77,7 @@ async def root():
         "service": "configuration-service",
         "version": "1.0.0",
         "status": "running",
+        "startup": StartupTimer.report(),
         "modules": ["configuration", "notifications"]
     }
 
@@ -82,5 +93,9 @@ async def health_check():
 
 # Import and include routers
 from src.modules.configuration.router import router as configuration_router
+from src.modules.notifications.router import router as notifications_router
 
 app.include_router(configuration_router)
+app.include_router(notifications_router)
+
+StartupTimer.mark("import")
@@ -1,8 +1,10 @@
 """
 Configuration Models
 """
-from sqlalchemy import String, Boolean, Integer, DateTime, Text, Index
+from sqlalchemy import String, Boolean, Integer, BigInteger, DateTime, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from datetime import datetime
 from typing import Optional
 
 from src.core.database import Base
@@ -25,3 +27,10 @@ class SystemSetting(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     key: Mapped[str] = mapped_column(String(100), unique=True, nullable=False, index=True)
     value: Mapped[str] = mapped_column(Text, nullable=False)
+
+class ConfigVersion(Base):
+    """Versión de la configuración (fila única): sube con cada cambio de empresa, sedes o parámetros"""
+    __tablename__ = "config_versions"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
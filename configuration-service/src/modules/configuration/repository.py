@@ -2,10 +2,11 @@
 Configuration Repository (Data access layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert
 from typing import Optional, List
 
-from src.modules.configuration.models import CompanyInfo, Location, SystemSetting
+from src.modules.configuration.models import CompanyInfo, Location, SystemSetting, ConfigVersion
 from src.modules.configuration.schemas import (
     CompanyInfoCreate, CompanyInfoUpdate,
     LocationCreate, LocationUpdate,
@@ -153,3 +154,29 @@ class SystemSettingRepository:
         result = await db.execute(stmt)
         await db.commit()
         return result.rowcount > 0
+
+
+class ConfigVersionRepository:
+    """Repository for the configuration version counter (single row, id=1)"""
+
+    @staticmethod
+    async def get(db: AsyncSession) -> int:
+        """Current version (0 if nothing was changed yet)"""
+        result = await db.execute(select(ConfigVersion.version).where(ConfigVersion.id == 1))
+        return result.scalar() or 0
+
+    @staticmethod
+    async def bump(db: AsyncSession) -> int:
+        """Increment the version and commit; returns the new version"""
+        stmt = (
+            insert(ConfigVersion)
+            .values(id=1, version=1)
+            .on_conflict_do_update(
+                index_elements=[ConfigVersion.id],
+                set_={"version": ConfigVersion.version + 1, "updated_at": func.now()}
+            )
+            .returning(ConfigVersion.version)
+        )
+        result = await db.execute(stmt)
+        await db.commit()
+        return result.scalar_one()
@@ -1,15 +1,18 @@
 """
 Configuration Router (API endpoints)
 """
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
+from src.core.config import settings
 from src.core.database import get_db
 from src.modules.configuration.service import (
     CompanyInfoService,
     LocationService,
-    SystemSettingService
+    SystemSettingService,
+    ConfigSnapshotService
 )
 from src.modules.configuration.schemas import (
     CompanyInfoCreate, CompanyInfoUpdate, CompanyInfoResponse,
@@ -116,3 +119,43 @@ async def bulk_upsert_settings(data: BulkSystemSettingsUpdate, db: AsyncSession
 async def delete_setting(key: str, db: AsyncSession = Depends(get_db)):
     """Elimina una configuración del sistema"""
     return await SystemSettingService.delete_setting(db, key)
+
+
+# ==================== Snapshot Endpoints ====================
+def _parse_etag(if_none_match: Optional[str]) -> Optional[int]:
+    """Versión contenida en un ETag '"<versión>"' (None si no es válido)"""
+    if not if_none_match:
+        return None
+    try:
+        return int(if_none_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        return None
+
+
+@router.get("/version", summary="Versión actual de la configuración")
+async def get_config_version(db: AsyncSession = Depends(get_db)):
+    """Número que cambia con cada modificación de empresa, sedes o configuraciones"""
+    return {"version": await ConfigSnapshotService.get_version(db)}
+
+
+@router.get("/snapshot", summary="Configuración completa con ETag")
+async def get_config_snapshot(
+    wait: float = Query(0, ge=0, le=settings.config_long_poll_max_seconds),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Empresa, sedes y configuraciones en una sola respuesta, con ETag "<versión>"
+
+    - **If-None-Match**: si coincide con la versión actual responde 304 sin cuerpo
+    - **wait**: segundos que la petición espera un cambio antes de responder 304 (long-poll)
+    """
+    known_version = _parse_etag(if_none_match)
+    if known_version is not None and wait > 0:
+        await ConfigSnapshotService.wait_for_change(known_version, wait)
+
+    version, snapshot = await ConfigSnapshotService.get_snapshot(db)
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if version == known_version:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=snapshot, headers=headers)
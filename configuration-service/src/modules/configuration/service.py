@@ -1,14 +1,19 @@
 """
 Configuration Service (Business logic layer)
 """
+import asyncio
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
 from src.modules.configuration.repository import (
     CompanyInfoRepository,
     LocationRepository,
-    SystemSettingRepository
+    SystemSettingRepository,
+    ConfigVersionRepository
 )
 from src.modules.configuration.schemas import (
     CompanyInfoCreate, CompanyInfoUpdate, CompanyInfoResponse,
@@ -44,6 +49,7 @@ class CompanyInfoService:
             )
 
         company = await CompanyInfoRepository.create(db, data)
+        await ConfigVersionRepository.bump(db)
         return CompanyInfoResponse.model_validate(company)
 
     @staticmethod
@@ -55,6 +61,7 @@ class CompanyInfoService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Información de empresa no encontrada"
             )
+        await ConfigVersionRepository.bump(db)
         return CompanyInfoResponse.model_validate(company)
 
 
@@ -90,6 +97,7 @@ class LocationService:
             )
 
         location = await LocationRepository.create(db, data)
+        await ConfigVersionRepository.bump(db)
         return LocationResponse.model_validate(location)
 
     @staticmethod
@@ -113,6 +121,7 @@ class LocationService:
                 )
 
         location = await LocationRepository.update(db, location_id, data)
+        await ConfigVersionRepository.bump(db)
         return LocationResponse.model_validate(location)
 
     @staticmethod
@@ -132,6 +141,7 @@ class LocationService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al eliminar la sede"
             )
+        await ConfigVersionRepository.bump(db)
 
         return {"message": f"Sede '{existing.name}' eliminada exitosamente"}
 
@@ -168,6 +178,7 @@ class SystemSettingService:
             )
 
         setting = await SystemSettingRepository.create(db, data)
+        await ConfigVersionRepository.bump(db)
         return SystemSettingResponse.model_validate(setting)
 
     @staticmethod
@@ -179,12 +190,14 @@ class SystemSettingService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Configuración con clave '{key}' no encontrada"
             )
+        await ConfigVersionRepository.bump(db)
         return SystemSettingResponse.model_validate(setting)
 
     @staticmethod
     async def upsert_setting(db: AsyncSession, key: str, value: str) -> SystemSettingResponse:
         """Create or update a system setting"""
         setting = await SystemSettingRepository.upsert(db, key, value)
+        await ConfigVersionRepository.bump(db)
         return SystemSettingResponse.model_validate(setting)
 
     @staticmethod
@@ -194,6 +207,7 @@ class SystemSettingService:
         for key, value in data.settings.items():
             setting = await SystemSettingRepository.upsert(db, key, value)
             results.append(SystemSettingResponse.model_validate(setting))
+        await ConfigVersionRepository.bump(db)
         return results
 
     @staticmethod
@@ -213,5 +227,62 @@ class SystemSettingService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error al eliminar la configuración"
             )
+        await ConfigVersionRepository.bump(db)
 
         return {"message": f"Configuración '{key}' eliminada exitosamente"}
+
+
+class ConfigSnapshotService:
+    """
+    Configuración completa (empresa, sedes y parámetros) para los clientes
+    de otros servicios, identificada por la versión de config_versions
+
+    - El snapshot de la versión vigente se arma una vez y se reutiliza
+    - wait_for_change (long-poll) consulta solo la versión, cada
+      CONFIG_VERSION_POLL_SECONDS, con una sesión corta por consulta
+    """
+
+    _cached: Optional[Tuple[int, Dict[str, Any]]] = None
+
+    @classmethod
+    async def get_snapshot(cls, db: AsyncSession) -> Tuple[int, Dict[str, Any]]:
+        """(versión, snapshot) de la configuración actual"""
+        version = await ConfigVersionRepository.get(db)
+        if cls._cached is not None and cls._cached[0] == version:
+            return cls._cached
+
+        company = await CompanyInfoRepository.get(db)
+        locations = await LocationRepository.get_all(db)
+        system_settings = await SystemSettingRepository.get_all(db)
+        snapshot = {
+            "version": version,
+            "company": CompanyInfoResponse.model_validate(company).model_dump() if company else None,
+            "locations": [LocationResponse.model_validate(location).model_dump() for location in locations],
+            "settings": {setting.key: setting.value for setting in system_settings},
+        }
+        # Un cambio durante la lectura deja la versión nueva sin caché (el cliente volverá a pedirla)
+        if await ConfigVersionRepository.get(db) == version:
+            cls._cached = (version, snapshot)
+        return version, snapshot
+
+    @staticmethod
+    async def get_version(db: AsyncSession) -> int:
+        """Versión actual de la configuración"""
+        return await ConfigVersionRepository.get(db)
+
+    @staticmethod
+    async def wait_for_change(known_version: int, wait_seconds: float) -> int:
+        """
+        Esperar hasta wait_seconds a que la versión deje de ser known_version
+
+        Returns:
+            La versión actual (igual a known_version si no hubo cambios)
+        """
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            async with AsyncSessionLocal() as db:
+                version = await ConfigVersionRepository.get(db)
+            remaining = deadline - time.monotonic()
+            if version != known_version or remaining <= 0:
+                return version
+            await asyncio.sleep(min(settings.config_version_poll_seconds, remaining))
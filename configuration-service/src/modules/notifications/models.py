@@ -2,9 +2,11 @@
 Notification Models
 """
 from sqlalchemy import String, Integer, DateTime, Text, Enum as SQLEnum, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 from datetime import datetime
+from typing import Optional, List
 import enum
 
 from src.core.database import Base
@@ -15,6 +17,7 @@ class NotificationType(str, enum.Enum):
 
 class NotificationStatus(str, enum.Enum):
     PENDING = "PENDING"
+    SENDING = "SENDING"  # tomada por un worker hasta next_attempt_at
     SENT = "SENT"
     FAILED = "FAILED"
 
@@ -28,12 +31,30 @@ class NotificationLog(Base):
     notification_type: Mapped[NotificationType] = mapped_column(SQLEnum(NotificationType, native_enum=False), index=True)
     status: Mapped[NotificationStatus] = mapped_column(SQLEnum(NotificationStatus, native_enum=False), default=NotificationStatus.PENDING, index=True)
     recipient: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     message: Mapped[str] = mapped_column(Text, nullable=False)
+    template_type: Mapped[Optional[TemplateType]] = mapped_column(SQLEnum(TemplateType, native_enum=False), nullable=True)
+    # [{filename, content_type, content (base64)}]; se vacía al enviarse
+    attachments: Mapped[Optional[List[dict]]] = mapped_column(JSONB(none_as_null=True), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Cola del worker: pendientes por orden de llegada
+        Index(
+            "ix_notification_logs_dispatch", "id",
+            postgresql_where=status.in_([NotificationStatus.PENDING.value, NotificationStatus.SENDING.value])
+        ),
+    )
+
 class NotificationTemplate(Base):
     __tablename__ = "notification_templates"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     template_type: Mapped[TemplateType] = mapped_column(SQLEnum(TemplateType, native_enum=False), unique=True, index=True)
     subject_template: Mapped[str] = mapped_column(String(255))
     body_template: Mapped[str] = mapped_column(Text)
+    # Sube con cada cambio; las plantillas compiladas en memoria se guardan por versión
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
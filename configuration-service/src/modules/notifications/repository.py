@@ -0,0 +1,154 @@
+"""
+Notification Repository (Data access layer)
+"""
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, and_, or_
+from sqlalchemy.dialects.postgresql import insert
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.modules.notifications.models import (
+    NotificationLog, NotificationTemplate, NotificationType, NotificationStatus, TemplateType
+)
+
+
+class NotificationLogRepository:
+    """Repository for NotificationLog operations"""
+
+    @staticmethod
+    async def create_many(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[NotificationLog]:
+        """Insert notifications in a single statement"""
+        result = await db.scalars(insert(NotificationLog).returning(NotificationLog), rows)
+        notifications = list(result.all())
+        await db.commit()
+        return notifications
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, notification_id: int) -> Optional[NotificationLog]:
+        """Get notification by ID"""
+        result = await db.execute(select(NotificationLog).where(NotificationLog.id == notification_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_list(
+        db: AsyncSession,
+        status: Optional[NotificationStatus] = None,
+        notification_type: Optional[NotificationType] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[NotificationLog]:
+        """Latest notifications first"""
+        query = select(NotificationLog)
+        if status is not None:
+            query = query.where(NotificationLog.status == status)
+        if notification_type is not None:
+            query = query.where(NotificationLog.notification_type == notification_type)
+        result = await db.execute(query.order_by(NotificationLog.id.desc()).offset(offset).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def claim_batch(
+        db: AsyncSession,
+        channels: Iterable[NotificationType],
+        limit: int,
+        lease_seconds: float
+    ) -> List[NotificationLog]:
+        """
+        Mark up to `limit` due notifications as SENDING and return them
+
+        Rows locked by another worker are skipped. A SENDING row whose lease
+        (next_attempt_at) expired belongs to a worker that stopped mid-batch
+        and is claimed again.
+        """
+        now = func.now()
+        due = (
+            select(NotificationLog.id)
+            .where(
+                NotificationLog.notification_type.in_(list(channels)),
+                or_(
+                    and_(
+                        NotificationLog.status == NotificationStatus.PENDING,
+                        or_(NotificationLog.next_attempt_at.is_(None), NotificationLog.next_attempt_at <= now)
+                    ),
+                    and_(NotificationLog.status == NotificationStatus.SENDING, NotificationLog.next_attempt_at <= now)
+                )
+            )
+            .order_by(NotificationLog.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(NotificationLog)
+            .where(NotificationLog.id.in_(due.scalar_subquery()))
+            .values(
+                status=NotificationStatus.SENDING,
+                attempts=NotificationLog.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds)
+            )
+            .returning(NotificationLog)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        notifications = sorted(result.scalars().all(), key=lambda notification: notification.id)
+        await db.commit()
+        return notifications
+
+    @staticmethod
+    async def update_statuses(db: AsyncSession, updates: List[Dict[str, Any]]) -> None:
+        """Bulk UPDATE by primary key (each dict has `id` and the columns to set)"""
+        if updates:
+            await db.execute(update(NotificationLog), updates)
+            await db.commit()
+
+    @staticmethod
+    async def count_by_status(db: AsyncSession) -> Dict[str, int]:
+        """{status: count}"""
+        result = await db.execute(
+            select(NotificationLog.status, func.count()).group_by(NotificationLog.status)
+        )
+        return {status.value: count for status, count in result.all()}
+
+
+class NotificationTemplateRepository:
+    """Repository for NotificationTemplate operations"""
+
+    @staticmethod
+    async def get_all(db: AsyncSession) -> List[NotificationTemplate]:
+        """Get all templates"""
+        result = await db.execute(select(NotificationTemplate).order_by(NotificationTemplate.template_type))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_types(db: AsyncSession, template_types: Iterable[TemplateType]) -> Dict[TemplateType, NotificationTemplate]:
+        """Templates of the given types, by type"""
+        result = await db.execute(
+            select(NotificationTemplate).where(NotificationTemplate.template_type.in_(list(template_types)))
+        )
+        return {template.template_type: template for template in result.scalars().all()}
+
+    @staticmethod
+    async def upsert(
+        db: AsyncSession,
+        template_type: TemplateType,
+        subject_template: str,
+        body_template: str
+    ) -> NotificationTemplate:
+        """Create or replace a template, increasing its version"""
+        stmt = (
+            insert(NotificationTemplate)
+            .values(template_type=template_type, subject_template=subject_template, body_template=body_template, version=1)
+            .on_conflict_do_update(
+                index_elements=[NotificationTemplate.template_type],
+                set_={
+                    "subject_template": subject_template,
+                    "body_template": body_template,
+                    "version": NotificationTemplate.version + 1,
+                }
+            )
+            .returning(NotificationTemplate)
+            .execution_options(populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        template = result.scalar_one()
+        await db.commit()
+        return template
@@ -0,0 +1,71 @@
+"""
+Notifications Router (API endpoints)
+"""
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from src.core.database import get_db
+from src.modules.notifications.models import NotificationType, NotificationStatus, TemplateType
+from src.modules.notifications.service import NotificationService
+from src.modules.notifications.schemas import (
+    NotificationCreate, NotificationBatchCreate, NotificationResponse,
+    NotificationTemplateUpdate, NotificationTemplateResponse
+)
+
+router = APIRouter(prefix="/api/v1/notifications", tags=["Notifications"])
+
+
+# ==================== Queue Endpoints ====================
+@router.post("", response_model=NotificationResponse, status_code=status.HTTP_202_ACCEPTED, summary="Encolar notificación")
+async def enqueue_notification(data: NotificationCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Encola un correo o mensaje de WhatsApp; el worker lo envía en segundo plano
+
+    - **template_type**: usa la plantilla configurada con las variables de **context**
+    - **subject** / **message**: texto a enviar sin plantilla (o si la plantilla no existe)
+    """
+    return await NotificationService.enqueue(db, data)
+
+
+@router.post("/batch", response_model=List[NotificationResponse], status_code=status.HTTP_202_ACCEPTED, summary="Encolar varias notificaciones")
+async def enqueue_notifications(data: NotificationBatchCreate, db: AsyncSession = Depends(get_db)):
+    """Encola hasta 1000 notificaciones en una sola operación"""
+    return await NotificationService.enqueue_many(db, data.notifications)
+
+
+@router.get("", response_model=List[NotificationResponse], summary="Listar notificaciones")
+async def list_notifications(
+    status_filter: Optional[NotificationStatus] = Query(None, alias="status"),
+    notification_type: Optional[NotificationType] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """Notificaciones más recientes primero, con su estado de envío"""
+    return await NotificationService.list_notifications(db, status_filter, notification_type, limit, offset)
+
+
+@router.get("/metrics", summary="Estado de la cola de notificaciones")
+async def get_notification_metrics(db: AsyncSession = Depends(get_db)):
+    """Notificaciones por estado y contadores del worker"""
+    return await NotificationService.get_metrics(db)
+
+
+# ==================== Template Endpoints ====================
+@router.get("/templates", response_model=List[NotificationTemplateResponse], summary="Listar plantillas")
+async def get_templates(db: AsyncSession = Depends(get_db)):
+    """Obtiene las plantillas de notificación configuradas"""
+    return await NotificationService.get_templates(db)
+
+
+@router.put("/templates/{template_type}", response_model=NotificationTemplateResponse, summary="Crear o actualizar plantilla")
+async def update_template(template_type: TemplateType, data: NotificationTemplateUpdate, db: AsyncSession = Depends(get_db)):
+    """Guarda una plantilla Jinja2 (asunto y mensaje); cada cambio sube su versión"""
+    return await NotificationService.update_template(db, template_type, data)
+
+
+@router.get("/{notification_id}", response_model=NotificationResponse, summary="Obtener notificación por ID")
+async def get_notification(notification_id: int, db: AsyncSession = Depends(get_db)):
+    """Obtiene el estado de envío de una notificación"""
+    return await NotificationService.get_notification(db, notification_id)
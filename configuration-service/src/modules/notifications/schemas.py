@@ -0,0 +1,96 @@
+"""
+Notification Schemas (Pydantic models for request/response validation)
+"""
+from pydantic import BaseModel, Field, validator
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import base64
+import binascii
+
+from src.modules.notifications.models import NotificationType, NotificationStatus, TemplateType
+
+
+class NotificationAttachment(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255, description="Nombre del archivo")
+    content_type: str = Field(default="application/octet-stream", pattern=r"^[\w.+-]+/[\w.+-]+$", description="Tipo MIME")
+    content: str = Field(..., min_length=1, description="Contenido en base64")
+
+    @validator('content')
+    def validate_content(cls, v):
+        try:
+            base64.b64decode(v, validate=True)
+        except binascii.Error:
+            raise ValueError('El contenido del adjunto debe estar en base64')
+        return v
+
+
+class NotificationCreate(BaseModel):
+    """
+    Notificación a encolar
+
+    Con template_type el asunto y el mensaje se generan con la plantilla y
+    context; sin plantilla se envían subject y message tal cual.
+    """
+    notification_type: NotificationType = Field(default=NotificationType.EMAIL, description="Canal de envío")
+    recipient: str = Field(..., min_length=3, max_length=255, description="Email o número de WhatsApp")
+    template_type: Optional[TemplateType] = Field(None, description="Plantilla a usar")
+    context: Dict[str, Any] = Field(default_factory=dict, description="Variables de la plantilla")
+    subject: Optional[str] = Field(None, max_length=255, description="Asunto (sin plantilla)")
+    message: Optional[str] = Field(None, min_length=1, description="Mensaje (sin plantilla)")
+    attachments: List[NotificationAttachment] = Field(default_factory=list, description="Adjuntos (solo EMAIL)")
+
+    @validator('recipient')
+    def validate_recipient(cls, v, values):
+        v = v.strip()
+        if values.get('notification_type') == NotificationType.EMAIL and '@' not in v:
+            raise ValueError('El destinatario de un EMAIL debe ser un correo electrónico')
+        if values.get('notification_type') == NotificationType.WHATSAPP and not v.lstrip('+').isdigit():
+            raise ValueError('El destinatario de un WHATSAPP debe ser un número de teléfono')
+        return v
+
+    @validator('message', always=True)
+    def validate_message(cls, v, values):
+        if v is None and values.get('template_type') is None:
+            raise ValueError('Indique template_type o message')
+        return v
+
+    @validator('attachments')
+    def validate_attachments(cls, v, values):
+        if v and values.get('notification_type') != NotificationType.EMAIL:
+            raise ValueError('Solo las notificaciones EMAIL admiten adjuntos')
+        return v
+
+
+class NotificationBatchCreate(BaseModel):
+    notifications: List[NotificationCreate] = Field(..., min_length=1, max_length=1000, description="Notificaciones a encolar")
+
+
+class NotificationResponse(BaseModel):
+    id: int
+    notification_type: NotificationType
+    status: NotificationStatus
+    recipient: str
+    subject: Optional[str] = None
+    template_type: Optional[TemplateType] = None
+    attempts: int
+    next_attempt_at: Optional[datetime] = None
+    sent_at: Optional[datetime] = None
+    error: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationTemplateUpdate(BaseModel):
+    subject_template: str = Field(..., min_length=1, max_length=255, description="Plantilla Jinja2 del asunto")
+    body_template: str = Field(..., min_length=1, description="Plantilla Jinja2 del mensaje")
+
+
+class NotificationTemplateResponse(NotificationTemplateUpdate):
+    id: int
+    template_type: TemplateType
+    version: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,174 @@
+"""
+Notification Service (Business logic layer)
+
+- enqueue / enqueue_many: generan asunto y mensaje (plantilla o texto) y
+  guardan las notificaciones como PENDING en un solo INSERT; el envío lo hace
+  NotificationWorker
+- Las plantillas Jinja2 se compilan una vez por versión (TemplateCache)
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+from jinja2 import StrictUndefined, Template, TemplateError
+from jinja2.sandbox import SandboxedEnvironment
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.modules.notifications.models import (
+    NotificationTemplate, NotificationType, NotificationStatus, TemplateType
+)
+from src.modules.notifications.repository import NotificationLogRepository, NotificationTemplateRepository
+from src.modules.notifications.schemas import (
+    NotificationCreate, NotificationResponse,
+    NotificationTemplateUpdate, NotificationTemplateResponse
+)
+from src.modules.notifications.worker import NotificationWorker
+
+
+class TemplateCache:
+    """
+    Plantillas compiladas por tipo y versión
+
+    Al editar una plantilla su versión sube y la siguiente notificación la
+    vuelve a compilar; mientras tanto cada envío solo la renderiza.
+    """
+
+    _environment = SandboxedEnvironment(undefined=StrictUndefined, autoescape=False, keep_trailing_newline=True)
+    _compiled: Dict[TemplateType, Tuple[int, Template, Template]] = {}
+    compilations = 0
+
+    @classmethod
+    def compile(cls, subject_template: str, body_template: str) -> Tuple[Template, Template]:
+        """
+        Raises:
+            TemplateError: si la plantilla no es válida
+        """
+        cls.compilations += 1
+        return cls._environment.from_string(subject_template), cls._environment.from_string(body_template)
+
+    @classmethod
+    def get(cls, template: NotificationTemplate) -> Tuple[Template, Template]:
+        """(asunto, mensaje) compilados de la versión actual de la plantilla"""
+        cached = cls._compiled.get(template.template_type)
+        if cached is None or cached[0] != template.version:
+            subject, body = cls.compile(template.subject_template, template.body_template)
+            cached = (template.version, subject, body)
+            cls._compiled[template.template_type] = cached
+        return cached[1], cached[2]
+
+    @classmethod
+    def render(cls, template: NotificationTemplate, context: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        (asunto, mensaje) con las variables de context
+
+        Raises:
+            TemplateError: si falta una variable o la plantilla falla
+        """
+        subject, body = cls.get(template)
+        return subject.render(context).strip(), body.render(context)
+
+
+class NotificationService:
+    """Service for notification operations"""
+
+    @staticmethod
+    async def enqueue(db: AsyncSession, data: NotificationCreate) -> NotificationResponse:
+        """Encolar una notificación"""
+        return (await NotificationService.enqueue_many(db, [data]))[0]
+
+    @staticmethod
+    async def enqueue_many(db: AsyncSession, items: List[NotificationCreate]) -> List[NotificationResponse]:
+        """
+        Encolar varias notificaciones (una consulta de plantillas y un INSERT)
+
+        Con template_type se usa la plantilla configurada; si no existe se usan
+        subject y message de la petición.
+        """
+        templates = await NotificationTemplateRepository.get_by_types(
+            db, {item.template_type for item in items if item.template_type is not None}
+        )
+        rows = []
+        for index, item in enumerate(items):
+            subject, message = item.subject, item.message
+            template = templates.get(item.template_type) if item.template_type is not None else None
+            if template is not None:
+                try:
+                    subject, message = TemplateCache.render(template, item.context)
+                except TemplateError as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail=f"Notificación {index}: no se pudo aplicar la plantilla {item.template_type.value}: {e}"
+                    )
+            elif message is None:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Notificación {index}: la plantilla {item.template_type.value} no está configurada y no se envió message"
+                )
+            rows.append({
+                "notification_type": item.notification_type,
+                "status": NotificationStatus.PENDING,
+                "recipient": item.recipient,
+                "subject": subject[:255] if subject else None,
+                "message": message,
+                "template_type": item.template_type,
+                "attachments": [attachment.model_dump() for attachment in item.attachments] or None,
+            })
+
+        notifications = await NotificationLogRepository.create_many(db, rows)
+        NotificationWorker.wake()
+        return [NotificationResponse.model_validate(notification) for notification in notifications]
+
+    @staticmethod
+    async def get_notification(db: AsyncSession, notification_id: int) -> NotificationResponse:
+        """Get notification by ID"""
+        notification = await NotificationLogRepository.get_by_id(db, notification_id)
+        if not notification:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Notificación con ID {notification_id} no encontrada"
+            )
+        return NotificationResponse.model_validate(notification)
+
+    @staticmethod
+    async def list_notifications(
+        db: AsyncSession,
+        status_filter: Optional[NotificationStatus] = None,
+        notification_type: Optional[NotificationType] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[NotificationResponse]:
+        """Latest notifications first"""
+        notifications = await NotificationLogRepository.get_list(db, status_filter, notification_type, limit, offset)
+        return [NotificationResponse.model_validate(notification) for notification in notifications]
+
+    @staticmethod
+    async def get_templates(db: AsyncSession) -> List[NotificationTemplateResponse]:
+        """Get all templates"""
+        templates = await NotificationTemplateRepository.get_all(db)
+        return [NotificationTemplateResponse.model_validate(template) for template in templates]
+
+    @staticmethod
+    async def update_template(
+        db: AsyncSession,
+        template_type: TemplateType,
+        data: NotificationTemplateUpdate
+    ) -> NotificationTemplateResponse:
+        """Crear o reemplazar una plantilla (se valida compilándola antes de guardarla)"""
+        try:
+            TemplateCache.compile(data.subject_template, data.body_template)
+        except TemplateError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Plantilla inválida: {e}"
+            )
+        template = await NotificationTemplateRepository.upsert(
+            db, template_type, data.subject_template, data.body_template
+        )
+        return NotificationTemplateResponse.model_validate(template)
+
+    @staticmethod
+    async def get_metrics(db: AsyncSession) -> Dict[str, Any]:
+        """Notificaciones por estado, estado del worker y compilaciones de plantillas"""
+        return {
+            "by_status": await NotificationLogRepository.count_by_status(db),
+            "worker": NotificationWorker.metrics(),
+            "template_compilations": TemplateCache.compilations,
+        }
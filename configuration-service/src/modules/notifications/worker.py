@@ -0,0 +1,378 @@
+"""
+Notification dispatch worker
+
+- Toma lotes de notificaciones vencidas (PENDING, o SENDING con la reserva
+  vencida) con FOR UPDATE SKIP LOCKED, así varias réplicas no se pisan
+- EMAIL: un pool de NOTIFICATION_SMTP_CONNECTIONS conexiones SMTP que se
+  reutilizan entre envíos y lotes, y se cierran tras
+  NOTIFICATION_SMTP_IDLE_SECONDS sin uso
+- WHATSAPP: cliente HTTP compartido hacia WHATSAPP_API_URL
+- Límite de envíos por segundo por canal (token bucket)
+- Los estados del lote se guardan con un UPDATE masivo por id
+- Errores temporales: reintento con espera exponencial hasta
+  NOTIFICATION_MAX_ATTEMPTS; errores permanentes: FAILED
+- Sin conexión o login SMTP (servidor caído, credenciales incorrectas): la
+  notificación vuelve a PENDING sin consumir intentos
+"""
+import asyncio
+import base64
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Any, Dict, List, Optional
+
+import aiosmtplib
+import httpx
+from loguru import logger
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.modules.notifications.models import NotificationLog, NotificationType, NotificationStatus
+from src.modules.notifications.repository import NotificationLogRepository
+
+SMTP_TIMEOUT_SECONDS = 30
+WHATSAPP_CONCURRENCY = 4
+DEFAULT_FROM_EMAIL = "no-reply@labclinico.local"
+
+
+class PermanentDeliveryError(Exception):
+    """El proveedor rechazó la notificación; reintentar no cambiaría el resultado"""
+
+
+class ChannelUnavailableError(Exception):
+    """
+    No se pudo conectar o autenticar con el servidor (p. ej. 535 por una
+    contraseña incorrecta): el mensaje no llegó a enviarse, así que se
+    reintenta sin consumir intentos
+    """
+
+
+class RateLimiter:
+    """Token bucket: hasta `rate` envíos por segundo, con ráfagas de hasta `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def build_email(notification: NotificationLog) -> EmailMessage:
+    """Mensaje MIME de una notificación EMAIL (adjuntos en base64 en la fila)"""
+    message = EmailMessage()
+    message["From"] = formataddr((settings.smtp_from_name, settings.smtp_from_email or settings.smtp_user or DEFAULT_FROM_EMAIL))
+    message["To"] = notification.recipient
+    message["Subject"] = notification.subject or ""
+    message.set_content(notification.message)
+    for attachment in notification.attachments or ():
+        maintype, _, subtype = attachment.get("content_type", "application/octet-stream").partition("/")
+        message.add_attachment(
+            base64.b64decode(attachment["content"]),
+            maintype=maintype,
+            subtype=subtype or "octet-stream",
+            filename=attachment["filename"]
+        )
+    return message
+
+
+class NotificationWorker:
+    """Envío en segundo plano de las notificaciones encoladas"""
+
+    _task: Optional[asyncio.Task] = None
+    _wake = asyncio.Event()
+    _smtp: Dict[int, aiosmtplib.SMTP] = {}
+    _smtp_used_at = 0.0
+    _http: Optional[httpx.AsyncClient] = None
+    _limiters: Dict[NotificationType, RateLimiter] = {}
+    _counters: Dict[str, int] = {
+        "batches": 0, "sent": 0, "retried": 0, "failed": 0, "smtp_connections": 0,
+    }
+
+    @classmethod
+    def channels(cls) -> List[NotificationType]:
+        """Canales configurados; las notificaciones de los demás quedan PENDING"""
+        channels = []
+        if settings.smtp_host:
+            channels.append(NotificationType.EMAIL)
+        if settings.whatsapp_api_url and settings.whatsapp_api_token:
+            channels.append(NotificationType.WHATSAPP)
+        return channels
+
+    @classmethod
+    def wake(cls) -> None:
+        """Despertar el worker de este proceso (hay notificaciones nuevas)"""
+        cls._wake.set()
+
+    @classmethod
+    def _limiter(cls, channel: NotificationType) -> RateLimiter:
+        limiter = cls._limiters.get(channel)
+        if limiter is None:
+            rate = (
+                settings.notification_email_rate_per_second
+                if channel == NotificationType.EMAIL
+                else settings.notification_whatsapp_rate_per_second
+            )
+            limiter = cls._limiters[channel] = RateLimiter(rate)
+        return limiter
+
+    @classmethod
+    async def dispatch_once(cls) -> int:
+        """
+        Enviar un lote
+
+        Returns:
+            Número de notificaciones procesadas
+        """
+        channels = cls.channels()
+        if not channels:
+            return 0
+        async with AsyncSessionLocal() as db:
+            notifications = await NotificationLogRepository.claim_batch(
+                db, channels, settings.notification_batch_size, settings.notification_lease_seconds
+            )
+        if not notifications:
+            return 0
+
+        emails = [n for n in notifications if n.notification_type == NotificationType.EMAIL]
+        messages = [n for n in notifications if n.notification_type == NotificationType.WHATSAPP]
+        results = await asyncio.gather(cls._send_emails(emails), cls._send_whatsapp(messages))
+
+        updates = [update for channel_updates in results for update in channel_updates]
+        async with AsyncSessionLocal() as db:
+            await NotificationLogRepository.update_statuses(db, updates)
+        cls._counters["batches"] += 1
+        return len(notifications)
+
+    @classmethod
+    def _result(cls, notification: NotificationLog, error: Optional[Exception] = None) -> Dict[str, Any]:
+        """Columnas a guardar según el resultado del envío"""
+        now = datetime.now(timezone.utc)
+        if error is None:
+            cls._counters["sent"] += 1
+            return {
+                "id": notification.id, "status": NotificationStatus.SENT, "sent_at": now,
+                "next_attempt_at": None, "error": None, "attachments": None,
+            }
+        if isinstance(error, ChannelUnavailableError):
+            cls._counters["retried"] += 1
+            return {
+                "id": notification.id, "status": NotificationStatus.PENDING, "sent_at": None,
+                "attempts": notification.attempts - 1,
+                "next_attempt_at": now + timedelta(seconds=settings.notification_retry_seconds),
+                "error": str(error)[:1000],
+            }
+        permanent = isinstance(error, PermanentDeliveryError)
+        if permanent or notification.attempts >= settings.notification_max_attempts:
+            cls._counters["failed"] += 1
+            logger.warning(f"Notificación {notification.id} fallida tras {notification.attempts} intento(s): {error}")
+            return {
+                "id": notification.id, "status": NotificationStatus.FAILED, "sent_at": None,
+                "next_attempt_at": None, "error": str(error)[:1000],
+            }
+        cls._counters["retried"] += 1
+        delay = settings.notification_retry_seconds * 2 ** (notification.attempts - 1)
+        return {
+            "id": notification.id, "status": NotificationStatus.PENDING, "sent_at": None,
+            "next_attempt_at": now + timedelta(seconds=delay), "error": str(error)[:1000],
+        }
+
+    # ==================== EMAIL ====================
+
+    @classmethod
+    async def _smtp_connection(cls, slot: int) -> aiosmtplib.SMTP:
+        """Conexión SMTP abierta de la posición `slot` del pool (la misma mientras siga viva)"""
+        smtp = cls._smtp.get(slot)
+        if smtp is None or not smtp.is_connected:
+            port = settings.smtp_port or 587
+            smtp = aiosmtplib.SMTP(
+                hostname=settings.smtp_host,
+                port=port,
+                username=settings.smtp_user or None,
+                password=settings.smtp_password or None,
+                use_tls=port == 465,
+                timeout=SMTP_TIMEOUT_SECONDS,
+            )
+            try:
+                await smtp.connect()
+            except BaseException:
+                smtp.close()
+                raise
+            cls._smtp[slot] = smtp
+            cls._counters["smtp_connections"] += 1
+        return smtp
+
+    @classmethod
+    async def _close_smtp(cls, slot: Optional[int] = None) -> None:
+        """Cerrar una conexión del pool (o todas)"""
+        for key in [slot] if slot is not None else list(cls._smtp):
+            smtp = cls._smtp.pop(key, None)
+            if smtp is None:
+                continue
+            try:
+                if smtp.is_connected:
+                    await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+    @classmethod
+    async def _deliver_email(cls, slot: int, message: EmailMessage) -> Optional[Exception]:
+        """Enviar por la conexión `slot`; None si se envió, o el error"""
+        for reused in (True, False):
+            try:
+                smtp = await cls._smtp_connection(slot)
+            except (aiosmtplib.SMTPException, OSError) as e:
+                # Conexión o login (incluido 535): problema del servidor o de la configuración, no del mensaje
+                logger.error(f"No se pudo conectar o autenticar con SMTP {settings.smtp_host}: {e}")
+                return ChannelUnavailableError(f"SMTP no disponible: {e}")
+            try:
+                await smtp.send_message(message)
+                cls._smtp_used_at = time.monotonic()
+                return None
+            except aiosmtplib.SMTPServerDisconnected as e:
+                # El servidor cerró la conexión reutilizada: un intento más con una nueva
+                await cls._close_smtp(slot)
+                if not reused:
+                    return e
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                # 4xx: el servidor pide reintentar más tarde
+                temporary = all(refused.code < 500 for refused in e.recipients)
+                return e if temporary else PermanentDeliveryError(str(e))
+            except aiosmtplib.SMTPResponseException as e:
+                return PermanentDeliveryError(str(e)) if e.code >= 500 else e
+            except (aiosmtplib.SMTPException, OSError) as e:
+                # Servidor no disponible: reconectar en el siguiente envío
+                await cls._close_smtp(slot)
+                return e
+
+    @classmethod
+    async def _send_emails(cls, notifications: List[NotificationLog]) -> List[Dict[str, Any]]:
+        """Reparte el lote entre NOTIFICATION_SMTP_CONNECTIONS conexiones; cada una envía en secuencia"""
+        limiter = cls._limiter(NotificationType.EMAIL)
+
+        async def send(slot: int, chunk: List[NotificationLog]) -> List[Dict[str, Any]]:
+            updates = []
+            unavailable: Optional[ChannelUnavailableError] = None
+            for notification in chunk:
+                if unavailable is not None:
+                    # Sin conexión: el resto de la porción se reintenta sin volver a conectar
+                    updates.append(cls._result(notification, unavailable))
+                    continue
+                try:
+                    message = build_email(notification)
+                except (ValueError, KeyError) as e:
+                    updates.append(cls._result(notification, PermanentDeliveryError(f"Mensaje inválido: {e}")))
+                    continue
+                await limiter.acquire()
+                error = await cls._deliver_email(slot, message)
+                if isinstance(error, ChannelUnavailableError):
+                    unavailable = error
+                updates.append(cls._result(notification, error))
+            return updates
+
+        connections = min(settings.notification_smtp_connections, len(notifications))
+        results = await asyncio.gather(*(send(slot, notifications[slot::connections]) for slot in range(connections)))
+        return [update for updates in results for update in updates]
+
+    # ==================== WHATSAPP ====================
+
+    @classmethod
+    async def _send_whatsapp(cls, notifications: List[NotificationLog]) -> List[Dict[str, Any]]:
+        """Envío concurrente (WHATSAPP_CONCURRENCY) dentro del límite por segundo"""
+        if not notifications:
+            return []
+        if cls._http is None:
+            cls._http = httpx.AsyncClient(timeout=SMTP_TIMEOUT_SECONDS)
+        limiter = cls._limiter(NotificationType.WHATSAPP)
+        semaphore = asyncio.Semaphore(WHATSAPP_CONCURRENCY)
+
+        async def send(notification: NotificationLog) -> Dict[str, Any]:
+            async with semaphore:
+                await limiter.acquire()
+                try:
+                    response = await cls._http.post(
+                        settings.whatsapp_api_url,
+                        headers={"Authorization": f"Bearer {settings.whatsapp_api_token}"},
+                        json={
+                            "messaging_product": "whatsapp",
+                            "to": notification.recipient.lstrip("+"),
+                            "type": "text",
+                            "text": {"body": notification.message},
+                        },
+                    )
+                    if 400 <= response.status_code < 500 and response.status_code != 429:
+                        return cls._result(notification, PermanentDeliveryError(f"{response.status_code}: {response.text[:500]}"))
+                    response.raise_for_status()
+                    return cls._result(notification)
+                except httpx.HTTPError as e:
+                    return cls._result(notification, e)
+
+        return list(await asyncio.gather(*(send(notification) for notification in notifications)))
+
+    # ==================== LIFECYCLE ====================
+
+    @classmethod
+    async def start(cls) -> None:
+        """Iniciar el worker (startup)"""
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._run())
+            logger.info(f"Notification worker started (channels: {[c.value for c in cls.channels()]})")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Detener el worker y cerrar las conexiones (shutdown)"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        await cls._close_smtp()
+        if cls._http is not None:
+            await cls._http.aclose()
+            cls._http = None
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            cls._wake.clear()
+            try:
+                processed = await cls.dispatch_once()
+            except Exception as e:
+                logger.error(f"Notification dispatch failed: {e}")
+                processed = 0
+            if processed >= settings.notification_batch_size:
+                continue  # hay más en cola
+
+            if cls._smtp and time.monotonic() - cls._smtp_used_at > settings.notification_smtp_idle_seconds:
+                await cls._close_smtp()
+            try:
+                await asyncio.wait_for(cls._wake.wait(), timeout=settings.notification_poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    @classmethod
+    def metrics(cls) -> Dict[str, Any]:
+        """Contadores del worker de este proceso"""
+        return {
+            **cls._counters,
+            "running": cls._task is not None and not cls._task.done(),
+            "channels": [channel.value for channel in cls.channels()],
+            "smtp_open_connections": sum(1 for smtp in cls._smtp.values() if smtp.is_connected),
+            "batch_size": settings.notification_batch_size,
+        }
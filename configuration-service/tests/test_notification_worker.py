@@ -0,0 +1,218 @@
+"""
+NotificationWorker contra un servidor SMTP local (aiosmtpd)
+
+- Lotes repartidos entre NOTIFICATION_SMTP_CONNECTIONS conexiones reutilizadas
+- 4xx: reintento (PENDING); 5xx: FAILED
+- Sin login SMTP (535): PENDING sin consumir el intento
+- Estados guardados con el UPDATE masivo (requiere la base de datos)
+"""
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from src.core.config import settings
+from src.modules.notifications.models import NotificationStatus, NotificationType
+from src.modules.notifications.worker import NotificationWorker
+
+
+class SinkHandler:
+    """Acepta todo salvo bad@ (550) y temp@ (451); cuenta sesiones y mensajes"""
+
+    def __init__(self):
+        self.sessions = set()
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("bad@"):
+            return "550 5.1.1 Unknown user"
+        if address.startswith("temp@"):
+            return "451 4.3.0 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def only_password(password: str):
+    """Autenticador de aiosmtpd que acepta solo `password`"""
+    def authenticator(server, session, envelope, mechanism, auth_data):
+        return AuthResult(success=getattr(auth_data, "password", b"") == password.encode(), handled=False)
+    return authenticator
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    """Inicia el servidor SMTP y deja el worker sin conexiones ni límites previos"""
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(settings, "smtp_host", "127.0.0.1")
+    monkeypatch.setattr(settings, "smtp_port", controller.port)
+    monkeypatch.setattr(settings, "smtp_user", None)
+    monkeypatch.setattr(settings, "smtp_password", None)
+    monkeypatch.setattr(settings, "notification_smtp_connections", 2)
+    monkeypatch.setattr(settings, "notification_email_rate_per_second", 0)
+    monkeypatch.setattr(NotificationWorker, "_smtp", {})
+    monkeypatch.setattr(NotificationWorker, "_limiters", {})
+    monkeypatch.setattr(NotificationWorker, "_counters", dict.fromkeys(NotificationWorker._counters, 0))
+    yield SimpleNamespace(handler=handler, controller=controller)
+    controller.stop()
+
+
+def email(notification_id: int, recipient: str, attempts: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=notification_id, notification_type=NotificationType.EMAIL, recipient=recipient,
+        subject="Resultados", message="Sus resultados están listos", attachments=None, attempts=attempts,
+    )
+
+
+def send(notifications):
+    """Enviar y cerrar las conexiones en el mismo event loop"""
+    async def run():
+        try:
+            return await NotificationWorker._send_emails(notifications)
+        finally:
+            await NotificationWorker._close_smtp()
+    return asyncio.run(run())
+
+
+def test_batch_is_sent_over_reused_connections(sink):
+    async def run():
+        first = await NotificationWorker._send_emails([email(i, f"p{i}@lab.pe") for i in range(10)])
+        second = await NotificationWorker._send_emails([email(i, f"p{i}@lab.pe") for i in range(10, 16)])
+        await NotificationWorker._close_smtp()
+        return first + second
+
+    updates = asyncio.run(run())
+
+    assert [update["status"] for update in updates] == [NotificationStatus.SENT] * 16
+    assert len(sink.handler.messages) == 16
+    # Dos conexiones para los dos lotes
+    assert NotificationWorker._counters["smtp_connections"] == 2
+    assert len(sink.handler.sessions) == 2
+
+
+def test_temporary_rejection_is_retried_and_permanent_one_fails(sink):
+    updates = {update["id"]: update for update in send([
+        email(1, "temp@lab.pe"), email(2, "bad@lab.pe"), email(3, "ok@lab.pe"),
+    ])}
+
+    assert updates[1]["status"] == NotificationStatus.PENDING
+    assert updates[1]["next_attempt_at"] is not None
+    assert updates[2]["status"] == NotificationStatus.FAILED
+    assert updates[3]["status"] == NotificationStatus.SENT
+    assert sink.handler.messages == ["ok@lab.pe"]
+
+
+def test_temporary_rejection_fails_after_max_attempts(sink, monkeypatch):
+    monkeypatch.setattr(settings, "notification_max_attempts", 3)
+    [update] = send([email(1, "temp@lab.pe", attempts=3)])
+    assert update["status"] == NotificationStatus.FAILED
+
+
+def test_smtp_login_failure_is_retried_without_using_attempts(monkeypatch):
+    handler = SinkHandler()
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=free_port(),
+        authenticator=only_password("correcta"), auth_require_tls=False, auth_required=True,
+    )
+    controller.start()
+    try:
+        monkeypatch.setattr(settings, "smtp_host", "127.0.0.1")
+        monkeypatch.setattr(settings, "smtp_port", controller.port)
+        monkeypatch.setattr(settings, "smtp_user", "laboratorio")
+        monkeypatch.setattr(settings, "smtp_password", "incorrecta")
+        monkeypatch.setattr(settings, "notification_email_rate_per_second", 0)
+        monkeypatch.setattr(NotificationWorker, "_smtp", {})
+        monkeypatch.setattr(NotificationWorker, "_limiters", {})
+
+        updates = send([email(1, "p1@lab.pe", attempts=5), email(2, "p2@lab.pe", attempts=1)])
+
+        assert [update["status"] for update in updates] == [NotificationStatus.PENDING] * 2
+        assert [update["attempts"] for update in updates] == [4, 0]
+        assert "535" in updates[0]["error"]
+        assert handler.messages == []
+
+        monkeypatch.setattr(settings, "smtp_password", "correcta")
+        assert [update["status"] for update in send([email(1, "p1@lab.pe")])] == [NotificationStatus.SENT]
+    finally:
+        controller.stop()
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """Sesiones sin pool (un event loop por prueba); omite la prueba sin base de datos"""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from src.modules.notifications import worker
+
+    engine = create_async_engine(settings.database_url, poolclass=NullPool)
+
+    async def reachable() -> bool:
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1 FROM notification_logs LIMIT 1"))
+            return True
+        except Exception:
+            return False
+
+    if not asyncio.run(reachable()):
+        pytest.skip("Base de datos de configuration-service no disponible")
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(worker, "AsyncSessionLocal", factory)
+    return factory
+
+
+def test_dispatch_saves_statuses_with_bulk_update(sink, session_factory, monkeypatch):
+    from sqlalchemy import delete, select
+
+    from src.modules.notifications.models import NotificationLog
+    from src.modules.notifications.repository import NotificationLogRepository
+
+    monkeypatch.setattr(settings, "whatsapp_api_url", None)
+    recipients = ["ok@test-worker.lab.pe", "temp@test-worker.lab.pe", "bad@test-worker.lab.pe"]
+
+    async def run():
+        async with session_factory() as db:
+            created = await NotificationLogRepository.create_many(db, [
+                {"notification_type": NotificationType.EMAIL, "status": NotificationStatus.PENDING,
+                 "recipient": recipient, "subject": "Prueba", "message": "Mensaje"}
+                for recipient in recipients
+            ])
+        ids = [notification.id for notification in created]
+        try:
+            processed = await NotificationWorker.dispatch_once()
+            await NotificationWorker._close_smtp()
+            async with session_factory() as db:
+                rows = (await db.execute(
+                    select(NotificationLog.recipient, NotificationLog.status, NotificationLog.attempts, NotificationLog.sent_at)
+                    .where(NotificationLog.id.in_(ids))
+                )).all()
+            return processed, {recipient: (status, attempts, sent_at) for recipient, status, attempts, sent_at in rows}
+        finally:
+            async with session_factory() as db:
+                await db.execute(delete(NotificationLog).where(NotificationLog.id.in_(ids)))
+                await db.commit()
+
+    processed, rows = asyncio.run(run())
+
+    assert processed >= 3
+    assert rows["ok@test-worker.lab.pe"][0] == NotificationStatus.SENT
+    assert rows["ok@test-worker.lab.pe"][2] is not None
+    assert rows["temp@test-worker.lab.pe"][:2] == (NotificationStatus.PENDING, 1)
+    assert rows["bad@test-worker.lab.pe"][0] == NotificationStatus.FAILED
@@ -38,6 +38,8 @@ export const ENDPOINTS = {
   // Patients
   PATIENTS: {
     LIST: '/api/v1/patients',
+    SUGGEST: '/api/v1/patients/suggest',
+    BATCH: '/api/v1/patients/batch',
     BY_ID: (id) => `/api/v1/patients/${id}`,
     HISTORY: (id) => `/api/v1/patients/${id}/history`,
     NOTES: (id) => `/api/v1/patients/${id}/notes`,
@@ -116,6 +116,7 @@ const InvoiceFormPage = () => {
     // Preparar datos del comprobante
     const invoiceData = {
       order_id: parseInt(orderId),
+      patient_id: order.patient_id, // billing consulta orden y paciente en paralelo
       document_type: formData.document_type,
       issue_date: formData.issue_date,
       currency: 'PEN',
@@ -5,14 +5,14 @@
 import { useEffect, useState } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import { useOrders, useCatalog } from '../../hooks/useOrders';
-import { usePatients } from '../../hooks/usePatients';
+import patientService from '../../services/patientService';
 import './OrderFormPage.css';
 
 const OrderFormPage = () => {
   const navigate = useNavigate();
   const { loading: ordersLoading, createOrder } = useOrders();
   const { services, loading: catalogLoading, fetchServices } = useCatalog();
-  const { patients, loading: patientsLoading, fetchPatients } = usePatients();
+  const [patientSuggestions, setPatientSuggestions] = useState([]);
 
   // Datos de la orden
   const [patientId, setPatientId] = useState('');
@@ -30,18 +30,30 @@ const OrderFormPage = () => {
 
   useEffect(() => {
     fetchServices();
-    fetchPatients({ page_size: 100 });
   }, []);
 
-  // Filtrar pacientes por búsqueda
-  const filteredPatients = patients.filter((p) => {
-    if (!searchPatient) return true;
-    const search = searchPatient.toLowerCase();
-    const fullName = `${p.first_name} ${p.last_name}`.toLowerCase();
-    const businessName = (p.business_name || '').toLowerCase();
-    const document = p.document_number;
-    return fullName.includes(search) || businessName.includes(search) || document.includes(search);
-  });
+  // Sugerencias de pacientes desde el servidor (con espera entre teclas)
+  useEffect(() => {
+    const query = searchPatient.trim();
+    if (query.length < 2 || patientId) return undefined;
+
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const suggestions = await patientService.suggest(query);
+        if (!cancelled) setPatientSuggestions(suggestions);
+      } catch (err) {
+        console.error('Error al buscar pacientes:', err);
+      }
+    }, 250);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchPatient, patientId]);
+
+  const patientLabel = (patient) => `${patient.name} - ${patient.document_number}`;
 
   // Filtrar servicios por búsqueda
   const filteredServices = services.filter((s) => {
@@ -196,7 +208,7 @@ const OrderFormPage = () => {
   const orderTotal = getOrderTotal();
   const totalPaid = getTotalPayments();
   const balance = orderTotal - totalPaid;
-  const isLoading = ordersLoading || catalogLoading || patientsLoading;
+  const isLoading = ordersLoading || catalogLoading;
 
   return (
     <div className="order-form-page">
@@ -222,11 +234,8 @@ const OrderFormPage = () => {
                 onChange={(e) => {
                   setSearchPatient(e.target.value);
                   // Find the patient by name/document if a full match is entered
-                  const selectedPatient = filteredPatients.find(
-                    (p) =>
-                      (p.document_type === 'RUC'
-                        ? `${p.business_name} - ${p.document_number}`
-                        : `${p.first_name} ${p.last_name} - ${p.document_number}`) === e.target.value
+                  const selectedPatient = patientSuggestions.find(
+                    (p) => patientLabel(p) === e.target.value
                   );
                   if (selectedPatient) {
                     setPatientId(selectedPatient.id.toString());
@@ -239,15 +248,8 @@ const OrderFormPage = () => {
                 required
               />
               <datalist id="patient-options">
-                {filteredPatients.map((patient) => (
-                  <option
-                    key={patient.id}
-                    value={
-                      patient.document_type === 'RUC'
-                        ? `${patient.business_name} - ${patient.document_number}`
-                        : `${patient.first_name} ${patient.last_name} - ${patient.document_number}`
-                    }
-                  />
+                {patientSuggestions.map((patient) => (
+                  <option key={patient.id} value={patientLabel(patient)} />
                 ))}
               </datalist>
             </div>
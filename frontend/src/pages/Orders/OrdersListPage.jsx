@@ -5,6 +5,7 @@
 import { useEffect, useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import { useOrders } from '../../hooks/useOrders';
+import patientService from '../../services/patientService';
 import './OrdersListPage.css';
 
 const OrdersListPage = () => {
@@ -15,11 +16,32 @@ const OrdersListPage = () => {
   const [statusFilter, setStatusFilter] = useState('');
   const [dateFrom, setDateFrom] = useState('');
   const [dateTo, setDateTo] = useState('');
+  const [patientNames, setPatientNames] = useState({});
 
   useEffect(() => {
     fetchOrders();
   }, []);
 
+  // Nombres de los pacientes de la página en una sola llamada
+  useEffect(() => {
+    const ids = [...new Set(orders.map((order) => order.patient_id))].filter(
+      (id) => !(id in patientNames)
+    );
+    if (ids.length === 0) return;
+
+    patientService
+      .getBatch(ids)
+      .then(({ patients }) => {
+        const names = {};
+        patients.forEach((p) => {
+          names[p.id] =
+            p.document_type === 'RUC' ? p.business_name : `${p.first_name} ${p.last_name}`;
+        });
+        setPatientNames((prev) => ({ ...prev, ...names }));
+      })
+      .catch((err) => console.error('Error al obtener pacientes:', err));
+  }, [orders]);
+
   const handleSearch = (e) => {
     e.preventDefault();
 
@@ -185,7 +207,7 @@ const OrdersListPage = () => {
                   <td>
                     <strong>{order.order_number}</strong>
                   </td>
-                  <td>{order.patient_id}</td>
+                  <td>{patientNames[order.patient_id] || order.patient_id}</td>
                   <td>Sede {order.location_id}</td>
                   <td>
                     <span className={`badge ${getStatusBadge(order.status)}`}>
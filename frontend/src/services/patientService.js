@@ -16,6 +16,31 @@ const patientService = {
     return response.data;
   },
 
+  /**
+   * Sugerencias de pacientes para autocompletar
+   * @param {string} q - Nombre, DNI/RUC, email o teléfono (mínimo 2 caracteres)
+   * @param {number} limit - Cantidad máxima de sugerencias
+   * @returns {Promise} - Lista de { id, document_type, document_number, name }
+   */
+  async suggest(q, limit = 10) {
+    const response = await api.get(ENDPOINTS.PATIENTS.SUGGEST, { params: { q, limit } });
+    return response.data;
+  },
+
+  /**
+   * Obtener varios pacientes en una sola llamada
+   * @param {number[]} ids - IDs de pacientes (máximo 500)
+   * @param {string[]} documentNumbers - Números de documento (máximo 500)
+   * @returns {Promise} - { patients, missing_ids, missing_document_numbers }
+   */
+  async getBatch(ids = [], documentNumbers = []) {
+    const response = await api.post(ENDPOINTS.PATIENTS.BATCH, {
+      ids,
+      document_numbers: documentNumbers,
+    });
+    return response.data;
+  },
+
   /**
    * Obtener paciente por ID
    * @param {number} id - ID del paciente
@@ -0,0 +1,29 @@
+"""order_events_clock_timestamp
+
+Revision ID: a8d4f2c6e913
+Revises: e2b7c9d4f015
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d4f2c6e913'
+down_revision: Union[str, None] = 'e2b7c9d4f015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Settle window is measured from the insert, not from the start of the transaction
+    op.alter_column('order_events', 'created_at', existing_type=sa.DateTime(timezone=True),
+                    server_default=sa.text('clock_timestamp()'), existing_nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('order_events', 'created_at', existing_type=sa.DateTime(timezone=True),
+                    server_default=sa.text('now()'), existing_nullable=False)
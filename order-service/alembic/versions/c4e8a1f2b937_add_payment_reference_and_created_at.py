@@ -0,0 +1,42 @@
+"""add_payment_reference_and_created_at
+
+Revision ID: c4e8a1f2b937
+Revises: 6dcf529e091b
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f2b937'
+down_revision: Union[str, None] = '6dcf529e091b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('order_payments', sa.Column('reference', sa.String(length=100), nullable=True))
+    op.add_column('order_payments', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+    # Pagos existentes: se toma la fecha de la orden
+    op.execute("""
+        UPDATE order_payments p
+        SET created_at = o.created_at
+        FROM orders o
+        WHERE o.id = p.order_id
+    """)
+
+    op.alter_column('order_payments', 'created_at', nullable=False)
+    op.create_index(op.f('ix_order_payments_reference'), 'order_payments', ['reference'], unique=False)
+    op.create_index(op.f('ix_order_payments_created_at'), 'order_payments', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_order_payments_created_at'), table_name='order_payments')
+    op.drop_index(op.f('ix_order_payments_reference'), table_name='order_payments')
+    op.drop_column('order_payments', 'created_at')
+    op.drop_column('order_payments', 'reference')
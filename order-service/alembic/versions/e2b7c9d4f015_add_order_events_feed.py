@@ -0,0 +1,40 @@
+"""add_order_events_feed
+
+Revision ID: e2b7c9d4f015
+Revises: c4e8a1f2b937
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c9d4f015'
+down_revision: Union[str, None] = 'c4e8a1f2b937'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'order_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('order_number', sa.String(length=50), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.Enum('CREATED', 'ANULADA', name='ordereventtype', native_enum=False), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_events_order_id'), 'order_events', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_events_created_at'), 'order_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_order_events_created_at'), table_name='order_events')
+    op.drop_index(op.f('ix_order_events_order_id'), table_name='order_events')
+    op.drop_table('order_events')
@@ -16,6 +16,8 @@ class Settings(BaseSettings):
     # Database
     database_url: str = Field(..., env="DATABASE_URL")
     db_echo: bool = Field(default=False, env="DB_ECHO")
+    # auto | alembic | create_all | off (ver prepare_schema en src/core/database.py)
+    schema_startup_mode: str = Field(default="auto", env="SCHEMA_STARTUP_MODE")
     
     # Security
     secret_key: str = Field(default="default-secret", env="SECRET_KEY")
@@ -34,6 +36,9 @@ class Settings(BaseSettings):
     billing_service_url: str = Field(default="http://localhost:8004", env="BILLING_SERVICE_URL")
     configuration_service_url: str = Field(default="http://localhost:8005", env="CONFIGURATION_SERVICE_URL")
 
+    # Feed de eventos de órdenes: antigüedad mínima de un evento para publicarse
+    order_events_settle_seconds: int = Field(default=5, env="ORDER_EVENTS_SETTLE_SECONDS")
+
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
 
@@ -1,12 +1,23 @@
 """
 Database configuration and session management
 """
+import ast
+import re
+from pathlib import Path
+from typing import Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from loguru import logger
 
 from src.core.config import settings
 
+ALEMBIC_VERSIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+# revision: str = '...' / down_revision: Union[str, None] = ... en cada migración
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\b[^=\n]*=\s*(.+?)\s*$", re.MULTILINE)
+
 
 # Base para modelos SQLAlchemy
 class Base(DeclarativeBase):
@@ -47,4 +58,69 @@ async def create_tables():
         logger.info("✅ Database tables created successfully")
     except Exception as e:
         logger.error(f"❌ Error creating database tables: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+async def database_revisions() -> Optional[Set[str]]:
+    """Revisiones en alembic_version (una consulta); None si la base nunca se migró con Alembic"""
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            return set(result.scalars())
+    except ProgrammingError as e:
+        if getattr(e.orig, "sqlstate", None) == "42P01":  # undefined_table
+            return None
+        raise
+
+
+def alembic_heads(versions_dir: Path = ALEMBIC_VERSIONS_DIR) -> Set[str]:
+    """Revisiones head de alembic/versions (se leen los archivos, sin importar Alembic)"""
+    revisions, parents = set(), set()
+    for path in versions_dir.glob("*.py"):
+        values = dict(_REVISION_LINE.findall(path.read_text(encoding="utf-8")))
+        if "revision" not in values:
+            continue
+        revisions.add(ast.literal_eval(values["revision"]))
+        down_revision = ast.literal_eval(values.get("down_revision", "None"))
+        if isinstance(down_revision, str):
+            parents.add(down_revision)
+        elif down_revision:
+            parents.update(down_revision)
+    return revisions - parents
+
+
+async def prepare_schema() -> str:
+    """
+    Preparar el esquema al arrancar según SCHEMA_STARTUP_MODE
+
+    - auto: una consulta a alembic_version; si la base está en el head de las
+      migraciones no se toca el esquema, si no (base sin migrar o migraciones
+      pendientes) se ejecuta create_all como antes
+    - alembic: igual, pero si la base no está en el head el servicio no arranca
+    - create_all: siempre Base.metadata.create_all
+    - off: sin verificación
+
+    Returns:
+        Lo que se hizo, para el log de arranque
+    """
+    mode = settings.schema_startup_mode
+    if mode == "off":
+        return "not checked"
+    if mode == "create_all":
+        await create_tables()
+        return "create_all"
+    if mode not in ("auto", "alembic"):
+        raise ValueError(f"Invalid SCHEMA_STARTUP_MODE {mode!r} (auto | alembic | create_all | off)")
+
+    heads = alembic_heads()
+    current = await database_revisions()
+    if heads and current == heads:
+        return f"at alembic head {', '.join(sorted(heads))}"
+
+    found = ", ".join(sorted(current)) if current else "none"
+    message = f"Database revision ({found}) is not the alembic head ({', '.join(sorted(heads))}); run `alembic upgrade head`"
+    if mode == "alembic":
+        raise RuntimeError(message)
+    logger.warning(f"{message}. Creating missing tables with create_all")
+    await create_tables()
+    return "create_all (not at alembic head)"
@@ -2,13 +2,15 @@
 Order Service Main Application
 FastAPI application for order management (catalog, orders, lab integration)
 """
+from shared.startup import StartupTimer  # primero: mide la importación de la aplicación
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 import sys
 
 from src.core.config import settings
-from src.core.database import create_tables
+from src.core.database import prepare_schema
 
 # Configure logger
 logger.remove()
@@ -49,9 +51,11 @@ async def startup_event():
     logger.info(f"Starting {settings.service_name} on port {settings.port}")
     logger.info(f"Environment: {settings.environment}")
 
-    # Create tables
-    await create_tables()
-    logger.info("Database tables created successfully")
+    # Esquema: una consulta al head de Alembic (create_all solo si hace falta)
+    with StartupTimer.phase("schema"):
+        schema = await prepare_schema()
+    logger.info(f"Database schema: {schema}")
+    logger.info(StartupTimer.finish())
 
 
 @app.on_event("shutdown")
@@ -67,6 +71,7 @@ async def root():
         "service": "order-service",
         "version": "1.0.0",
         "status": "running",
+        "startup": StartupTimer.report(),
         "modules": ["catalog", "orders", "lab_integration"]
     }
 
@@ -89,3 +94,5 @@ app.include_router(category_router)
 app.include_router(service_router)
 app.include_router(order_router)
 app.include_router(lab_sync_router)
+
+StartupTimer.mark("import")
@@ -23,6 +23,10 @@ class PaymentMethod(str, enum.Enum):
     TRANSFERENCIA = "TRANSFERENCIA"
     YAPE_PLIN = "YAPE_PLIN"
 
+class OrderEventType(str, enum.Enum):
+    CREATED = "CREATED"
+    ANULADA = "ANULADA"
+
 class Order(Base):
     __tablename__ = "orders"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -53,4 +57,17 @@ class OrderPayment(Base):
     order_id: Mapped[int] = mapped_column(ForeignKey('orders.id'), nullable=False, index=True)
     payment_method: Mapped[PaymentMethod] = mapped_column(SQLEnum(PaymentMethod, native_enum=False))
     amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    reference: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, index=True)  # Nº de operación (tarjeta, transferencia, Yape/Plin)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     order: Mapped["Order"] = relationship("Order", back_populates="payments")
+
+class OrderEvent(Base):
+    """Change feed of orders (read by patient-service to keep visit counts and history)"""
+    __tablename__ = "order_events"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id'), nullable=False, index=True)
+    order_number: Mapped[str] = mapped_column(String(50), nullable=False)
+    patient_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    event_type: Mapped[OrderEventType] = mapped_column(SQLEnum(OrderEventType, native_enum=False), nullable=False)
+    # clock_timestamp(): hora de la inserción, no del inicio de la transacción (ventana de asentamiento)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.clock_timestamp(), nullable=False, index=True)
@@ -1,14 +1,25 @@
 """
 Order Repository (Database operations)
 """
-from sqlalchemy import select, func, or_, and_
+from sqlalchemy import select, func, or_, and_, literal, true, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from typing import Optional, List, Tuple
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta, timezone
 from decimal import Decimal
 
-from src.modules.orders.models import Order, OrderItem, OrderPayment, OrderStatus
+from src.modules.orders.models import Order, OrderItem, OrderPayment, OrderStatus, PaymentMethod, OrderEvent, OrderEventType
+
+
+def day_range(date_from: date, date_to: date, utc_offset_hours: int = 0) -> Tuple[datetime, datetime]:
+    """
+    UTC bounds [start, end) of the local days date_from..date_to, for sargable
+    created_at range filters (created_at >= start AND created_at < end)
+    """
+    tz = timezone(timedelta(hours=utc_offset_hours))
+    start = datetime.combine(date_from, time.min, tzinfo=tz)
+    end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=tz)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
 
 
 class OrderRepository:
@@ -85,6 +96,80 @@ class OrderRepository:
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_billable(
+        db: AsyncSession,
+        location_id: int,
+        date_from: date,
+        date_to: date,
+        after_id: int = 0,
+        limit: int = 500
+    ) -> List[Tuple[Order, Decimal]]:
+        """
+        Get fully paid, non-cancelled orders of a location and date range
+        with their items, in keyset pages ordered by ID (id > after_id)
+
+        The paid total is a LATERAL sum over each candidate order's payments
+        (ix_order_payments_order_id), not an aggregate of the whole table.
+        """
+        start, end = day_range(date_from, date_to)
+        paid = (
+            select(func.sum(OrderPayment.amount).label("total_paid"))
+            .where(OrderPayment.order_id == Order.id)
+            .lateral("paid")
+        )
+        query = (
+            select(Order, paid.c.total_paid)
+            .join(paid, true())
+            .options(selectinload(Order.items))
+            .where(
+                Order.location_id == location_id,
+                Order.status != OrderStatus.ANULADA,
+                Order.created_at >= start,
+                Order.created_at < end,
+                paid.c.total_paid >= Order.total,
+                Order.id > after_id
+            )
+            .order_by(Order.id)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return [(order, total_paid) for order, total_paid in result.all()]
+
+    @staticmethod
+    async def get_daily_totals(db: AsyncSession, location_id: int, day: date) -> List[Tuple]:
+        """
+        Order and payment totals of a location and day in one statement.
+
+        Returns rows (payment_method, count, amount, cancelled_count): the row
+        with payment_method NULL holds the non-cancelled order count and
+        expected total; the others hold the paid total per payment method.
+        """
+        day_orders = (
+            select(Order.id, Order.total, Order.status)
+            .where(Order.location_id == location_id, func.date(Order.created_at) == day)
+            .cte("day_orders")
+        )
+        order_totals = select(
+            literal(None).label("payment_method"),
+            func.count().filter(day_orders.c.status != OrderStatus.ANULADA),
+            func.coalesce(func.sum(day_orders.c.total).filter(day_orders.c.status != OrderStatus.ANULADA), 0),
+            func.count().filter(day_orders.c.status == OrderStatus.ANULADA)
+        )
+        payment_totals = (
+            select(
+                OrderPayment.payment_method,
+                func.count(),
+                func.sum(OrderPayment.amount),
+                literal(0)
+            )
+            .join(day_orders, day_orders.c.id == OrderPayment.order_id)
+            .where(day_orders.c.status != OrderStatus.ANULADA)
+            .group_by(OrderPayment.payment_method)
+        )
+        result = await db.execute(union_all(order_totals, payment_totals))
+        return list(result.all())
+
     @staticmethod
     async def get_by_order_number(db: AsyncSession, order_number: str) -> Optional[Order]:
         """Get order by order number"""
@@ -195,3 +280,124 @@ class OrderPaymentRepository:
         query = select(func.sum(OrderPayment.amount)).where(OrderPayment.order_id == order_id)
         result = await db.execute(query)
         return result.scalar() or Decimal("0.00")
+
+    @staticmethod
+    async def get_by_location_and_day(
+        db: AsyncSession,
+        location_id: int,
+        day: date,
+        payment_methods: Optional[List[PaymentMethod]] = None,
+        utc_offset_hours: int = 0
+    ) -> List[Tuple]:
+        """
+        Get the payments registered on a day for orders of a location
+        (non-cancelled orders), in one query ordered by payment time.
+
+        The day is the local day at utc_offset_hours (e.g. -5 for Lima).
+
+        Returns rows (id, order_id, order_number, payment_method, amount, reference, created_at)
+        """
+        start, end = day_range(day, day, utc_offset_hours)
+        query = (
+            select(
+                OrderPayment.id,
+                OrderPayment.order_id,
+                Order.order_number,
+                OrderPayment.payment_method,
+                OrderPayment.amount,
+                OrderPayment.reference,
+                OrderPayment.created_at
+            )
+            .join(Order, Order.id == OrderPayment.order_id)
+            .where(
+                Order.location_id == location_id,
+                Order.status != OrderStatus.ANULADA,
+                OrderPayment.created_at >= start,
+                OrderPayment.created_at < end
+            )
+            .order_by(OrderPayment.created_at, OrderPayment.id)
+        )
+        if payment_methods:
+            query = query.where(OrderPayment.payment_method.in_(payment_methods))
+        result = await db.execute(query)
+        return list(result.all())
+
+
+class OrderEventRepository:
+    """Repository for the order change feed"""
+
+    @staticmethod
+    def add(db: AsyncSession, order: Order, event_type: OrderEventType) -> None:
+        """Add an event to the session (committed together with the order change)"""
+        db.add(OrderEvent(
+            order_id=order.id,
+            order_number=order.order_number,
+            patient_id=order.patient_id,
+            event_type=event_type
+        ))
+
+    @staticmethod
+    async def get_after(
+        db: AsyncSession,
+        after_id: int,
+        limit: int,
+        settle_seconds: int = 0
+    ) -> List[OrderEvent]:
+        """
+        Events with id > after_id, ordered by id (keyset pagination)
+
+        Events newer than settle_seconds are held back: an id is allocated
+        before its transaction commits, so a just-written id may still become
+        visible after a larger one and would be skipped by the consumer's cursor.
+        """
+        query = (
+            select(OrderEvent)
+            .where(OrderEvent.id > after_id)
+            .order_by(OrderEvent.id)
+            .limit(limit)
+        )
+        if settle_seconds > 0:
+            query = query.where(OrderEvent.created_at <= func.now() - timedelta(seconds=settle_seconds))
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_visit_counts(db: AsyncSession, up_to_event_id: int) -> List[Tuple[int, int]]:
+        """
+        Non-cancelled orders per patient as seen by a feed consumer whose
+        cursor is at up_to_event_id (one grouped query).
+
+        An order counts when its CREATED event is at or before the cursor (or it
+        predates the feed and has none), unless its cancellation is too: status
+        ANULADA with the ANULADA event at or before the cursor, or with none.
+
+        Returns rows (patient_id, visits) for patients with at least one visit
+        """
+        created_later = (
+            select(OrderEvent.id)
+            .where(
+                OrderEvent.order_id == Order.id,
+                OrderEvent.event_type == OrderEventType.CREATED,
+                OrderEvent.id > up_to_event_id
+            )
+            .exists()
+        )
+        cancelled_later = (
+            select(OrderEvent.id)
+            .where(
+                OrderEvent.order_id == Order.id,
+                OrderEvent.event_type == OrderEventType.ANULADA,
+                OrderEvent.id > up_to_event_id
+            )
+            .exists()
+        )
+        query = (
+            select(Order.patient_id, func.count())
+            .where(
+                ~created_later,
+                or_(Order.status != OrderStatus.ANULADA, cancelled_later)
+            )
+            .group_by(Order.patient_id)
+        )
+        result = await db.execute(query)
+        return list(result.all())
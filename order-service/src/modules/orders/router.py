@@ -11,9 +11,10 @@ from src.modules.orders.service import OrderService
 from src.modules.orders.schemas import (
     OrderCreate, OrderUpdate, OrderUpdateStatus, OrderAddPayment,
     OrderResponse, OrderDetailResponse, OrderListResponse, OrderStats,
-    PaymentMethodStats, ServiceStats, MonthlyRevenueStats, PatientTypeStats
+    PaymentMethodStats, ServiceStats, MonthlyRevenueStats, PatientTypeStats,
+    BillableOrderResponse, OrderDailyTotals, LocationPaymentResponse, OrderEventResponse, PatientVisitCountResponse
 )
-from src.modules.orders.models import OrderStatus
+from src.modules.orders.models import OrderStatus, PaymentMethod
 
 # Note: Authentication will be added later when integrating with user-service
 # For now, endpoints are public for testing
@@ -81,6 +82,114 @@ async def get_statistics(
     return await OrderService.get_statistics(db, date_from, date_to)
 
 
+@router.get(
+    "/daily-totals",
+    response_model=OrderDailyTotals,
+    summary="Totales diarios por sede (conciliación)"
+)
+async def get_daily_totals(
+    location_id: int = Query(..., gt=0, description="ID de la sede"),
+    day: date = Query(..., alias="date", description="Fecha (YYYY-MM-DD)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Totales de una sede en un día, calculados en una sola consulta SQL:
+
+    - Cantidad de órdenes (no anuladas) y anuladas
+    - Total esperado (suma de órdenes no anuladas)
+    - Total pagado por método de pago (todos los métodos, con cero si no hubo pagos)
+
+    Usado por billing-service para el cierre diario y el reporte de conciliación.
+    """
+    return await OrderService.get_daily_totals(db, location_id, day)
+
+
+@router.get(
+    "/payments",
+    response_model=List[LocationPaymentResponse],
+    summary="Pagos de una sede y día (conciliación bancaria)"
+)
+async def get_location_payments(
+    location_id: int = Query(..., gt=0, description="ID de la sede"),
+    day: date = Query(..., alias="date", description="Fecha del pago (YYYY-MM-DD)"),
+    payment_method: Optional[List[PaymentMethod]] = Query(None, description="Filtrar por método de pago (repetible)"),
+    utc_offset_hours: int = Query(0, ge=-12, le=14, description="Desfase UTC del día local (ej. -5 para Lima)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Pagos registrados en un día para órdenes no anuladas de una sede,
+    ordenados por hora del pago, con número de orden y referencia de operación.
+
+    El día es el día local según `utc_offset_hours` (por defecto, el día UTC).
+    Usado por billing-service para conciliar extractos bancarios y de billeteras.
+    """
+    return await OrderService.get_location_payments(db, location_id, day, payment_method, utc_offset_hours)
+
+
+@router.get(
+    "/events",
+    response_model=List[OrderEventResponse],
+    summary="Feed de cambios de órdenes"
+)
+async def get_order_events(
+    after_id: int = Query(0, ge=0, description="Devolver eventos con ID mayor a este (cursor)"),
+    limit: int = Query(500, ge=1, le=1000, description="Cantidad máxima de eventos"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Eventos de órdenes (CREATED, ANULADA) ordenados por ID
+
+    Para continuar, enviar `after_id` = último ID recibido. Los eventos de los
+    últimos segundos se publican con un pequeño retraso para no saltear
+    transacciones aún no confirmadas.
+    Usado por patient-service para el conteo de visitas y el historial.
+    """
+    return await OrderService.get_order_events(db, after_id, limit)
+
+
+@router.get(
+    "/events/visit-counts",
+    response_model=List[PatientVisitCountResponse],
+    summary="Visitas por paciente hasta un evento del feed"
+)
+async def get_visit_counts(
+    up_to_event_id: int = Query(..., ge=0, description="Último evento ya aplicado por el consumidor (su cursor)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Órdenes no anuladas por paciente tal como las ve un consumidor del feed
+    cuyo cursor está en `up_to_event_id`, incluidas las órdenes anteriores al
+    feed (sin eventos). Solo pacientes con al menos una visita.
+
+    Usado por patient-service para la carga inicial de visit_count; los eventos
+    posteriores al cursor se aplican después desde el feed.
+    """
+    return await OrderService.get_visit_counts(db, up_to_event_id)
+
+
+@router.get(
+    "/billable",
+    response_model=List[BillableOrderResponse],
+    summary="Órdenes pagadas para facturación masiva"
+)
+async def get_billable_orders(
+    location_id: int = Query(..., gt=0, description="ID de la sede"),
+    date_from: date = Query(..., description="Fecha desde (YYYY-MM-DD)"),
+    date_to: date = Query(..., description="Fecha hasta (YYYY-MM-DD)"),
+    after_id: int = Query(0, ge=0, description="Devolver órdenes con ID mayor a este (paginación por cursor)"),
+    limit: int = Query(500, ge=1, le=1000, description="Cantidad máxima de órdenes"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Órdenes no anuladas y totalmente pagadas de una sede y rango de fechas,
+    con sus items, ordenadas por ID.
+
+    Para obtener la siguiente página, enviar `after_id` = último ID recibido.
+    Usado por billing-service para la facturación masiva.
+    """
+    return await OrderService.get_billable_orders(db, location_id, date_from, date_to, after_id, limit)
+
+
 @router.get(
     "/number/{order_number}",
     response_model=OrderDetailResponse,
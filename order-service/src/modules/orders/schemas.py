@@ -3,9 +3,9 @@ Order Schemas (Pydantic models for request/response validation)
 """
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
 from decimal import Decimal
-from src.modules.orders.models import OrderStatus, PaymentMethod
+from src.modules.orders.models import OrderStatus, PaymentMethod, OrderEventType
 
 
 # ==================== Order Item Schemas ====================
@@ -43,6 +43,14 @@ class OrderPaymentCreate(BaseModel):
     """Schema for creating a payment"""
     payment_method: PaymentMethod = Field(..., description="Método de pago")
     amount: Decimal = Field(..., gt=0, decimal_places=2, description="Monto del pago")
+    reference: Optional[str] = Field(None, max_length=100, description="Número de operación (tarjeta, transferencia, Yape/Plin)")
+
+    @validator('reference')
+    def validate_reference(cls, v):
+        """Normalize empty references to None"""
+        if v is not None:
+            v = v.strip()
+        return v or None
 
     @validator('amount')
     def validate_amount(cls, v):
@@ -60,11 +68,43 @@ class OrderPaymentResponse(BaseModel):
     order_id: int
     payment_method: PaymentMethod
     amount: Decimal
+    reference: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class LocationPaymentResponse(BaseModel):
+    """Payment of a location and day, for statement reconciliation"""
+    id: int
+    order_id: int
+    order_number: str
+    payment_method: PaymentMethod
+    amount: Decimal
+    reference: Optional[str] = None
+    created_at: datetime
+
+
+class OrderEventResponse(BaseModel):
+    """Order change feed entry"""
+    id: int
+    order_id: int
+    order_number: str
+    patient_id: int
+    event_type: OrderEventType
+    created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class PatientVisitCountResponse(BaseModel):
+    """Visits (non-cancelled orders) of a patient up to a feed event"""
+    patient_id: int
+    visits: int
+
+
 # ==================== Order Schemas ====================
 
 class OrderCreate(BaseModel):
@@ -125,6 +165,30 @@ class OrderDetailResponse(OrderResponse):
     balance: Decimal = Field(..., description="Saldo pendiente")
 
 
+class BillableOrderResponse(OrderResponse):
+    """Paid order with its items, for bulk invoicing"""
+    items: List[OrderItemResponse] = Field(default_factory=list)
+    total_paid: Decimal = Field(..., description="Total pagado")
+
+
+class PaymentMethodTotal(BaseModel):
+    """Paid total for one payment method"""
+    payment_method: PaymentMethod
+    total_amount: Decimal = Field(..., description="Monto pagado")
+    count: int = Field(..., description="Cantidad de pagos")
+
+
+class OrderDailyTotals(BaseModel):
+    """Aggregated order and payment totals of a location and day (reconciliation)"""
+    location_id: int
+    date: date
+    total_orders: int = Field(..., description="Órdenes no anuladas")
+    cancelled_orders: int = Field(..., description="Órdenes anuladas")
+    expected_total: Decimal = Field(..., description="Suma del total de las órdenes no anuladas")
+    total_paid: Decimal = Field(..., description="Suma de los pagos de las órdenes no anuladas")
+    payment_methods: List[PaymentMethodTotal] = Field(..., description="Pagado por método de pago")
+
+
 class OrderListResponse(BaseModel):
     """Paginated list of orders"""
     total: int = Field(..., description="Total de órdenes")
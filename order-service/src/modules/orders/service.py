@@ -7,13 +7,17 @@ from typing import Optional, List, Dict
 from datetime import date
 from decimal import Decimal
 
-from src.modules.orders.models import Order, OrderItem, OrderPayment, OrderStatus
-from src.modules.orders.repository import OrderRepository, OrderItemRepository, OrderPaymentRepository
+from src.core.config import settings
+from src.modules.orders.models import Order, OrderItem, OrderPayment, OrderStatus, PaymentMethod, OrderEventType
+from src.modules.orders.repository import (
+    OrderRepository, OrderItemRepository, OrderPaymentRepository, OrderEventRepository
+)
 from src.modules.catalog.repository import ServiceRepository
 from src.modules.orders.schemas import (
     OrderCreate, OrderUpdate, OrderUpdateStatus, OrderAddPayment,
     OrderResponse, OrderDetailResponse, OrderListResponse,
-    OrderItemResponse, OrderPaymentResponse, OrderStats
+    OrderItemResponse, OrderPaymentResponse, OrderStats, BillableOrderResponse, LocationPaymentResponse,
+    OrderDailyTotals, PaymentMethodTotal, OrderEventResponse, PatientVisitCountResponse
 )
 
 
@@ -165,6 +169,7 @@ class OrderService:
                     for item_data in items_data
                 ]
                 await OrderItemRepository.create_many(db, order_items)
+                OrderEventRepository.add(db, order, OrderEventType.CREATED)
                 await db.commit()
 
                 # Reload order with details
@@ -246,6 +251,8 @@ class OrderService:
                 detail="Una orden completada solo puede ser anulada"
             )
 
+        if data.status == OrderStatus.ANULADA and order.status != OrderStatus.ANULADA:
+            OrderEventRepository.add(db, order, OrderEventType.ANULADA)
         order.status = data.status
         order = await OrderRepository.update(db, order)
         return OrderResponse.model_validate(order)
@@ -290,7 +297,8 @@ class OrderService:
             OrderPayment(
                 order_id=order_id,
                 payment_method=payment.payment_method,
-                amount=payment.amount
+                amount=payment.amount,
+                reference=payment.reference
             )
             for payment in data.payments
         ]
@@ -327,9 +335,104 @@ class OrderService:
             )
 
         order.status = OrderStatus.ANULADA
+        OrderEventRepository.add(db, order, OrderEventType.ANULADA)
         order = await OrderRepository.update(db, order)
         return OrderResponse.model_validate(order)
 
+    @staticmethod
+    async def get_order_events(db: AsyncSession, after_id: int, limit: int) -> List[OrderEventResponse]:
+        """Feed de cambios de órdenes (creación y anulación) posterior a after_id"""
+        events = await OrderEventRepository.get_after(db, after_id, limit, settings.order_events_settle_seconds)
+        return [OrderEventResponse.model_validate(event) for event in events]
+
+    @staticmethod
+    async def get_visit_counts(db: AsyncSession, up_to_event_id: int) -> List[PatientVisitCountResponse]:
+        """Visitas por paciente coherentes con un cursor del feed (carga inicial de patient-service)"""
+        rows = await OrderEventRepository.get_visit_counts(db, up_to_event_id)
+        return [PatientVisitCountResponse(patient_id=patient_id, visits=visits) for patient_id, visits in rows]
+
+    @staticmethod
+    async def get_billable_orders(
+        db: AsyncSession,
+        location_id: int,
+        date_from: date,
+        date_to: date,
+        after_id: int = 0,
+        limit: int = 500
+    ) -> List[BillableOrderResponse]:
+        """Get paid orders (with items) for bulk invoicing, one keyset page"""
+        rows = await OrderRepository.get_billable(db, location_id, date_from, date_to, after_id, limit)
+        return [
+            BillableOrderResponse(
+                id=order.id,
+                order_number=order.order_number,
+                patient_id=order.patient_id,
+                location_id=order.location_id,
+                status=order.status,
+                total=order.total,
+                created_at=order.created_at,
+                items=[OrderItemResponse.model_validate(item) for item in order.items],
+                total_paid=total_paid
+            )
+            for order, total_paid in rows
+        ]
+
+    @staticmethod
+    async def get_daily_totals(db: AsyncSession, location_id: int, day: date) -> OrderDailyTotals:
+        """Get order count, expected total and paid totals by payment method for a location and day"""
+        rows = await OrderRepository.get_daily_totals(db, location_id, day)
+
+        total_orders, expected_total, cancelled_orders = 0, Decimal("0.00"), 0
+        paid_by_method = {}
+        for payment_method, count, amount, cancelled in rows:
+            if payment_method is None:
+                total_orders, expected_total, cancelled_orders = count, Decimal(amount).quantize(Decimal("0.01")), cancelled
+            else:
+                paid_by_method[PaymentMethod(payment_method)] = (Decimal(amount), count)
+
+        payment_methods = [
+            PaymentMethodTotal(
+                payment_method=method,
+                total_amount=paid_by_method.get(method, (Decimal("0.00"), 0))[0],
+                count=paid_by_method.get(method, (Decimal("0.00"), 0))[1]
+            )
+            for method in PaymentMethod
+        ]
+        return OrderDailyTotals(
+            location_id=location_id,
+            date=day,
+            total_orders=total_orders,
+            cancelled_orders=cancelled_orders,
+            expected_total=expected_total,
+            total_paid=sum((pm.total_amount for pm in payment_methods), Decimal("0.00")),
+            payment_methods=payment_methods
+        )
+
+    @staticmethod
+    async def get_location_payments(
+        db: AsyncSession,
+        location_id: int,
+        day: date,
+        payment_methods: Optional[List[PaymentMethod]] = None,
+        utc_offset_hours: int = 0
+    ) -> List[LocationPaymentResponse]:
+        """Get the payments of a location and local day (statement reconciliation)"""
+        rows = await OrderPaymentRepository.get_by_location_and_day(
+            db, location_id, day, payment_methods, utc_offset_hours
+        )
+        return [
+            LocationPaymentResponse(
+                id=payment_id,
+                order_id=order_id,
+                order_number=order_number,
+                payment_method=payment_method,
+                amount=amount,
+                reference=reference,
+                created_at=created_at
+            )
+            for payment_id, order_id, order_number, payment_method, amount, reference, created_at in rows
+        ]
+
     @staticmethod
     async def get_statistics(
         db: AsyncSession,
@@ -0,0 +1,54 @@
+"""add_patient_search_text_trgm
+
+Revision ID: 5d2f7a9c1e84
+Revises: 3a9fd17ae6b6
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f7a9c1e84'
+down_revision: Union[str, None] = '3a9fd17ae6b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mismo resultado que normalize_search_text para el alfabeto español
+ACCENTED = 'áàäâãéèëêíìïîóòöôõúùüûñçÁÀÄÂÃÉÈËÊÍÌÏÎÓÒÖÔÕÚÙÜÛÑÇ'
+PLAIN = 'aaaaaeeeeiiiiooooouuuuncAAAAAEEEEIIIIOOOOOUUUUNC'
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('patients', sa.Column('search_text', sa.Text(), server_default='', nullable=False))
+
+    op.execute(f"""
+        UPDATE patients
+        SET search_text = trim(regexp_replace(
+            lower(translate(
+                concat_ws(' ', first_name, last_name, business_name, document_number, email, phone),
+                '{ACCENTED}', '{PLAIN}'
+            )),
+            '[^a-z0-9@._-]+', ' ', 'g'
+        ))
+    """)
+
+    op.create_index(
+        'ix_patients_search_text_trgm', 'patients', ['search_text'],
+        unique=False, postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_patients_document_number_pattern', 'patients', ['document_number'],
+        unique=False, postgresql_ops={'document_number': 'varchar_pattern_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_document_number_pattern', table_name='patients')
+    op.drop_index('ix_patients_search_text_trgm', table_name='patients')
+    op.drop_column('patients', 'search_text')
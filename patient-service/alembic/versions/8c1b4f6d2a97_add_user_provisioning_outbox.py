@@ -0,0 +1,50 @@
+"""add_user_provisioning_outbox
+
+Revision ID: 8c1b4f6d2a97
+Revises: 5d2f7a9c1e84
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1b4f6d2a97'
+down_revision: Union[str, None] = '5d2f7a9c1e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('patients', sa.Column('user_id', sa.Integer(), nullable=True))
+    op.add_column('patients', sa.Column(
+        'user_provisioning_status',
+        sa.Enum('PENDING', 'PROVISIONED', 'FAILED', name='userprovisioningstatus', native_enum=False),
+        nullable=True
+    ))
+    op.add_column('patients', sa.Column('user_provisioning_error', sa.String(length=255), nullable=True))
+
+    op.create_table(
+        'user_provisioning_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('patient_id')
+    )
+    op.create_index('ix_user_provisioning_jobs_next_attempt_at', 'user_provisioning_jobs', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_provisioning_jobs_next_attempt_at', table_name='user_provisioning_jobs')
+    op.drop_table('user_provisioning_jobs')
+    op.drop_column('patients', 'user_provisioning_error')
+    op.drop_column('patients', 'user_provisioning_status')
+    op.drop_column('patients', 'user_id')
@@ -0,0 +1,34 @@
+"""add_order_feed_cursor
+
+Revision ID: a3e6f1c8d259
+Revises: 8c1b4f6d2a97
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e6f1c8d259'
+down_revision: Union[str, None] = '8c1b4f6d2a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # El cursor empieza en 0; las órdenes anteriores a order_events no tienen
+    # eventos y se cargan una vez desde order-service (ver b9e2d5a7c314)
+    op.create_table(
+        'order_feed_cursors',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_event_id', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('order_feed_cursors')
@@ -0,0 +1,28 @@
+"""seed_visit_counts_from_orders
+
+Revision ID: b9e2d5a7c314
+Revises: d7b3e9a4c612
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e2d5a7c314'
+down_revision: Union[str, None] = 'd7b3e9a4c612'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # visit_count was never incremented before the order feed: while this is NULL
+    # the consumer reloads it once from order-service order counts
+    op.add_column('order_feed_cursors', sa.Column('visits_seeded_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('order_feed_cursors', 'visits_seeded_at')
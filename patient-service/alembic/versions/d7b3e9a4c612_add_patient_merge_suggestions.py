@@ -0,0 +1,50 @@
+"""add_patient_merge_suggestions
+
+Revision ID: d7b3e9a4c612
+Revises: a3e6f1c8d259
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3e9a4c612'
+down_revision: Union[str, None] = 'a3e6f1c8d259'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'patient_merge_suggestions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('duplicate_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('reasons', sa.String(length=100), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('PENDING', 'MERGED', 'REJECTED', name='mergesuggestionstatus', native_enum=False),
+            server_default='PENDING',
+            nullable=False
+        ),
+        sa.Column('reviewed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['duplicate_id'], ['patients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('patient_id', 'duplicate_id', name='uq_patient_merge_suggestions_pair')
+    )
+    op.create_index(
+        'ix_patient_merge_suggestions_status_score', 'patient_merge_suggestions', ['status', 'score'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patient_merge_suggestions_status_score', table_name='patient_merge_suggestions')
+    op.drop_table('patient_merge_suggestions')
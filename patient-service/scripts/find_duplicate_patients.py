@@ -0,0 +1,49 @@
+"""
+Duplicate patient detection job (writes suggestions to patient_merge_suggestions).
+
+Usage:
+    python scripts/find_duplicate_patients.py [--dry-run] [--min-score=0.55] [--workers=2]
+
+Review the suggestions with GET /api/v1/patients/duplicates.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.database import AsyncSessionLocal
+from src.services.patient_dedup import PatientDedupService
+
+
+def option(name: str):
+    """Value of --name=value, or None"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+async def main():
+    min_score = option("min-score")
+    workers = option("workers")
+    async with AsyncSessionLocal() as db:
+        summary = await PatientDedupService.run(
+            db,
+            min_score=float(min_score) if min_score is not None else None,
+            workers=int(workers) if workers is not None else None,
+            dry_run="--dry-run" in sys.argv,
+        )
+
+    seconds = summary["seconds"]
+    print(
+        f"{'🔎 Simulación' if summary['dry_run'] else '✅ Deduplicación'}: {summary['patients']} pacientes, "
+        f"{summary['candidate_pairs']} pares comparados, {summary['suggestions']} sugerencias "
+        f"({summary['stale_removed']} pendientes eliminadas, {summary['oversized_blocks']} bloques omitidos)"
+    )
+    print("⏱️  " + ", ".join(f"{phase} {value:.1f}s" for phase, value in seconds.items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""
+Bulk patient import from the command line (same rules as POST /api/v1/patients/import).
+
+Usage:
+    python scripts/import_patients.py <file.csv|file.xlsx> [--dry-run]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import HTTPException
+
+from src.core.database import AsyncSessionLocal
+from src.services.patient_import import PatientImportService, iter_csv_rows, iter_xlsx_rows
+
+
+async def read_chunks(path: Path, size: int = 64 * 1024):
+    """File content in blocks"""
+    with path.open("rb") as file:
+        while chunk := file.read(size):
+            yield chunk
+
+
+async def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not args:
+        raise SystemExit(__doc__)
+    path = Path(args[0])
+    dry_run = "--dry-run" in sys.argv
+
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            if path.suffix.lower() == ".xlsx":
+                with path.open("rb") as file:
+                    report = await PatientImportService.import_patients(db, iter_xlsx_rows(file), dry_run=dry_run)
+            else:
+                report = await PatientImportService.import_patients(
+                    db, iter_csv_rows(read_chunks(path)), dry_run=dry_run
+                )
+    except HTTPException as e:
+        raise SystemExit(f"❌ {e.detail}")
+    elapsed = time.perf_counter() - started
+
+    for issue in report.errors:
+        print(f"❌ Fila {issue.row} ({issue.document_number or '-'}): {issue.message}")
+    for issue in report.skipped_rows:
+        print(f"⚠️  Fila {issue.row} ({issue.document_number}): {issue.message}")
+    print(
+        f"{'🔎 Validación' if dry_run else '✅ Importación'}: {report.total_rows} filas en {elapsed:.2f}s "
+        f"({report.total_rows / elapsed:.0f} filas/s) - {report.created} creados, "
+        f"{report.skipped} omitidos, {report.failed} inválidos"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
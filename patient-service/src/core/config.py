@@ -17,6 +17,8 @@ class Settings(BaseSettings):
     # Database
     database_url: str = Field(..., env="DATABASE_URL")
     db_echo: bool = Field(default=False, env="DB_ECHO")
+    # auto | alembic | create_all | off (ver prepare_schema en src/core/database.py)
+    schema_startup_mode: str = Field(default="auto", env="SCHEMA_STARTUP_MODE")
 
     # Security (aunque este servicio no maneje auth directamente)
     secret_key: str = Field(default="default-secret", env="SECRET_KEY")
@@ -33,6 +35,33 @@ class Settings(BaseSettings):
     # Service URLs
     user_service_url: str = Field(default="http://localhost:8001", env="USER_SERVICE_URL")
     configuration_service_url: str = Field(default="http://localhost:8005", env="CONFIGURATION_SERVICE_URL")
+    billing_service_url: str = Field(default="http://localhost:8004", env="BILLING_SERVICE_URL")
+    order_service_url: str = Field(default="http://localhost:8003", env="ORDER_SERVICE_URL")
+
+    # Búsqueda de pacientes (typeahead): filas candidatas que se ordenan por similitud
+    patient_suggest_candidates: int = Field(default=200, env="PATIENT_SUGGEST_CANDIDATES")
+
+    # Provisión de usuarios de pacientes (outbox + worker en lotes hacia user-service)
+    user_provisioning_enabled: bool = Field(default=True, env="USER_PROVISIONING_ENABLED")
+    # Tope: MAX_PATIENT_USER_BATCH de user-service (lotes mayores responden 422)
+    user_provisioning_batch_size: int = Field(default=50, ge=1, le=100, env="USER_PROVISIONING_BATCH_SIZE")
+    user_provisioning_poll_seconds: float = Field(default=5.0, env="USER_PROVISIONING_POLL_SECONDS")
+    user_provisioning_linger_ms: int = Field(default=500, env="USER_PROVISIONING_LINGER_MS")
+    user_provisioning_lease_seconds: int = Field(default=120, env="USER_PROVISIONING_LEASE_SECONDS")
+    user_provisioning_max_attempts: int = Field(default=8, env="USER_PROVISIONING_MAX_ATTEMPTS")
+    user_provisioning_retry_base_seconds: int = Field(default=30, env="USER_PROVISIONING_RETRY_BASE_SECONDS")
+    user_provisioning_timeout_seconds: float = Field(default=30.0, env="USER_PROVISIONING_TIMEOUT_SECONDS")
+    patient_role_id: int = Field(default=6, env="PATIENT_ROLE_ID")
+
+    # Conteo de visitas e historial desde el feed de eventos de order-service
+    order_events_enabled: bool = Field(default=True, env="ORDER_EVENTS_ENABLED")
+    order_events_batch_size: int = Field(default=500, env="ORDER_EVENTS_BATCH_SIZE")
+    order_events_poll_seconds: float = Field(default=5.0, env="ORDER_EVENTS_POLL_SECONDS")
+
+    # Detección de pacientes duplicados (scripts/find_duplicate_patients.py)
+    dedup_min_score: float = Field(default=0.55, env="DEDUP_MIN_SCORE")
+    dedup_max_block_size: int = Field(default=50, env="DEDUP_MAX_BLOCK_SIZE")
+    dedup_workers: int = Field(default=2, env="DEDUP_WORKERS")
 
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -2,13 +2,17 @@
 Patient Service Main Application
 FastAPI application for patient management
 """
+from shared.startup import StartupTimer  # primero: mide la importación de la aplicación
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 import sys
 
 from src.core.config import settings
-from src.core.database import create_tables
+from src.core.database import prepare_schema
+from src.services.user_provisioning import UserProvisioningWorker
+from src.services.order_events import OrderEventConsumer
 
 # Configure logger
 logger.remove()
@@ -49,15 +53,24 @@ async def startup_event():
     logger.info(f"Starting {settings.service_name} on port {settings.port}")
     logger.info(f"Environment: {settings.environment}")
 
-    # Create tables
-    await create_tables()
-    logger.info("Database tables created successfully")
+    # Esquema: una consulta al head de Alembic (create_all solo si hace falta)
+    with StartupTimer.phase("schema"):
+        schema = await prepare_schema()
+    logger.info(f"Database schema: {schema}")
+
+    if settings.user_provisioning_enabled:
+        UserProvisioningWorker.start()
+    if settings.order_events_enabled:
+        OrderEventConsumer.start()
+    logger.info(StartupTimer.finish())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info(f"Shutting down {settings.service_name}")
+    await UserProvisioningWorker.stop()
+    await OrderEventConsumer.stop()
 
 
 @app.get("/")
@@ -66,7 +79,8 @@ async def root():
     return {
         "service": "patient-service",
         "version": "1.0.0",
-        "status": "running"
+        "status": "running",
+        "startup": StartupTimer.report()
     }
 
 
@@ -83,3 +97,5 @@ async def health_check():
 from src.routers.patient import router as patient_router
 
 app.include_router(patient_router)
+
+StartupTimer.mark("import")
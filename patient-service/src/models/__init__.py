@@ -1,6 +1,12 @@
 """
 Patient Service Models
 """
-from src.models.patient import Patient, PatientHistory, PatientNote, DocumentType
+from src.models.patient import (
+    Patient, PatientHistory, PatientNote, DocumentType, UserProvisioningJob, UserProvisioningStatus,
+    OrderFeedCursor, PatientMergeSuggestion, MergeSuggestionStatus
+)
 
-__all__ = ["Patient", "PatientHistory", "PatientNote", "DocumentType"]
+__all__ = [
+    "Patient", "PatientHistory", "PatientNote", "DocumentType", "UserProvisioningJob", "UserProvisioningStatus",
+    "OrderFeedCursor", "PatientMergeSuggestion", "MergeSuggestionStatus"
+]
@@ -4,13 +4,33 @@ Database: patient_db
 """
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import String, Boolean, Integer, DateTime, Text, Enum as SQLEnum, Index, ForeignKey
+from sqlalchemy import (
+    String, Boolean, Integer, Float, DateTime, Text, Enum as SQLEnum, Index, ForeignKey, UniqueConstraint, event
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 import enum
+import re
+import unicodedata
 
 from src.core.database import Base
 
+# Separadores del texto de búsqueda (se conservan @ . _ - de emails y documentos)
+_SEARCH_SEPARATORS = re.compile(r"[^a-z0-9@._-]+")
+
+
+def normalize_search_text(*values: Optional[str]) -> str:
+    """
+    Texto normalizado para búsqueda: minúsculas, sin tildes ni diéresis
+    ("Peña Núñez" -> "pena nunez"), palabras separadas por un espacio
+    """
+    text = " ".join(value for value in values if value)
+    folded = "".join(
+        char for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+    return " ".join(_SEARCH_SEPARATORS.split(folded.lower())).strip()
+
 
 class DocumentType(str, enum.Enum):
     """Tipos de documento"""
@@ -18,6 +38,20 @@ class DocumentType(str, enum.Enum):
     RUC = "RUC"
 
 
+class UserProvisioningStatus(str, enum.Enum):
+    """Estado de la creación del usuario del paciente en user-service"""
+    PENDING = "PENDING"
+    PROVISIONED = "PROVISIONED"
+    FAILED = "FAILED"
+
+
+class MergeSuggestionStatus(str, enum.Enum):
+    """Estado de revisión de una sugerencia de pacientes duplicados"""
+    PENDING = "PENDING"
+    MERGED = "MERGED"
+    REJECTED = "REJECTED"
+
+
 class Patient(Base):
     """Paciente"""
     __tablename__ = "patients"
@@ -25,6 +59,16 @@ class Patient(Base):
         Index('ix_patients_document_number', 'document_number'),
         Index('ix_patients_first_name_last_name', 'first_name', 'last_name'),
         Index('ix_patients_is_recurrent', 'is_recurrent'),
+        # Búsqueda por prefijo de documento (LIKE '1234%')
+        Index(
+            'ix_patients_document_number_pattern', 'document_number',
+            postgresql_ops={'document_number': 'varchar_pattern_ops'}
+        ),
+        # Búsqueda por subcadena/similitud (pg_trgm)
+        Index(
+            'ix_patients_search_text_trgm', 'search_text',
+            postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}
+        ),
     )
 
     # Primary Key
@@ -49,11 +93,22 @@ class Patient(Base):
     email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     address: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
+    # Búsqueda: nombres, razón social, documento, email y teléfono normalizados
+    search_text: Mapped[str] = mapped_column(Text, nullable=False, default="", server_default="")
+
     # Metadata
     is_recurrent: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     visit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
+    # Usuario del paciente (referencia lógica a user_db.users), creado en segundo plano
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    user_provisioning_status: Mapped[Optional[UserProvisioningStatus]] = mapped_column(
+        SQLEnum(UserProvisioningStatus, native_enum=False),
+        nullable=True
+    )
+    user_provisioning_error: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
     # Auditoría (referencias lógicas a user_db.users)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -80,11 +135,25 @@ class Patient(Base):
         cascade="all, delete-orphan"
     )
 
+    def build_search_text(self) -> str:
+        """Texto de búsqueda a partir de los datos actuales"""
+        return normalize_search_text(
+            self.first_name, self.last_name, self.business_name,
+            self.document_number, self.email, self.phone
+        )
+
     def __repr__(self):
         name = self.business_name if self.document_type == DocumentType.RUC else f"{self.first_name} {self.last_name}"
         return f"<Patient(id={self.id}, doc={self.document_number}, name='{name}')>"
 
 
+@event.listens_for(Patient, "before_insert")
+@event.listens_for(Patient, "before_update")
+def _update_search_text(mapper, connection, target: Patient) -> None:
+    """Mantener search_text sincronizado en cada INSERT/UPDATE del ORM"""
+    target.search_text = target.build_search_text()
+
+
 class PatientHistory(Base):
     """Historial de acciones del paciente"""
     __tablename__ = "patient_history"
@@ -149,3 +218,118 @@ class PatientNote(Base):
 
     def __repr__(self):
         return f"<PatientNote(id={self.id}, patient_id={self.patient_id})>"
+
+
+class UserProvisioningJob(Base):
+    """
+    Outbox de creación de usuarios de pacientes
+
+    Se inserta en la misma transacción que el paciente; el worker de
+    provisión lo procesa en lotes y lo elimina al terminar.
+    """
+    __tablename__ = "user_provisioning_jobs"
+    __table_args__ = (
+        Index('ix_user_provisioning_jobs_next_attempt_at', 'next_attempt_at'),
+    )
+
+    # Primary Key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Foreign Key
+    patient_id: Mapped[int] = mapped_column(
+        ForeignKey("patients.id", ondelete="CASCADE"), unique=True, nullable=False
+    )
+
+    # Reintentos
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Auditoría
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<UserProvisioningJob(patient_id={self.patient_id}, attempts={self.attempts})>"
+
+
+class OrderFeedCursor(Base):
+    """
+    Posición de lectura del feed de eventos de order-service
+
+    Se actualiza en la misma transacción que aplica los eventos, así cada
+    evento se cuenta exactamente una vez. visits_seeded_at marca la carga
+    inicial de visit_count desde order-service (una sola vez, ver
+    OrderEventConsumer.seed_visit_counts).
+    """
+    __tablename__ = "order_feed_cursors"
+
+    # Primary Key (nombre del feed)
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+
+    last_event_id: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    visits_seeded_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        onupdate=func.now(),
+        nullable=True
+    )
+
+    def __repr__(self):
+        return f"<OrderFeedCursor(name='{self.name}', last_event_id={self.last_event_id})>"
+
+
+class PatientMergeSuggestion(Base):
+    """
+    Posible paciente duplicado (generado por el job de deduplicación)
+
+    patient_id es siempre el menor de los dos IDs, así cada par aparece una
+    sola vez. Los pares rechazados no se vuelven a sugerir.
+    """
+    __tablename__ = "patient_merge_suggestions"
+    __table_args__ = (
+        UniqueConstraint('patient_id', 'duplicate_id', name='uq_patient_merge_suggestions_pair'),
+        Index('ix_patient_merge_suggestions_status_score', 'status', 'score'),
+    )
+
+    # Primary Key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Par de pacientes
+    patient_id: Mapped[int] = mapped_column(ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+    duplicate_id: Mapped[int] = mapped_column(ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+
+    # Puntaje (0-1) y coincidencias que lo explican (nombre, documento, telefono, email)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    reasons: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    # Revisión
+    status: Mapped[MergeSuggestionStatus] = mapped_column(
+        SQLEnum(MergeSuggestionStatus, native_enum=False),
+        default=MergeSuggestionStatus.PENDING,
+        server_default=MergeSuggestionStatus.PENDING.value,
+        nullable=False
+    )
+    reviewed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Auditoría
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        onupdate=func.now(),
+        nullable=True
+    )
+
+    def __repr__(self):
+        return f"<PatientMergeSuggestion(patient_id={self.patient_id}, duplicate_id={self.duplicate_id}, score={self.score})>"
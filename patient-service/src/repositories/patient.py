@@ -1,12 +1,44 @@
 """
 Patient Repository (Database operations)
 """
-from sqlalchemy import select, func, or_, and_
+from datetime import timedelta
+from sqlalchemy import select, update, delete, func, or_, and_, literal, any_, all_, bindparam, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Any, AsyncIterator
 
-from src.models.patient import Patient, PatientNote, PatientHistory, DocumentType
+from src.models.patient import (
+    Patient, PatientNote, PatientHistory, DocumentType, UserProvisioningJob, UserProvisioningStatus,
+    OrderFeedCursor, PatientMergeSuggestion, MergeSuggestionStatus, normalize_search_text
+)
+
+# Longitudes de DNI y RUC
+DOCUMENT_LENGTHS = (8, 11)
+
+# Visitas a partir de las cuales un paciente es recurrente
+RECURRENT_VISITS = 3
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards (search terms may contain '_')"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _document_prefix(term: str):
+    """
+    Document number prefix condition, served by ix_patients_document_number_pattern.
+
+    The pattern is rendered inline (digits only) so the planner can use the
+    btree prefix range even when the statement is prepared.
+    """
+    return Patient.document_number.like(literal(f"{term}%", literal_execute=True))
+
+
+def _search_text_filter(search: str):
+    """Every word of the search must appear in search_text (pg_trgm GIN index)"""
+    words = normalize_search_text(search).split()
+    return and_(*[Patient.search_text.like(f"%{_escape_like(word)}%", escape="\\") for word in words])
 
 
 class PatientRepository:
@@ -27,18 +59,12 @@ class PatientRepository:
 
         # Apply filters
         filters = []
-        if search:
-            search_pattern = f"%{search}%"
-            filters.append(
-                or_(
-                    Patient.document_number.ilike(search_pattern),
-                    Patient.first_name.ilike(search_pattern),
-                    Patient.last_name.ilike(search_pattern),
-                    Patient.business_name.ilike(search_pattern),
-                    Patient.email.ilike(search_pattern),
-                    Patient.phone.ilike(search_pattern)
-                )
-            )
+        search = (search or "").strip()
+        if search.isdigit():
+            # Documento por prefijo, o teléfono/documento dentro del texto de búsqueda
+            filters.append(or_(_document_prefix(search), _search_text_filter(search)))
+        elif normalize_search_text(search):
+            filters.append(_search_text_filter(search))
         if document_type is not None:
             filters.append(Patient.document_type == document_type)
         if is_recurrent is not None:
@@ -65,6 +91,71 @@ class PatientRepository:
 
         return patients, total
 
+    @staticmethod
+    async def suggest(
+        db: AsyncSession,
+        search: str,
+        limit: int = 10,
+        candidates: int = 200
+    ) -> List[Tuple]:
+        """
+        Top matches for typeahead (active patients, no count, minimal projection).
+
+        - Digits: exact document (DNI/RUC length), then document prefix, both on btree
+        - Otherwise: every word contained in search_text (GIN trigram); the
+          `candidates` rows with the highest word_similarity to the whole search
+          are kept and ranked (frequent names have more matches than candidates)
+
+        Returns rows (id, document_type, document_number, first_name, last_name, business_name)
+        """
+        columns = (
+            Patient.id, Patient.document_type, Patient.document_number,
+            Patient.first_name, Patient.last_name, Patient.business_name
+        )
+        search = search.strip()
+
+        if search.isdigit():
+            if len(search) in DOCUMENT_LENGTHS:
+                result = await db.execute(
+                    select(*columns).where(Patient.document_number == search, Patient.is_active.is_(True))
+                )
+                rows = list(result.all())
+                if rows:
+                    return rows
+
+            result = await db.execute(
+                select(*columns)
+                .where(_document_prefix(search), Patient.is_active.is_(True))
+                .order_by(Patient.document_number)
+                .limit(limit)
+            )
+            rows = list(result.all())
+            if rows:
+                return rows
+
+        normalized = normalize_search_text(search)
+        if not normalized:
+            return []
+
+        similarity = func.word_similarity(normalized, Patient.search_text).label("similarity")
+        matches = (
+            select(*columns, similarity, Patient.visit_count)
+            .where(_search_text_filter(search), Patient.is_active.is_(True))
+            .order_by(similarity.desc(), Patient.visit_count.desc(), Patient.id)
+            .limit(candidates)
+            .subquery()
+        )
+        query = (
+            select(
+                matches.c.id, matches.c.document_type, matches.c.document_number,
+                matches.c.first_name, matches.c.last_name, matches.c.business_name
+            )
+            .order_by(matches.c.similarity.desc(), matches.c.visit_count.desc(), matches.c.id)
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return list(result.all())
+
     @staticmethod
     async def get_by_id(db: AsyncSession, patient_id: int) -> Optional[Patient]:
         """Get patient by ID"""
@@ -72,6 +163,36 @@ class PatientRepository:
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_many(
+        db: AsyncSession,
+        ids: Optional[List[int]] = None,
+        document_numbers: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get several patients in one query (WHERE id = ANY(:ids) OR document_number = ANY(:documents)).
+
+        Each list is bound as a single array parameter, so the statement is the
+        same whatever the number of IDs. Only the summary columns are selected.
+        """
+        conditions = []
+        if ids:
+            conditions.append(Patient.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        if document_numbers:
+            conditions.append(
+                Patient.document_number == any_(bindparam("document_numbers", document_numbers, type_=ARRAY(String)))
+            )
+        if not conditions:
+            return []
+
+        columns = (
+            Patient.id, Patient.document_type, Patient.document_number,
+            Patient.first_name, Patient.last_name, Patient.business_name,
+            Patient.phone, Patient.email, Patient.address, Patient.is_active
+        )
+        result = await db.execute(select(*columns).where(or_(*conditions)))
+        return [dict(row) for row in result.mappings().all()]
+
     @staticmethod
     async def get_by_id_with_notes(db: AsyncSession, patient_id: int) -> Optional[Patient]:
         """Get patient by ID with notes"""
@@ -91,13 +212,74 @@ class PatientRepository:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def create(db: AsyncSession, patient: Patient) -> Patient:
-        """Create a new patient"""
+    async def create(db: AsyncSession, patient: Patient, provision_user: bool = False) -> Patient:
+        """
+        Create a new patient.
+
+        With provision_user, the user provisioning job is inserted in the same
+        transaction (outbox), so it is never lost nor created for a rolled back patient.
+        """
         db.add(patient)
+        if provision_user:
+            patient.user_provisioning_status = UserProvisioningStatus.PENDING
+            await db.flush()
+            db.add(UserProvisioningJob(patient_id=patient.id))
         await db.commit()
         await db.refresh(patient)
         return patient
 
+    @staticmethod
+    async def get_existing_documents(db: AsyncSession, document_numbers: List[str]) -> set:
+        """Document numbers (of the given ones) already registered, in one query"""
+        if not document_numbers:
+            return set()
+        result = await db.execute(
+            select(Patient.document_number).where(
+                Patient.document_number == any_(bindparam("document_numbers", document_numbers, type_=ARRAY(String)))
+            )
+        )
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def bulk_create(
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        chunk_size: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert many patients with multi-row INSERTs (chunk_size rows per statement).
+
+        Core INSERTs bypass the ORM events, so each row must already carry its
+        search_text. Rows with user_provisioning_status PENDING also get their
+        provisioning job. Documents inserted concurrently by someone else are
+        skipped (ON CONFLICT DO NOTHING). Does not commit.
+
+        Returns:
+            [{"id", "document_number"}] of the inserted rows
+        """
+        if not rows:
+            return []
+
+        # executemany + RETURNING: SQLAlchemy compiles the statement once and
+        # sends it as multi-row INSERTs of chunk_size rows ("insertmanyvalues")
+        result = await db.execute(
+            insert(Patient.__table__)
+            .on_conflict_do_nothing(index_elements=["document_number"])
+            .returning(Patient.__table__.c.id, Patient.__table__.c.document_number)
+            .execution_options(insertmanyvalues_page_size=chunk_size),
+            rows
+        )
+        inserted = [dict(row) for row in result.mappings().all()]
+
+        pending = {
+            row["document_number"] for row in rows
+            if row.get("user_provisioning_status") == UserProvisioningStatus.PENDING
+        }
+        jobs = [{"patient_id": row["id"]} for row in inserted if row["document_number"] in pending]
+        if jobs:
+            await db.execute(insert(UserProvisioningJob.__table__), jobs)
+        return inserted
+
     @staticmethod
     async def update(db: AsyncSession, patient: Patient) -> Patient:
         """Update patient"""
@@ -113,13 +295,111 @@ class PatientRepository:
 
     @staticmethod
     async def increment_visit_count(db: AsyncSession, patient_id: int) -> None:
-        """Increment patient visit count"""
-        patient = await PatientRepository.get_by_id(db, patient_id)
-        if patient:
-            patient.visit_count += 1
-            if patient.visit_count >= 3:
-                patient.is_recurrent = True
-            await db.commit()
+        """Increment patient visit count (atomic, no read-modify-write)"""
+        await PatientRepository.apply_visit_deltas(db, {patient_id: 1})
+        await db.commit()
+
+    @staticmethod
+    async def apply_visit_deltas(db: AsyncSession, deltas: Dict[int, int]) -> int:
+        """
+        Add n visits to each patient in one statement:
+
+            UPDATE patients SET visit_count = GREATEST(visit_count + d.n, 0), is_recurrent = ...
+            FROM (SELECT unnest(:patient_ids) AS patient_id, unnest(:counts) AS n) AS d
+            WHERE patients.id = d.patient_id
+
+        Negative n (cancelled orders) are allowed; the count never goes below 0.
+        Does not commit. Returns the number of patients updated.
+        """
+        deltas = {patient_id: n for patient_id, n in deltas.items() if n}
+        if not deltas:
+            return 0
+
+        delta = select(
+            func.unnest(bindparam("patient_ids", list(deltas), type_=ARRAY(Integer))).label("patient_id"),
+            func.unnest(bindparam("counts", list(deltas.values()), type_=ARRAY(Integer))).label("n"),
+        ).subquery("d")
+        new_count = func.greatest(Patient.visit_count + delta.c.n, 0)
+        result = await db.execute(
+            update(Patient)
+            .where(Patient.id == delta.c.patient_id)
+            .values(visit_count=new_count, is_recurrent=new_count >= RECURRENT_VISITS)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def set_visit_counts(db: AsyncSession, visits: Dict[int, int]) -> int:
+        """
+        Replace every patient's visit_count with visits (0 for patients not in
+        it) and recompute is_recurrent, in two statements:
+
+            UPDATE patients SET visit_count = 0, is_recurrent = false WHERE <not in visits> AND <not already 0>
+            UPDATE patients SET visit_count = d.n, is_recurrent = ... FROM (SELECT unnest(...)) AS d WHERE ...
+
+        Does not commit. Returns the number of patients updated.
+        """
+        patient_ids = bindparam("patient_ids", list(visits), type_=ARRAY(Integer))
+        cleared = await db.execute(
+            update(Patient)
+            .where(
+                Patient.id != all_(patient_ids),
+                or_(Patient.visit_count != 0, Patient.is_recurrent.is_(True))
+            )
+            .values(visit_count=0, is_recurrent=False)
+            .execution_options(synchronize_session=False)
+        )
+        if not visits:
+            return cleared.rowcount
+
+        counts = select(
+            func.unnest(patient_ids).label("patient_id"),
+            func.unnest(bindparam("counts", list(visits.values()), type_=ARRAY(Integer))).label("n"),
+        ).subquery("d")
+        seeded = await db.execute(
+            update(Patient)
+            .where(Patient.id == counts.c.patient_id)
+            .values(visit_count=counts.c.n, is_recurrent=counts.c.n >= RECURRENT_VISITS)
+            .execution_options(synchronize_session=False)
+        )
+        return cleared.rowcount + seeded.rowcount
+
+    @staticmethod
+    async def get_existing_ids(db: AsyncSession, patient_ids: List[int]) -> set:
+        """IDs (of the given ones) that exist, in one query"""
+        if not patient_ids:
+            return set()
+        result = await db.execute(
+            select(Patient.id).where(Patient.id == any_(bindparam("patient_ids", patient_ids, type_=ARRAY(Integer))))
+        )
+        return set(result.scalars().all())
+
+
+    @staticmethod
+    async def iter_dedup_rows(db: AsyncSession, chunk_size: int = 10_000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Active patients in id order, chunk_size rows at a time (keyset, WHERE id > last).
+
+        Only the columns compared by the dedup job are selected.
+        """
+        columns = (
+            Patient.id, Patient.document_type, Patient.document_number,
+            Patient.first_name, Patient.last_name, Patient.business_name,
+            Patient.phone, Patient.email
+        )
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(*columns)
+                .where(Patient.is_active.is_(True), Patient.id > last_id)
+                .order_by(Patient.id)
+                .limit(chunk_size)
+            )
+            rows = [dict(row) for row in result.mappings().all()]
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
 
 
 class PatientNoteRepository:
@@ -182,3 +462,241 @@ class PatientHistoryRepository:
         await db.commit()
         await db.refresh(history)
         return history
+
+    @staticmethod
+    async def create_many(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """Insert many history records (executemany, multi-row INSERTs). Does not commit."""
+        if rows:
+            await db.execute(insert(PatientHistory.__table__), rows)
+
+
+class OrderFeedRepository:
+    """Repository for the order-service feed cursor"""
+
+    @staticmethod
+    async def lock_cursor(db: AsyncSession, name: str) -> Optional[int]:
+        """
+        Lock the feed cursor for this transaction and return its last event id.
+
+        Returns None when another consumer holds it (FOR UPDATE SKIP LOCKED),
+        so only one instance applies each page of events.
+        """
+        await db.execute(
+            insert(OrderFeedCursor.__table__)
+            .values(name=name, last_event_id=0)
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        result = await db.execute(
+            select(OrderFeedCursor.last_event_id)
+            .where(OrderFeedCursor.name == name)
+            .with_for_update(skip_locked=True)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def visits_seeded(db: AsyncSession, name: str) -> bool:
+        """Whether the initial visit_count load was done (cursor already locked)"""
+        result = await db.execute(
+            select(OrderFeedCursor.visits_seeded_at).where(OrderFeedCursor.name == name)
+        )
+        return result.scalar_one_or_none() is not None
+
+    @staticmethod
+    async def mark_visits_seeded(db: AsyncSession, name: str) -> None:
+        """Record the initial visit_count load. Does not commit."""
+        await db.execute(
+            update(OrderFeedCursor)
+            .where(OrderFeedCursor.name == name)
+            .values(visits_seeded_at=func.now())
+        )
+
+    @staticmethod
+    async def save_cursor(db: AsyncSession, name: str, last_event_id: int) -> None:
+        """Move the cursor (same transaction as the applied events). Does not commit."""
+        await db.execute(
+            update(OrderFeedCursor)
+            .where(OrderFeedCursor.name == name)
+            .values(last_event_id=last_event_id, updated_at=func.now())
+        )
+
+
+class UserProvisioningRepository:
+    """Repository for the user provisioning outbox"""
+
+    @staticmethod
+    async def claim_batch(db: AsyncSession, limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+        """
+        Claim up to `limit` due jobs and return them with the patient data.
+
+        The jobs are leased (next_attempt_at moved forward and attempts
+        incremented) with FOR UPDATE SKIP LOCKED, so several workers never take
+        the same job, and a job whose worker died becomes due again when the
+        lease expires. Commits.
+        """
+        due = (
+            select(UserProvisioningJob.id)
+            .where(UserProvisioningJob.next_attempt_at <= func.now())
+            .order_by(UserProvisioningJob.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = await db.execute(
+            update(UserProvisioningJob)
+            .where(UserProvisioningJob.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=UserProvisioningJob.attempts + 1,
+                next_attempt_at=func.now() + timedelta(seconds=lease_seconds)
+            )
+            .returning(UserProvisioningJob.id, UserProvisioningJob.patient_id, UserProvisioningJob.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        jobs = [dict(row) for row in claimed.mappings().all()]
+        if not jobs:
+            await db.commit()
+            return []
+
+        patient_ids = [job["patient_id"] for job in jobs]
+        result = await db.execute(
+            select(
+                Patient.id, Patient.document_number, Patient.first_name,
+                Patient.last_name, Patient.phone, Patient.email
+            ).where(Patient.id == any_(bindparam("patient_ids", patient_ids, type_=ARRAY(Integer))))
+        )
+        patients = {row["id"]: dict(row) for row in result.mappings().all()}
+        await db.commit()
+
+        return [{**job, "patient": patients.get(job["patient_id"])} for job in jobs]
+
+    @staticmethod
+    async def save_results(
+        db: AsyncSession,
+        provisioned: List[Dict[str, Any]],
+        failed: List[Dict[str, Any]],
+        retries: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Record a processed batch in one transaction, with one statement per kind of outcome.
+
+        Args:
+            provisioned: [{"job_id", "patient_id", "user_id"}] - patient linked, job removed
+            failed: [{"job_id", "patient_id", "error"}] - permanent failure, job removed
+            retries: [{"job_id", "error", "next_attempt_at"}] - job kept for a later attempt
+        """
+        if provisioned:
+            await db.execute(
+                update(Patient),
+                [
+                    {
+                        "id": item["patient_id"],
+                        "user_id": item["user_id"],
+                        "user_provisioning_status": UserProvisioningStatus.PROVISIONED,
+                        "user_provisioning_error": None,
+                    }
+                    for item in provisioned
+                ]
+            )
+        if failed:
+            await db.execute(
+                update(Patient),
+                [
+                    {
+                        "id": item["patient_id"],
+                        "user_provisioning_status": UserProvisioningStatus.FAILED,
+                        "user_provisioning_error": item["error"][:255],
+                    }
+                    for item in failed
+                ]
+            )
+        finished = [item["job_id"] for item in provisioned + failed]
+        if finished:
+            await db.execute(
+                delete(UserProvisioningJob)
+                .where(UserProvisioningJob.id == any_(bindparam("job_ids", finished, type_=ARRAY(Integer))))
+                .execution_options(synchronize_session=False)
+            )
+        if retries:
+            await db.execute(
+                update(UserProvisioningJob),
+                [
+                    {"id": item["job_id"], "last_error": item["error"], "next_attempt_at": item["next_attempt_at"]}
+                    for item in retries
+                ]
+            )
+        await db.commit()
+
+
+class PatientMergeSuggestionRepository:
+    """Repository for duplicate patient suggestions"""
+
+    @staticmethod
+    async def upsert_many(db: AsyncSession, rows: List[Dict[str, Any]], chunk_size: int = 1000) -> None:
+        """
+        Insert or refresh suggestions {patient_id, duplicate_id, score, reasons}.
+
+        Existing PENDING pairs get the new score and updated_at = now(); reviewed
+        pairs (MERGED / REJECTED) are left untouched. Does not commit.
+        """
+        if not rows:
+            return
+        stmt = insert(PatientMergeSuggestion.__table__)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_patient_merge_suggestions_pair",
+            set_={"score": stmt.excluded.score, "reasons": stmt.excluded.reasons, "updated_at": func.now()},
+            where=PatientMergeSuggestion.__table__.c.status == MergeSuggestionStatus.PENDING.value,
+        )
+        await db.execute(stmt.execution_options(insertmanyvalues_page_size=chunk_size), rows)
+
+    @staticmethod
+    async def delete_stale_pending(db: AsyncSession) -> int:
+        """
+        Delete PENDING suggestions not inserted nor refreshed in the current
+        transaction (now() is the transaction start time). Does not commit.
+        """
+        table = PatientMergeSuggestion.__table__
+        result = await db.execute(
+            delete(table).where(
+                table.c.status == MergeSuggestionStatus.PENDING.value,
+                func.coalesce(table.c.updated_at, table.c.created_at) < func.now(),
+            )
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def get_all(
+        db: AsyncSession,
+        page: int = 1,
+        page_size: int = 50,
+        status: Optional[MergeSuggestionStatus] = MergeSuggestionStatus.PENDING,
+        min_score: Optional[float] = None
+    ) -> Tuple[List[PatientMergeSuggestion], int]:
+        """Suggestions by score (highest first) with filters and pagination"""
+        filters = []
+        if status is not None:
+            filters.append(PatientMergeSuggestion.status == status)
+        if min_score is not None:
+            filters.append(PatientMergeSuggestion.score >= min_score)
+
+        total_result = await db.execute(select(func.count()).select_from(PatientMergeSuggestion).where(*filters))
+        total = total_result.scalar() or 0
+
+        result = await db.execute(
+            select(PatientMergeSuggestion)
+            .where(*filters)
+            .order_by(PatientMergeSuggestion.score.desc(), PatientMergeSuggestion.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        return list(result.scalars().all()), total
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, suggestion_id: int) -> Optional[PatientMergeSuggestion]:
+        """Get suggestion by ID"""
+        result = await db.execute(select(PatientMergeSuggestion).where(PatientMergeSuggestion.id == suggestion_id))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def update(db: AsyncSession, suggestion: PatientMergeSuggestion) -> PatientMergeSuggestion:
+        """Update suggestion"""
+        await db.commit()
+        await db.refresh(suggestion)
+        return suggestion
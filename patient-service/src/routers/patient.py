@@ -1,17 +1,21 @@
 """
 Patient Router (API endpoints)
 """
-from fastapi import APIRouter, Depends, status, Query
+from fastapi import APIRouter, Depends, status, Query, File, Form, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
 from src.core.database import get_db
 from src.services.patient import PatientService
+from src.services.patient_import import PatientImportService, iter_csv_rows, iter_xlsx_rows
+from src.services.patient_dedup import PatientDedupService
 from src.schemas.patient import (
     PatientCreate, PatientUpdate, PatientResponse, PatientDetailResponse,
-    PatientListResponse, PatientNoteCreate, PatientNoteResponse
+    PatientListResponse, PatientNoteCreate, PatientNoteResponse, PatientSuggestion,
+    PatientBatchRequest, PatientBatchResponse, PatientImportResponse, PatientHistoryResponse,
+    MergeSuggestionListResponse, MergeSuggestionReview
 )
-from src.models.patient import DocumentType
+from src.models.patient import DocumentType, MergeSuggestionStatus
 
 # Note: Authentication will be added later when integrating with user-service
 # For now, endpoints are public for testing
@@ -53,6 +57,115 @@ async def get_all_patients(
     )
 
 
+@router.get(
+    "/suggest",
+    response_model=List[PatientSuggestion],
+    summary="Sugerencias de pacientes (autocompletar)"
+)
+async def suggest_patients(
+    q: str = Query(..., min_length=2, max_length=100, description="Nombre, DNI/RUC, email o teléfono"),
+    limit: int = Query(10, ge=1, le=50, description="Cantidad máxima de sugerencias"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Pacientes activos que coinciden con el texto, ordenados por relevancia
+
+    - Solo dígitos: documento exacto (8 u 11 dígitos) o por prefijo
+    - Texto: cada palabra debe aparecer (sin distinguir tildes ni mayúsculas)
+
+    Respuesta mínima (ID, documento y nombre), sin conteo total.
+    """
+    return await PatientService.suggest_patients(db, q, limit)
+
+
+@router.post(
+    "/batch",
+    response_model=PatientBatchResponse,
+    summary="Obtener varios pacientes en una sola consulta"
+)
+async def get_patients_batch(
+    data: PatientBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtener hasta 500 pacientes por ID y/o hasta 500 por número de documento
+
+    Retorna una proyección compacta (sin notas) y los IDs/documentos no encontrados.
+    Útil para listados de órdenes o comprobantes que muestran el nombre del paciente.
+    """
+    return await PatientService.get_patients_batch(db, data)
+
+
+@router.post(
+    "/import",
+    response_model=PatientImportResponse,
+    summary="Importar pacientes desde CSV o XLSX"
+)
+async def import_patients(
+    file: UploadFile = File(..., description="Archivo .csv o .xlsx con encabezado"),
+    dry_run: bool = Form(False, description="Solo validar, sin registrar"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Carga masiva de pacientes (p. ej. empleados de un cliente corporativo)
+
+    **Columnas:** numero_documento (obligatoria), tipo_documento (DNI/RUC; si
+    falta se deduce de la longitud), nombres, apellidos, razon_social,
+    telefono, email, direccion.
+
+    - Las filas inválidas se reportan en `errors` con su número de fila
+    - Los documentos ya registrados o repetidos se omiten (`skipped_rows`)
+    - Los pacientes con email reciben su usuario en segundo plano
+    """
+    if (file.filename or "").lower().endswith(".xlsx"):
+        rows = iter_xlsx_rows(file.file)
+    else:
+        async def chunks():
+            while chunk := await file.read(64 * 1024):
+                yield chunk
+        rows = iter_csv_rows(chunks())
+
+    return await PatientImportService.import_patients(db, rows, dry_run=dry_run)
+
+
+@router.get(
+    "/duplicates",
+    response_model=MergeSuggestionListResponse,
+    summary="Listar posibles pacientes duplicados"
+)
+async def get_duplicate_suggestions(
+    page: int = Query(1, ge=1, description="Número de página"),
+    page_size: int = Query(50, ge=1, le=100, description="Tamaño de página"),
+    suggestion_status: Optional[MergeSuggestionStatus] = Query(
+        MergeSuggestionStatus.PENDING, alias="status", description="Estado de revisión"
+    ),
+    min_score: Optional[float] = Query(None, ge=0, le=1, description="Puntaje mínimo"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Sugerencias del job de deduplicación (scripts/find_duplicate_patients.py),
+    de mayor a menor puntaje, con los datos de ambos pacientes
+    """
+    return await PatientDedupService.get_suggestions(db, page, page_size, suggestion_status, min_score)
+
+
+@router.put(
+    "/duplicates/{suggestion_id}",
+    summary="Revisar sugerencia de duplicado"
+)
+async def review_duplicate_suggestion(
+    suggestion_id: int,
+    data: MergeSuggestionReview,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Marcar un par como el mismo paciente (MERGED) o como distintos (REJECTED)
+
+    Los pares revisados no se vuelven a sugerir
+    """
+    return await PatientDedupService.review_suggestion(db, suggestion_id, data)
+
+
 @router.get(
     "/document/{document_number}",
     response_model=PatientResponse,
@@ -197,3 +310,21 @@ async def get_patient_notes(
     Las notas se retornan ordenadas por fecha de creación (más reciente primero)
     """
     return await PatientService.get_patient_notes(db, patient_id, limit)
+
+
+@router.get(
+    "/{patient_id}/history",
+    response_model=List[PatientHistoryResponse],
+    summary="Obtener historial de órdenes del paciente"
+)
+async def get_patient_history(
+    patient_id: int,
+    limit: int = Query(20, ge=1, le=100, description="Número máximo de registros a retornar"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtener el historial de órdenes del paciente (registradas y anuladas)
+
+    Se alimenta del feed de eventos de order-service; más reciente primero
+    """
+    return await PatientService.get_patient_history(db, patient_id, limit)
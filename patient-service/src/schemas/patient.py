@@ -4,7 +4,10 @@ Patient Schemas (Pydantic models for request/response validation)
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from datetime import datetime
-from src.models.patient import DocumentType
+from src.models.patient import DocumentType, UserProvisioningStatus, MergeSuggestionStatus
+
+# Máximo de pacientes por consulta en lote
+MAX_BATCH_SIZE = 500
 
 
 # ==================== Patient Schemas ====================
@@ -94,6 +97,8 @@ class PatientResponse(BaseModel):
     is_recurrent: bool
     visit_count: int
     is_active: bool
+    user_id: Optional[int] = None
+    user_provisioning_status: Optional[UserProvisioningStatus] = None
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -106,6 +111,77 @@ class PatientDetailResponse(PatientResponse):
     notes: List["PatientNoteResponse"] = Field(default_factory=list)
 
 
+class PatientSuggestion(BaseModel):
+    """Minimal patient projection for typeahead"""
+    id: int
+    document_type: DocumentType
+    document_number: str
+    name: str = Field(..., description="Nombre completo o razón social")
+
+
+class PatientBatchRequest(BaseModel):
+    """Schema for looking up several patients at once (by ID and/or document)"""
+    ids: List[int] = Field(default_factory=list, max_items=MAX_BATCH_SIZE, description="IDs de pacientes")
+    document_numbers: List[str] = Field(
+        default_factory=list, max_items=MAX_BATCH_SIZE, description="Números de documento (DNI o RUC)"
+    )
+
+    @validator('ids')
+    def validate_ids(cls, v):
+        """Remove duplicates keeping order"""
+        return list(dict.fromkeys(v))
+
+    @validator('document_numbers', always=True)
+    def validate_document_numbers(cls, v, values):
+        """Remove duplicates and require at least one ID or document"""
+        v = list(dict.fromkeys(number.strip() for number in v if number.strip()))
+        if not v and not values.get('ids'):
+            raise ValueError('Debe enviar al menos un ID o número de documento')
+        return v
+
+
+class PatientSummary(BaseModel):
+    """Compact patient projection for batch lookups"""
+    id: int
+    document_type: DocumentType
+    document_number: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    business_name: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    address: Optional[str]
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+
+class PatientBatchResponse(BaseModel):
+    """Batch lookup result"""
+    patients: List[PatientSummary] = Field(default_factory=list)
+    missing_ids: List[int] = Field(default_factory=list, description="IDs no encontrados")
+    missing_document_numbers: List[str] = Field(default_factory=list, description="Documentos no encontrados")
+
+
+class PatientImportIssue(BaseModel):
+    """One row of the import that was not loaded"""
+    row: int = Field(..., description="Número de fila en el archivo (1 = encabezado)")
+    document_number: Optional[str] = None
+    message: str
+
+
+class PatientImportResponse(BaseModel):
+    """Bulk import report"""
+    total_rows: int = Field(..., description="Filas de datos leídas")
+    created: int = Field(..., description="Pacientes creados")
+    skipped: int = Field(..., description="Filas omitidas por documento ya registrado o repetido")
+    failed: int = Field(..., description="Filas con datos inválidos")
+    dry_run: bool = False
+    errors: List[PatientImportIssue] = Field(default_factory=list, description="Filas inválidas (hasta un máximo)")
+    skipped_rows: List[PatientImportIssue] = Field(default_factory=list, description="Filas omitidas (hasta un máximo)")
+
+
 class PatientListResponse(BaseModel):
     """Paginated list of patients"""
     total: int = Field(..., description="Total de pacientes")
@@ -148,5 +224,39 @@ class PatientHistoryResponse(BaseModel):
         from_attributes = True
 
 
+# ==================== Duplicate Patient Schemas ====================
+
+class MergeSuggestionResponse(BaseModel):
+    """Possible duplicate pair found by the dedup job"""
+    id: int
+    score: float = Field(..., description="Puntaje 0-1 (nombre, documento, teléfono, email)")
+    reasons: List[str] = Field(default_factory=list, description="Coincidencias: nombre, documento, telefono, email")
+    status: MergeSuggestionStatus
+    patient: Optional[PatientSummary] = Field(None, description="Paciente más antiguo del par")
+    duplicate: Optional[PatientSummary] = Field(None, description="Posible duplicado")
+    created_at: datetime
+    reviewed_at: Optional[datetime] = None
+
+
+class MergeSuggestionListResponse(BaseModel):
+    """Paginated duplicate suggestions"""
+    total: int = Field(..., description="Total de sugerencias")
+    page: int = Field(..., description="Página actual")
+    page_size: int = Field(..., description="Tamaño de página")
+    suggestions: List[MergeSuggestionResponse] = Field(..., description="Sugerencias (mayor puntaje primero)")
+
+
+class MergeSuggestionReview(BaseModel):
+    """Review decision for a duplicate suggestion"""
+    status: MergeSuggestionStatus = Field(..., description="MERGED (son el mismo paciente) o REJECTED")
+
+    @validator('status')
+    def validate_status(cls, v):
+        """Only final decisions"""
+        if v == MergeSuggestionStatus.PENDING:
+            raise ValueError('El estado de revisión debe ser MERGED o REJECTED')
+        return v
+
+
 # Update forward references
 PatientDetailResponse.model_rebuild()
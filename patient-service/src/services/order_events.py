@@ -0,0 +1,165 @@
+"""
+Order Event Consumer
+
+Mantiene el conteo de visitas, la marca de paciente recurrente y el historial
+a partir del feed de eventos de order-service (GET /api/v1/orders/events):
+- Lee páginas de eventos por cursor (after_id) con un cliente HTTP reutilizado
+- Aplica cada página en una transacción: un UPDATE con los incrementos
+  agregados por paciente, un INSERT multi-fila en patient_history y el avance
+  del cursor, así cada evento se aplica exactamente una vez
+- La primera vez (visits_seeded_at vacío) carga visit_count desde los
+  conteos de órdenes de order-service coherentes con el cursor: incluye las
+  órdenes anteriores al feed, que no tienen eventos
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+import httpx
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.repositories.patient import PatientRepository, PatientHistoryRepository, OrderFeedRepository
+
+# Nombre del cursor en order_feed_cursors
+FEED_NAME = "order-service"
+
+# Evento de order-service -> (incremento de visitas, acción del historial)
+EVENT_ACTIONS = {
+    "CREATED": (1, "ORDEN_REGISTRADA"),
+    "ANULADA": (-1, "ORDEN_ANULADA"),
+}
+
+
+class OrderEventConsumer:
+    """Consumidor del feed de órdenes (una tarea asyncio por proceso)"""
+
+    _task: Optional[asyncio.Task] = None
+    _client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def start(cls) -> None:
+        """Iniciar el consumidor (startup)"""
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._client = httpx.AsyncClient(base_url=settings.order_service_url, timeout=10.0)
+        cls._task = asyncio.create_task(cls._run())
+        logger.info("Order event consumer started")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Detener el consumidor (shutdown)"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+        logger.info("Order event consumer stopped")
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            try:
+                applied = await cls.process_page()
+            except Exception as e:
+                logger.error(f"Order event page failed: {e}")
+                applied = 0
+
+            # Página completa: probablemente hay más eventos
+            if applied < settings.order_events_batch_size:
+                await asyncio.sleep(settings.order_events_poll_seconds)
+
+    @classmethod
+    async def process_page(cls) -> int:
+        """
+        Leer y aplicar la siguiente página de eventos
+
+        Returns:
+            Número de eventos aplicados (0 si no hay nuevos o si otra instancia
+            tiene el cursor)
+
+        Raises:
+            httpx.HTTPError: si order-service no responde correctamente
+        """
+        async with AsyncSessionLocal() as db:
+            after_id = await OrderFeedRepository.lock_cursor(db, FEED_NAME)
+            if after_id is None:
+                await db.rollback()
+                return 0
+
+            if not await OrderFeedRepository.visits_seeded(db, FEED_NAME):
+                await cls.seed_visit_counts(db, after_id)
+                return 0
+
+            response = await cls._client.get(
+                "/api/v1/orders/events",
+                params={"after_id": after_id, "limit": settings.order_events_batch_size},
+            )
+            response.raise_for_status()
+            events = response.json()
+            if not events:
+                await db.rollback()
+                return 0
+
+            known = await PatientRepository.get_existing_ids(db, list({event["patient_id"] for event in events}))
+            deltas: Counter = Counter()
+            history = []
+            for event in events:
+                if event["event_type"] not in EVENT_ACTIONS or event["patient_id"] not in known:
+                    continue
+                delta, action = EVENT_ACTIONS[event["event_type"]]
+                deltas[event["patient_id"]] += delta
+                history.append({
+                    "patient_id": event["patient_id"],
+                    "order_id": event["order_id"],
+                    "action": action,
+                    "description": f"Orden {event['order_number']}",
+                    "created_at": datetime.fromisoformat(event["created_at"].replace("Z", "+00:00")),
+                })
+
+            await PatientRepository.apply_visit_deltas(db, deltas)
+            await PatientHistoryRepository.create_many(db, history)
+            await OrderFeedRepository.save_cursor(db, FEED_NAME, events[-1]["id"])
+            await db.commit()
+
+        skipped = len(events) - len(history)
+        logger.info(
+            f"Order events up to {events[-1]['id']}: {len(history)} applied to {len(deltas)} patients"
+            + (f", {skipped} skipped (unknown patient or event)" if skipped else "")
+        )
+        return len(events)
+
+    @classmethod
+    async def seed_visit_counts(cls, db: AsyncSession, after_id: int) -> None:
+        """
+        Carga inicial de visit_count e is_recurrent (una sola vez, con el cursor bloqueado)
+
+        order-service devuelve las órdenes no anuladas por paciente tal como las
+        ve el cursor after_id; los eventos posteriores se aplican luego desde el
+        feed. Confirma la transacción.
+
+        Raises:
+            httpx.HTTPError: si order-service no responde correctamente
+        """
+        response = await cls._client.get(
+            "/api/v1/orders/events/visit-counts",
+            params={"up_to_event_id": after_id},
+        )
+        response.raise_for_status()
+        visits = {row["patient_id"]: row["visits"] for row in response.json()}
+
+        updated = await PatientRepository.set_visit_counts(db, visits)
+        await OrderFeedRepository.mark_visits_seeded(db, FEED_NAME)
+        await db.commit()
+        logger.info(
+            f"Visit counts seeded from order-service up to event {after_id}: "
+            f"{updated} patients updated, {len(visits)} with visits"
+        )
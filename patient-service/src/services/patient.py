@@ -1,21 +1,50 @@
 """
 Patient Service (Business logic)
 """
+import asyncio
+
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set
 from loguru import logger
 
 from src.core.config import settings
 from src.models.patient import Patient, PatientNote, PatientHistory, DocumentType
 from src.repositories.patient import PatientRepository, PatientNoteRepository, PatientHistoryRepository
+from src.services.user_provisioning import UserProvisioningWorker
 from src.schemas.patient import (
     PatientCreate, PatientUpdate, PatientResponse, PatientDetailResponse,
-    PatientListResponse, PatientNoteCreate, PatientNoteResponse
+    PatientListResponse, PatientNoteCreate, PatientNoteResponse, PatientSuggestion,
+    PatientBatchRequest, PatientBatchResponse, PatientSummary, PatientHistoryResponse
 )
 
 
+async def invalidate_billing_cache(patient_id: int) -> None:
+    """Notify billing-service that the patient's billing identity changed (best effort)"""
+    try:
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            response = await client.delete(
+                f"{settings.billing_service_url}/api/v1/internal/patient-cache/{patient_id}",
+                headers={"X-Internal-API-Key": settings.internal_api_key}
+            )
+            response.raise_for_status()
+    except Exception as e:
+        # The billing cache TTL bounds how long stale data can be served
+        logger.warning(f"Could not invalidate billing cache for patient {patient_id}: {e}")
+
+
+# Pending invalidations (asyncio keeps only weak references to tasks)
+_invalidation_tasks: Set[asyncio.Task] = set()
+
+
+def schedule_billing_cache_invalidation(patient_id: int) -> None:
+    """Fire-and-forget invalidation: the patient update never waits on billing-service"""
+    task = asyncio.create_task(invalidate_billing_cache(patient_id))
+    _invalidation_tasks.add(task)
+    task.add_done_callback(_invalidation_tasks.discard)
+
+
 class PatientService:
     """Business logic for Patient operations"""
 
@@ -43,6 +72,33 @@ class PatientService:
             patients=patient_responses
         )
 
+    @staticmethod
+    async def suggest_patients(db: AsyncSession, query: str, limit: int = 10) -> List[PatientSuggestion]:
+        """Sugerencias de pacientes para autocompletar (sin conteo total)"""
+        rows = await PatientRepository.suggest(db, query, limit, settings.patient_suggest_candidates)
+        return [
+            PatientSuggestion(
+                id=patient_id,
+                document_type=document_type,
+                document_number=document_number,
+                name=business_name if document_type == DocumentType.RUC else f"{first_name or ''} {last_name or ''}".strip()
+            )
+            for patient_id, document_type, document_number, first_name, last_name, business_name in rows
+        ]
+
+    @staticmethod
+    async def get_patients_batch(db: AsyncSession, data: PatientBatchRequest) -> PatientBatchResponse:
+        """Obtener varios pacientes por ID y/o documento en una sola consulta"""
+        patients = await PatientRepository.get_many(db, data.ids, data.document_numbers)
+
+        found_ids = {patient["id"] for patient in patients}
+        found_documents = {patient["document_number"] for patient in patients}
+        return PatientBatchResponse(
+            patients=[PatientSummary(**patient) for patient in patients],
+            missing_ids=[patient_id for patient_id in data.ids if patient_id not in found_ids],
+            missing_document_numbers=[number for number in data.document_numbers if number not in found_documents]
+        )
+
     @staticmethod
     async def get_patient_by_id(db: AsyncSession, patient_id: int) -> PatientDetailResponse:
         """Get patient by ID with notes"""
@@ -67,6 +123,8 @@ class PatientService:
             "is_recurrent": patient.is_recurrent,
             "visit_count": patient.visit_count,
             "is_active": patient.is_active,
+            "user_id": patient.user_id,
+            "user_provisioning_status": patient.user_provisioning_status,
             "created_at": patient.created_at,
             "updated_at": patient.updated_at,
             "notes": [PatientNoteResponse.model_validate(note) for note in patient.notes]
@@ -90,7 +148,7 @@ class PatientService:
         data: PatientCreate,
         created_by: Optional[int] = None
     ) -> PatientResponse:
-        """Create a new patient and a corresponding user"""
+        """Create a new patient and queue the creation of its user"""
         # Check if patient with document already exists
         existing = await PatientRepository.get_by_document(db, data.document_number)
         if existing:
@@ -111,33 +169,10 @@ class PatientService:
             address=data.address,
             created_by=created_by
         )
-        patient = await PatientRepository.create(db, patient)
-
-        # Create user in user-service
+        # El usuario se crea en segundo plano (outbox + worker por lotes)
+        patient = await PatientRepository.create(db, patient, provision_user=bool(patient.email))
         if patient.email:
-            temp_password = f"P{patient.document_number}!"
-            user_data = {
-                "email": patient.email,
-                "password": temp_password,
-                "first_name": patient.first_name or "Usuario",
-                "last_name": patient.last_name or "Paciente",
-                "phone": patient.phone,
-                "role_ids": [6]  # Assuming 6 is the role ID for "Paciente"
-            }
-            try:
-                async with httpx.AsyncClient() as client:
-                    headers = {"X-Internal-API-Key": settings.internal_api_key}
-                    response = await client.post(
-                        f"{settings.user_service_url}/api/v1/internal/create-patient-user",
-                        json=user_data,
-                        headers=headers
-                    )
-                    response.raise_for_status()
-                    logger.info(f"Successfully created user for patient {patient.id}")
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Error creating user for patient {patient.id}: {e.response.text}")
-            except Exception as e:
-                logger.error(f"An unexpected error occurred while creating user for patient {patient.id}: {e}")
+            UserProvisioningWorker.notify()
 
         return PatientResponse.model_validate(patient)
 
@@ -168,6 +203,7 @@ class PatientService:
 
         patient.updated_by = updated_by
         patient = await PatientRepository.update(db, patient)
+        schedule_billing_cache_invalidation(patient.id)
         return PatientResponse.model_validate(patient)
 
     @staticmethod
@@ -182,6 +218,7 @@ class PatientService:
 
         name = patient.business_name if patient.document_type == DocumentType.RUC else f"{patient.first_name} {patient.last_name}"
         await PatientRepository.delete(db, patient)
+        schedule_billing_cache_invalidation(patient_id)
         return {"message": f"Paciente '{name}' desactivado exitosamente"}
 
     @staticmethod
@@ -223,3 +260,20 @@ class PatientService:
 
         notes = await PatientNoteRepository.get_by_patient_id(db, patient_id, limit)
         return [PatientNoteResponse.model_validate(note) for note in notes]
+
+    @staticmethod
+    async def get_patient_history(
+        db: AsyncSession,
+        patient_id: int,
+        limit: int = 20
+    ) -> List[PatientHistoryResponse]:
+        """Get order history for a patient (registradas y anuladas)"""
+        patient = await PatientRepository.get_by_id(db, patient_id)
+        if not patient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Paciente con ID {patient_id} no encontrado"
+            )
+
+        history = await PatientHistoryRepository.get_by_patient_id(db, patient_id, limit)
+        return [PatientHistoryResponse.model_validate(entry) for entry in history]
@@ -0,0 +1,448 @@
+"""
+Patient Dedup (detección de pacientes duplicados por lotes)
+
+Recepción registra a veces al mismo paciente dos veces, con el nombre escrito
+distinto o un dígito del DNI mal tipeado. El job evita comparar todos contra
+todos (O(n²)) con claves de bloqueo; solo se comparan los pacientes que
+comparten alguna clave:
+- clave fonética del nombre (primer nombre + primer apellido, o razón social)
+- hash del teléfono (últimos 9 dígitos) y del email
+- documento a distancia de edición 1: el mismo número con una posición
+  enmascarada (un dígito distinto) o con dos dígitos vecinos ordenados
+  (transposición); el DNI dentro de un RUC 10 cuenta como ese DNI
+
+Los pares candidatos se puntúan por lotes en un pool de procesos sobre
+columnas de atributos ya normalizados, y los que superan el umbral se
+guardan en patient_merge_suggestions para revisión.
+"""
+import asyncio
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import HTTPException, status
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from src.core.config import settings
+from src.models.patient import DocumentType, MergeSuggestionStatus, normalize_search_text
+from src.repositories.patient import PatientRepository, PatientMergeSuggestionRepository
+from src.schemas.patient import (
+    MergeSuggestionListResponse, MergeSuggestionResponse, MergeSuggestionReview, PatientSummary
+)
+
+# Peso de cada coincidencia en el puntaje (suman 1)
+NAME_WEIGHT = 0.40
+DOCUMENT_WEIGHT = 0.30
+PHONE_WEIGHT = 0.15
+EMAIL_WEIGHT = 0.15
+
+# Similitud de nombre a partir de la cual se reporta "nombre" como motivo
+NAME_REASON_THRESHOLD = 0.8
+
+# Pares por tarea del pool de procesos
+SCORE_CHUNK_PAIRS = 50_000
+
+_NON_LETTERS = re.compile(r"[^a-z]+")
+_NON_DIGITS = re.compile(r"\D+")
+
+# Reglas fonéticas del español, en orden (ll/y, b/v, c/s/z, j/g, qu/k, h muda)
+_PHONETIC_RULES = (
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"ch"), "x"),
+    (re.compile(r"ll"), "y"),
+    (re.compile(r"g(?=[ei])"), "j"),
+    (re.compile(r"gu(?=[eia])"), "g"),
+    (re.compile(r"qu"), "k"),
+    (re.compile(r"c(?=[ei])"), "s"),
+    (re.compile(r"[cq]"), "k"),
+    (re.compile(r"z"), "s"),
+    (re.compile(r"v"), "b"),
+    (re.compile(r"w"), "u"),
+    (re.compile(r"h"), ""),
+    (re.compile(r"y(?![aeiou])"), "i"),
+    (re.compile(r"(.)\1+"), r"\1"),
+)
+_VOWELS = re.compile(r"[aeiou]")
+
+
+def phonetic_code(word: str) -> str:
+    """
+    Código fonético de una palabra: 'Vásquez', 'Vazquez', 'Basques' -> 'bsks'
+
+    Primera letra (ya transformada) y consonantes siguientes, hasta 6 letras.
+    """
+    code = _NON_LETTERS.sub("", normalize_search_text(word))
+    for pattern, replacement in _PHONETIC_RULES:
+        code = pattern.sub(replacement, code)
+    if not code:
+        return ""
+    return (code[0] + _VOWELS.sub("", code[1:]))[:6]
+
+
+def name_key(
+    document_type: DocumentType,
+    first_name: Optional[str],
+    last_name: Optional[str],
+    business_name: Optional[str]
+) -> Optional[str]:
+    """Clave de bloqueo fonética: primer nombre + primer apellido, o dos primeras palabras de la razón social"""
+    if document_type == DocumentType.RUC and business_name:
+        words = normalize_search_text(business_name).split()[:2]
+    else:
+        words = normalize_search_text(first_name).split()[:1] + normalize_search_text(last_name).split()[:1]
+    codes = [phonetic_code(word) for word in words]
+    return " ".join(codes) if all(codes) and codes else None
+
+
+def person_document(document_type: DocumentType, document_number: str) -> str:
+    """Documento comparable: el DNI dentro de un RUC de persona natural (10 + DNI + verificador)"""
+    if document_type == DocumentType.RUC and len(document_number) == 11 and document_number.startswith("10"):
+        return document_number[2:10]
+    return document_number
+
+
+def phone_key(phone: Optional[str]) -> Optional[str]:
+    """Últimos 9 dígitos del teléfono (sin prefijo +51); None si tiene menos de 7"""
+    digits = _NON_DIGITS.sub("", phone or "")
+    return digits[-9:] if len(digits) >= 7 else None
+
+
+def email_key(email: Optional[str]) -> Optional[str]:
+    """Email en minúsculas"""
+    email = (email or "").strip().lower()
+    return email or None
+
+
+def document_pass_key(document: str, pass_number: int) -> Optional[str]:
+    """
+    Clave del documento en una pasada de bloqueo por distancia de edición 1:
+    - pasada p < len: posición p enmascarada (sustitución de un dígito)
+    - pasada len + p: dígitos p y p+1 ordenados (transposición de vecinos)
+
+    Dos documentos del mismo largo a distancia 1 comparten la clave de al
+    menos una pasada. None si la pasada no aplica a ese largo.
+    """
+    length = len(document)
+    if pass_number < length:
+        return document[:pass_number] + "_" + document[pass_number + 1:]
+    position = pass_number - length
+    if position < length - 1:
+        pair = "".join(sorted(document[position:position + 2]))
+        return document[:position] + pair + document[position + 2:]
+    return None
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas de un texto (con relleno para que cuenten las palabras cortas)"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def document_similarity(a: str, b: str) -> float:
+    """1 si es el mismo documento (DNI y su RUC 10), 0.8 a distancia 1 (sustitución o transposición), si no 0"""
+    if a == b:
+        return 1.0
+    if len(a) != len(b):
+        return 0.0
+    diff = [i for i in range(len(a)) if a[i] != b[i]]
+    if len(diff) == 1:
+        return 0.8
+    if len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]:
+        return 0.8
+    return 0.0
+
+
+@dataclass
+class PatientColumns:
+    """Atributos normalizados de los pacientes, por columna (índice = fila)"""
+    ids: List[int] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    documents: List[str] = field(default_factory=list)
+    phones: List[Optional[str]] = field(default_factory=list)
+    emails: List[Optional[str]] = field(default_factory=list)
+    name_keys: List[Optional[str]] = field(default_factory=list)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        document_type = DocumentType(row["document_type"])
+        if document_type == DocumentType.RUC and row["business_name"]:
+            name = normalize_search_text(row["business_name"])
+        else:
+            name = normalize_search_text(row["first_name"], row["last_name"])
+        self.ids.append(row["id"])
+        self.names.append(name)
+        self.documents.append(person_document(document_type, row["document_number"]))
+        self.phones.append(phone_key(row["phone"]))
+        self.emails.append(email_key(row["email"]))
+        self.name_keys.append(name_key(document_type, row["first_name"], row["last_name"], row["business_name"]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _add_block_pairs(keyed_rows: Iterable[Tuple[Any, int]], pairs: Set[int], max_block_size: int) -> int:
+    """
+    Agrupar filas por clave y agregar los pares de cada bloque a `pairs`
+    (codificados como i << 32 | j, con i < j)
+
+    Returns:
+        Número de bloques omitidos por superar max_block_size
+    """
+    # Casi todas las claves son únicas: solo las repetidas guardan una lista
+    first: Dict[Any, int] = {}
+    shared: Dict[Any, List[int]] = {}
+    for key, row in keyed_rows:
+        previous = first.setdefault(key, row)
+        if previous != row:
+            rows = shared.get(key)
+            if rows is None:
+                shared[key] = [previous, row]
+            else:
+                rows.append(row)
+
+    oversized = 0
+    for rows in shared.values():
+        if len(rows) > max_block_size:
+            # Teléfono de la clínica, email genérico o nombre muy común: no discrimina
+            oversized += 1
+            continue
+        for a in range(len(rows)):
+            for b in range(a + 1, len(rows)):
+                pairs.add(rows[a] << 32 | rows[b])
+    return oversized
+
+
+def candidate_pairs(columns: PatientColumns, max_block_size: int) -> Tuple[Set[int], int]:
+    """
+    Pares candidatos (i << 32 | j) de todas las claves de bloqueo
+
+    Las claves de documento se procesan una pasada a la vez, así en memoria
+    hay un solo diccionario del tamaño de la tabla.
+
+    Returns:
+        (pares, bloques omitidos por tamaño)
+    """
+    pairs: Set[int] = set()
+    oversized = 0
+    for keys in (columns.name_keys, columns.phones, columns.emails):
+        oversized += _add_block_pairs(
+            ((key, row) for row, key in enumerate(keys) if key is not None), pairs, max_block_size
+        )
+
+    # Las claves conservan el largo del documento: DNI y RUC no se mezclan
+    passes = max((2 * len(document) - 1 for document in columns.documents), default=0)
+    for pass_number in range(passes):
+        keyed_rows = ((document_pass_key(document, pass_number), row) for row, document in enumerate(columns.documents))
+        oversized += _add_block_pairs(
+            ((key, row) for key, row in keyed_rows if key is not None), pairs, max_block_size
+        )
+    return pairs, oversized
+
+
+# Columnas del proceso de puntaje (se cargan una vez por proceso con init_scoring)
+_scoring_columns: Optional[PatientColumns] = None
+
+
+def init_scoring(columns: PatientColumns) -> None:
+    """Inicializador del pool: columnas compartidas por todas las tareas del proceso"""
+    global _scoring_columns
+    _scoring_columns = columns
+
+
+def score_pairs(pairs: Sequence[int], min_score: float) -> List[Tuple[int, int, float, str]]:
+    """
+    Puntuar un lote de pares sobre las columnas del proceso
+
+    Returns:
+        [(patient_id, duplicate_id, score, reasons)] de los pares con score >= min_score
+    """
+    columns = _scoring_columns
+    names, documents, phones, emails, ids = (
+        columns.names, columns.documents, columns.phones, columns.emails, columns.ids
+    )
+    grams: Dict[int, Set[str]] = {}
+    results = []
+    for pair in pairs:
+        a, b = pair >> 32, pair & 0xFFFFFFFF
+
+        grams_a = grams.get(a)
+        if grams_a is None:
+            grams_a = grams[a] = trigrams(names[a])
+        grams_b = grams.get(b)
+        if grams_b is None:
+            grams_b = grams[b] = trigrams(names[b])
+        name = len(grams_a & grams_b) / len(grams_a | grams_b) if names[a] and names[b] else 0.0
+
+        document = document_similarity(documents[a], documents[b])
+        phone = 1.0 if phones[a] is not None and phones[a] == phones[b] else 0.0
+        email = 1.0 if emails[a] is not None and emails[a] == emails[b] else 0.0
+
+        score = NAME_WEIGHT * name + DOCUMENT_WEIGHT * document + PHONE_WEIGHT * phone + EMAIL_WEIGHT * email
+        if score < min_score:
+            continue
+
+        reasons = [
+            reason for reason, matched in (
+                ("nombre", name >= NAME_REASON_THRESHOLD), ("documento", document > 0),
+                ("telefono", phone > 0), ("email", email > 0),
+            ) if matched
+        ]
+        patient_id, duplicate_id = sorted((ids[a], ids[b]))
+        results.append((patient_id, duplicate_id, round(score, 3), ",".join(reasons)))
+    return results
+
+
+class PatientDedupService:
+    """Job de detección de pacientes duplicados"""
+
+    @staticmethod
+    async def load_columns(db: AsyncSession, chunk_size: int = 10_000) -> PatientColumns:
+        """Atributos normalizados de los pacientes activos (lectura por bloques de ID)"""
+        columns = PatientColumns()
+        async for rows in PatientRepository.iter_dedup_rows(db, chunk_size):
+            for row in rows:
+                columns.append(row)
+        return columns
+
+    @staticmethod
+    async def score(
+        columns: PatientColumns,
+        pairs: Set[int],
+        min_score: float,
+        workers: int
+    ) -> List[Tuple[int, int, float, str]]:
+        """Puntuar los pares candidatos en lotes (en un pool de `workers` procesos, o aquí si es 0)"""
+        ordered = sorted(pairs)
+        chunks = [ordered[i:i + SCORE_CHUNK_PAIRS] for i in range(0, len(ordered), SCORE_CHUNK_PAIRS)]
+        if workers <= 0:
+            init_scoring(columns)
+            return [match for chunk in chunks for match in score_pairs(chunk, min_score)]
+
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_scoring, initargs=(columns,)) as pool:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, score_pairs, chunk, min_score) for chunk in chunks)
+            )
+        return [match for chunk in results for match in chunk]
+
+    @staticmethod
+    async def run(
+        db: AsyncSession,
+        min_score: Optional[float] = None,
+        max_block_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Detectar duplicados entre todos los pacientes activos y guardar las sugerencias
+
+        - Las sugerencias pendientes se actualizan; las que ya no superan el
+          umbral se eliminan
+        - Los pares ya revisados (MERGED / REJECTED) no se modifican
+
+        Returns:
+            Resumen del job (pacientes, pares comparados, sugerencias y tiempos)
+        """
+        min_score = settings.dedup_min_score if min_score is None else min_score
+        max_block_size = settings.dedup_max_block_size if max_block_size is None else max_block_size
+        workers = settings.dedup_workers if workers is None else workers
+        timings = {}
+
+        started = time.perf_counter()
+        columns = await PatientDedupService.load_columns(db)
+        timings["load"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        pairs, oversized = candidate_pairs(columns, max_block_size)
+        timings["blocking"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        matches = await PatientDedupService.score(columns, pairs, min_score, workers)
+        timings["scoring"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        removed = 0
+        if not dry_run:
+            await PatientMergeSuggestionRepository.upsert_many(db, [
+                {"patient_id": patient_id, "duplicate_id": duplicate_id, "score": score, "reasons": reasons}
+                for patient_id, duplicate_id, score, reasons in matches
+            ])
+            removed = await PatientMergeSuggestionRepository.delete_stale_pending(db)
+            await db.commit()
+        timings["save"] = time.perf_counter() - started
+
+        summary = {
+            "patients": len(columns),
+            "candidate_pairs": len(pairs),
+            "oversized_blocks": oversized,
+            "suggestions": len(matches),
+            "stale_removed": removed,
+            "dry_run": dry_run,
+            "seconds": {phase: round(seconds, 2) for phase, seconds in timings.items()},
+        }
+        logger.info(f"Patient dedup: {summary}")
+        return summary
+
+    @staticmethod
+    async def get_suggestions(
+        db: AsyncSession,
+        page: int = 1,
+        page_size: int = 50,
+        suggestion_status: Optional[MergeSuggestionStatus] = MergeSuggestionStatus.PENDING,
+        min_score: Optional[float] = None
+    ) -> MergeSuggestionListResponse:
+        """Sugerencias de duplicados con los datos de ambos pacientes (una consulta en lote)"""
+        suggestions, total = await PatientMergeSuggestionRepository.get_all(
+            db, page, page_size, suggestion_status, min_score
+        )
+        patient_ids = {s.patient_id for s in suggestions} | {s.duplicate_id for s in suggestions}
+        patients = {
+            patient["id"]: PatientSummary(**patient)
+            for patient in await PatientRepository.get_many(db, ids=list(patient_ids))
+        }
+        return MergeSuggestionListResponse(
+            total=total,
+            page=page,
+            page_size=page_size,
+            suggestions=[
+                MergeSuggestionResponse(
+                    id=suggestion.id,
+                    score=suggestion.score,
+                    reasons=[reason for reason in suggestion.reasons.split(",") if reason],
+                    status=suggestion.status,
+                    patient=patients.get(suggestion.patient_id),
+                    duplicate=patients.get(suggestion.duplicate_id),
+                    created_at=suggestion.created_at,
+                    reviewed_at=suggestion.reviewed_at,
+                )
+                for suggestion in suggestions
+            ]
+        )
+
+    @staticmethod
+    async def review_suggestion(
+        db: AsyncSession,
+        suggestion_id: int,
+        data: MergeSuggestionReview
+    ) -> Dict[str, str]:
+        """
+        Registrar la revisión de una sugerencia
+
+        Los pares revisados no vuelven a sugerirse ni se modifican en las
+        siguientes ejecuciones del job.
+        """
+        suggestion = await PatientMergeSuggestionRepository.get_by_id(db, suggestion_id)
+        if not suggestion:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Sugerencia con ID {suggestion_id} no encontrada"
+            )
+
+        suggestion.status = data.status
+        suggestion.reviewed_at = func.now()
+        await PatientMergeSuggestionRepository.update(db, suggestion)
+        return {"message": f"Sugerencia {suggestion_id} marcada como {data.status.value}"}
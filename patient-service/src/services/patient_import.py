@@ -0,0 +1,308 @@
+"""
+Patient Import (carga masiva desde CSV o XLSX)
+
+- El archivo se lee por bloques (CSV) o en modo read_only (XLSX), sin cargarlo completo
+- Cada fila se valida con las mismas reglas que POST /patients (DNI 8 dígitos, RUC 11)
+- Los documentos ya registrados se detectan con una sola consulta (= ANY)
+- Los pacientes nuevos se insertan con INSERT multi-fila en una sola transacción
+"""
+import asyncio
+import codecs
+import csv
+import re
+import unicodedata
+from itertools import islice
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.patient import DocumentType, UserProvisioningStatus, normalize_search_text
+from src.repositories.patient import PatientRepository
+from src.schemas.patient import PatientCreate, PatientImportIssue, PatientImportResponse
+from src.services.user_provisioning import UserProvisioningWorker
+
+# Encabezados aceptados (normalizados: minúsculas, sin tildes, "_" como separador)
+COLUMN_ALIASES = {
+    "document_type": ("tipo_documento", "tipo_de_documento", "tipo_doc", "document_type"),
+    "document_number": (
+        "numero_documento", "numero_de_documento", "nro_documento", "no_documento", "n_documento",
+        "num_documento", "documento",
+        "document_number", "dni_ruc", "dni", "ruc",
+    ),
+    "first_name": ("nombres", "nombre", "first_name"),
+    "last_name": ("apellidos", "apellido", "last_name"),
+    "business_name": ("razon_social", "empresa", "business_name"),
+    "phone": ("telefono", "celular", "phone"),
+    "email": ("email", "correo", "correo_electronico", "e_mail"),
+    "address": ("direccion", "domicilio", "address"),
+}
+
+# Filas por lectura del XLSX en el thread pool
+XLSX_CHUNK_ROWS = 1000
+
+# Máximo de filas reportadas en errors / skipped_rows (los contadores son exactos)
+MAX_REPORTED_ISSUES = 1000
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+class ImportFormatError(ValueError):
+    """El archivo no se puede leer o no tiene la columna de documento"""
+
+
+def normalize_header(value: Any) -> str:
+    """'Nº Documento' -> 'n_documento'"""
+    folded = unicodedata.normalize("NFKD", str(value or "")).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub("_", folded.lower()).strip("_")
+
+
+def cell_to_text(value: Any) -> Optional[str]:
+    """Valor de celda como texto ('12345678.0' de Excel -> '12345678'); vacío -> None"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes], encoding: str = "utf-8-sig") -> AsyncIterator[Tuple[int, List[str]]]:
+    """
+    Filas del CSV (número de línea, campos) leyendo el archivo por bloques
+
+    El delimitador (',', ';' o tabulador) se detecta en la primera línea.
+    No admite saltos de línea dentro de campos entre comillas.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    delimiter: Optional[str] = None
+    line_number = 0
+
+    def rows(lines: List[str]):
+        nonlocal delimiter, line_number
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            if delimiter is None:
+                delimiter = max((";", ",", "\t"), key=line.count)
+            yield line_number, next(csv.reader([line], delimiter=delimiter))
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for row in rows([line.rstrip("\r") for line in lines]):
+            yield row
+
+    pending += decoder.decode(b"", final=True)
+    for row in rows([line.rstrip("\r") for line in pending.split("\n")]):
+        yield row
+
+
+async def iter_xlsx_rows(file: BinaryIO) -> AsyncIterator[Tuple[int, List[Any]]]:
+    """
+    Filas de la primera hoja del XLSX (número de fila, celdas)
+
+    openpyxl en modo read_only recorre la hoja sin cargarla completa; la
+    lectura se hace por bloques en un thread para no bloquear el event loop.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("La importación de XLSX requiere openpyxl")
+
+    try:
+        workbook = await asyncio.to_thread(load_workbook, file, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFormatError(f"No se pudo leer el archivo XLSX: {e}")
+
+    try:
+        rows = enumerate(workbook.worksheets[0].iter_rows(values_only=True), start=1)
+        while True:
+            chunk = await asyncio.to_thread(lambda: list(islice(rows, XLSX_CHUNK_ROWS)))
+            if not chunk:
+                return
+            for row_number, row in chunk:
+                if any(cell is not None and str(cell).strip() for cell in row):
+                    yield row_number, list(row)
+    finally:
+        workbook.close()
+
+
+class RowParser:
+    """Convierte una fila en PatientCreate según el encabezado"""
+
+    def __init__(self, header: List[Any]):
+        normalized = [normalize_header(column) for column in header]
+        self.columns: Dict[str, int] = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in normalized:
+                    self.columns[field] = normalized.index(alias)
+                    break
+
+        if "document_number" not in self.columns:
+            raise ImportFormatError(
+                "El archivo debe tener una columna de número de documento "
+                f"(encabezado recibido: {', '.join(str(column) for column in header if column is not None)})"
+            )
+
+    def parse(self, row: List[Any]) -> PatientCreate:
+        """
+        Raises:
+            ValidationError: si la fila no cumple las reglas de PatientCreate
+        """
+        data = {
+            field: cell_to_text(row[index]) if index < len(row) else None
+            for field, index in self.columns.items()
+        }
+        number = data.get("document_number") or ""
+        document_type = (data.get("document_type") or "").upper()
+        if not document_type:
+            # Sin tipo: se deduce de la longitud (RUC 11 dígitos, el resto DNI)
+            document_type = DocumentType.RUC.value if len(number) == 11 else DocumentType.DNI.value
+
+        raw_number = row[self.columns["document_number"]] if self.columns["document_number"] < len(row) else None
+        if document_type == DocumentType.DNI.value and isinstance(raw_number, (int, float)) and len(number) == 7:
+            # Celda numérica de Excel: se perdió el cero inicial del DNI
+            number = number.zfill(8)
+        data["document_type"] = document_type
+        data["document_number"] = number
+        return PatientCreate(**data)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in item['loc']) or 'fila'}: {item['msg'].removeprefix('Value error, ')}"
+        for item in error.errors()
+    )
+
+
+class PatientImportService:
+    """Carga masiva de pacientes"""
+
+    @staticmethod
+    async def import_patients(
+        db: AsyncSession,
+        rows: AsyncIterator[Tuple[int, List[Any]]],
+        created_by: Optional[int] = None,
+        dry_run: bool = False
+    ) -> PatientImportResponse:
+        """
+        Importar pacientes desde las filas de un archivo (la primera es el encabezado)
+
+        - Filas inválidas: se reportan en errors
+        - Documentos repetidos en el archivo o ya registrados: se omiten (skipped_rows)
+        - El resto se inserta en una sola transacción; los pacientes con email
+          quedan en la outbox de provisión de usuarios
+        - dry_run: valida y reporta sin insertar
+        """
+        parser: Optional[RowParser] = None
+        errors: List[PatientImportIssue] = []
+        skipped: List[PatientImportIssue] = []
+        failed = total = 0
+        valid: Dict[str, Tuple[int, PatientCreate]] = {}
+        skipped_count = 0
+
+        def skip(issue: PatientImportIssue) -> None:
+            nonlocal skipped_count
+            skipped_count += 1
+            if len(skipped) < MAX_REPORTED_ISSUES:
+                skipped.append(issue)
+
+        try:
+            async for row_number, row in rows:
+                if parser is None:
+                    parser = RowParser(row)
+                    continue
+
+                total += 1
+                try:
+                    patient = parser.parse(row)
+                except ValidationError as e:
+                    failed += 1
+                    if len(errors) < MAX_REPORTED_ISSUES:
+                        index = parser.columns["document_number"]
+                        errors.append(PatientImportIssue(
+                            row=row_number,
+                            document_number=cell_to_text(row[index]) if index < len(row) else None,
+                            message=_validation_message(e)
+                        ))
+                    continue
+
+                first = valid.get(patient.document_number)
+                if first is not None:
+                    skip(PatientImportIssue(
+                        row=row_number, document_number=patient.document_number,
+                        message=f"Documento repetido en el archivo (fila {first[0]})"
+                    ))
+                    continue
+                valid[patient.document_number] = (row_number, patient)
+        except ImportFormatError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if parser is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El archivo está vacío")
+
+        existing = await PatientRepository.get_existing_documents(db, list(valid))
+        for document_number in existing:
+            row_number, _ = valid.pop(document_number)
+            skip(PatientImportIssue(row=row_number, document_number=document_number, message="Documento ya registrado"))
+
+        created = len(valid)
+        if not dry_run and valid:
+            new_rows = [
+                {
+                    "document_type": patient.document_type,
+                    "document_number": patient.document_number,
+                    "first_name": patient.first_name,
+                    "last_name": patient.last_name,
+                    "business_name": patient.business_name,
+                    "phone": patient.phone,
+                    "email": patient.email,
+                    "address": patient.address,
+                    # Los INSERT de core no disparan el evento que calcula search_text
+                    "search_text": normalize_search_text(
+                        patient.first_name, patient.last_name, patient.business_name,
+                        patient.document_number, patient.email, patient.phone
+                    ),
+                    "is_recurrent": False,
+                    "visit_count": 0,
+                    "is_active": True,
+                    "user_provisioning_status": UserProvisioningStatus.PENDING if patient.email else None,
+                    "created_by": created_by,
+                }
+                for _, patient in valid.values()
+            ]
+            inserted = await PatientRepository.bulk_create(db, new_rows)
+            await db.commit()
+
+            # Registrados por otra petición entre la consulta y el INSERT
+            inserted_documents = {row["document_number"] for row in inserted}
+            for document_number, (row_number, _) in valid.items():
+                if document_number not in inserted_documents:
+                    skip(PatientImportIssue(
+                        row=row_number, document_number=document_number, message="Documento ya registrado"
+                    ))
+            created = len(inserted)
+            if any(row["email"] for row in new_rows):
+                UserProvisioningWorker.notify()
+
+        skipped.sort(key=lambda issue: issue.row)
+        logger.info(
+            f"Patient import{' (dry run)' if dry_run else ''}: {total} rows, {created} created, "
+            f"{skipped_count} skipped, {failed} failed"
+        )
+        return PatientImportResponse(
+            total_rows=total,
+            created=created,
+            skipped=skipped_count,
+            failed=failed,
+            dry_run=dry_run,
+            errors=errors,
+            skipped_rows=skipped
+        )
@@ -0,0 +1,190 @@
+"""
+User Provisioning Worker
+
+Crea en segundo plano los usuarios de los pacientes en user-service:
+- El alta del paciente solo inserta un job en la outbox (misma transacción)
+- El worker toma los jobs pendientes en lotes y los envía en una sola llamada
+  a POST /api/v1/internal/create-patient-users, con un cliente HTTP reutilizado
+- Los fallos de red o de user-service se reintentan con backoff exponencial;
+  los datos inválidos, los emails de cuentas que no son de paciente y los
+  jobs que agotan los intentos quedan como FAILED
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.repositories.patient import UserProvisioningRepository
+
+# Espera máxima entre reintentos de un job
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def build_user_payload(patient: Dict[str, Any]) -> Dict[str, Any]:
+    """Datos del usuario del paciente (contraseña temporal derivada del documento)"""
+    return {
+        "email": patient["email"],
+        "password": f"P{patient['document_number']}!",
+        "first_name": patient["first_name"] or "Usuario",
+        "last_name": patient["last_name"] or "Paciente",
+        "phone": patient["phone"],
+        "role_ids": [settings.patient_role_id],
+    }
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff exponencial: base, 2x base, 4x base... hasta MAX_RETRY_DELAY"""
+    delay = timedelta(seconds=settings.user_provisioning_retry_base_seconds * 2 ** max(attempts - 1, 0))
+    return min(delay, MAX_RETRY_DELAY)
+
+
+class UserProvisioningWorker:
+    """Worker de provisión de usuarios (una tarea asyncio por proceso)"""
+
+    _task: Optional[asyncio.Task] = None
+    _wakeup: Optional[asyncio.Event] = None
+    _client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def start(cls) -> None:
+        """Iniciar el worker (startup)"""
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._wakeup = asyncio.Event()
+        cls._client = httpx.AsyncClient(
+            base_url=settings.user_service_url,
+            timeout=settings.user_provisioning_timeout_seconds,
+            headers={"X-Internal-API-Key": settings.internal_api_key},
+        )
+        cls._task = asyncio.create_task(cls._run())
+        logger.info("User provisioning worker started")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Detener el worker (shutdown); los jobs en curso se retoman al vencer su lease"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+        logger.info("User provisioning worker stopped")
+
+    @classmethod
+    def notify(cls) -> None:
+        """Avisar que hay jobs nuevos (sin esperar al siguiente sondeo)"""
+        if cls._wakeup is not None:
+            cls._wakeup.set()
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            try:
+                processed = await cls.process_batch()
+            except Exception as e:
+                logger.error(f"User provisioning batch failed: {e}")
+                processed = 0
+
+            # Lote completo: probablemente quedan más pendientes
+            if processed >= settings.user_provisioning_batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(cls._wakeup.wait(), timeout=settings.user_provisioning_poll_seconds)
+                # Esperar un poco para agrupar las altas que llegan juntas
+                await asyncio.sleep(settings.user_provisioning_linger_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            cls._wakeup.clear()
+
+    @classmethod
+    async def process_batch(cls) -> int:
+        """
+        Procesar un lote de jobs vencidos
+
+        Returns:
+            Número de jobs tomados
+        """
+        async with AsyncSessionLocal() as db:
+            jobs = await UserProvisioningRepository.claim_batch(
+                db, settings.user_provisioning_batch_size, settings.user_provisioning_lease_seconds
+            )
+        if not jobs:
+            return 0
+
+        provisioned: List[Dict[str, Any]] = []
+        failed: List[Dict[str, Any]] = []
+        retries: List[Dict[str, Any]] = []
+        to_send = []
+        for job in jobs:
+            if job["patient"] is None or not job["patient"]["email"]:
+                failed.append({"job_id": job["id"], "patient_id": job["patient_id"], "error": "Paciente sin email"})
+            else:
+                to_send.append(job)
+
+        if to_send:
+            try:
+                response = await cls._client.post(
+                    "/api/v1/internal/create-patient-users",
+                    json={"users": [build_user_payload(job["patient"]) for job in to_send]},
+                )
+                response.raise_for_status()
+                results = response.json()["results"]
+            except httpx.HTTPStatusError as e:
+                error = f"user-service respondió {e.response.status_code}: {e.response.text[:200]}"
+                results = None
+            except httpx.HTTPError as e:
+                error = f"user-service no disponible: {e!r}"
+                results = None
+
+            if results is None:
+                logger.warning(f"User provisioning batch of {len(to_send)} will be retried: {error}")
+                for job in to_send:
+                    cls._retry_or_fail(job, error, retries, failed)
+            else:
+                for job, result in zip(to_send, results):
+                    if result["status"] in ("INVALID", "CONFLICT"):
+                        # CONFLICT: el email es de una cuenta de personal; no se vincula al paciente
+                        failed.append({
+                            "job_id": job["id"], "patient_id": job["patient_id"],
+                            "error": result.get("detail") or "Datos inválidos"
+                        })
+                    else:
+                        provisioned.append({
+                            "job_id": job["id"], "patient_id": job["patient_id"], "user_id": result["user_id"]
+                        })
+
+        async with AsyncSessionLocal() as db:
+            await UserProvisioningRepository.save_results(db, provisioned, failed, retries)
+
+        logger.info(
+            f"User provisioning batch: {len(provisioned)} provisioned, "
+            f"{len(failed)} failed, {len(retries)} to retry"
+        )
+        return len(jobs)
+
+    @staticmethod
+    def _retry_or_fail(
+        job: Dict[str, Any],
+        error: str,
+        retries: List[Dict[str, Any]],
+        failed: List[Dict[str, Any]]
+    ) -> None:
+        if job["attempts"] >= settings.user_provisioning_max_attempts:
+            failed.append({
+                "job_id": job["id"], "patient_id": job["patient_id"],
+                "error": f"Sin éxito tras {job['attempts']} intentos: {error}"
+            })
+        else:
+            retries.append({
+                "job_id": job["id"], "error": error,
+                "next_attempt_at": datetime.now(timezone.utc) + retry_delay(job["attempts"])
+            })
@@ -0,0 +1,7 @@
+"""
+Módulos compartidos por los microservicios
+
+Cada servicio lo recibe en /app/shared (contexto de build "shared" y volumen
+en docker-compose.yml); fuera de Docker, la raíz del repositorio debe estar en
+PYTHONPATH.
+"""
@@ -0,0 +1,47 @@
+"""
+Startup timing
+
+Común a todos los servicios: src/main.py de cada uno importa este módulo antes
+que todo lo demás. PROCESS_STARTED marca el inicio de la importación de la
+aplicación y StartupTimer mide cada fase del evento startup (esquema, workers,
+...). El resumen se registra en el log y se expone en el endpoint raíz.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+PROCESS_STARTED = time.perf_counter()
+
+
+class StartupTimer:
+    """Duración (ms) de la importación y de cada fase del arranque"""
+
+    _phases: Dict[str, float] = {}
+    _total: Optional[float] = None
+
+    @classmethod
+    def mark(cls, name: str, since: float = PROCESS_STARTED) -> None:
+        """Registrar una fase que empezó en `since` y termina ahora"""
+        cls._phases[name] = round((time.perf_counter() - since) * 1000, 1)
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name: str) -> Iterator[None]:
+        """Medir el bloque `with` como una fase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.mark(name, started)
+
+    @classmethod
+    def finish(cls) -> str:
+        """Cerrar la medición (fin del evento startup); retorna el resumen para el log"""
+        cls._total = round((time.perf_counter() - PROCESS_STARTED) * 1000, 1)
+        phases = ", ".join(f"{name} {ms:.0f} ms" for name, ms in cls._phases.items())
+        return f"Startup completed in {cls._total:.0f} ms ({phases})"
+
+    @classmethod
+    def report(cls) -> Dict:
+        """{"total_ms": ..., "phases_ms": {...}}"""
+        return {"total_ms": cls._total, "phases_ms": dict(cls._phases)}
@@ -0,0 +1,106 @@
+"""partition_audit_logs_by_month
+
+Revision ID: c9e5a7d3b1f8
+Revises: b4d8e2f1a6c3
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e5a7d3b1f8'
+down_revision: Union[str, None] = 'b4d8e2f1a6c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Particiones creadas por adelantado (luego las mantiene maintain_audit_partitions.py)
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, user_id, action, entity_type, entity_id, old_values, new_values, ip_address, user_agent, created_at"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER TABLE audit_logs_unpartitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_unpartitioned_pkey")
+    for index in ('ix_audit_logs_action', 'ix_audit_logs_created_at', 'ix_audit_logs_id', 'ix_audit_logs_user_id'):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+
+    # La clave primaria de una tabla particionada debe incluir la clave de partición
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id INTEGER REFERENCES users (id),
+            action VARCHAR(100) NOT NULL,
+            entity_type VARCHAR(50),
+            entity_id INTEGER,
+            old_values TEXT,
+            new_values TEXT,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(255),
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.create_index('ix_audit_logs_action', 'audit_logs', ['action'], unique=False)
+    op.create_index('ix_audit_logs_created_at', 'audit_logs', ['created_at'], unique=False)
+    op.create_index('ix_audit_logs_user_id', 'audit_logs', ['user_id'], unique=False)
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    # Una partición por mes (UTC) desde el registro más antiguo
+    oldest = op.get_bind().execute(sa.text(
+        "SELECT min(created_at) FROM audit_logs_unpartitioned"
+    )).scalar()
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    month = min(oldest.astimezone(timezone.utc).date().replace(day=1), current) if oldest else current
+    while month <= add_months(current, MONTHS_AHEAD):
+        next_month = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE audit_logs_p{month:%Y%m} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{next_month.isoformat()} 00:00:00+00')"
+        )
+        month = next_month
+
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_unpartitioned")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    # Los meses ya archivados (CSV gzip) no se restauran
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER INDEX ix_audit_logs_action RENAME TO ix_audit_logs_partitioned_action")
+    op.execute("ALTER INDEX ix_audit_logs_created_at RENAME TO ix_audit_logs_partitioned_created_at")
+    op.execute("ALTER INDEX ix_audit_logs_user_id RENAME TO ix_audit_logs_partitioned_user_id")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq') PRIMARY KEY,
+            user_id INTEGER REFERENCES users (id),
+            action VARCHAR(100) NOT NULL,
+            entity_type VARCHAR(50),
+            entity_id INTEGER,
+            old_values TEXT,
+            new_values TEXT,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(255),
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("DROP TABLE audit_logs_partitioned CASCADE")
+    op.create_index('ix_audit_logs_action', 'audit_logs', ['action'], unique=False)
+    op.create_index('ix_audit_logs_created_at', 'audit_logs', ['created_at'], unique=False)
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'], unique=False)
+    op.create_index('ix_audit_logs_user_id', 'audit_logs', ['user_id'], unique=False)
@@ -0,0 +1,42 @@
+"""roles_permissions_jsonb
+
+Revision ID: d2f6b8a4c0e7
+Revises: c9e5a7d3b1f8
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f6b8a4c0e7'
+down_revision: Union[str, None] = 'c9e5a7d3b1f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # El texto que no es una lista JSON válida queda como lista vacía (ya se ignoraba al leerlo)
+    op.execute("""
+        CREATE FUNCTION pg_temp.permissions_to_jsonb(value TEXT) RETURNS JSONB AS $$
+        BEGIN
+            IF value IS NULL THEN
+                RETURN NULL;
+            END IF;
+            IF jsonb_typeof(value::jsonb) = 'array' THEN
+                RETURN value::jsonb;
+            END IF;
+            RETURN '[]'::jsonb;
+        EXCEPTION WHEN others THEN
+            RETURN '[]'::jsonb;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("ALTER TABLE roles ALTER COLUMN permissions TYPE JSONB USING pg_temp.permissions_to_jsonb(permissions)")
+
+
+def downgrade() -> None:
+    op.alter_column('roles', 'permissions', type_=sa.Text(), postgresql_using='permissions::text')
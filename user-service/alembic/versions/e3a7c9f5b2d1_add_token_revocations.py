@@ -0,0 +1,38 @@
+"""add_token_revocations
+
+Revision ID: e3a7c9f5b2d1
+Revises: d2f6b8a4c0e7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c9f5b2d1'
+down_revision: Union[str, None] = 'd2f6b8a4c0e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'token_revocations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=32), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('issued_before', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('reason', sa.String(length=50), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_token_revocations_expires_at', 'token_revocations', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_token_revocations_expires_at', table_name='token_revocations')
+    op.drop_table('token_revocations')
@@ -0,0 +1,26 @@
+"""users_created_at_index
+
+Revision ID: f4b8d0e6c2a9
+Revises: e3a7c9f5b2d1
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8d0e6c2a9'
+down_revision: Union[str, None] = 'e3a7c9f5b2d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The user listing is ordered by (created_at, id) DESC: the index gives the page without sorting
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
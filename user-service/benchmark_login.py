@@ -0,0 +1,128 @@
+"""
+Login load benchmark for user-service
+
+Fires concurrent POST /api/v1/auth/login requests and reports latency,
+throughput, event loop lag (in-process mode), the bcrypt pool metrics and
+the audit log writer metrics.
+The benchmark users (bench-login-N@bench.labclinico.com) are created on the first
+run and reused afterwards.
+
+Usage:
+    python benchmark_login.py [--users=20] [--requests=200] [--concurrency=50] [--url=http://localhost:8001]
+
+Without --url the app runs in this process (httpx ASGI transport), which
+also measures how long the event loop was blocked.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import httpx
+from sqlalchemy import select
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.core.security import PasswordHasher, hash_password
+from src.models.user import User
+
+BENCH_PASSWORD = "Bench-login-1"
+
+
+def option(name: str, default):
+    """Value of --name=value, or default"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return type(default)(arg.split("=", 1)[1]) if default is not None else arg.split("=", 1)[1]
+    return default
+
+
+async def ensure_users(count: int) -> list:
+    """Emails of the benchmark users (missing ones are created with one shared hash)"""
+    emails = [f"bench-login-{i}@bench.labclinico.com" for i in range(count)]
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.email).where(User.email.in_(emails)))
+        existing = set(result.scalars().all())
+        missing = [email for email in emails if email not in existing]
+        if missing:
+            password_hash = hash_password(BENCH_PASSWORD)
+            db.add_all([
+                User(email=email, password_hash=password_hash, first_name="Bench", last_name="Login", is_active=True)
+                for email in missing
+            ])
+            await db.commit()
+    return emails
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list, interval: float = 0.01) -> None:
+    """Delay of a periodic timer: how long the event loop could not run other tasks"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+
+async def main():
+    users = option("users", 20)
+    total = option("requests", 200)
+    concurrency = option("concurrency", 50)
+    url = option("url", None)
+
+    emails = await ensure_users(users)
+
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=120.0)
+    else:
+        from src.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120.0)
+
+    latencies, statuses = [], {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/auth/login", json={"email": emails[i % len(emails)], "password": BENCH_PASSWORD}
+            )
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    stop, lag = asyncio.Event(), []
+    lag_task = asyncio.create_task(measure_loop_lag(stop, lag))
+    started = time.perf_counter()
+    async with client:
+        await asyncio.gather(*(login(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await lag_task
+
+    print(
+        f"{total} logins, concurrency {concurrency}, bcrypt rounds {settings.bcrypt_rounds}, "
+        f"{settings.password_hash_workers} hash workers: {elapsed:.1f}s ({total / elapsed:.1f} logins/s)"
+    )
+    print(f"Status: {statuses}")
+    print(
+        f"Latency: p50 {percentile(latencies, 0.5):.2f}s, p95 {percentile(latencies, 0.95):.2f}s, "
+        f"max {max(latencies):.2f}s"
+    )
+    if not url:
+        print(f"Event loop lag: p95 {percentile(lag, 0.95) * 1000:.0f}ms, max {max(lag, default=0) * 1000:.0f}ms")
+        print(f"Hash pool: {PasswordHasher.metrics()}")
+        # Without the app lifespan nothing else flushes the queued LOGIN events
+        from src.services.audit import AuditLogWriter
+        await AuditLogWriter.stop()
+        print(f"Audit log: {AuditLogWriter.metrics()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
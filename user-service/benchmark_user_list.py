@@ -0,0 +1,191 @@
+"""
+User listing benchmark for user-service
+
+Times GET /api/v1/users pages with the projected query (one query with
+array_agg of role names, bulk validation) against the previous approach (full
+User objects with selectinload of user_roles -> role and an exact count over
+a subquery), for several filters and page depths.
+The benchmark users (bench-list-N@bench.labclinico.com, one role each) are
+created on the first run and reused afterwards.
+
+Usage:
+    python benchmark_user_list.py [--users=100000] [--repeat=20] [--page-size=50] [--cleanup]
+
+    --cleanup  delete the benchmark users and exit
+"""
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import httpx
+from sqlalchemy import select, delete, func, or_
+from sqlalchemy.orm import selectinload
+
+from src.core.database import AsyncSessionLocal
+from src.core.permissions import PermissionCache
+from src.core.security import create_access_token, hash_password
+from src.models.user import User, Role, UserRole
+from src.schemas.user import UserResponse
+from src.services.user import UserService
+
+EMAIL_DOMAIN = "@bench.labclinico.com"
+EMAIL_PREFIX = "bench-list-"
+CHUNK_SIZE = 5000
+
+
+def option(name: str, default):
+    """Value of --name=value, or default"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return type(default)(arg.split("=", 1)[1]) if default is not None else arg.split("=", 1)[1]
+    return default
+
+
+async def ensure_users(count: int) -> None:
+    """Create the missing benchmark users (multi-row inserts, one shared hash, one role each)"""
+    async with AsyncSessionLocal() as db:
+        existing = (await db.execute(
+            select(func.count(User.id)).where(User.email.like(f"{EMAIL_PREFIX}%{EMAIL_DOMAIN}"))
+        )).scalar()
+        if existing >= count:
+            return
+        role_ids = list((await db.execute(select(Role.id).order_by(Role.id))).scalars())
+        password_hash = hash_password("Bench-list-1")
+        started = time.perf_counter()
+        for first in range(existing, count, CHUNK_SIZE):
+            numbers = range(first, min(first + CHUNK_SIZE, count))
+            result = await db.execute(
+                User.__table__.insert().returning(User.id),
+                [
+                    {
+                        "email": f"{EMAIL_PREFIX}{i}{EMAIL_DOMAIN}",
+                        "password_hash": password_hash,
+                        "first_name": f"Bench{i}",
+                        "last_name": "List",
+                        "is_active": i % 10 != 0,
+                        "location_id": i % 5 + 1,
+                    }
+                    for i in numbers
+                ]
+            )
+            user_ids = list(result.scalars())
+            if role_ids:
+                await db.execute(
+                    UserRole.__table__.insert(),
+                    [{"user_id": user_id, "role_id": role_ids[user_id % len(role_ids)]} for user_id in user_ids]
+                )
+            await db.commit()
+        print(f"Created {count - existing} benchmark users in {time.perf_counter() - started:.1f}s")
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as db:
+        bench_ids = select(User.id).where(User.email.like(f"{EMAIL_PREFIX}%{EMAIL_DOMAIN}"))
+        await db.execute(delete(UserRole).where(UserRole.user_id.in_(bench_ids)))
+        result = await db.execute(delete(User).where(User.email.like(f"{EMAIL_PREFIX}%{EMAIL_DOMAIN}")))
+        await db.commit()
+    print(f"Deleted {result.rowcount} benchmark users")
+
+
+async def legacy_page(db, page: int, page_size: int, search=None, role_id=None, is_active=None) -> int:
+    """Previous implementation: ORM objects + selectinload + count over a subquery"""
+    query = select(User).options(selectinload(User.user_roles).selectinload(UserRole.role))
+    if search:
+        query = query.where(or_(
+            User.email.ilike(f"%{search}%"), User.first_name.ilike(f"%{search}%"), User.last_name.ilike(f"%{search}%")
+        ))
+    if role_id is not None:
+        query = query.join(User.user_roles).where(UserRole.role_id == role_id)
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar() or 0
+    query = query.order_by(User.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
+    users = list((await db.execute(query)).unique().scalars().all())
+
+    await PermissionCache.ensure_loaded(db, {ur.role_id for user in users for ur in user.user_roles})
+    responses = []
+    for user in users:
+        active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
+        responses.append(UserResponse(
+            id=user.id, email=user.email, first_name=user.first_name, last_name=user.last_name,
+            phone=user.phone, location_id=user.location_id, is_active=user.is_active,
+            roles=[role.name for role in active_roles],
+            permissions=PermissionCache.permissions_of(role.id for role in active_roles),
+            created_at=user.created_at, updated_at=user.updated_at
+        ))
+    return total
+
+
+async def projected_page(db, page: int, page_size: int, include_total: bool = True, **filters) -> int:
+    result = await UserService.get_all_users(db, page=page, page_size=page_size, include_total=include_total, **filters)
+    return result.total
+
+
+async def timed(function, repeat: int, *args, **kwargs) -> tuple:
+    """(median ms, p95 ms, result) of `repeat` calls, each in a new session"""
+    samples, value = [], None
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            value = await function(db, *args, **kwargs)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(0.95 * len(samples)))], value
+
+
+async def main():
+    if "--cleanup" in sys.argv:
+        await cleanup()
+        return
+
+    users = option("users", 100000)
+    repeat = option("repeat", 20)
+    page_size = option("page-size", 50)
+    await ensure_users(users)
+
+    async with AsyncSessionLocal() as db:
+        total_users = (await db.execute(select(func.count(User.id)))).scalar()
+        first_role = (await db.execute(select(func.min(Role.id)))).scalar()
+    deep_page = max(1, total_users // page_size // 2)
+    scenarios = [
+        ("page 1", {"page": 1}),
+        (f"page {deep_page}", {"page": deep_page}),
+        ("search 'bench99'", {"page": 1, "search": "bench99"}),
+        (f"role {first_role}", {"page": 1, "role_id": first_role}),
+        ("inactive", {"page": 1, "is_active": False}),
+    ]
+
+    print(f"{total_users} users, page size {page_size}, {repeat} runs per case (median / p95 ms)")
+    print(f"{'case':<22}{'previous':>18}{'projected':>18}{'no count':>18}")
+    for name, filters in scenarios:
+        page = filters.pop("page")
+        legacy = await timed(legacy_page, repeat, page, page_size, **filters)
+        projected = await timed(projected_page, repeat, page, page_size, **filters)
+        no_count = await timed(projected_page, repeat, page, page_size, include_total=False, **filters)
+        assert legacy[2] == projected[2], f"{name}: totals differ ({legacy[2]} != {projected[2]})"
+        print(
+            f"{name:<22}{legacy[0]:>10.2f} / {legacy[1]:<6.2f}{projected[0]:>10.2f} / {projected[1]:<6.2f}"
+            f"{no_count[0]:>10.2f} / {no_count[1]:<6.2f}"
+        )
+
+    # Whole endpoint (routing, auth, serialization) in this process
+    from src.main import app
+    token = create_access_token({"user_id": 1, "email": "bench", "roles": ["Administrador General"], "permissions": []})
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for params in ({"page_size": page_size}, {"page_size": page_size, "include_total": "false"}):
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = await client.get("/api/v1/users", params=params, headers={"Authorization": f"Bearer {token}"})
+                samples.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+            print(f"GET /api/v1/users {params}: median {statistics.median(samples):.2f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
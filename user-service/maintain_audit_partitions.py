@@ -0,0 +1,63 @@
+"""
+Audit log partition maintenance for user-service
+
+- Creates the monthly partitions of audit_logs for the current month and the
+  next AUDIT_PARTITION_MONTHS_AHEAD months
+- Detaches the partitions older than AUDIT_RETENTION_MONTHS, exports each one
+  to AUDIT_ARCHIVE_DIR/audit_logs_pYYYYMM.csv.gz and drops it once the file
+  row count matches
+
+Run it daily (cron or a scheduled container); it is idempotent.
+
+Usage:
+    python maintain_audit_partitions.py [--months-ahead=3] [--retention-months=24] [--archive-dir=archive/audit_logs] [--dry-run]
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from loguru import logger
+
+from src.core.config import settings
+from src.core.database import engine
+from src.services.audit_partitions import AuditPartitionService
+
+
+def option(name: str, default):
+    """Value of --name=value, or default"""
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return type(default)(arg.split("=", 1)[1]) if default is not None else arg.split("=", 1)[1]
+    return default
+
+
+async def main():
+    months_ahead = option("months-ahead", settings.audit_partition_months_ahead)
+    retention_months = option("retention-months", settings.audit_retention_months)
+    archive_dir = option("archive-dir", settings.audit_archive_dir)
+    dry_run = "--dry-run" in sys.argv
+
+    try:
+        if dry_run:
+            logger.info("Dry run: no partition is created, detached or dropped")
+        else:
+            created = await AuditPartitionService.ensure_partitions(months_ahead)
+            logger.info(f"Partitions created: {', '.join(created) or 'none'}")
+
+        archived = await AuditPartitionService.archive_expired(retention_months, archive_dir, dry_run=dry_run)
+        for item in archived:
+            target = item["file"] or "(dry run)"
+            logger.info(f"{item['partition']} ({item['month']:%Y-%m}): {item['rows']} rows -> {target}")
+        logger.success(
+            f"{len(archived)} partitions {'to archive' if dry_run else 'archived'} "
+            f"(retention {retention_months} months)"
+        )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
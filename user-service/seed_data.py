@@ -37,32 +37,32 @@ async def create_roles(session: AsyncSession) -> dict[str, Role]:
         {
             "name": "Administrador General",
             "description": "Acceso completo al sistema, gestión de usuarios, configuraciones y permisos",
-            "permissions": '["all"]'
+            "permissions": ["all"]
         },
         {
             "name": "Recepcionista",
             "description": "Registro de pacientes, creación de órdenes, gestión de pagos",
-            "permissions": '["patients:read", "patients:write", "orders:read", "orders:write", "billing:read", "billing:write"]'
+            "permissions": ["patients:read", "patients:write", "orders:read", "orders:write", "billing:read", "billing:write"]
         },
         {
             "name": "Supervisor de Sede",
             "description": "Supervisión de operaciones, reportes, conciliación diaria",
-            "permissions": '["patients:read", "orders:read", "billing:read", "reports:read", "reconciliation:read", "reconciliation:write"]'
+            "permissions": ["patients:read", "orders:read", "billing:read", "reports:read", "reconciliation:read", "reconciliation:write"]
         },
         {
             "name": "Laboratorista",
             "description": "Gestión de resultados de laboratorio, integración con LIS",
-            "permissions": '["orders:read", "lab:read", "lab:write"]'
+            "permissions": ["orders:read", "lab:read", "lab:write"]
         },
         {
             "name": "Contador",
             "description": "Gestión de facturación, reportes contables",
-            "permissions": '["billing:read", "billing:write", "reports:read"]'
+            "permissions": ["billing:read", "billing:write", "reports:read"]
         },
         {
             "name": "Paciente",
             "description": "Acceso a resultados de laboratorio, historial de órdenes",
-            "permissions": '["results:read", "orders:read"]'
+            "permissions": ["results:read", "orders:read"]
         }
     ]
 
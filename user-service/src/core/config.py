@@ -17,12 +17,36 @@ class Settings(BaseSettings):
     # Database
     database_url: str = Field(..., env="DATABASE_URL")
     db_echo: bool = Field(default=False, env="DB_ECHO")
+    # auto | alembic | create_all | off (ver prepare_schema en src/core/database.py)
+    schema_startup_mode: str = Field(default="auto", env="SCHEMA_STARTUP_MODE")
 
     # Security
     secret_key: str = Field(..., env="SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     access_token_expire_minutes: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
+    refresh_token_expire_days: int = Field(default=14, env="REFRESH_TOKEN_EXPIRE_DAYS")
     internal_api_key: str = Field(default="a-super-secret-internal-key", env="INTERNAL_API_KEY")
+    # Revocación de access tokens (lista en memoria sincronizada desde token_revocations)
+    token_revocation_sync_seconds: float = Field(default=2.0, gt=0, env="TOKEN_REVOCATION_SYNC_SECONDS")
+    token_revocation_lookback_seconds: float = Field(default=10.0, ge=0, env="TOKEN_REVOCATION_LOOKBACK_SECONDS")
+
+    # Password hashing (bcrypt en un pool de threads acotado)
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31, env="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default=4, ge=1, env="PASSWORD_HASH_WORKERS")
+    password_hash_queue_timeout_seconds: float = Field(default=10.0, env="PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS")
+
+    # Caché de permisos por rol (se invalida al modificar roles; el TTL sincroniza otros procesos)
+    permission_cache_ttl_seconds: float = Field(default=60.0, env="PERMISSION_CACHE_TTL_SECONDS")
+
+    # Audit log (eventos en memoria, insertados por lotes)
+    audit_flush_interval_ms: int = Field(default=200, ge=1, env="AUDIT_FLUSH_INTERVAL_MS")
+    audit_flush_batch_size: int = Field(default=500, ge=1, env="AUDIT_FLUSH_BATCH_SIZE")
+    audit_queue_max_events: int = Field(default=50000, ge=1, env="AUDIT_QUEUE_MAX_EVENTS")
+    # Particiones mensuales de audit_logs (maintain_audit_partitions.py)
+    audit_partition_months_ahead: int = Field(default=3, ge=1, env="AUDIT_PARTITION_MONTHS_AHEAD")
+    audit_retention_months: int = Field(default=24, ge=1, env="AUDIT_RETENTION_MONTHS")
+    audit_archive_dir: str = Field(default="archive/audit_logs", env="AUDIT_ARCHIVE_DIR")
+    audit_query_max_days: int = Field(default=366, ge=1, env="AUDIT_QUERY_MAX_DAYS")
 
     # CORS
     cors_origins: List[str] = Field(
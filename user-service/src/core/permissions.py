@@ -1,3 +1,14 @@
+"""
+Permisos del sistema y caché compilada de permisos por rol
+"""
+import time
+from typing import Dict, Iterable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.repositories.role import RoleRepository
+
 AVAILABLE_PERMISSIONS = [
     {"id": "all", "name": "Acceso Total"},
     {"id": "patients:read", "name": "Ver Pacientes"},
@@ -13,3 +24,79 @@ AVAILABLE_PERMISSIONS = [
     {"id": "lab:write", "name": "Crear/Editar Laboratorio"},
     {"id": "results:read", "name": "Ver Resultados"},
 ]
+
+
+class PermissionCache:
+    """
+    Permisos de los roles compilados a bitsets (uno por rol)
+
+    - Cada permiso tiene una posición de bit; los de AVAILABLE_PERMISSIONS
+      ocupan siempre las primeras posiciones
+    - Los permisos de un usuario son el OR de los bitsets de sus roles; la
+      lista de nombres de cada combinación se arma una sola vez
+    - Se recarga (una consulta) al vencer PERMISSION_CACHE_TTL_SECONDS, al
+      pedir un rol desconocido o tras invalidate() (RoleService al crear,
+      modificar o eliminar un rol); el TTL acota el desfase entre procesos
+    """
+
+    _bits: Dict[str, int] = {}
+    _names: List[str] = []
+    _role_masks: Dict[int, int] = {}
+    _decoded: Dict[int, List[str]] = {}
+    _expires_at = 0.0
+    _version = 0
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Descartar el mapa compilado (se recarga en el siguiente uso)"""
+        cls._version += 1
+        cls._expires_at = 0.0
+
+    @classmethod
+    async def ensure_loaded(cls, db: AsyncSession, role_ids: Iterable[int] = ()) -> None:
+        """Cargar el mapa si no está vigente o no conoce alguno de los roles"""
+        if time.monotonic() < cls._expires_at and all(role_id in cls._role_masks for role_id in role_ids):
+            return
+
+        version = cls._version
+        rows = await RoleRepository.get_all_permissions(db)
+        bits = {permission["id"]: position for position, permission in enumerate(AVAILABLE_PERMISSIONS)}
+        role_masks = {}
+        for role_id, permissions in rows:
+            mask = 0
+            for permission in permissions if isinstance(permissions, list) else ():
+                mask |= 1 << bits.setdefault(permission, len(bits))
+            role_masks[role_id] = mask
+
+        cls._bits = bits
+        cls._names = list(bits)
+        cls._role_masks = role_masks
+        cls._decoded = {}
+        # Una invalidación durante la consulta obliga a recargar en el siguiente uso
+        if version == cls._version:
+            cls._expires_at = time.monotonic() + settings.permission_cache_ttl_seconds
+
+    @classmethod
+    def mask_of(cls, role_ids: Iterable[int]) -> int:
+        """OR de los bitsets de los roles (los desconocidos no aportan permisos)"""
+        mask = 0
+        for role_id in role_ids:
+            mask |= cls._role_masks.get(role_id, 0)
+        return mask
+
+    @classmethod
+    def permissions_of(cls, role_ids: Iterable[int]) -> List[str]:
+        """Permisos de un conjunto de roles (requiere ensure_loaded)"""
+        mask = cls.mask_of(role_ids)
+        names = cls._decoded.get(mask)
+        if names is None:
+            names = [name for position, name in enumerate(cls._names) if mask >> position & 1]
+            cls._decoded[mask] = names
+        return list(names)
+
+    @classmethod
+    async def get_permissions(cls, db: AsyncSession, role_ids: Iterable[int]) -> List[str]:
+        """Permisos de un conjunto de roles (carga el mapa si hace falta)"""
+        role_ids = list(role_ids)
+        await cls.ensure_loaded(db, role_ids)
+        return cls.permissions_of(role_ids)
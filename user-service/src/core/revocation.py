@@ -0,0 +1,148 @@
+"""
+Lista en memoria de access tokens revocados (sincronizada desde token_revocations)
+"""
+import asyncio
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.models.user import TokenRevocation
+from src.repositories.revocation import TokenRevocationRepository
+
+
+def revocation_entry(revocation: TokenRevocation) -> Dict[str, Any]:
+    """Fila de token_revocations -> entrada de la lista (fechas como epoch)"""
+    return {
+        "id": revocation.id,
+        "jti": revocation.jti,
+        "user_id": revocation.user_id,
+        "issued_before": revocation.issued_before.timestamp() if revocation.issued_before else None,
+        "expires_at": revocation.expires_at.timestamp(),
+    }
+
+
+class TokenRevocationList:
+    """
+    Revocaciones vigentes en memoria, consultadas al validar cada JWT
+
+    - _jtis: jti -> exp de cada token revocado
+    - _users: user_id -> (issued_before, expires_at); revoca los tokens del
+      usuario con iat anterior a issued_before
+    - El caso común (token no revocado) son dos búsquedas en diccionarios,
+      sin red ni base de datos
+    - Una tarea asyncio trae cada TOKEN_REVOCATION_SYNC_SECONDS las filas
+      nuevas (id > cursor); las revocaciones hechas en este proceso se
+      aplican de inmediato
+    """
+
+    _jtis: Dict[str, float] = {}
+    _users: Dict[int, Tuple[float, float]] = {}
+    _cursor = 0
+    _task: Optional[asyncio.Task] = None
+    _synced_at = 0.0
+    _syncs = 0
+    _failed_syncs = 0
+
+    @classmethod
+    def is_revoked(cls, payload: Dict[str, Any]) -> bool:
+        """True si el jti del token está revocado o el token es anterior a la revocación de su usuario"""
+        jti = payload.get("jti")
+        if jti is not None and jti in cls._jtis:
+            return True
+        user = cls._users.get(payload.get("user_id"))
+        if user is None:
+            return False
+        # Tokens emitidos antes de incluir iat también quedan revocados
+        issued_at = payload.get("iat")
+        return issued_at is None or issued_at < user[0]
+
+    @classmethod
+    def apply(cls, entries: Iterable[Dict[str, Any]]) -> None:
+        """Agregar revocaciones (idempotente: la misma fila puede llegar más de una vez)"""
+        for entry in entries:
+            if entry["jti"]:
+                cls._jtis[entry["jti"]] = entry["expires_at"]
+            if entry["user_id"] is not None and entry["issued_before"] is not None:
+                current = cls._users.get(entry["user_id"])
+                if current is None or entry["issued_before"] >= current[0]:
+                    cls._users[entry["user_id"]] = (entry["issued_before"], entry["expires_at"])
+
+    @classmethod
+    def prune(cls) -> None:
+        """Descartar las revocaciones de tokens ya expirados"""
+        now = time.time()
+        cls._jtis = {jti: expires_at for jti, expires_at in cls._jtis.items() if expires_at > now}
+        cls._users = {user_id: user for user_id, user in cls._users.items() if user[1] > now}
+
+    @classmethod
+    async def sync(cls) -> int:
+        """
+        Traer de la base las revocaciones nuevas
+
+        Returns:
+            Número de filas recibidas
+        """
+        async with AsyncSessionLocal() as db:
+            revocations, last_id = await TokenRevocationRepository.get_since(
+                db, cls._cursor, settings.token_revocation_lookback_seconds
+            )
+        if last_id < cls._cursor:
+            # La tabla se recreó: se vuelve a cargar completa
+            cls._jtis, cls._users, cls._cursor = {}, {}, 0
+            return await cls.sync()
+
+        cls.apply(revocation_entry(revocation) for revocation in revocations)
+        cls.prune()
+        cls._cursor = last_id
+        cls._synced_at = time.time()
+        cls._syncs += 1
+        return len(revocations)
+
+    @classmethod
+    async def start(cls) -> None:
+        """Carga inicial e inicio de la sincronización periódica (startup)"""
+        try:
+            await cls.sync()
+        except Exception as e:
+            cls._failed_syncs += 1
+            logger.error(f"Could not load the token revocation list: {e}")
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._run())
+        logger.info(f"Token revocation list loaded ({len(cls._jtis)} tokens, {len(cls._users)} users)")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Detener la sincronización (shutdown)"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            await asyncio.sleep(settings.token_revocation_sync_seconds)
+            try:
+                await cls.sync()
+            except Exception as e:
+                cls._failed_syncs += 1
+                logger.error(f"Token revocation sync failed (keeping the last list): {e}")
+
+    @classmethod
+    def metrics(cls) -> Dict[str, Any]:
+        """Size and sync state of the list"""
+        return {
+            "revoked_tokens": len(cls._jtis),
+            "revoked_users": len(cls._users),
+            "cursor": cls._cursor,
+            "syncs": cls._syncs,
+            "failed_syncs": cls._failed_syncs,
+            "seconds_since_sync": round(time.time() - cls._synced_at, 3) if cls._synced_at else None,
+            "sync_seconds": settings.token_revocation_sync_seconds,
+        }
@@ -1,8 +1,14 @@
 """
-Security utilities for JWT authentication
+Security utilities for JWT authentication and password hashing
 """
+import asyncio
+import re
+import secrets
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends, Header
@@ -10,27 +16,170 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from loguru import logger
 
 from src.core.config import settings
+from src.core.revocation import TokenRevocationList
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-# Context para hashing de passwords
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Context para hashing de passwords (costo configurable con BCRYPT_ROUNDS)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+# Costo de un hash bcrypt: $2b$<rounds>$...
+_BCRYPT_COST = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password using bcrypt (blocking: use PasswordHasher inside async code)"""
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (blocking: use PasswordHasher inside async code)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a bcrypt cost other than BCRYPT_ROUNDS"""
+    match = _BCRYPT_COST.match(hashed_password or "")
+    return match is None or int(match.group(1)) != settings.bcrypt_rounds
+
+
+class PasswordHasher:
+    """
+    bcrypt fuera del event loop, con concurrencia acotada
+
+    - Un pool de PASSWORD_HASH_WORKERS threads (bcrypt libera el GIL, los
+      hashes corren en paralelo)
+    - Un semáforo con la misma capacidad: las operaciones esperan su turno en
+      orden y el tiempo de espera (cola) se mide por separado del tiempo de bcrypt
+    - Si la espera supera PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS se responde 503
+      en lugar de acumular peticiones
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+    _waiting = 0
+    _running = 0
+    _completed: Dict[str, int] = {"hash": 0, "verify": 0}
+    _rejected = 0
+    _queue_seconds_total = 0.0
+    _queue_seconds_max = 0.0
+    _run_seconds_total = 0.0
+    _recent_queue_seconds: deque = deque(maxlen=1000)
+
+    @classmethod
+    def _slots(cls) -> Tuple[ThreadPoolExecutor, asyncio.Semaphore]:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt"
+            )
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(settings.password_hash_workers)
+        return cls._executor, cls._semaphore
+
+    @classmethod
+    async def _run(cls, operation: str, function, *args):
+        executor, semaphore = cls._slots()
+        queued_at = time.perf_counter()
+        cls._waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=settings.password_hash_queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            cls._rejected += 1
+            logger.warning(f"Password {operation} rejected after {time.perf_counter() - queued_at:.1f}s in queue")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servicio ocupado, intente nuevamente en unos segundos",
+                headers={"Retry-After": "5"},
+            )
+        finally:
+            cls._waiting -= 1
+
+        started = time.perf_counter()
+        queue_seconds = started - queued_at
+        cls._queue_seconds_total += queue_seconds
+        cls._queue_seconds_max = max(cls._queue_seconds_max, queue_seconds)
+        cls._recent_queue_seconds.append(queue_seconds)
+        cls._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+        finally:
+            cls._running -= 1
+            cls._run_seconds_total += time.perf_counter() - started
+            cls._completed[operation] += 1
+            semaphore.release()
+
+    @classmethod
+    async def hash(cls, password: str) -> str:
+        """Hash a password in the pool"""
+        return await cls._run("hash", hash_password, password)
+
+    @classmethod
+    async def hash_many(cls, passwords: List[str]) -> List[str]:
+        """
+        Hash several passwords one after another
+
+        Cada hash vuelve a la cola, así un lote ocupa a lo sumo un thread y
+        los logins concurrentes no esperan a que termine.
+        """
+        return [await cls.hash(password) for password in passwords]
+
+    @classmethod
+    async def verify(cls, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in the pool"""
+        return await cls._run("verify", verify_password, plain_password, hashed_password)
+
+    @classmethod
+    async def verify_and_rehash(cls, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and, if it is valid but was hashed with another
+        bcrypt cost, return a new hash with the current BCRYPT_ROUNDS
+
+        Returns:
+            (valid, new hash or None)
+        """
+        if not await cls.verify(plain_password, hashed_password):
+            return False, None
+        if password_needs_rehash(hashed_password):
+            return True, await cls.hash(plain_password)
+        return True, None
+
+    @classmethod
+    def metrics(cls) -> Dict[str, Any]:
+        """Queue and execution metrics since startup"""
+        completed = sum(cls._completed.values())
+        recent = sorted(cls._recent_queue_seconds)
+
+        def percentile(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 4) if recent else 0.0
+
+        return {
+            "workers": settings.password_hash_workers,
+            "bcrypt_rounds": settings.bcrypt_rounds,
+            "running": cls._running,
+            "waiting": cls._waiting,
+            "completed": dict(cls._completed),
+            "rejected": cls._rejected,
+            "queue_seconds_avg": round(cls._queue_seconds_total / completed, 4) if completed else 0.0,
+            "queue_seconds_p50": percentile(0.50),
+            "queue_seconds_p95": percentile(0.95),
+            "queue_seconds_max": round(cls._queue_seconds_max, 4),
+            "run_seconds_avg": round(cls._run_seconds_total / completed, 4) if completed else 0.0,
+        }
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Stop the pool threads (shutdown)"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+        cls._semaphore = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token"""
+    """Create a JWT access token (with jti and a sub-second iat, used for revocation)"""
     to_encode = data.copy()
 
     if expires_delta:
@@ -38,7 +187,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": round(time.time(), 3), "jti": secrets.token_hex(16)})
 
     encoded_jwt = jwt.encode(
         to_encode,
@@ -50,14 +199,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_access_token(token: str) -> dict:
-    """Decode and validate a JWT token"""
+    """Decode and validate a JWT token (signature, expiry and revocation list)"""
     try:
         payload = jwt.decode(
             token,
             settings.secret_key,
             algorithms=[settings.jwt_algorithm]
         )
-        return payload
     except JWTError as e:
         logger.error(f"JWT decode error: {e}")
         raise HTTPException(
@@ -66,6 +214,14 @@ def decode_access_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if TokenRevocationList.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revocado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
 
 def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
     """
@@ -111,6 +267,21 @@ def get_current_user_payload(credentials: HTTPAuthorizationCredentials = Depends
     return decode_access_token(token)
 
 
+def get_optional_user_payload(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[Dict[str, Any]]:
+    """
+    Dependency for public endpoints: payload of the Bearer token if one was
+    sent and it is valid, None otherwise
+    """
+    if credentials is None:
+        return None
+    try:
+        return decode_access_token(credentials.credentials)
+    except HTTPException:
+        return None
+
+
 def require_roles(*required_roles: str):
     """
     Dependency factory to check if user has required roles
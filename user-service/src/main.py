@@ -2,13 +2,19 @@
 User Service Main Application
 FastAPI application for user management and authentication
 """
+from shared.startup import StartupTimer  # primero: mide la importación de la aplicación
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 import sys
 
 from src.core.config import settings
-from src.core.database import create_tables
+from src.core.database import prepare_schema
+from src.core.security import PasswordHasher
+from src.core.revocation import TokenRevocationList
+from src.services.audit import AuditLogWriter
+from src.services.audit_partitions import AuditPartitionService
 
 # Configure logger
 logger.remove()
@@ -49,15 +55,31 @@ async def startup_event():
     logger.info(f"Starting {settings.service_name} on port {settings.port}")
     logger.info(f"Environment: {settings.environment}")
 
-    # Create tables
-    await create_tables()
-    logger.info("Database tables created successfully")
+    # Esquema: una consulta al head de Alembic (create_all solo si hace falta)
+    with StartupTimer.phase("schema"):
+        schema = await prepare_schema()
+    logger.info(f"Database schema: {schema}")
+
+    # Particiones de audit_logs del mes actual y los siguientes
+    with StartupTimer.phase("audit_partitions"):
+        try:
+            await AuditPartitionService.ensure_partitions()
+        except Exception as e:
+            logger.error(f"Could not create the audit log partitions: {e}")
+
+    AuditLogWriter.start()
+    with StartupTimer.phase("revocation_list"):
+        await TokenRevocationList.start()
+    logger.info(StartupTimer.finish())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info(f"Shutting down {settings.service_name}")
+    await TokenRevocationList.stop()
+    await AuditLogWriter.stop()
+    PasswordHasher.shutdown()
 
 
 @app.get("/")
@@ -66,7 +88,8 @@ async def root():
     return {
         "service": "user-service",
         "version": "1.0.0",
-        "status": "running"
+        "status": "running",
+        "startup": StartupTimer.report()
     }
 
 
@@ -85,9 +108,13 @@ from src.routers.user import router as user_router
 from src.routers.role import router as role_router
 from src.routers.profile import router as profile_router
 from src.routers.internal import router as internal_router
+from src.routers.audit import router as audit_router
 
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(role_router)
 app.include_router(profile_router)
 app.include_router(internal_router)
+app.include_router(audit_router)
+
+StartupTimer.mark("import")
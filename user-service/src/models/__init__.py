@@ -1,6 +1,6 @@
 """
 User Service Models
 """
-from src.models.user import User, Role, UserRole, PasswordResetToken, AuditLog
+from src.models.user import User, Role, UserRole, PasswordResetToken, RefreshToken, AuditLog
 
-__all__ = ["User", "Role", "UserRole", "PasswordResetToken", "AuditLog"]
+__all__ = ["User", "Role", "UserRole", "PasswordResetToken", "RefreshToken", "AuditLog"]
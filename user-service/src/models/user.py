@@ -5,6 +5,7 @@ Database: user_db
 from datetime import datetime
 from typing import Optional, List
 from sqlalchemy import String, Boolean, Integer, DateTime, Text, Index, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -14,6 +15,10 @@ from src.core.database import Base
 class User(Base):
     """Usuario del sistema"""
     __tablename__ = "users"
+    __table_args__ = (
+        # Orden del listado (más recientes primero)
+        Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
 
     # Primary Key
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -56,6 +61,12 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan"
     )
+    refresh_tokens: Mapped[List["RefreshToken"]] = relationship(
+        "RefreshToken",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
     audit_logs: Mapped[List["AuditLog"]] = relationship(
         "AuditLog",
         back_populates="user"
@@ -76,7 +87,7 @@ class Role(Base):
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
     # Valores: 'Administrador General', 'Recepcionista', 'Supervisor de Sede', 'Laboratorista'
     description: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
-    permissions: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON as TEXT
+    permissions: Mapped[Optional[List[str]]] = mapped_column(JSONB, nullable=True)  # ["patients:read", ...]
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
     # Auditoría
@@ -162,16 +173,103 @@ class PasswordResetToken(Base):
         return f"<PasswordResetToken(user_id={self.user_id}, expires_at={self.expires_at})>"
 
 
+class RefreshToken(Base):
+    """
+    Refresh tokens (opacos, se guarda solo su SHA-256)
+
+    Cada uso rota el token: se marca used_at y se emite uno nuevo de la misma
+    familia (family_id, una por login). Presentar un token ya usado o
+    revocado revoca toda la familia.
+    """
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index('ix_refresh_tokens_user_id', 'user_id'),
+        Index('ix_refresh_tokens_family_id', 'family_id'),
+    )
+
+    # Primary Key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Foreign Key
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # Datos
+    token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    used_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    ip_address: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)
+    user_agent: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    # Auditoría
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    # Relaciones
+    user: Mapped["User"] = relationship("User", back_populates="refresh_tokens")
+
+    def __repr__(self):
+        return f"<RefreshToken(user_id={self.user_id}, family_id='{self.family_id}', expires_at={self.expires_at})>"
+
+
+class TokenRevocation(Base):
+    """
+    Revocaciones de access tokens (JWT), guardadas hasta que el token expira
+
+    - jti: un token concreto (logout)
+    - user_id + issued_before: todos los tokens del usuario emitidos antes de
+      esa fecha (desactivación, restablecimiento de contraseña)
+
+    Los procesos las sincronizan en memoria (TokenRevocationList) por id
+    incremental; no se consulta la base en cada petición.
+    """
+    __tablename__ = "token_revocations"
+    __table_args__ = (
+        Index('ix_token_revocations_expires_at', 'expires_at'),
+    )
+
+    # Primary Key (cursor de sincronización)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Datos
+    jti: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    issued_before: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    reason: Mapped[str] = mapped_column(String(50), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    # Auditoría
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<TokenRevocation(jti='{self.jti}', user_id={self.user_id}, reason='{self.reason}')>"
+
+
 class AuditLog(Base):
-    """Registro de auditoría de acciones"""
+    """
+    Registro de auditoría de acciones
+
+    Tabla particionada por mes (RANGE sobre created_at, en UTC): la clave
+    primaria incluye created_at. Las particiones las crea y archiva
+    maintain_audit_partitions.py (ver AuditPartitionService).
+    """
     __tablename__ = "audit_logs"
     __table_args__ = (
         Index('ix_audit_logs_user_id', 'user_id'),
         Index('ix_audit_logs_created_at', 'created_at'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
     )
 
-    # Primary Key
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # Primary Key (id, created_at)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
     # Foreign Key
     user_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
@@ -186,9 +284,10 @@ class AuditLog(Base):
     ip_address: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)
     user_agent: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
-    # Auditoría
+    # Auditoría (clave de partición)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         server_default=func.now(),
         nullable=False
     )
@@ -0,0 +1,190 @@
+"""
+Audit Log Repository (Data access layer)
+
+audit_logs is partitioned by month on created_at (UTC bounds):
+- audit_logs_pYYYYMM: one partition per month
+- audit_logs_default: rows outside the existing months (moved out when the
+  month partition is created)
+"""
+from datetime import date, datetime, time, timezone
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.user import AuditLog
+
+PARTITION_PREFIX = "audit_logs_p"
+DEFAULT_PARTITION = "audit_logs_default"
+
+
+def partition_name(month: date) -> str:
+    """2026-10-01 -> audit_logs_p202610"""
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """audit_logs_p202610 -> 2026-10-01 (None if the name is not a month partition)"""
+    suffix = name[len(PARTITION_PREFIX):]
+    if not name.startswith(PARTITION_PREFIX) or len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return date(int(suffix[:4]), int(suffix[4:]), 1)
+
+
+def utc_midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class AuditLogRepository:
+    """Repository for audit log queries and partition maintenance"""
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        created_from: datetime,
+        created_to: datetime,
+        skip: int = 0,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None
+    ) -> Tuple[List[AuditLog], int]:
+        """
+        Audit logs with created_from <= created_at < created_to, newest first
+
+        The range on the partition key lets PostgreSQL scan only the
+        partitions of the requested months.
+
+        Returns:
+            Tuple of (audit logs, total count)
+        """
+        conditions = [AuditLog.created_at >= created_from, AuditLog.created_at < created_to]
+        if user_id is not None:
+            conditions.append(AuditLog.user_id == user_id)
+        if action:
+            conditions.append(AuditLog.action == action)
+        if entity_type:
+            conditions.append(AuditLog.entity_type == entity_type)
+        if entity_id is not None:
+            conditions.append(AuditLog.entity_id == entity_id)
+
+        total = (await db.execute(select(func.count()).select_from(AuditLog).where(*conditions))).scalar() or 0
+        result = await db.execute(
+            select(AuditLog)
+            .where(*conditions)
+            .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all()), total
+
+    @staticmethod
+    async def is_partitioned(db: AsyncSession) -> bool:
+        """True if audit_logs is a partitioned table (the migration was applied)"""
+        result = await db.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('audit_logs'))"
+        ))
+        return bool(result.scalar())
+
+    @staticmethod
+    async def get_partitions(db: AsyncSession) -> List[str]:
+        """Names of the partitions attached to audit_logs"""
+        result = await db.execute(text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'audit_logs'::regclass
+            ORDER BY c.relname
+        """))
+        return [name for name, in result]
+
+    @staticmethod
+    async def get_detached_partitions(db: AsyncSession) -> List[str]:
+        """Month partitions that were detached but not archived yet (e.g. an interrupted run)"""
+        result = await db.execute(text("""
+            SELECT c.relname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema()
+              AND c.relkind = 'r'
+              AND c.relname LIKE :prefix
+              AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+            ORDER BY c.relname
+        """), {"prefix": f"{PARTITION_PREFIX}%"})
+        return [name for name, in result if partition_month(name)]
+
+    @staticmethod
+    async def create_default_partition(db: AsyncSession) -> None:
+        """Create audit_logs_default if it does not exist (does not commit)"""
+        await db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF audit_logs DEFAULT"))
+
+    @staticmethod
+    async def get_default_partition_months(db: AsyncSession) -> List[date]:
+        """Months (UTC) that have rows in the default partition"""
+        result = await db.execute(text(f"""
+            SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')::date
+            FROM {DEFAULT_PARTITION}
+            ORDER BY 1
+        """))
+        return [month for month, in result]
+
+    @staticmethod
+    async def lock_maintenance(db: AsyncSession) -> None:
+        """Serialize partition maintenance between processes (lock held until commit)"""
+        await db.execute(text("SELECT pg_advisory_xact_lock(hashtext('audit_logs_partitions'))"))
+
+    @staticmethod
+    async def create_month_partition(db: AsyncSession, month: date, next_month: date) -> int:
+        """
+        Create and attach the partition of a month (does not commit)
+
+        The table is created detached, receives the rows of that month that
+        landed in the default partition and is then attached, so the default
+        partition never blocks the new bounds.
+
+        Returns:
+            Rows moved from the default partition
+        """
+        name = partition_name(month)
+        await db.execute(text(f"CREATE TABLE {name} (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        bounds = {"start": utc_midnight(month), "end": utc_midnight(next_month)}
+        result = await db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE created_at >= :start AND created_at < :end
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """), bounds)
+        await db.execute(text(
+            f"ALTER TABLE audit_logs ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+        ))
+        return result.rowcount
+
+    @staticmethod
+    async def detach_partition(db: AsyncSession, name: str) -> None:
+        """Detach a month partition from audit_logs (does not commit)"""
+        await db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+
+    @staticmethod
+    async def count_rows(db: AsyncSession, name: str) -> int:
+        """Row count of a (detached) partition"""
+        return (await db.execute(text(f"SELECT count(*) FROM {name}"))).scalar() or 0
+
+    @staticmethod
+    async def drop_partition(db: AsyncSession, name: str) -> None:
+        """Drop a detached partition (does not commit)"""
+        await db.execute(text(f"DROP TABLE {name}"))
+
+    @staticmethod
+    async def export_partition(db: AsyncSession, name: str, output: Any) -> None:
+        """
+        Write a partition as CSV (with header) to a binary file object
+
+        Uses COPY ... TO STDOUT on the session connection (asyncpg).
+        """
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_from_table(name, output=output, format="csv", header=True)
@@ -2,13 +2,20 @@
 Authentication Repository (Data access layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, insert, func
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import selectinload
-from typing import Optional, List
-from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta, timezone
+import hashlib
 import secrets
 
-from src.models.user import User, Role, UserRole, PasswordResetToken, AuditLog
+from src.models.user import User, Role, UserRole, PasswordResetToken, RefreshToken, AuditLog
+
+
+def hash_refresh_token(token: str) -> str:
+    """SHA-256 of an opaque refresh token (random, 256 bits: no salt or bcrypt needed)"""
+    return hashlib.sha256(token.encode()).hexdigest()
 
 
 class AuthRepository:
@@ -165,6 +172,32 @@ class AuthRepository:
         await db.commit()
         return True
 
+    @staticmethod
+    async def rehash_password(
+        db: AsyncSession,
+        user_id: int,
+        old_password_hash: str,
+        new_password_hash: str
+    ) -> bool:
+        """
+        Replace a password hash made with an outdated bcrypt cost
+
+        Only if it did not change meanwhile (UPDATE ... WHERE password_hash = old).
+        Does not commit: AuthService.login commits it together with the new
+        refresh token (the login audit log is written by AuditLogWriter in its
+        own transaction).
+
+        Returns:
+            True if the hash was replaced
+        """
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_password_hash)
+            .values(password_hash=new_password_hash)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
     @staticmethod
     async def create_password_reset_token(
         db: AsyncSession,
@@ -245,6 +278,110 @@ class AuthRepository:
         await db.commit()
         return True
 
+    @staticmethod
+    async def create_refresh_token(
+        db: AsyncSession,
+        user_id: int,
+        expires_in_days: int,
+        family_id: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> str:
+        """
+        Create a refresh token (only its hash is stored). Does not commit.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            expires_in_days: Token lifetime
+            family_id: Rotation family (None: new family, i.e. a new login)
+            ip_address: IP address (optional)
+            user_agent: User agent string (optional)
+
+        Returns:
+            The opaque token to give to the client
+        """
+        token = secrets.token_urlsafe(32)
+        db.add(RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(token),
+            family_id=family_id or secrets.token_hex(16),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=expires_in_days),
+            ip_address=ip_address,
+            user_agent=user_agent[:255] if user_agent else None
+        ))
+        return token
+
+    @staticmethod
+    async def get_refresh_grant(db: AsyncSession, token: str) -> Optional[Row]:
+        """
+        Refresh token with what a new access token needs, in one query
+        (unique index on token_hash, then the user's active roles)
+
+        Returns:
+            Row (id, user_id, family_id, expires_at, used_at, revoked_at, email,
+            is_active, role_names, role_ids) or None
+        """
+        stmt = (
+            select(
+                RefreshToken.id, RefreshToken.user_id, RefreshToken.family_id,
+                RefreshToken.expires_at, RefreshToken.used_at, RefreshToken.revoked_at,
+                User.email, User.is_active,
+                func.array_agg(Role.name).filter(Role.is_active.is_(True)).label("role_names"),
+                func.array_agg(Role.id).filter(Role.is_active.is_(True)).label("role_ids"),
+            )
+            .join(User, User.id == RefreshToken.user_id)
+            .outerjoin(UserRole, UserRole.user_id == User.id)
+            .outerjoin(Role, Role.id == UserRole.role_id)
+            .where(RefreshToken.token_hash == hash_refresh_token(token))
+            .group_by(RefreshToken.id, User.id)
+        )
+        result = await db.execute(stmt)
+        return result.one_or_none()
+
+    @staticmethod
+    async def mark_refresh_token_used(db: AsyncSession, token_id: int) -> bool:
+        """
+        Mark a refresh token as used (rotated). Does not commit.
+
+        Returns:
+            False if it was already used or revoked (a concurrent refresh won)
+        """
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == token_id, RefreshToken.used_at.is_(None), RefreshToken.revoked_at.is_(None))
+            .values(used_at=func.now())
+        )
+        return result.rowcount > 0
+
+    @staticmethod
+    async def revoke_refresh_family(db: AsyncSession, family_id: str) -> int:
+        """Revoke every token of a rotation family. Does not commit."""
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def revoke_user_refresh_tokens(db: AsyncSession, user_id: int) -> int:
+        """Revoke every refresh token of a user (password change). Does not commit."""
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def delete_expired_refresh_tokens(db: AsyncSession, user_id: int) -> int:
+        """Delete a user's expired refresh tokens (kept until expiry for reuse detection). Does not commit."""
+        result = await db.execute(
+            delete(RefreshToken).where(RefreshToken.user_id == user_id, RefreshToken.expires_at < func.now())
+        )
+        return result.rowcount
+
     @staticmethod
     async def create_audit_log(
         db: AsyncSession,
@@ -256,7 +393,10 @@ class AuthRepository:
         user_agent: Optional[str] = None
     ) -> AuditLog:
         """
-        Create an audit log entry
+        Create an audit log entry and commit it with the caller's transaction
+
+        Synchronous mode of the audit log, for security-critical events; the
+        rest go through AuditLogWriter.record (batched, outside the request).
 
         Args:
             db: Database session
@@ -280,5 +420,16 @@ class AuthRepository:
         )
         db.add(audit_log)
         await db.commit()
-        await db.refresh(audit_log)
         return audit_log
+
+    @staticmethod
+    async def create_audit_logs(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert several audit log entries with a multi-row INSERT (does not commit)
+
+        Args:
+            db: Database session
+            rows: AuditLog column values (user_id, action, ..., created_at)
+        """
+        if rows:
+            await db.execute(insert(AuditLog), rows)
@@ -0,0 +1,69 @@
+"""
+Token Revocation Repository (Data access layer)
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, delete, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.user import TokenRevocation
+
+
+class TokenRevocationRepository:
+    """Repository for access token revocations"""
+
+    @staticmethod
+    async def create(
+        db: AsyncSession,
+        reason: str,
+        expires_at: datetime,
+        jti: Optional[str] = None,
+        user_id: Optional[int] = None,
+        issued_before: Optional[datetime] = None
+    ) -> TokenRevocation:
+        """Record a revocation (does not commit)"""
+        revocation = TokenRevocation(
+            jti=jti,
+            user_id=user_id,
+            issued_before=issued_before,
+            reason=reason,
+            expires_at=expires_at
+        )
+        db.add(revocation)
+        await db.flush()
+        return revocation
+
+    @staticmethod
+    async def get_since(
+        db: AsyncSession,
+        after_id: int,
+        lookback_seconds: float
+    ) -> Tuple[List[TokenRevocation], int]:
+        """
+        Unexpired revocations with id > after_id, plus those created in the
+        last lookback_seconds (ids are assigned before commit, so a row with a
+        lower id can become visible after a higher one)
+
+        Returns:
+            Tuple of (revocations ordered by id, highest id in the table)
+        """
+        result = await db.execute(
+            select(TokenRevocation)
+            .where(
+                TokenRevocation.expires_at > func.now(),
+                or_(
+                    TokenRevocation.id > after_id,
+                    TokenRevocation.created_at >= func.now() - func.make_interval(0, 0, 0, 0, 0, 0, lookback_seconds)
+                )
+            )
+            .order_by(TokenRevocation.id)
+        )
+        last_id = (await db.execute(select(func.coalesce(func.max(TokenRevocation.id), 0)))).scalar()
+        return list(result.scalars().all()), last_id
+
+    @staticmethod
+    async def delete_expired(db: AsyncSession) -> int:
+        """Delete the revocations of tokens that already expired (does not commit)"""
+        result = await db.execute(delete(TokenRevocation).where(TokenRevocation.expires_at < func.now()))
+        return result.rowcount
@@ -3,12 +3,20 @@ Role Repository (Data access layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, func
-from typing import Optional, List
+from typing import Optional, List, Tuple, Any
+import json
 
 from src.models.user import Role, UserRole
 from src.schemas.role import RoleCreate, RoleUpdate
 
 
+def _role_values(values: dict) -> dict:
+    """Schema values to column values (permissions: JSON text -> JSONB list)"""
+    if values.get("permissions") is not None:
+        values["permissions"] = json.loads(values["permissions"])
+    return values
+
+
 class RoleRepository:
     """Repository for Role operations"""
 
@@ -40,10 +48,16 @@ class RoleRepository:
         result = await db.execute(select(Role).where(Role.id.in_(role_ids)))
         return list(result.scalars().all())
 
+    @staticmethod
+    async def get_all_permissions(db: AsyncSession) -> List[Tuple[int, Any]]:
+        """(role id, permissions JSONB) of every role"""
+        result = await db.execute(select(Role.id, Role.permissions))
+        return [(role_id, permissions) for role_id, permissions in result]
+
     @staticmethod
     async def create(db: AsyncSession, data: RoleCreate) -> Role:
         """Create a new role"""
-        role = Role(**data.model_dump())
+        role = Role(**_role_values(data.model_dump()))
         db.add(role)
         await db.commit()
         await db.refresh(role)
@@ -55,7 +69,7 @@ class RoleRepository:
         stmt = (
             update(Role)
             .where(Role.id == role_id)
-            .values(**data.model_dump(exclude_unset=True))
+            .values(**_role_values(data.model_dump(exclude_unset=True)))
             .returning(Role)
         )
         result = await db.execute(stmt)
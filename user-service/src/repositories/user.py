@@ -2,9 +2,10 @@
 User Repository (Data access layer)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy import select, update, delete, func, or_, cast, String, Integer
+from sqlalchemy.dialects.postgresql import insert, aggregate_order_by, ARRAY
 from sqlalchemy.orm import selectinload
-from typing import Optional, List, Tuple
+from typing import Optional, List, Set, Tuple, Dict, Any
 
 from src.models.user import User, Role, UserRole
 from src.schemas.user import UserCreate, UserUpdate
@@ -14,58 +15,77 @@ class UserRepository:
     """Repository for User operations"""
 
     @staticmethod
-    async def get_all(
+    async def get_list(
         db: AsyncSession,
         skip: int = 0,
         limit: int = 100,
         search: Optional[str] = None,
         role_id: Optional[int] = None,
         location_id: Optional[int] = None,
-        is_active: Optional[bool] = None
-    ) -> Tuple[List[User], int]:
+        is_active: Optional[bool] = None,
+        include_total: bool = True
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
         """
-        Get all users with pagination and filters
+        One page of users as plain rows (no ORM objects), newest first
+
+        One query: the page is cut from users alone (ordered by the
+        created_at, id index) and only then joined with its roles; the names
+        and ids of the active roles are aggregated with array_agg.
 
         Returns:
-            Tuple of (users list, total count)
+            Tuple of (rows with the listed columns plus roles and role_ids,
+            total count or None when include_total is False)
         """
-        # Base query with roles loaded
-        query = select(User).options(
-            selectinload(User.user_roles).selectinload(UserRole.role)
-        )
-
-        # Apply filters
+        conditions = []
         if search:
-            search_filter = or_(
+            conditions.append(or_(
                 User.email.ilike(f"%{search}%"),
                 User.first_name.ilike(f"%{search}%"),
                 User.last_name.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
-
+            ))
         if role_id is not None:
-            # Join with UserRole to filter by role
-            query = query.join(User.user_roles).where(UserRole.role_id == role_id)
-
+            conditions.append(
+                select(UserRole.id).where(UserRole.user_id == User.id, UserRole.role_id == role_id).exists()
+            )
         if location_id is not None:
-            query = query.where(User.location_id == location_id)
-
+            conditions.append(User.location_id == location_id)
         if is_active is not None:
-            query = query.where(User.is_active == is_active)
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
+            conditions.append(User.is_active == is_active)
 
-        # Apply pagination and ordering
-        query = query.order_by(User.created_at.desc()).offset(skip).limit(limit)
-
-        # Execute query
-        result = await db.execute(query)
-        users = list(result.unique().scalars().all())
+        page = (
+            select(
+                User.id, User.email, User.first_name, User.last_name, User.phone,
+                User.location_id, User.is_active, User.created_at, User.updated_at
+            )
+            .where(*conditions)
+            .order_by(User.created_at.desc(), User.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .subquery("page")
+        )
+        active_role = Role.is_active.is_(True)
+        stmt = (
+            select(
+                *page.c,
+                func.coalesce(
+                    func.array_agg(aggregate_order_by(Role.name, Role.id)).filter(active_role), cast([], ARRAY(String))
+                ).label("roles"),
+                func.coalesce(
+                    func.array_agg(aggregate_order_by(Role.id, Role.id)).filter(active_role), cast([], ARRAY(Integer))
+                ).label("role_ids")
+            )
+            .select_from(page)
+            .outerjoin(UserRole, UserRole.user_id == page.c.id)
+            .outerjoin(Role, Role.id == UserRole.role_id)
+            .group_by(*page.c)
+            .order_by(page.c.created_at.desc(), page.c.id.desc())
+        )
+        rows = [dict(row) for row in (await db.execute(stmt)).mappings()]
 
-        return users, total
+        total = None
+        if include_total:
+            total = (await db.execute(select(func.count(User.id)).where(*conditions))).scalar() or 0
+        return rows, total
 
     @staticmethod
     async def get_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
@@ -84,6 +104,63 @@ class UserRepository:
         result = await db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_roles_by_emails(db: AsyncSession, emails: List[str]) -> Dict[str, Tuple[int, Set[int]]]:
+        """Map email -> (user id, role ids) for the existing emails (single query)"""
+        if not emails:
+            return {}
+        result = await db.execute(
+            select(User.email, User.id, UserRole.role_id)
+            .outerjoin(UserRole, UserRole.user_id == User.id)
+            .where(User.email.in_(emails))
+        )
+        users: Dict[str, Tuple[int, Set[int]]] = {}
+        for email, user_id, role_id in result.all():
+            roles = users.setdefault(email, (user_id, set()))[1]
+            if role_id is not None:
+                roles.add(role_id)
+        return users
+
+    @staticmethod
+    async def create_many(
+        db: AsyncSession,
+        users: List[Dict[str, Any]],
+        role_ids: List[int],
+        created_by: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Create several users and assign them the same roles in one transaction
+        (one multi-row INSERT for users and one for user_roles)
+
+        Emails that already exist (e.g. created concurrently) are skipped.
+
+        Returns:
+            Map email -> id of the users created
+        """
+        if not users:
+            return {}
+
+        stmt = (
+            insert(User)
+            .values([{**user, "created_by": created_by} for user in users])
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.email, User.id)
+        )
+        result = await db.execute(stmt)
+        created = {email: user_id for email, user_id in result.all()}
+
+        if created:
+            await db.execute(
+                insert(UserRole),
+                [
+                    {"user_id": user_id, "role_id": role_id, "assigned_by": created_by}
+                    for user_id in created.values()
+                    for role_id in role_ids
+                ]
+            )
+        await db.commit()
+        return created
+
     @staticmethod
     async def create(
         db: AsyncSession,
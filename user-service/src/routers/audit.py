@@ -0,0 +1,54 @@
+"""
+Audit Log Router (API endpoints)
+"""
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.security import require_roles
+from src.services.audit import AuditLogService
+from src.schemas.audit import AuditLogListResponse
+
+router = APIRouter(prefix="/api/v1/audit-logs", tags=["Audit Logs"])
+
+
+@router.get(
+    "",
+    response_model=AuditLogListResponse,
+    summary="Consultar registros de auditoría",
+    dependencies=[Depends(require_roles("Administrador General"))]
+)
+async def search_audit_logs(
+    date_from: date = Query(..., description="Fecha inicial (UTC, inclusive)"),
+    date_to: date = Query(..., description="Fecha final (UTC, inclusive)"),
+    user_id: Optional[int] = Query(None, description="Filtrar por ID de usuario"),
+    action: Optional[str] = Query(None, description="Filtrar por acción (LOGIN, CHANGE_PASSWORD...)"),
+    entity_type: Optional[str] = Query(None, description="Filtrar por tipo de entidad"),
+    entity_id: Optional[int] = Query(None, description="Filtrar por ID de entidad"),
+    page: int = Query(1, ge=1, description="Número de página"),
+    page_size: int = Query(50, ge=1, le=200, description="Tamaño de página"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtener registros de auditoría de un rango de fechas, del más reciente al más antiguo
+
+    **Requiere rol:** Administrador General
+
+    El rango (date_from, date_to) es obligatorio y no puede superar
+    AUDIT_QUERY_MAX_DAYS días; solo se consultan las particiones mensuales
+    de esas fechas. Los meses archivados no están disponibles.
+    """
+    return await AuditLogService.search(
+        db=db,
+        date_from=date_from,
+        date_to=date_to,
+        page=page,
+        page_size=page_size,
+        user_id=user_id,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id
+    )
@@ -1,16 +1,19 @@
 """
 Authentication Router (API endpoints)
 """
+from typing import Optional
+
 from fastapi import APIRouter, Depends, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db
-from src.core.security import get_current_user_id, get_current_user_payload
+from src.core.security import get_current_user_id, get_current_user_payload, get_optional_user_payload
 from src.services.auth import AuthService
 from src.schemas.auth import (
     LoginRequest, LoginResponse, UserInfo,
     RegisterRequest, ChangePasswordRequest,
-    RequestPasswordResetRequest, ResetPasswordRequest
+    RequestPasswordResetRequest, ResetPasswordRequest,
+    RefreshTokenRequest, TokenRefreshResponse
 )
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
@@ -30,6 +33,8 @@ async def login(
 
     Retorna:
     - **access_token**: Token JWT para autenticación
+    - **expires_in**: Segundos de vigencia del access_token
+    - **refresh_token**: Token para renovar el access_token sin volver a enviar la contraseña
     - **user**: Información del usuario autenticado
     """
     ip_address = request.client.host if request.client else None
@@ -38,6 +43,46 @@ async def login(
     return await AuthService.login(db, data, ip_address, user_agent)
 
 
+@router.post("/refresh", response_model=TokenRefreshResponse, summary="Renovar token de acceso")
+async def refresh(
+    request: Request,
+    data: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtener un nuevo access_token con el refresh_token del login
+
+    El refresh_token es de un solo uso: la respuesta incluye uno nuevo que
+    reemplaza al enviado. Reusar un refresh_token ya rotado revoca la sesión.
+
+    - **refresh_token**: Refresh token vigente
+    """
+    ip_address = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+
+    return await AuthService.refresh(db, data, ip_address, user_agent)
+
+
+@router.post("/logout", summary="Cerrar sesión")
+async def logout(
+    request: Request,
+    data: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db),
+    access_payload: Optional[dict] = Depends(get_optional_user_payload)
+):
+    """
+    Revocar el refresh_token (y los rotados a partir del mismo login)
+
+    - **refresh_token**: Refresh token de la sesión
+
+    Si se envía el access_token (header Authorization) también se revoca.
+    """
+    ip_address = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+
+    return await AuthService.logout(db, data, ip_address, user_agent, access_payload)
+
+
 @router.post("/register", response_model=UserInfo, status_code=status.HTTP_201_CREATED, summary="Registrar nuevo usuario")
 async def register(
     data: RegisterRequest,
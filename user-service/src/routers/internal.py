@@ -1,14 +1,17 @@
 """
 Internal Router for service-to-service communication
 """
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_db
-from src.core.security import verify_internal_api_key
+from src.core.security import verify_internal_api_key, PasswordHasher
 from src.services.user import UserService
-from src.schemas.user import UserCreate
-from src.schemas.auth import UserInfo
+from src.core.revocation import TokenRevocationList
+from src.services.audit import AuditLogWriter
+from src.services.revocation import TokenRevocationService
+from src.schemas.user import UserCreate, PatientUserBatchRequest, PatientUserBatchResponse
+from src.schemas.auth import UserInfo, TokenRevocationFeed
 
 router = APIRouter(
     prefix="/api/v1/internal",
@@ -32,3 +35,73 @@ async def create_patient_user(
     """
     # The created_by can be set to a system user or a default value
     return await UserService.create_user(db, data, created_by=1)
+
+
+@router.post(
+    "/create-patient-users",
+    response_model=PatientUserBatchResponse,
+    summary="Create users for several patients"
+)
+async def create_patient_users(
+    data: PatientUserBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create the users of several patients in one call.
+    Used by the patient-service provisioning worker; returns one result per
+    item (CREATED, EXISTING, CONFLICT or INVALID) in the request order.
+    """
+    return await UserService.create_patient_users(db, data, created_by=1)
+
+
+@router.get(
+    "/password-hashing/metrics",
+    summary="Password hashing pool metrics"
+)
+async def get_password_hashing_metrics():
+    """
+    bcrypt pool metrics since startup: operations running and waiting,
+    completed and rejected (503), queue time (avg, p50, p95, max) and bcrypt time.
+    """
+    return PasswordHasher.metrics()
+
+
+@router.get(
+    "/audit-log/metrics",
+    summary="Audit log writer metrics"
+)
+async def get_audit_log_metrics():
+    """
+    Audit log writer metrics since startup: events queued, written and dropped,
+    number of batches, failed flushes and duration of the last flush.
+    """
+    return AuditLogWriter.metrics()
+
+
+@router.get(
+    "/token-revocations",
+    response_model=TokenRevocationFeed,
+    summary="Revoked access tokens feed"
+)
+async def get_token_revocations(
+    after_id: int = Query(0, ge=0, description="last_id de la consulta anterior (0: lista completa)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Unexpired access token revocations for the in-memory lists of other
+    processes (api-gateway). Poll with the returned last_id; rows of the last
+    TOKEN_REVOCATION_LOOKBACK_SECONDS are sent again, so entries are idempotent.
+    A last_id lower than after_id means the list must be reloaded from 0.
+    """
+    return await TokenRevocationService.get_feed(db, after_id)
+
+
+@router.get(
+    "/token-revocations/metrics",
+    summary="Token revocation list metrics"
+)
+async def get_token_revocation_metrics():
+    """
+    Size of this process' revocation list, sync cursor and seconds since the last sync.
+    """
+    return TokenRevocationList.metrics()
@@ -29,6 +29,7 @@ async def get_all_users(
     role_id: Optional[int] = Query(None, description="Filtrar por ID de rol"),
     location_id: Optional[int] = Query(None, description="Filtrar por ID de sede"),
     is_active: Optional[bool] = Query(None, description="Filtrar por estado activo/inactivo"),
+    include_total: bool = Query(True, description="Calcular el total (false omite el conteo)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -41,6 +42,7 @@ async def get_all_users(
     - **role_id**: Filtra usuarios con un rol específico
     - **location_id**: Filtra usuarios de una sede específica
     - **is_active**: Filtra por estado (true/false)
+    - **include_total**: false omite el conteo (total = null), útil en listas grandes
     """
     return await UserService.get_all_users(
         db=db,
@@ -49,7 +51,8 @@ async def get_all_users(
         search=search,
         role_id=role_id,
         location_id=location_id,
-        is_active=is_active
+        is_active=is_active,
+        include_total=include_total
     )
 
 
@@ -0,0 +1,33 @@
+"""
+Audit Log Schemas
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import date, datetime
+
+
+class AuditLogResponse(BaseModel):
+    """Schema for audit log response"""
+    id: int
+    user_id: Optional[int] = None
+    action: str
+    entity_type: Optional[str] = None
+    entity_id: Optional[int] = None
+    old_values: Optional[str] = None
+    new_values: Optional[str] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AuditLogListResponse(BaseModel):
+    """Paginated list of audit logs of a date range"""
+    total: int = Field(..., description="Total de registros en el rango")
+    page: int = Field(..., description="Página actual")
+    page_size: int = Field(..., description="Tamaño de página")
+    date_from: date = Field(..., description="Fecha inicial (UTC, inclusive)")
+    date_to: date = Field(..., description="Fecha final (UTC, inclusive)")
+    logs: List[AuditLogResponse] = Field(..., description="Registros, del más reciente al más antiguo")
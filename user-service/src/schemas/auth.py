@@ -32,9 +32,39 @@ class LoginResponse(BaseModel):
     """Login response schema"""
     access_token: str = Field(..., description="JWT access token")
     token_type: str = Field(default="bearer", description="Tipo de token")
+    expires_in: Optional[int] = Field(None, description="Vigencia del access token (segundos)")
+    refresh_token: Optional[str] = Field(None, description="Token para obtener nuevos access tokens (/auth/refresh)")
     user: UserInfo = Field(..., description="Información del usuario")
 
 
+class RefreshTokenRequest(BaseModel):
+    """Refresh token request (refresh and logout)"""
+    refresh_token: str = Field(..., min_length=16, max_length=128, description="Refresh token recibido en el login")
+
+
+class TokenRefreshResponse(BaseModel):
+    """New access token and the rotated refresh token"""
+    access_token: str = Field(..., description="JWT access token")
+    token_type: str = Field(default="bearer", description="Tipo de token")
+    expires_in: int = Field(..., description="Vigencia del access token (segundos)")
+    refresh_token: str = Field(..., description="Nuevo refresh token (el anterior ya no es válido)")
+
+
+class TokenRevocationEntry(BaseModel):
+    """Revoked access token (jti) or user watermark (tokens issued before issued_before)"""
+    id: int
+    jti: Optional[str] = None
+    user_id: Optional[int] = None
+    issued_before: Optional[float] = Field(None, description="Epoch: tokens del usuario con iat anterior quedan revocados")
+    expires_at: float = Field(..., description="Epoch: la entrada deja de ser necesaria")
+
+
+class TokenRevocationFeed(BaseModel):
+    """Incremental revocation feed for the services and the gateway"""
+    last_id: int = Field(..., description="Cursor para la siguiente consulta (after_id)")
+    revocations: List[TokenRevocationEntry]
+
+
 class RegisterRequest(BaseModel):
     """User registration request"""
     email: EmailStr = Field(..., description="Email del usuario")
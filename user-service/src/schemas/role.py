@@ -1,9 +1,29 @@
 """
 Role Schemas
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from datetime import datetime
+import json
+
+
+def normalize_permissions(value):
+    """
+    Permissions as JSON text of a list of strings
+
+    Accepts the JSON text sent by the clients or the list stored in the
+    JSONB column (responses).
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            raise ValueError('permissions debe ser una lista JSON, por ejemplo ["patients:read"]')
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError('permissions debe ser una lista JSON de textos')
+    return json.dumps(list(dict.fromkeys(value)))
 
 
 class RoleBase(BaseModel):
@@ -13,6 +33,8 @@ class RoleBase(BaseModel):
     permissions: Optional[str] = Field(None, description="Permisos en formato JSON")
     is_active: bool = Field(default=True, description="Estado del rol")
 
+    _normalize_permissions = validator('permissions', pre=True, allow_reuse=True)(normalize_permissions)
+
 
 class RoleCreate(RoleBase):
     """Schema for creating a role"""
@@ -26,6 +48,8 @@ class RoleUpdate(BaseModel):
     permissions: Optional[str] = None
     is_active: Optional[bool] = None
 
+    _normalize_permissions = validator('permissions', pre=True, allow_reuse=True)(normalize_permissions)
+
 
 class RoleResponse(RoleBase):
     """Schema for role response"""
@@ -2,8 +2,12 @@
 User Management Schemas
 """
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
+import enum
+
+# Máximo de usuarios por llamada a /internal/create-patient-users
+MAX_PATIENT_USER_BATCH = 100
 
 
 class UserBase(BaseModel):
@@ -33,6 +37,40 @@ class UserCreate(UserBase):
         return v
 
 
+class PatientUserBatchRequest(BaseModel):
+    """
+    Batch of patient users to create (internal, patient-service)
+
+    Each item has the UserCreate fields; items are validated one by one so an
+    invalid item does not reject the whole batch.
+    """
+    users: List[Dict[str, Any]] = Field(
+        ..., min_items=1, max_items=MAX_PATIENT_USER_BATCH, description="Usuarios a crear (campos de UserCreate)"
+    )
+
+
+class PatientUserStatus(str, enum.Enum):
+    """Result of each item of a patient user batch"""
+    CREATED = "CREATED"
+    EXISTING = "EXISTING"  # Ya había un usuario de paciente con ese email
+    CONFLICT = "CONFLICT"  # El email es de una cuenta con otros roles (no se vincula)
+    INVALID = "INVALID"    # Datos inválidos (no se reintenta)
+
+
+class PatientUserResult(BaseModel):
+    """Result for one item, in the same order as the request"""
+    index: int
+    email: Optional[str] = None
+    status: PatientUserStatus
+    user_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class PatientUserBatchResponse(BaseModel):
+    """Patient user batch result"""
+    results: List[PatientUserResult]
+
+
 class UserUpdate(BaseModel):
     """Schema for updating a user"""
     first_name: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -62,7 +100,7 @@ class UserDetailResponse(UserResponse):
 
 class UserListResponse(BaseModel):
     """Paginated list of users"""
-    total: int = Field(..., description="Total de usuarios")
+    total: Optional[int] = Field(None, description="Total de usuarios (null si include_total=false)")
     page: int = Field(..., description="Página actual")
     page_size: int = Field(..., description="Tamaño de página")
     users: List[UserResponse] = Field(..., description="Lista de usuarios")
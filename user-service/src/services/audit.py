@@ -0,0 +1,273 @@
+"""
+Audit Log Service
+
+Consulta de auditoría por rango de fechas (AuditLogService) y registro de
+eventos fuera de la transacción de la petición (AuditLogWriter):
+- record() solo agrega el evento a una cola en memoria (no hay I/O)
+- Una tarea asyncio inserta la cola con INSERT multi-fila cada
+  AUDIT_FLUSH_INTERVAL_MS o al juntar AUDIT_FLUSH_BATCH_SIZE eventos
+- En el shutdown se insertan los eventos pendientes
+- Los textos se recortan al ancho de su columna; un lote rechazado por datos
+  (DataError/IntegrityError) se divide hasta aislar y descartar las filas
+  inválidas, sin bloquear el resto de la cola
+- write() es el modo síncrono: el evento se guarda con la transacción de la
+  petición (cambios de contraseña, reuso de refresh tokens)
+"""
+import asyncio
+import time
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from loguru import logger
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.models.user import AuditLog
+from src.repositories.auth import AuthRepository
+from src.repositories.audit import AuditLogRepository, utc_midnight
+from src.schemas.audit import AuditLogResponse, AuditLogListResponse
+
+# Ancho de las columnas de texto de audit_logs (los valores más largos se recortan)
+COLUMN_WIDTHS = {
+    name: AuditLog.__table__.c[name].type.length
+    for name in ("action", "entity_type", "ip_address", "user_agent")
+}
+
+
+def fit_column(name: str, value: Optional[str]) -> Optional[str]:
+    """Recortar un texto al ancho de su columna en audit_logs"""
+    return value[:COLUMN_WIDTHS[name]] if value is not None else None
+
+
+class AuditLogService:
+    """Consulta de registros de auditoría"""
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        date_from: date,
+        date_to: date,
+        page: int = 1,
+        page_size: int = 50,
+        user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None
+    ) -> AuditLogListResponse:
+        """
+        Registros de auditoría entre date_from y date_to (días UTC, inclusive)
+
+        El rango es obligatorio y está acotado por AUDIT_QUERY_MAX_DAYS: la
+        consulta solo recorre las particiones mensuales de esas fechas.
+
+        Raises:
+            HTTPException: 400 si el rango es inválido o demasiado amplio
+        """
+        if date_to < date_from:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_to debe ser mayor o igual a date_from"
+            )
+        if (date_to - date_from).days + 1 > settings.audit_query_max_days:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El rango de fechas no puede superar {settings.audit_query_max_days} días"
+            )
+
+        logs, total = await AuditLogRepository.search(
+            db=db,
+            created_from=utc_midnight(date_from),
+            created_to=utc_midnight(date_to + timedelta(days=1)),
+            skip=(page - 1) * page_size,
+            limit=page_size,
+            user_id=user_id,
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id
+        )
+        return AuditLogListResponse(
+            total=total,
+            page=page,
+            page_size=page_size,
+            date_from=date_from,
+            date_to=date_to,
+            logs=[AuditLogResponse.model_validate(log) for log in logs]
+        )
+
+
+class AuditLogWriter:
+    """Cola de eventos de auditoría (una tarea asyncio por proceso)"""
+
+    _queue: deque = deque()
+    _task: Optional[asyncio.Task] = None
+    _wakeup: Optional[asyncio.Event] = None
+    _lock: Optional[asyncio.Lock] = None
+    _written = 0
+    _batches = 0
+    _dropped = 0
+    _failed_flushes = 0
+    _last_flush_seconds = 0.0
+
+    @classmethod
+    def start(cls) -> None:
+        """Iniciar la tarea de escritura (startup, o en el primer evento)"""
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._wakeup = asyncio.Event()
+        cls._lock = asyncio.Lock()
+        cls._task = asyncio.create_task(cls._run())
+        logger.info("Audit log writer started")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Detener la tarea e insertar los eventos pendientes (shutdown)"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+        try:
+            await cls.flush()
+        except Exception as e:
+            logger.error(f"Audit log writer lost {len(cls._queue)} events on shutdown: {e}")
+            cls._queue.clear()
+        logger.info("Audit log writer stopped")
+
+    @classmethod
+    def record(
+        cls,
+        user_id: Optional[int],
+        action: str,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        """
+        Encolar un evento de auditoría (se inserta en el siguiente lote)
+
+        created_at es la hora del evento, no la de la inserción. Si la cola
+        llega a AUDIT_QUEUE_MAX_EVENTS (base de datos caída) se descarta el
+        evento más antiguo.
+        """
+        if len(cls._queue) >= settings.audit_queue_max_events:
+            cls._queue.popleft()
+            cls._dropped += 1
+            if cls._dropped % 1000 == 1:
+                logger.warning(f"Audit log queue full: {cls._dropped} events dropped so far")
+
+        cls._queue.append({
+            "user_id": user_id,
+            "action": fit_column("action", action),
+            "entity_type": fit_column("entity_type", entity_type),
+            "entity_id": entity_id,
+            "ip_address": fit_column("ip_address", ip_address),
+            "user_agent": fit_column("user_agent", user_agent),
+            "created_at": datetime.now(timezone.utc),
+        })
+
+        if cls._task is None or cls._task.done():
+            cls.start()
+        elif len(cls._queue) >= settings.audit_flush_batch_size:
+            cls._wakeup.set()
+
+    @staticmethod
+    async def write(
+        db: AsyncSession,
+        user_id: Optional[int],
+        action: str,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> AuditLog:
+        """Registrar un evento en la transacción de `db` y confirmarla (modo síncrono)"""
+        return await AuthRepository.create_audit_log(
+            db=db,
+            user_id=user_id,
+            action=fit_column("action", action),
+            entity_type=fit_column("entity_type", entity_type),
+            entity_id=entity_id,
+            ip_address=fit_column("ip_address", ip_address),
+            user_agent=fit_column("user_agent", user_agent)
+        )
+
+    @classmethod
+    async def flush(cls) -> int:
+        """
+        Insertar todos los eventos encolados, por lotes de AUDIT_FLUSH_BATCH_SIZE
+
+        Si un lote falla por la conexión vuelve al inicio de la cola y se
+        reintenta en el siguiente ciclo; si lo rechaza la base de datos por sus
+        datos se divide y se descartan solo las filas inválidas.
+
+        Returns:
+            Número de eventos insertados
+        """
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        written = 0
+        async with cls._lock:
+            while cls._queue:
+                size = min(len(cls._queue), settings.audit_flush_batch_size)
+                # Pila de partes del lote por insertar (la primera mitad arriba)
+                parts = [[cls._queue.popleft() for _ in range(size)]]
+                started = time.perf_counter()
+                while parts:
+                    rows = parts.pop()
+                    try:
+                        async with AsyncSessionLocal() as db:
+                            await AuthRepository.create_audit_logs(db, rows)
+                            await db.commit()
+                    except (DataError, IntegrityError) as e:
+                        if len(rows) > 1:
+                            middle = len(rows) // 2
+                            parts += [rows[middle:], rows[:middle]]
+                        else:
+                            cls._dropped += 1
+                            logger.error(f"Audit log event dropped ({rows[0]['action']}, user {rows[0]['user_id']}): {e.orig}")
+                        continue
+                    except BaseException:
+                        # Lo no insertado vuelve al inicio de la cola, en orden
+                        cls._queue.extendleft(reversed([row for part in [rows] + parts[::-1] for row in part]))
+                        cls._failed_flushes += 1
+                        raise
+                    cls._written += len(rows)
+                    written += len(rows)
+                cls._last_flush_seconds = time.perf_counter() - started
+                cls._batches += 1
+        return written
+
+    @classmethod
+    async def _run(cls) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(cls._wakeup.wait(), timeout=settings.audit_flush_interval_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            cls._wakeup.clear()
+
+            try:
+                await cls.flush()
+            except Exception as e:
+                logger.error(f"Audit log flush failed ({len(cls._queue)} events queued): {e}")
+
+    @classmethod
+    def metrics(cls) -> Dict[str, Any]:
+        """Queue and flush metrics since startup"""
+        return {
+            "queued": len(cls._queue),
+            "written": cls._written,
+            "batches": cls._batches,
+            "dropped": cls._dropped,
+            "failed_flushes": cls._failed_flushes,
+            "last_flush_seconds": round(cls._last_flush_seconds, 4),
+            "flush_interval_ms": settings.audit_flush_interval_ms,
+            "flush_batch_size": settings.audit_flush_batch_size,
+        }
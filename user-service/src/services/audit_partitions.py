@@ -0,0 +1,149 @@
+"""
+Audit Log Partitions (mantenimiento de las particiones mensuales de audit_logs)
+
+- ensure_partitions: crea las particiones del mes actual y de los siguientes
+  AUDIT_PARTITION_MONTHS_AHEAD meses (y las de los meses que hayan caído en
+  la partición default)
+- archive_expired: las particiones anteriores a AUDIT_RETENTION_MONTHS se
+  desconectan (DETACH), se exportan a AUDIT_ARCHIVE_DIR como CSV gzip, se
+  verifica el número de filas del archivo y recién entonces se eliminan
+"""
+import asyncio
+import csv
+import gzip
+import os
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.repositories.audit import AuditLogRepository, partition_month, partition_name
+
+
+def add_months(month: date, months: int) -> date:
+    """Primer día del mes desplazado `months` meses"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    """Primer día del mes actual (UTC)"""
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+def count_csv_records(path: Path) -> int:
+    """Registros de un CSV gzip, sin el encabezado (admite saltos de línea entre comillas)"""
+    with gzip.open(path, "rt", newline="", encoding="utf-8") as file:
+        return max(sum(1 for _ in csv.reader(file)) - 1, 0)
+
+
+class AuditPartitionService:
+    """Mantenimiento de las particiones de audit_logs"""
+
+    @staticmethod
+    async def ensure_partitions(months_ahead: Optional[int] = None) -> List[str]:
+        """
+        Crear las particiones que falten (idempotente, seguro entre procesos)
+
+        Returns:
+            Nombres de las particiones creadas
+        """
+        months_ahead = settings.audit_partition_months_ahead if months_ahead is None else months_ahead
+        created = []
+        async with AsyncSessionLocal() as db:
+            if not await AuditLogRepository.is_partitioned(db):
+                logger.warning("audit_logs is not partitioned yet: run the alembic migrations")
+                return created
+
+            await AuditLogRepository.lock_maintenance(db)
+            await AuditLogRepository.create_default_partition(db)
+            existing = set(await AuditLogRepository.get_partitions(db))
+            first = current_month()
+            months = {add_months(first, offset) for offset in range(months_ahead + 1)}
+            months.update(await AuditLogRepository.get_default_partition_months(db))
+
+            for month in sorted(months):
+                name = partition_name(month)
+                if name in existing:
+                    continue
+                moved = await AuditLogRepository.create_month_partition(db, month, add_months(month, 1))
+                created.append(name)
+                logger.info(f"Audit log partition {name} created ({moved} rows moved from the default partition)")
+            await db.commit()
+        return created
+
+    @staticmethod
+    async def archive_expired(
+        retention_months: Optional[int] = None,
+        archive_dir: Optional[str] = None,
+        dry_run: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Desconectar, exportar y eliminar las particiones fuera de la retención
+
+        Una partición desconectada que no llegó a exportarse (ejecución
+        interrumpida) se exporta en la siguiente ejecución.
+
+        Returns:
+            [{partition, month, rows, file}] por partición archivada (o por archivar si dry_run)
+        """
+        retention_months = settings.audit_retention_months if retention_months is None else retention_months
+        directory = Path(archive_dir or settings.audit_archive_dir)
+        cutoff = add_months(current_month(), -retention_months)
+
+        async with AsyncSessionLocal() as db:
+            if not await AuditLogRepository.is_partitioned(db):
+                logger.warning("audit_logs is not partitioned yet: run the alembic migrations")
+                return []
+
+            attached = [
+                name for name in await AuditLogRepository.get_partitions(db)
+                if partition_month(name) and partition_month(name) < cutoff
+            ]
+            pending = await AuditLogRepository.get_detached_partitions(db)
+            if dry_run:
+                return [
+                    {
+                        "partition": name,
+                        "month": partition_month(name),
+                        "rows": await AuditLogRepository.count_rows(db, name),
+                        "file": None,
+                    }
+                    for name in sorted(attached + pending)
+                ]
+
+            if attached:
+                await AuditLogRepository.lock_maintenance(db)
+                for name in attached:
+                    await AuditLogRepository.detach_partition(db, name)
+                    logger.info(f"Audit log partition {name} detached")
+                await db.commit()
+
+        archived = []
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in sorted(set(attached + pending)):
+            archived.append(await AuditPartitionService._archive(name, directory))
+        return archived
+
+    @staticmethod
+    async def _archive(name: str, directory: Path) -> Dict[str, Any]:
+        """Exportar una partición desconectada a CSV gzip y eliminarla"""
+        path = directory / f"{name}.csv.gz"
+        tmp = path.with_suffix(".gz.tmp")
+        async with AsyncSessionLocal() as db:
+            rows = await AuditLogRepository.count_rows(db, name)
+            with gzip.open(tmp, "wb") as file:
+                await AuditLogRepository.export_partition(db, name, file)
+            exported = await asyncio.to_thread(count_csv_records, tmp)
+            if exported != rows:
+                raise RuntimeError(f"Export of {name} has {exported} rows, expected {rows}; the table is kept")
+            os.replace(tmp, path)
+
+            await AuditLogRepository.drop_partition(db, name)
+            await db.commit()
+
+        logger.info(f"Audit log partition {name} archived to {path} ({rows} rows) and dropped")
+        return {"partition": name, "month": partition_month(name), "rows": rows, "file": str(path)}
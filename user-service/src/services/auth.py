@@ -1,23 +1,26 @@
 """
 Authentication Service (Business logic layer)
 """
-import json
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import Optional, List
-from datetime import timedelta
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta, timezone
 
 from src.repositories.auth import AuthRepository
+from src.services.audit import AuditLogWriter
+from src.services.revocation import TokenRevocationService
 from src.schemas.auth import (
     LoginRequest, LoginResponse, UserInfo,
     RegisterRequest, ChangePasswordRequest,
-    RequestPasswordResetRequest, ResetPasswordRequest
+    RequestPasswordResetRequest, ResetPasswordRequest,
+    RefreshTokenRequest, TokenRefreshResponse
 )
 from src.core.security import (
-    verify_password, hash_password,
+    PasswordHasher,
     create_access_token
 )
 from src.core.config import settings
+from src.core.permissions import PermissionCache
 
 
 class AuthService:
@@ -45,8 +48,7 @@ class AuthService:
 
         if not user:
             # Create audit log for failed login attempt
-            await AuthRepository.create_audit_log(
-                db=db,
+            AuditLogWriter.record(
                 user_id=None,
                 action="LOGIN_FAILED",
                 ip_address=ip_address,
@@ -57,11 +59,11 @@ class AuthService:
                 detail="Email o contraseña incorrectos"
             )
 
-        # Verify password
-        if not verify_password(data.password, user.password_hash):
+        # Verify password (and rehash it if BCRYPT_ROUNDS changed)
+        valid, new_password_hash = await PasswordHasher.verify_and_rehash(data.password, user.password_hash)
+        if not valid:
             # Create audit log for failed login attempt
-            await AuthRepository.create_audit_log(
-                db=db,
+            AuditLogWriter.record(
                 user_id=user.id,
                 action="LOGIN_FAILED",
                 ip_address=ip_address,
@@ -79,27 +81,20 @@ class AuthService:
                 detail="Usuario inactivo. Contacte al administrador."
             )
 
+        if new_password_hash:
+            await AuthRepository.rehash_password(db, user.id, user.password_hash, new_password_hash)
+
         # Get user roles and permissions
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    perms = json.loads(role.permissions)
-                    if isinstance(perms, list):
-                        permissions.update(perms)
-                except json.JSONDecodeError:
-                    # Log error if permissions format is invalid
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
 
         # Create JWT token
         token_data = {
             "user_id": user.id,
             "email": user.email,
             "roles": role_names,
-            "permissions": list(permissions)
+            "permissions": permissions
         }
 
         access_token = create_access_token(
@@ -107,9 +102,19 @@ class AuthService:
             expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
         )
 
-        # Create audit log for successful login
-        await AuthRepository.create_audit_log(
-            db=db,
+        # Refresh token (new rotation family); expired ones of this user are purged
+        await AuthRepository.delete_expired_refresh_tokens(db, user.id)
+        refresh_token = await AuthRepository.create_refresh_token(
+            db,
+            user_id=user.id,
+            expires_in_days=settings.refresh_token_expire_days,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+        await db.commit()
+
+        # Audit log for successful login (batched, outside this transaction)
+        AuditLogWriter.record(
             user_id=user.id,
             action="LOGIN",
             ip_address=ip_address,
@@ -124,7 +129,7 @@ class AuthService:
             last_name=user.last_name,
             phone=user.phone,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             location_id=user.location_id,
             is_active=user.is_active
         )
@@ -132,9 +137,116 @@ class AuthService:
         return LoginResponse(
             access_token=access_token,
             token_type="bearer",
+            expires_in=settings.access_token_expire_minutes * 60,
+            refresh_token=refresh_token,
             user=user_info
         )
 
+    @staticmethod
+    async def refresh(
+        db: AsyncSession,
+        data: RefreshTokenRequest,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> TokenRefreshResponse:
+        """
+        Issue a new access token from a refresh token (rotation)
+
+        One indexed lookup loads the token, the user and its active roles;
+        there is no password hashing and no audit insert. The presented token
+        is marked as used and a new one of the same family is returned.
+
+        Raises:
+            HTTPException: 401 if the token is unknown, expired or revoked, or was
+                already used (reuse: the whole family is revoked); 403 if the user is inactive
+        """
+        grant = await AuthRepository.get_refresh_grant(db, data.refresh_token)
+        if not grant or grant.revoked_at or grant.expires_at <= datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token inválido o expirado"
+            )
+
+        if grant.used_at or not await AuthRepository.mark_refresh_token_used(db, grant.id):
+            # Un token rotado se volvió a usar: posible robo, se cierra la sesión completa
+            await AuthRepository.revoke_refresh_family(db, grant.family_id)
+            await AuditLogWriter.write(
+                db=db,
+                user_id=grant.user_id,
+                action="REFRESH_TOKEN_REUSE",
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token inválido o expirado"
+            )
+
+        if not grant.is_active:
+            await AuthRepository.revoke_refresh_family(db, grant.family_id)
+            await db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuario inactivo. Contacte al administrador."
+            )
+
+        refresh_token = await AuthRepository.create_refresh_token(
+            db,
+            user_id=grant.user_id,
+            expires_in_days=settings.refresh_token_expire_days,
+            family_id=grant.family_id,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+        await db.commit()
+
+        access_token = create_access_token(
+            data={
+                "user_id": grant.user_id,
+                "email": grant.email,
+                "roles": list(grant.role_names or []),
+                "permissions": await PermissionCache.get_permissions(db, grant.role_ids or [])
+            },
+            expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
+        )
+        return TokenRefreshResponse(
+            access_token=access_token,
+            token_type="bearer",
+            expires_in=settings.access_token_expire_minutes * 60,
+            refresh_token=refresh_token
+        )
+
+    @staticmethod
+    async def logout(
+        db: AsyncSession,
+        data: RefreshTokenRequest,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        access_payload: Optional[Dict[str, Any]] = None
+    ) -> dict:
+        """
+        Revoke the session of a refresh token (its whole rotation family)
+
+        If the request carries the session's access token (access_payload) it
+        is revoked too, so it stops working before its expiry.
+        Always returns success, whether the token exists or not.
+        """
+        if access_payload:
+            await TokenRevocationService.revoke_token(db, access_payload, reason="LOGOUT")
+
+        grant = await AuthRepository.get_refresh_grant(db, data.refresh_token)
+        if grant:
+            await AuthRepository.revoke_refresh_family(db, grant.family_id)
+        await db.commit()
+        if grant:
+            AuditLogWriter.record(
+                user_id=grant.user_id,
+                action="LOGOUT",
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
+        return {"message": "Sesión cerrada exitosamente"}
+
     @staticmethod
     async def register(
         db: AsyncSession,
@@ -172,7 +284,7 @@ class AuthService:
             )
 
         # Hash password
-        password_hash = hash_password(data.password)
+        password_hash = await PasswordHasher.hash(data.password)
 
         # Create user
         user = await AuthRepository.create_user(
@@ -195,8 +307,7 @@ class AuthService:
         )
 
         # Create audit log
-        await AuthRepository.create_audit_log(
-            db=db,
+        AuditLogWriter.record(
             user_id=created_by,
             action="CREATE_USER",
             entity_type="User",
@@ -207,16 +318,7 @@ class AuthService:
         user = await AuthRepository.get_user_by_id(db, user.id)
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    perms = json.loads(role.permissions)
-                    if isinstance(perms, list):
-                        permissions.update(perms)
-                except json.JSONDecodeError:
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
 
         return UserInfo(
             id=user.id,
@@ -225,7 +327,7 @@ class AuthService:
             last_name=user.last_name,
             phone=user.phone,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             location_id=user.location_id,
             is_active=user.is_active
         )
@@ -259,20 +361,21 @@ class AuthService:
             )
 
         # Verify current password
-        if not verify_password(data.current_password, user.password_hash):
+        if not await PasswordHasher.verify(data.current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Contraseña actual incorrecta"
             )
 
         # Hash new password
-        new_password_hash = hash_password(data.new_password)
+        new_password_hash = await PasswordHasher.hash(data.new_password)
 
-        # Update password
+        # Update password (the open sessions of the user are closed)
+        await AuthRepository.revoke_user_refresh_tokens(db, user_id)
         await AuthRepository.update_user_password(db, user_id, new_password_hash)
 
         # Create audit log
-        await AuthRepository.create_audit_log(
+        await AuditLogWriter.write(
             db=db,
             user_id=user_id,
             action="CHANGE_PASSWORD"
@@ -307,8 +410,7 @@ class AuthService:
             print(f"Password reset token for {user.email}: {token_obj.token}")
 
             # Create audit log
-            await AuthRepository.create_audit_log(
-                db=db,
+            AuditLogWriter.record(
                 user_id=user.id,
                 action="REQUEST_PASSWORD_RESET"
             )
@@ -346,16 +448,18 @@ class AuthService:
             )
 
         # Hash new password
-        new_password_hash = hash_password(data.new_password)
+        new_password_hash = await PasswordHasher.hash(data.new_password)
 
-        # Update password
+        # Update password (the open sessions and access tokens of the user are revoked)
+        await AuthRepository.revoke_user_refresh_tokens(db, token_obj.user_id)
+        await TokenRevocationService.revoke_user(db, token_obj.user_id, reason="RESET_PASSWORD")
         await AuthRepository.update_user_password(db, token_obj.user_id, new_password_hash)
 
         # Mark token as used
         await AuthRepository.mark_token_as_used(db, token_obj.id)
 
         # Create audit log
-        await AuthRepository.create_audit_log(
+        await AuditLogWriter.write(
             db=db,
             user_id=token_obj.user_id,
             action="RESET_PASSWORD"
@@ -388,16 +492,7 @@ class AuthService:
 
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    perms = json.loads(role.permissions)
-                    if isinstance(perms, list):
-                        permissions.update(perms)
-                except json.JSONDecodeError:
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
 
         return UserInfo(
             id=user.id,
@@ -406,7 +501,7 @@ class AuthService:
             last_name=user.last_name,
             phone=user.phone,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             location_id=user.location_id,
             is_active=user.is_active
         )
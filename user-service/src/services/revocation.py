@@ -0,0 +1,77 @@
+"""
+Token Revocation Service (Business logic layer)
+
+Revocación de access tokens antes de su expiración:
+- revoke_token: un token concreto por su jti (logout)
+- revoke_user: todos los tokens emitidos a un usuario hasta ahora
+  (desactivación, restablecimiento o cambio de contraseña por un administrador)
+
+Las filas se guardan solo hasta que vence el último token afectado. El
+proceso que revoca actualiza su TokenRevocationList al instante; los demás
+procesos y el gateway la reciben en la siguiente sincronización.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.revocation import TokenRevocationList, revocation_entry
+from src.repositories.revocation import TokenRevocationRepository
+from src.schemas.auth import TokenRevocationEntry, TokenRevocationFeed
+
+
+class TokenRevocationService:
+    """Service for access token revocation"""
+
+    @staticmethod
+    async def revoke_token(db: AsyncSession, payload: Dict[str, Any], reason: str) -> bool:
+        """
+        Revocar el token de un payload ya validado (no confirma la transacción)
+
+        Returns:
+            False si el token no tiene jti (emitido antes de la revocación por jti)
+        """
+        if not payload.get("jti") or not payload.get("exp"):
+            return False
+
+        await TokenRevocationRepository.delete_expired(db)
+        revocation = await TokenRevocationRepository.create(
+            db,
+            reason=reason,
+            expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+            jti=payload["jti"],
+            user_id=payload.get("user_id")
+        )
+        TokenRevocationList.apply([revocation_entry(revocation)])
+        return True
+
+    @staticmethod
+    async def revoke_user(db: AsyncSession, user_id: int, reason: str) -> None:
+        """
+        Revocar todos los access tokens emitidos al usuario hasta ahora (no confirma la transacción)
+
+        La entrada vence cuando vence el último token que pudo emitirse antes
+        (ACCESS_TOKEN_EXPIRE_MINUTES); los tokens posteriores no se ven afectados.
+        """
+        now = datetime.now(timezone.utc)
+        await TokenRevocationRepository.delete_expired(db)
+        revocation = await TokenRevocationRepository.create(
+            db,
+            reason=reason,
+            expires_at=now + timedelta(minutes=settings.access_token_expire_minutes),
+            user_id=user_id,
+            issued_before=now
+        )
+        TokenRevocationList.apply([revocation_entry(revocation)])
+
+    @staticmethod
+    async def get_feed(db: AsyncSession, after_id: int = 0) -> TokenRevocationFeed:
+        """Revocaciones vigentes posteriores a after_id (0: todas), para sincronizar listas remotas"""
+        revocations, last_id = await TokenRevocationRepository.get_since(
+            db, after_id, settings.token_revocation_lookback_seconds
+        )
+        return TokenRevocationFeed(
+            last_id=last_id,
+            revocations=[TokenRevocationEntry(**revocation_entry(revocation)) for revocation in revocations]
+        )
@@ -6,6 +6,7 @@ from fastapi import HTTPException, status
 from typing import List
 
 from src.repositories.role import RoleRepository
+from src.core.permissions import PermissionCache
 from src.schemas.role import RoleCreate, RoleUpdate, RoleResponse, RoleWithUsersCount
 
 
@@ -53,6 +54,7 @@ class RoleService:
             )
 
         role = await RoleRepository.create(db, data)
+        PermissionCache.invalidate()
         return RoleResponse.model_validate(role)
 
     @staticmethod
@@ -76,6 +78,7 @@ class RoleService:
                 )
 
         role = await RoleRepository.update(db, role_id, data)
+        PermissionCache.invalidate()
         return RoleResponse.model_validate(role)
 
     @staticmethod
@@ -98,6 +101,7 @@ class RoleService:
             )
 
         deleted = await RoleRepository.delete(db, role_id)
+        PermissionCache.invalidate()
         if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,19 +1,26 @@
 """
 User Service (Business logic layer)
 """
-import json
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import Optional
+from pydantic import TypeAdapter, ValidationError
+from typing import Optional, List, Dict, Tuple
 
 from src.repositories.user import UserRepository
 from src.repositories.role import RoleRepository
+from src.repositories.auth import AuthRepository
 from src.schemas.user import (
     UserCreate, UserUpdate, UserResponse, UserDetailResponse,
     UserListResponse, AssignRolesRequest, UpdateUserPasswordRequest,
-    ProfileUpdateRequest, ChangePasswordRequest, ProfileResponse
+    ProfileUpdateRequest, ChangePasswordRequest, ProfileResponse,
+    PatientUserBatchRequest, PatientUserBatchResponse, PatientUserResult, PatientUserStatus
 )
-from src.core.security import hash_password, verify_password
+from src.core.security import PasswordHasher
+from src.core.permissions import PermissionCache
+from src.services.revocation import TokenRevocationService
+
+# Validación en bloque de las filas del listado (un solo esquema compilado)
+user_list_adapter = TypeAdapter(List[UserResponse])
 
 
 class UserService:
@@ -27,59 +34,41 @@ class UserService:
         search: Optional[str] = None,
         role_id: Optional[int] = None,
         location_id: Optional[int] = None,
-        is_active: Optional[bool] = None
+        is_active: Optional[bool] = None,
+        include_total: bool = True
     ) -> UserListResponse:
-        """Get all users with pagination and filters"""
+        """
+        Get all users with pagination and filters
+
+        include_total=False skips the count query (total is None), e.g. for
+        "load more" style paging.
+        """
         if page < 1:
             page = 1
         if page_size < 1 or page_size > 100:
             page_size = 50
 
-        skip = (page - 1) * page_size
-
-        users, total = await UserRepository.get_all(
+        rows, total = await UserRepository.get_list(
             db=db,
-            skip=skip,
+            skip=(page - 1) * page_size,
             limit=page_size,
             search=search,
             role_id=role_id,
             location_id=location_id,
-            is_active=is_active
+            is_active=is_active,
+            include_total=include_total
         )
 
-        # Convert to response schema
-        user_responses = []
-        for user in users:
-            active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
-            role_names = [role.name for role in active_roles]
-            permissions = set()
-            for role in active_roles:
-                if role.permissions:
-                    try:
-                        permissions.update(json.loads(role.permissions))
-                    except json.JSONDecodeError:
-                        pass
-            
-            user_dict = {
-                'id': user.id,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'phone': user.phone,
-                'location_id': user.location_id,
-                'is_active': user.is_active,
-                'roles': role_names,
-                'permissions': list(permissions),
-                'created_at': user.created_at,
-                'updated_at': user.updated_at
-            }
-            user_responses.append(UserResponse(**user_dict))
+        # Permisos: OR de los bitsets compilados de los roles; los modelos se validan en bloque
+        await PermissionCache.ensure_loaded(db, set().union(*(row["role_ids"] for row in rows)))
+        for row in rows:
+            row["permissions"] = PermissionCache.permissions_of(row.pop("role_ids"))
 
         return UserListResponse(
             total=total,
             page=page,
             page_size=page_size,
-            users=user_responses
+            users=user_list_adapter.validate_python(rows)
         )
 
     @staticmethod
@@ -94,13 +83,7 @@ class UserService:
 
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    permissions.update(json.loads(role.permissions))
-                except json.JSONDecodeError:
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
 
         return UserDetailResponse(
             id=user.id,
@@ -111,7 +94,7 @@ class UserService:
             location_id=user.location_id,
             is_active=user.is_active,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             created_at=user.created_at,
             updated_at=user.updated_at,
             created_by=user.created_by,
@@ -142,7 +125,7 @@ class UserService:
             )
 
         # Hash password
-        password_hash = hash_password(data.password)
+        password_hash = await PasswordHasher.hash(data.password)
 
         # Create user
         user = await UserRepository.create(
@@ -169,13 +152,7 @@ class UserService:
         user = await UserRepository.get_by_id(db, user.id)
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    permissions.update(json.loads(role.permissions))
-                except json.JSONDecodeError:
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
 
         return UserResponse(
             id=user.id,
@@ -186,11 +163,112 @@ class UserService:
             location_id=user.location_id,
             is_active=user.is_active,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             created_at=user.created_at,
             updated_at=user.updated_at
         )
 
+    @staticmethod
+    async def create_patient_users(
+        db: AsyncSession,
+        data: PatientUserBatchRequest,
+        created_by: int
+    ) -> PatientUserBatchResponse:
+        """
+        Crear en lote los usuarios de pacientes (uso interno de patient-service)
+
+        - Cada item se valida por separado; los inválidos se reportan como INVALID
+        - Los emails ya registrados con solo los roles pedidos (el de paciente)
+          se reportan como EXISTING con su user_id, así un reintento del mismo
+          lote es idempotente; si la cuenta tiene otros roles (personal,
+          administrador) se reporta CONFLICT y no se entrega su user_id
+        - Una consulta para emails existentes, una para roles, el hash de
+          contraseñas fuera del event loop y un INSERT multi-fila por grupo de roles
+        """
+        results: List[Optional[PatientUserResult]] = [None] * len(data.users)
+        valid: List[Tuple[int, UserCreate]] = []
+        for index, item in enumerate(data.users):
+            try:
+                valid.append((index, UserCreate(**item)))
+            except ValidationError as e:
+                error = e.errors()[0]
+                results[index] = PatientUserResult(
+                    index=index,
+                    email=item.get("email") if isinstance(item.get("email"), str) else None,
+                    status=PatientUserStatus.INVALID,
+                    detail=f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                )
+
+        existing = await UserRepository.get_roles_by_emails(db, list({user.email for _, user in valid}))
+        role_ids = {role_id for _, user in valid for role_id in user.role_ids}
+        known_roles = {role.id for role in await RoleRepository.get_by_ids(db, list(role_ids))} if role_ids else set()
+
+        # Primer item de cada email nuevo, agrupado por roles
+        pending: Dict[Tuple[int, ...], Dict[str, UserCreate]] = {}
+        for index, user in valid:
+            missing_roles = set(user.role_ids) - known_roles
+            if missing_roles:
+                results[index] = PatientUserResult(
+                    index=index, email=user.email, status=PatientUserStatus.INVALID,
+                    detail=f"Roles inexistentes: {sorted(missing_roles)}"
+                )
+            elif user.email not in existing:
+                pending.setdefault(tuple(sorted(set(user.role_ids))), {}).setdefault(user.email, user)
+
+        created: Dict[str, int] = {}
+        for group_role_ids, users in pending.items():
+            to_create = list(users.values())
+            # bcrypt en el pool acotado, un hash a la vez para no desplazar a los logins
+            password_hashes = await PasswordHasher.hash_many([user.password for user in to_create])
+            created.update(await UserRepository.create_many(
+                db,
+                [
+                    {
+                        "email": user.email,
+                        "password_hash": password_hash,
+                        "first_name": user.first_name,
+                        "last_name": user.last_name,
+                        "phone": user.phone,
+                        "location_id": user.location_id,
+                        "is_active": True,
+                    }
+                    for user, password_hash in zip(to_create, password_hashes)
+                ],
+                list(group_role_ids),
+                created_by=created_by
+            ))
+
+        # Emails que otra petición creó en paralelo (omitidos por ON CONFLICT)
+        skipped = [email for users in pending.values() for email in users if email not in created]
+        existing.update(await UserRepository.get_roles_by_emails(db, skipped))
+
+        reported = set()
+        for index, user in valid:
+            if results[index] is not None:
+                continue
+            if user.email in created and user.email not in reported:
+                reported.add(user.email)
+                results[index] = PatientUserResult(
+                    index=index, email=user.email, status=PatientUserStatus.CREATED, user_id=created[user.email]
+                )
+            elif user.email in created:
+                results[index] = PatientUserResult(
+                    index=index, email=user.email, status=PatientUserStatus.EXISTING, user_id=created[user.email]
+                )
+            else:
+                user_id, account_role_ids = existing.get(user.email, (None, set()))
+                if account_role_ids and account_role_ids <= set(user.role_ids):
+                    results[index] = PatientUserResult(
+                        index=index, email=user.email, status=PatientUserStatus.EXISTING, user_id=user_id
+                    )
+                else:
+                    results[index] = PatientUserResult(
+                        index=index, email=user.email, status=PatientUserStatus.CONFLICT,
+                        detail="El email pertenece a una cuenta que no es de paciente"
+                    )
+
+        return PatientUserBatchResponse(results=results)
+
     @staticmethod
     async def update_user(
         db: AsyncSession,
@@ -207,6 +285,10 @@ class UserService:
                 detail=f"Usuario con ID {user_id} no encontrado"
             )
 
+        # Deactivating a user revokes the access tokens already issued
+        if data.is_active is False and existing.is_active:
+            await TokenRevocationService.revoke_user(db, user_id, reason="USER_DEACTIVATED")
+
         # Update user
         await UserRepository.update(db, user_id, data, updated_by)
 
@@ -214,13 +296,7 @@ class UserService:
         user = await UserRepository.get_by_id(db, user_id)
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    permissions.update(json.loads(role.permissions))
-                except json.JSONDecodeError:
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
 
         return UserResponse(
             id=user.id,
@@ -231,7 +307,7 @@ class UserService:
             location_id=user.location_id,
             is_active=user.is_active,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             created_at=user.created_at,
             updated_at=user.updated_at
         )
@@ -247,7 +323,9 @@ class UserService:
                 detail=f"Usuario con ID {user_id} no encontrado"
             )
 
-        # Soft delete (deactivate)
+        # Soft delete (deactivate); the access tokens already issued are revoked
+        if existing.is_active:
+            await TokenRevocationService.revoke_user(db, user_id, reason="USER_DEACTIVATED")
         await UserRepository.update(
             db, user_id, UserUpdate(is_active=False)
         )
@@ -285,13 +363,7 @@ class UserService:
         user = await UserRepository.get_by_id(db, user_id)
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    permissions.update(json.loads(role.permissions))
-                except json.JSONDecodeError:
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
 
         return UserResponse(
             id=user.id,
@@ -302,7 +374,7 @@ class UserService:
             location_id=user.location_id,
             is_active=user.is_active,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             created_at=user.created_at,
             updated_at=user.updated_at
         )
@@ -323,9 +395,11 @@ class UserService:
             )
 
         # Hash new password
-        new_password_hash = hash_password(data.new_password)
+        new_password_hash = await PasswordHasher.hash(data.new_password)
 
-        # Update password
+        # Update password (the open sessions and access tokens of the user are revoked)
+        await AuthRepository.revoke_user_refresh_tokens(db, user_id)
+        await TokenRevocationService.revoke_user(db, user_id, reason="ADMIN_PASSWORD_UPDATE")
         await UserRepository.update_password(db, user_id, new_password_hash)
 
         return {"message": "Contraseña actualizada exitosamente"}
@@ -344,13 +418,7 @@ class UserService:
 
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    permissions.update(json.loads(role.permissions))
-                except json.JSONDecodeError:
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
         
         return ProfileResponse(
             id=user.id,
@@ -361,7 +429,7 @@ class UserService:
             location_id=user.location_id,
             is_active=user.is_active,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             created_at=user.created_at,
             updated_at=user.updated_at
         )
@@ -415,13 +483,7 @@ class UserService:
         user = await UserRepository.get_by_id(db, user_id)
         active_roles = [ur.role for ur in user.user_roles if ur.role.is_active]
         role_names = [role.name for role in active_roles]
-        permissions = set()
-        for role in active_roles:
-            if role.permissions:
-                try:
-                    permissions.update(json.loads(role.permissions))
-                except json.JSONDecodeError:
-                    pass
+        permissions = await PermissionCache.get_permissions(db, [role.id for role in active_roles])
 
         return ProfileResponse(
             id=user.id,
@@ -432,7 +494,7 @@ class UserService:
             location_id=user.location_id,
             is_active=user.is_active,
             roles=role_names,
-            permissions=list(permissions),
+            permissions=permissions,
             created_at=user.created_at,
             updated_at=user.updated_at
         )
@@ -453,16 +515,17 @@ class UserService:
             )
 
         # Verify current password
-        if not verify_password(data.current_password, user.password_hash):
+        if not await PasswordHasher.verify(data.current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="La contraseña actual es incorrecta"
             )
 
         # Hash new password
-        new_password_hash = hash_password(data.new_password)
+        new_password_hash = await PasswordHasher.hash(data.new_password)
 
-        # Update password
+        # Update password (the open sessions of the user are closed)
+        await AuthRepository.revoke_user_refresh_tokens(db, user_id)
         await UserRepository.update_password(db, user_id, new_password_hash)
 
         return {"message": "Contraseña actualizada exitosamente"}